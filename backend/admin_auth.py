@@ -0,0 +1,70 @@
+"""관리 API 토큰 인증
+
+대상: /api/admin/*, 내보내기 작업(/api/exports*), 아이템 타입 큐브 상태(/api/item-type-cube/stats).
+내보내기 목록/다운로드는 다른 사용자가 만든 파일까지 드러내고, 작업 생성은 테이블 전체를 읽으므로
+관리 API와 같이 취급한다.
+X-Admin-Token 헤더 또는 `Authorization: Bearer <토큰>`이 ADMIN_TOKEN과 같을 때만 통과시킨다.
+ADMIN_TOKEN이 비어 있으면 관리 API를 모두 막는다 (인덱스 사용 현황, DB 호스트, 프로파일 등은
+내부 구성과 쿼리 정보를 드러내므로 기본값이 공개여서는 안 된다).
+"""
+import hmac
+
+from config import ADMIN_TOKEN
+from serialization import dumps
+
+ADMIN_PREFIXES = ("/api/admin/", "/api/exports")
+ADMIN_ROUTES = frozenset({"/api/item-type-cube/stats"})
+
+
+def protected(path):
+    return path in ADMIN_ROUTES or path.startswith(ADMIN_PREFIXES)
+
+
+def _presented_token(scope):
+    for name, value in scope.get("headers", ()):
+        if name == b"x-admin-token":
+            return value
+        if name == b"authorization" and value[:7].lower() == b"bearer ":
+            return value[7:].strip()
+    return None
+
+
+def authorized(scope):
+    token = _presented_token(scope)
+    return bool(ADMIN_TOKEN) and token is not None and hmac.compare_digest(token, ADMIN_TOKEN.encode())
+
+
+async def _send_forbidden(send):
+    body = dumps({
+        "success": False,
+        "error": "admin token required" if ADMIN_TOKEN else "admin api disabled",
+        "message": "관리 API 접근 권한이 없습니다." if ADMIN_TOKEN else "ADMIN_TOKEN이 설정되지 않아 관리 API를 사용할 수 없습니다."
+    })
+    await send({
+        "type": "http.response.start",
+        "status": 403,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"cache-control", b"no-store"),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class AdminTokenMiddleware:
+    """관리 API 요청 토큰 확인 (ASGI 미들웨어, CORS preflight는 통과)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] == "http"
+            and protected(scope["path"])
+            and scope["method"] != "OPTIONS"
+            and not authorized(scope)
+        ):
+            await _send_forbidden(send)
+            return
+        await self.app(scope, receive, send)
@@ -0,0 +1,196 @@
+"""DB 앞단 동시 실행 제한(admission control)과 부하 차단
+
+경로를 등급으로 나눠 등급마다 동시 실행 수와 대기열 길이를 제한한다.
+  - bulk   : 테이블 전체를 읽는 대량 조회 (deadlines.BULK_ROUTES)
+  - lookup : 그 밖의 DB 조회
+  - 제외   : 헬스체크/관리 API/메모리 조회/썸네일 (제한 없음)
+대기열이 가득 찼거나, 예상 대기 시간(앞선 대기 수 / 동시 실행 수 × 평균 처리 시간)이
+요청의 남은 deadline을 넘으면 기다리지 않고 바로 503 + Retry-After로 응답한다.
+등급별 실행/대기 수, 차단 건수는 stats()로 노출한다.
+"""
+import asyncio
+import math
+import time
+from collections import Counter, deque
+
+from config import (
+    ADMISSION_BULK_CONCURRENCY,
+    ADMISSION_BULK_QUEUE,
+    ADMISSION_ENABLED,
+    ADMISSION_LOOKUP_CONCURRENCY,
+    ADMISSION_LOOKUP_QUEUE,
+)
+from deadlines import BULK_ROUTES, STREAM_ROUTES, current_scope
+from serialization import dumps
+
+EXEMPT_ROUTES = frozenset({
+    "/",
+    "/health",
+    "/api/health",
+    "/docs",
+    "/openapi.json",
+    "/api/item-type-cube/stats",
+    "/api/images/thumbnail",
+    "/api/images/thumbnail/stats",
+})
+# 내보내기는 작업 스레드 풀에서 실행되고 다운로드는 오래 걸릴 수 있어 제한하지 않는다
+EXEMPT_PREFIXES = ("/api/admin/", "/api/exports")
+# 평균 처리 시간 지수 이동 평균 가중치와 초기값 (초)
+EWMA_ALPHA = 0.2
+INITIAL_SERVICE_TIME = {"bulk": 5.0, "lookup": 0.2}
+
+
+class Shed(Exception):
+    """부하 차단 (사유, 재시도 권장 초)"""
+
+    def __init__(self, reason, retry_after):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class RouteClass:
+    """등급 하나의 동시 실행 슬롯과 대기열 (이벤트 루프 안에서만 사용)"""
+
+    def __init__(self, name, concurrency, queue_size):
+        self.name = name
+        self.concurrency = max(1, concurrency)
+        self.queue_size = queue_size
+        self.active = 0
+        self.waiters = deque()
+        self.service_time = INITIAL_SERVICE_TIME.get(name, 1.0)
+        self.counters = Counter()
+
+    def expected_wait(self, position):
+        """대기열 position번째 요청의 예상 대기 시간 (초)"""
+        return position / self.concurrency * self.service_time
+
+    async def acquire(self, remaining):
+        if self.active < self.concurrency and not self.waiters:
+            self.active += 1
+            self.counters["admitted"] += 1
+            return
+        position = len(self.waiters) + 1
+        expected = self.expected_wait(position)
+        if len(self.waiters) >= self.queue_size:
+            self._shed("queue_full", expected)
+        if remaining is not None and expected > remaining:
+            self._shed("deadline", expected)
+
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), remaining)
+        except BaseException as exc:
+            if waiter.done() and not waiter.cancelled():
+                # 시간 초과/취소와 슬롯 양도가 겹치면 받은 슬롯을 다음 요청에 넘긴다
+                self.release(0)
+            else:
+                waiter.cancel()
+            if isinstance(exc, asyncio.TimeoutError):
+                self._shed("timeout", self.service_time)
+            raise
+        finally:
+            if waiter in self.waiters:
+                self.waiters.remove(waiter)
+        self.counters["admitted"] += 1
+        self.counters["queued"] += 1
+
+    def release(self, elapsed):
+        """슬롯 반납 (대기 중인 요청이 있으면 슬롯을 그대로 넘긴다)"""
+        if elapsed:
+            self.service_time += EWMA_ALPHA * (elapsed - self.service_time)
+        while self.waiters:
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def _shed(self, reason, retry_after):
+        self.counters[f"shed_{reason}"] += 1
+        raise Shed(reason, max(1, math.ceil(retry_after)))
+
+    def stats(self):
+        return {
+            "class": self.name,
+            "concurrency": self.concurrency,
+            "queue_size": self.queue_size,
+            "active": self.active,
+            "queue_depth": len(self.waiters),
+            "avg_service_ms": round(self.service_time * 1000, 1),
+            "admitted": self.counters["admitted"],
+            "queued": self.counters["queued"],
+            "shed_queue_full": self.counters["shed_queue_full"],
+            "shed_deadline": self.counters["shed_deadline"],
+            "shed_timeout": self.counters["shed_timeout"],
+        }
+
+
+ROUTE_CLASSES = {
+    "bulk": RouteClass("bulk", ADMISSION_BULK_CONCURRENCY, ADMISSION_BULK_QUEUE),
+    "lookup": RouteClass("lookup", ADMISSION_LOOKUP_CONCURRENCY, ADMISSION_LOOKUP_QUEUE),
+}
+
+
+def route_class(path):
+    """경로 → 등급 이름 (제한 대상이 아니면 None)"""
+    if (
+        path in EXEMPT_ROUTES or path in STREAM_ROUTES or path.startswith(EXEMPT_PREFIXES)
+        or not path.startswith("/api/")
+    ):
+        return None
+    return "bulk" if path in BULK_ROUTES else "lookup"
+
+
+def stats():
+    return {
+        "enabled": ADMISSION_ENABLED,
+        "classes": [route.stats() for route in ROUTE_CLASSES.values()],
+    }
+
+
+async def _send_shed(send, shed):
+    body = dumps({
+        "success": False,
+        "error": f"overloaded: {shed.reason}",
+        "message": "요청이 많아 처리하지 못했습니다. 잠시 후 다시 시도해 주세요."
+    })
+    await send({
+        "type": "http.response.start",
+        "status": 503,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(shed.retry_after).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class AdmissionMiddleware:
+    """경로 등급별 동시 실행 제한 (ASGI 미들웨어, RequestDeadlineMiddleware 안쪽에 둔다)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        name = route_class(scope["path"]) if scope["type"] == "http" and ADMISSION_ENABLED else None
+        if name is None:
+            await self.app(scope, receive, send)
+            return
+
+        route = ROUTE_CLASSES[name]
+        request_scope = current_scope()
+        remaining = request_scope.remaining() if request_scope is not None else None
+        try:
+            await route.acquire(remaining)
+        except Shed as shed:
+            await _send_shed(send, shed)
+            return
+
+        started = time.monotonic()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            route.release(time.monotonic() - started)
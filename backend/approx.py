@@ -0,0 +1,284 @@
+"""근사 조회(approx=true) 모드
+
+탐색 중 필터를 바꿀 때마다 원본 전체를 집계하지 않도록 두 가지 근사 자료를 사용한다.
+  - 층화 표본  : ai_image_dm.follow_sample (migrations/0003). (연도, 월, 대분류) 층마다 뽑은 행 표본으로,
+                 행 가중치 w(= 1 / 표본 비율)의 합으로 건수를 추정하고 분산 추정치 Σ w(w-1)로
+                 95% 오차 범위를 함께 돌려준다. 표본 뷰가 아직 없으면 TABLESAMPLE BERNOULLI로 대신한다.
+  - HLL 스케치 : (값, 연도, 월, 대분류)별 post_id HyperLogLog 레지스터.
+                 행 표본으로는 고유 게시물 수를 추정할 수 없으므로 원본에서 레지스터를 만들어 두고,
+                 조회 시 필요한 조합만 병합(max)해서 고유 게시물 수를 추정한다.
+원본 데이터 버전이 바뀌면 표본 뷰 갱신은 스케줄러의 approx-sample 작업(refresh_sample_if_stale,
+클러스터에서 한 곳만 실행)이, 스케치 재구성은 각 프로세스가 백그라운드에서 수행하고,
+그동안은 이전 표본/스케치로 응답한다.
+정확한 값은 approx=false(기본)로 언제든 조회할 수 있다.
+"""
+import logging
+import math
+import threading
+import time
+
+import numpy as np
+
+from config import APPROX_HLL_PRECISION
+from data_version import data_version
+from db import get_db_connection, pooled_connection
+from query_builder import FOLLOW_TABLE
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_TABLE = "ai_image_dm.follow_sample"
+# 표본 뷰가 없을 때 사용할 TABLESAMPLE 비율(%)과 고정 시드
+FALLBACK_SAMPLE_PERCENT = 5
+FALLBACK_SAMPLE_SEED = 42
+# 95% 신뢰구간
+Z_95 = 1.96
+# HLL 스케치 대상 차원 (원본 테이블 컬럼)
+SKETCH_DIMENSIONS = ("color", "pattern", "detail_1", "category_l3")
+
+# 표본 건수 추정 컬럼 (추정 건수, 분산 추정치)
+ESTIMATE_COLUMNS = (
+    "SUM(sample_weight) AS estimate, "
+    "SUM(sample_weight * (sample_weight - 1)) AS variance"
+)
+
+
+def error_bound(variance):
+    """분산 추정치 → 95% 오차 범위 (±건수)"""
+    return round(Z_95 * math.sqrt(max(float(variance or 0), 0.0)))
+
+
+class HyperLogLog:
+    """HyperLogLog 레지스터 (레지스터 수 m = 2^precision)"""
+
+    def __init__(self, registers):
+        self.registers = np.asarray(registers, dtype=np.uint8)
+
+    @classmethod
+    def empty(cls, precision=APPROX_HLL_PRECISION):
+        return cls(np.zeros(1 << precision, dtype=np.uint8))
+
+    def merge(self, other):
+        return HyperLogLog(np.maximum(self.registers, other.registers))
+
+    @property
+    def relative_error(self):
+        return 1.04 / math.sqrt(len(self.registers))
+
+    def estimate(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / float(np.sum(np.exp2(-self.registers.astype(np.float64))))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        # 작은 값 구간은 linear counting으로 보정
+        if raw <= 2.5 * m and zeros:
+            return m * math.log(m / zeros)
+        return raw
+
+
+def register_query(dimension, precision=APPROX_HLL_PRECISION):
+    """(연도, 월, 대분류, 값)별 HLL 레지스터 SQL
+
+    post_id의 64비트 해시 하위 precision비트로 레지스터를 고르고,
+    나머지 상위 비트의 선행 0 개수 + 1을 rank로 기록한다.
+    """
+    if dimension not in SKETCH_DIMENSIONS:
+        raise ValueError(f"지원하지 않는 차원입니다: {dimension}")
+    width = 64 - precision
+    mask = (1 << width) - 1
+    return f"""
+        SELECT post_year, post_month, category_l1, value,
+               array_agg(register), array_agg(rank)
+        FROM (
+            SELECT post_year, post_month, category_l1, value,
+                   (hash & {(1 << precision) - 1})::int AS register,
+                   MAX(CASE WHEN rest = 0 THEN {width + 1}
+                            ELSE {width} - floor(log(2, rest::numeric))::int END) AS rank
+            FROM (
+                SELECT post_year, post_month, category_l1, {dimension} AS value,
+                       hashtextextended(post_id::text, 0) AS hash,
+                       (hashtextextended(post_id::text, 0) >> {precision}) & {mask} AS rest
+                FROM {FOLLOW_TABLE}
+                WHERE {dimension} IS NOT NULL
+                AND {dimension} != ''
+                AND post_id IS NOT NULL
+                AND post_year IS NOT NULL
+                AND post_month IS NOT NULL
+            ) hashed
+            GROUP BY 1, 2, 3, 4, 5
+        ) registers
+        GROUP BY 1, 2, 3, 4
+    """
+
+
+class SketchIndex:
+    """한 차원의 (값, 연도, 월) → {대분류: 레지스터 행}"""
+
+    def __init__(self, dimension, rows, precision=APPROX_HLL_PRECISION):
+        """rows: (post_year, post_month, category_l1, 값, [레지스터 번호], [rank])"""
+        self.dimension = dimension
+        self.precision = precision
+        self.registers = np.zeros((len(rows), 1 << precision), dtype=np.uint8)
+        self.groups = {}
+        for i, (year, month, category_l1, value, indexes, ranks) in enumerate(rows):
+            self.registers[i, np.asarray(indexes, dtype=np.intp)] = np.asarray(ranks, dtype=np.uint8)
+            self.groups.setdefault((value, year, month), {})[category_l1] = i
+
+    def sketch(self, value, year, month, category_l1=None):
+        """조건에 맞는 레지스터를 병합한 스케치"""
+        groups = self.groups.get((value, year, month), {})
+        if category_l1:
+            rows = [groups[category_l1]] if category_l1 in groups else []
+        else:
+            rows = list(groups.values())
+        if not rows:
+            return HyperLogLog.empty(self.precision)
+        return HyperLogLog(self.registers[rows].max(axis=0))
+
+    def distinct_posts(self, value, periods, category_l1=None):
+        """월별 고유 게시물 수 추정치와 95% 오차 범위 [(추정치, ±오차)]"""
+        result = []
+        for year, month in periods:
+            sketch = self.sketch(value, year, month, category_l1)
+            estimate = sketch.estimate()
+            result.append((round(estimate), round(Z_95 * sketch.relative_error * estimate)))
+        return result
+
+    def stats(self):
+        return {
+            "dimension": self.dimension,
+            "groups": len(self.registers),
+            "bytes": int(self.registers.nbytes),
+        }
+
+
+_state_lock = threading.Lock()
+_sample_exists = None
+_sample_checked_version = None
+_sample_version = None
+_sample_refreshing = False
+# (데이터 버전, {차원: SketchIndex}) — 한 번에 바꿔 읽는 쪽이 버전과 스케치를 함께 보게 한다
+_sketches = (None, None)
+_sketches_building = False
+_last_error = None
+
+
+def _sample_status(cursor):
+    """(표본 뷰 존재 여부, 표본을 만든 원본 데이터 버전)"""
+    cursor.execute(
+        "SELECT to_regclass(%s) IS NOT NULL, obj_description(to_regclass(%s)::oid, 'pg_class')",
+        (SAMPLE_TABLE, SAMPLE_TABLE),
+    )
+    return cursor.fetchone()
+
+
+def refresh_sample(version=None):
+    """표본 뷰 재추출 (주석에 원본 데이터 버전 기록)
+
+    CONCURRENTLY로 갱신하므로 재추출 중에도 근사 조회가 표본 뷰를 계속 읽는다
+    (sample_id 유니크 인덱스 필요, migrations/0003).
+    """
+    global _sample_refreshing, _sample_checked_version, _last_error
+    version = version or data_version(FOLLOW_TABLE)
+    started = time.perf_counter()
+    _sample_refreshing = True
+    conn = get_db_connection()
+    try:
+        conn.autocommit = True
+        with conn.cursor() as cursor:
+            cursor.execute(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {SAMPLE_TABLE}")
+            cursor.execute(f"COMMENT ON MATERIALIZED VIEW {SAMPLE_TABLE} IS %s", (version,))
+        logger.info("approx sample refreshed in %.1fs", time.perf_counter() - started)
+    except Exception as exc:
+        _last_error = str(exc)
+        raise
+    finally:
+        conn.close()
+        _sample_refreshing = False
+        _sample_checked_version = None
+    return version
+
+
+def refresh_sample_if_stale():
+    """표본 뷰가 원본 데이터 버전보다 오래되었으면 재추출 (스케줄러 approx-sample 작업)"""
+    version = data_version(FOLLOW_TABLE)
+    # 표본 버전 주석은 기본 DB에서 기록하므로 기본 DB에서 확인
+    with pooled_connection(primary=True) as conn:
+        with conn.cursor() as cursor:
+            exists, sampled_version = _sample_status(cursor)
+    if not exists or sampled_version == version:
+        return None
+    return refresh_sample(version)
+
+
+def sample_source():
+    """표본 FROM 절 (표본 뷰가 없으면 TABLESAMPLE)"""
+    global _sample_exists, _sample_checked_version, _sample_version
+    version = data_version(FOLLOW_TABLE)
+    if _sample_checked_version != version:
+        with pooled_connection() as conn:
+            with conn.cursor() as cursor:
+                exists, sampled_version = _sample_status(cursor)
+        with _state_lock:
+            _sample_exists, _sample_version = exists, sampled_version
+            _sample_checked_version = version
+    if _sample_exists:
+        return SAMPLE_TABLE
+    return (
+        f"(SELECT *, {100 / FALLBACK_SAMPLE_PERCENT}::float8 AS sample_weight FROM {FOLLOW_TABLE} "
+        f"TABLESAMPLE BERNOULLI ({FALLBACK_SAMPLE_PERCENT}) REPEATABLE ({FALLBACK_SAMPLE_SEED})) AS sample"
+    )
+
+
+def _build_sketches(version):
+    global _sketches, _sketches_building, _last_error
+    try:
+        started = time.perf_counter()
+        indexes = {}
+        with pooled_connection() as conn:
+            with conn.cursor() as cursor:
+                for dimension in SKETCH_DIMENSIONS:
+                    cursor.execute(register_query(dimension))
+                    indexes[dimension] = SketchIndex(dimension, cursor.fetchall())
+        _sketches = (version, indexes)
+        logger.info("approx sketches built in %.1fs", time.perf_counter() - started)
+    except Exception as exc:
+        _last_error = str(exc)
+        logger.exception("approx sketch build failed")
+    finally:
+        _sketches_building = False
+
+
+def get_sketch(dimension):
+    """현재 데이터 버전의 HLL 스케치 인덱스
+
+    오래되었으면 백그라운드에서 재구성하고, 그동안(또는 준비 전)에는 None을 돌려준다.
+    이전 버전 스케치로 답하면 새 버전으로 표시되어 캐시되므로 쓰지 않는다.
+    """
+    global _sketches_building
+    if dimension not in SKETCH_DIMENSIONS:
+        return None
+    version = data_version(FOLLOW_TABLE)
+    sketches_version, indexes = _sketches
+    if sketches_version == version:
+        return indexes.get(dimension)
+    with _state_lock:
+        if not _sketches_building and _sketches[0] != version:
+            _sketches_building = True
+            threading.Thread(target=_build_sketches, args=(version,),
+                             name="approx-sketches", daemon=True).start()
+    return None
+
+
+def approx_status():
+    sketches_version, sketches = _sketches
+    return {
+        "sample_table": SAMPLE_TABLE if _sample_exists else None,
+        "sample_version": _sample_version,
+        "sample_stale": bool(_sample_exists) and _sample_version != _sample_checked_version,
+        "sample_refreshing": _sample_refreshing,
+        "sketches_ready": sketches is not None,
+        "sketches_version": sketches_version,
+        "sketches_building": _sketches_building,
+        "sketches": [index.stats() for index in (sketches or {}).values()],
+        "error": _last_error,
+    }
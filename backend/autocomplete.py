@@ -0,0 +1,212 @@
+"""해시태그 / TPO 키워드 자동완성 인덱스
+
+무드 매칭 인덱스(mood_matching)의 정규화된 해시태그와 tag_norm 키워드를 모아
+정렬된 키 배열 + 이진 탐색으로 접두사 검색하고, 이미지 수(빈도) 순으로 돌려준다.
+  - 키는 한글 음절을 자모로 풀어 쓴 문자열이다 (겹모음/겹받침도 낱자로 분해).
+    입력 중인 음절("브", "블랙" 입력 중의 "블래")이나 받침이 다음 글자로 넘어가기 전 상태("간" → "가나")도
+    접두사로 일치한다.
+  - 입력이 자음으로만 되어 있으면("ㅂㄹ") 초성 키 배열도 함께 검색한다.
+  - 용어 id를 빈도 순위로 매기므로 접두사 범위 안의 상위 k개는 id 배열에서 np.partition으로 고르고,
+    범위가 큰 짧은 접두사는 만들 때 상위 MAX_LIMIT개를 미리 계산해 둔다.
+인덱스는 무드 매칭 인덱스의 데이터 버전이 바뀔 때 다시 만든다.
+"""
+import time
+from bisect import bisect_left
+
+import numpy as np
+
+from deadlines import DetachedBuild
+from mood_matching import get_index as get_mood_match_index, normalize_tag
+
+MAX_LIMIT = 50
+# 범위가 이보다 큰 접두사(길이 HEAD_DEPTH 이하)는 상위 결과를 미리 계산
+HEAD_RANGE = 512
+HEAD_DEPTH = 3
+KINDS = ("hashtag", "keyword")
+
+_CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+_JUNGSEONG = (
+    "ㅏ", "ㅐ", "ㅑ", "ㅒ", "ㅓ", "ㅔ", "ㅕ", "ㅖ", "ㅗ", "ㅗㅏ", "ㅗㅐ",
+    "ㅗㅣ", "ㅛ", "ㅜ", "ㅜㅓ", "ㅜㅔ", "ㅜㅣ", "ㅠ", "ㅡ", "ㅡㅣ", "ㅣ",
+)
+_JONGSEONG = (
+    "", "ㄱ", "ㄲ", "ㄱㅅ", "ㄴ", "ㄴㅈ", "ㄴㅎ", "ㄷ", "ㄹ", "ㄹㄱ", "ㄹㅁ", "ㄹㅂ", "ㄹㅅ", "ㄹㅌ",
+    "ㄹㅍ", "ㄹㅎ", "ㅁ", "ㅂ", "ㅂㅅ", "ㅅ", "ㅆ", "ㅇ", "ㅈ", "ㅊ", "ㅋ", "ㅌ", "ㅍ", "ㅎ",
+)
+# 겹받침/겹모음 호환 자모 → 낱자
+_COMPOUND_JAMO = {
+    "ㄳ": "ㄱㅅ", "ㄵ": "ㄴㅈ", "ㄶ": "ㄴㅎ", "ㄺ": "ㄹㄱ", "ㄻ": "ㄹㅁ", "ㄼ": "ㄹㅂ", "ㄽ": "ㄹㅅ",
+    "ㄾ": "ㄹㅌ", "ㄿ": "ㄹㅍ", "ㅀ": "ㄹㅎ", "ㅄ": "ㅂㅅ",
+    "ㅘ": "ㅗㅏ", "ㅙ": "ㅗㅐ", "ㅚ": "ㅗㅣ", "ㅝ": "ㅜㅓ", "ㅞ": "ㅜㅔ", "ㅟ": "ㅜㅣ", "ㅢ": "ㅡㅣ",
+}
+_CONSONANTS = frozenset("ㄱㄲㄳㄴㄵㄶㄷㄸㄹㄺㄻㄼㄽㄾㄿㅀㅁㅂㅃㅄㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ")
+
+
+def _translation_tables():
+    jamo = {ord(char): value for char, value in _COMPOUND_JAMO.items()}
+    # normalize_tag의 NFKC는 호환 자모("ㅂ")를 첫가끝 조합형 자모로 바꾸므로 다시 호환 자모로 맞춘다
+    jamo.update({0x1100 + index: char for index, char in enumerate(_CHOSEONG)})
+    jamo.update({0x1161 + index: value for index, value in enumerate(_JUNGSEONG)})
+    jamo.update({0x11A8 + index: value for index, value in enumerate(_JONGSEONG[1:])})
+    choseong = dict(jamo)
+    for index in range(11172):
+        syllable = 0xAC00 + index
+        lead, rest = divmod(index, 588)
+        vowel, tail = divmod(rest, 28)
+        jamo[syllable] = _CHOSEONG[lead] + _JUNGSEONG[vowel] + _JONGSEONG[tail]
+        choseong[syllable] = _CHOSEONG[lead]
+    return jamo, choseong
+
+
+_JAMO_TABLE, _CHOSEONG_TABLE = _translation_tables()
+
+
+def jamo_key(text):
+    """정규화된 문자열 → 자모 분해 키 ("블랙" → "ㅂㅡㄹㄹㅐㄱ")"""
+    return text.translate(_JAMO_TABLE)
+
+
+def choseong_key(text):
+    """정규화된 문자열 → 초성 키 ("블랙" → "ㅂㄹ", 한글이 아닌 글자는 그대로)"""
+    return text.translate(_CHOSEONG_TABLE)
+
+
+def is_choseong_query(key):
+    """자모 분해 키가 자음으로만 되어 있는지 ("ㅂㄹ")"""
+    return bool(key) and all(char in _CONSONANTS for char in key)
+
+
+class _PrefixArray:
+    """정렬된 (키, 용어 id) 배열 — 접두사 범위의 빈도 상위 k개 (용어 id = 빈도 순위)"""
+
+    def __init__(self, pairs):
+        pairs.sort()
+        self.keys = [key for key, _ in pairs]
+        self.ids = np.array([term_id for _, term_id in pairs], dtype=np.int32)
+        self._head = {}
+        for depth in range(1, HEAD_DEPTH + 1):
+            for prefix in {key[:depth] for key in self.keys if len(key) >= depth}:
+                lo, hi = self._range(prefix)
+                if hi - lo > HEAD_RANGE:
+                    self._head[prefix] = self._select(lo, hi, MAX_LIMIT)
+
+    def _range(self, prefix):
+        return bisect_left(self.keys, prefix), bisect_left(self.keys, prefix + "\U0010ffff")
+
+    def _select(self, lo, hi, limit):
+        ids = self.ids[lo:hi]
+        if hi - lo > limit:
+            ids = np.partition(ids, limit)[:limit]
+        return np.sort(ids).tolist()
+
+    def top(self, prefix, limit):
+        """접두사가 일치하는 용어 id (빈도 순위 오름차순, 최대 limit개)"""
+        head = self._head.get(prefix)
+        if head is not None:
+            return head[:limit]
+        lo, hi = self._range(prefix)
+        return self._select(lo, hi, limit) if hi > lo else []
+
+    def __len__(self):
+        return len(self.keys)
+
+
+class AutocompleteIndex:
+    """해시태그 + TPO 키워드 접두사 인덱스"""
+
+    def __init__(self, hashtags, keywords, version=None):
+        """hashtags: [(용어, 이미지 수)], keywords: [(용어, 1차 카테고리, 2차 카테고리)] — 용어는 정규화된 값"""
+        started = time.perf_counter()
+        self.version = version
+        counts = dict(hashtags)
+        self.categories = {}
+        for term, cate1, cate2 in keywords:
+            categories = self.categories.setdefault(term, [])
+            if [cate1, cate2] not in categories:
+                categories.append([cate1, cate2])
+        # 빈도 내림차순, 같으면 짧은 용어 우선 → 순위 = 용어 id
+        self.terms = sorted(set(counts) | set(self.categories), key=lambda term: (-counts.get(term, 0), len(term), term))
+        self.counts = [counts.get(term, 0) for term in self.terms]
+        self.term_ids = {term: term_id for term_id, term in enumerate(self.terms)}
+
+        self.indexes = {}
+        for kind, members in (("hashtag", counts), ("keyword", self.categories)):
+            ids = [self.term_ids[term] for term in members]
+            choseong_pairs = [(choseong_key(self.terms[i]), i) for i in ids]
+            self.indexes[kind] = (
+                _PrefixArray([(jamo_key(self.terms[i]), i) for i in ids]),
+                # 한글이 없는 용어는 초성 키가 원문과 같으므로 제외
+                _PrefixArray([(key, i) for key, i in choseong_pairs if key != self.terms[i]]),
+            )
+        self.build_seconds = time.perf_counter() - started
+
+    def _item(self, term_id):
+        term = self.terms[term_id]
+        categories = self.categories.get(term)
+        return {
+            "text": term,
+            "count": self.counts[term_id],
+            "type": "keyword" if categories is not None else "hashtag",
+            "categories": categories or [],
+        }
+
+    def suggest(self, query, limit=10, kind=None):
+        """접두사 자동완성 목록 (정확히 일치하는 용어 우선, 그다음 빈도 순)"""
+        normalized = normalize_tag(query)
+        if not normalized:
+            return []
+        limit = min(max(limit, 1), MAX_LIMIT)
+        key = jamo_key(normalized)
+        choseong = is_choseong_query(key)
+        found = set()
+        for name in (kind,) if kind else KINDS:
+            jamo_index, choseong_index = self.indexes[name]
+            found.update(jamo_index.top(key, limit))
+            if choseong:
+                found.update(choseong_index.top(key, limit))
+        ranked = sorted(found)
+        exact = self.term_ids.get(normalized)
+        if exact in found:
+            ranked.remove(exact)
+            ranked.insert(0, exact)
+        return [self._item(term_id) for term_id in ranked[:limit]]
+
+    def stats(self):
+        return {
+            "version": self.version,
+            "terms": len(self.terms),
+            "hashtags": len(self.indexes["hashtag"][0]),
+            "keywords": len(self.indexes["keyword"][0]),
+            "build_seconds": round(self.build_seconds, 3),
+        }
+
+
+def from_mood_index(mood_index):
+    hashtags = [(hashtag, len(posting)) for hashtag, posting in zip(mood_index.hashtags, mood_index.postings)]
+    keywords = [
+        (normalize_tag(tag_norm), cate1, cate2)
+        for cate1, cate2s in mood_index.taxonomy.items()
+        for cate2, tag_norms in cate2s.items()
+        for tag_norm in tag_norms
+        if normalize_tag(tag_norm)
+    ]
+    return AutocompleteIndex(hashtags, keywords, mood_index.version)
+
+
+_index = None
+_builds = DetachedBuild("autocomplete")
+
+
+def _rebuild(mood_index):
+    global _index
+    _index = from_mood_index(mood_index)
+    return _index
+
+
+def get_index():
+    """현재 데이터 버전의 자동완성 인덱스 (무드 매칭 인덱스가 바뀌면 요청 밖에서 재생성하고 기다림)"""
+    mood_index = get_mood_match_index()
+    index = _index
+    if index is None or index.version != mood_index.version:
+        index = _builds.wait(mood_index.version, _rebuild, mood_index)
+    return index
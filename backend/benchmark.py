@@ -0,0 +1,426 @@
+"""성능 벤치마크 스크립트
+
+실제 DB(.env 설정)를 대상으로 실행한다.
+
+    python benchmark.py prepared --iterations 200
+    python benchmark.py serialize --rows 100000   # DB 불필요 (합성 데이터)
+    python benchmark.py approx --iterations 20
+    python benchmark.py copy --rows 1000000
+    python benchmark.py autocomplete --vocab 200000   # DB 불필요 (합성 어휘)
+    python benchmark.py workers --seconds 10          # 1~CPU 수 워커 처리량, 워커별 RSS/PSS
+    python benchmark.py workers --no-shared           # 공유 스냅샷 없이 같은 측정
+"""
+import argparse
+import datetime
+import http.client
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import quote
+
+from fastapi.encoders import jsonable_encoder
+from psycopg2.extras import RealDictCursor
+
+import approx
+import autocomplete
+import copy_extract
+from db import get_db_connection, pooled_connection
+from facets import facets_query
+from query_builder import ITEMTYPE_TABLE, attribute_images_query, compile_shape, execute, select
+from serialization import RowSet, dumps, fetch_rowset, gc_paused
+import serve
+from trends import rollup_query
+
+
+def _timed(func, iterations):
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def _report(label, samples):
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1] if len(samples) >= 20 else samples[-1]
+    print(
+        f"{label:<28} mean={statistics.mean(samples):8.3f}ms "
+        f"p50={statistics.median(samples):8.3f}ms p95={p95:8.3f}ms"
+    )
+
+
+def _sample_queries():
+    return {
+        "item-type-keywords": select(
+            ITEMTYPE_TABLE,
+            "category_l3, COUNT(*) as count",
+            {"category_l1": "상의", "post_year": 2024, "post_month": 5, "follower_count": 1000},
+            conditions=("category_l3 IS NOT NULL", "category_l3 != ''"),
+            group_by="category_l3",
+            order_by="count DESC",
+            limit=10,
+        ),
+        "color-images": attribute_images_query(
+            "color", "블랙", "상의", None, 2024, 5, 1000, 20,
+        ),
+    }
+
+
+def bench_prepared(args):
+    """일반 execute와 prepared statement 실행 시간 및 planning time 비교"""
+    for name, query in _sample_queries().items():
+        compiled = compile_shape(query.shape)
+        print(f"\n[{name}] {compiled.sql}")
+
+        # 1) 매 호출 파싱/플래닝 (기존 방식)
+        conn = get_db_connection()
+        try:
+            with conn.cursor() as cursor:
+                def run_plain():
+                    cursor.execute(compiled.text_sql, query.params)
+                    cursor.fetchall()
+                _report("plain execute", _timed(run_plain, args.iterations))
+
+                cursor.execute("EXPLAIN (ANALYZE, SUMMARY) " + compiled.text_sql, query.params)
+                plan_lines = [row[0] for row in cursor.fetchall()]
+                planning = [line for line in plan_lines if line.startswith("Planning Time")]
+                print(f"{'':<28} {planning[0] if planning else ''}")
+        finally:
+            conn.close()
+
+        # 2) 풀 커넥션 + prepared statement
+        with pooled_connection() as pooled:
+            with pooled.cursor(cursor_factory=RealDictCursor) as cursor:
+                def run_prepared():
+                    execute(cursor, query)
+                    cursor.fetchall()
+                _report("prepared execute", _timed(run_prepared, args.iterations))
+
+                placeholders = ", ".join(["%s"] * compiled.param_count)
+                cursor.execute(
+                    f"EXPLAIN (ANALYZE, SUMMARY) EXECUTE {compiled.name} ({placeholders})",
+                    query.params,
+                )
+                plan_lines = [row["QUERY PLAN"] for row in cursor.fetchall()]
+                planning = [line for line in plan_lines if line.startswith("Planning Time")]
+                print(f"{'':<28} {planning[0] if planning else ''}")
+
+
+def _trend_rows(cursor, approximate):
+    execute(cursor, rollup_query("color", "상의", approximate=approximate))
+    return cursor.fetchall()
+
+
+def bench_approx(args):
+    """원본 집계와 표본(approx=true) 집계 시간 및 추정 오차 비교 (캐시 미사용)"""
+    print(f"sample source: {approx.sample_source()}")
+    filters = {"category_l1": "상의", "post_year": 2024}
+    with pooled_connection() as conn:
+        with conn.cursor() as cursor:
+            for approximate in (False, True):
+                label = "approx" if approximate else "exact"
+                _report(f"trends color ({label})",
+                        _timed(lambda: _trend_rows(cursor, approximate), args.iterations))
+
+                def run_facets():
+                    cursor.execute(*facets_query("follow", filters, approximate))
+                    cursor.fetchall()
+                _report(f"facets follow ({label})", _timed(run_facets, args.iterations))
+
+            exact = {(year, month, value): count for year, month, value, count in _trend_rows(cursor, False)}
+            errors = []
+            for year, month, value, estimate, _ in _trend_rows(cursor, True):
+                count = exact.get((year, month, value))
+                if count:
+                    errors.append(abs(estimate - count) / count)
+            if errors:
+                print(f"trends color 상대 오차: mean={statistics.mean(errors) * 100:.2f}% "
+                      f"max={max(errors) * 100:.2f}% (cells={len(errors)})")
+
+
+# 엔드포인트별 응답 컬럼 구성 (합성 데이터 생성용)
+SERIALIZE_LAYOUTS = {
+    "item-color": ("category_l1", "category_l3", "follower_count", "post_date",
+                   "post_year", "post_month", "color"),
+    "mood-rate": ("post_date", "category_l1", "category_l3", "mood_category",
+                  "mood_look", "pattern", "color", "detail_1", "s3_key"),
+    "mood-style": ("desc_style", "s3_thumbnail_key"),
+    "color-images": ("s3_key", "post_id", "category_l1", "category_l3",
+                     "follower_count", "post_date"),
+}
+
+
+def _synthetic_value(column, rng, base_date):
+    if column == "post_date":
+        return base_date + datetime.timedelta(minutes=rng.randrange(500000))
+    if column in ("follower_count",):
+        return rng.randrange(100, 2_000_000)
+    if column == "post_year":
+        return rng.choice((2023, 2024, 2025))
+    if column == "post_month":
+        return rng.randrange(1, 13)
+    if column == "desc_style":
+        return [f"tag{rng.randrange(5000)}" for _ in range(rng.randrange(1, 8))]
+    if column in ("s3_key", "s3_thumbnail_key", "post_id"):
+        return f"instagram/{rng.randrange(10**9):09d}.jpg"
+    return f"{column}_{rng.randrange(40)}"
+
+
+def _synthetic_rows(columns, count):
+    rng = random.Random(42)
+    base_date = datetime.datetime(2024, 1, 1)
+    return [tuple(_synthetic_value(column, rng, base_date) for column in columns)
+            for _ in range(count)]
+
+
+def bench_serialize(args):
+    """기존 (dict 복사 + jsonable_encoder + json) 대비 튜플 + orjson 직렬화 시간 비교"""
+    for endpoint, columns in SERIALIZE_LAYOUTS.items():
+        rows = _synthetic_rows(columns, args.rows)
+        print(f"\n[{endpoint}] rows={len(rows)}")
+
+        def legacy():
+            real_dict_rows = [dict(zip(columns, row)) for row in rows]  # RealDictCursor
+            data = [dict(row) for row in real_dict_rows]
+            payload = jsonable_encoder({"success": True, "data": data, "count": len(data)})
+            return json.dumps(payload, ensure_ascii=False, allow_nan=False,
+                              indent=None, separators=(",", ":")).encode("utf-8")
+
+        def fast():
+            data = RowSet(columns, rows)
+            return dumps({"success": True, "data": data, "count": len(data)})
+
+        def fast_dict_records():
+            data = RowSet(columns, rows)
+            with gc_paused():
+                return dumps({"success": True, "data": data.records(), "count": len(data)})
+
+        def fast_columnar():
+            data = RowSet(columns, rows)
+            return dumps({"success": True, "data": data.columnar(), "count": len(data)})
+
+        _report("legacy jsonable_encoder", _timed(legacy, args.iterations))
+        _report("rowset + orjson (dict per row)", _timed(fast_dict_records, args.iterations))
+        _report("rowset + orjson", _timed(fast, args.iterations))
+        _report("rowset + orjson (columnar)", _timed(fast_columnar, args.iterations))
+
+
+# item-color 응답과 같은 컬럼 구성의 서버 측 합성 행 (원본 테이블 크기와 무관하게 비교)
+COPY_BENCH_QUERY = """
+    SELECT
+        (ARRAY['상의', '하의', '아우터', '원피스'])[1 + i %% 4] AS category_l1,
+        'category_l3_' || (i %% 40) AS category_l3,
+        (i::bigint * 7919 %% 2000000) AS follower_count,
+        TIMESTAMP '2024-01-01' + (i %% 500000) * INTERVAL '1 minute' AS post_date,
+        2023 + i %% 3 AS post_year,
+        1 + i %% 12 AS post_month,
+        'color_' || (i %% 40) AS color
+    FROM generate_series(1, %s) AS i
+"""
+
+
+def bench_copy(args):
+    """execute + fetchall 대비 COPY 추출의 초당 행 수 비교 (추출 / 추출 + 직렬화)"""
+    with pooled_connection() as conn:
+        with conn.cursor() as cursor:
+            def fetchall_path():
+                cursor.execute(COPY_BENCH_QUERY, (args.rows,))
+                return fetch_rowset(cursor)
+
+            def copy_path():
+                return copy_extract.copy_rowset(cursor, COPY_BENCH_QUERY, (args.rows,))
+
+            print(f"rows={args.rows}")
+            for label, extract in (("execute + fetchall", fetchall_path), ("COPY text", copy_path)):
+                samples = _timed(extract, args.iterations)
+                _report(label, samples)
+                print(f"{'':<28} {args.rows / (statistics.median(samples) / 1000):,.0f} rows/s")
+
+                def extract_and_dump():
+                    data = extract()
+                    return dumps({"success": True, "data": data.columnar(), "count": len(data)})
+                _report(f"{label} + orjson", _timed(extract_and_dump, args.iterations))
+
+
+def _synthetic_vocabulary(size, rng):
+    """자모 분포가 고른 한글/영문 혼합 해시태그 (빈도는 Zipf 분포)"""
+    syllables = [chr(0xAC00 + index) for index in range(0, 11172, 7)]
+    terms = set()
+    while len(terms) < size:
+        if rng.random() < 0.15:
+            term = "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(3, 10)))
+        else:
+            term = "".join(rng.choice(syllables) for _ in range(rng.randint(2, 6)))
+        terms.add(term)
+    return [(term, int(10000 / rank)) for rank, term in enumerate(terms, start=1)]
+
+
+def bench_autocomplete(args):
+    """자동완성 인덱스 생성 시간과 조회 지연 (합성 어휘, DB 불필요)"""
+    rng = random.Random(42)
+    hashtags = _synthetic_vocabulary(args.vocab, rng)
+    keywords = [(term, "무드", "합성") for term, _ in rng.sample(hashtags, min(args.vocab // 20, len(hashtags)))]
+    index = autocomplete.AutocompleteIndex(hashtags, keywords)
+    print(f"vocab={args.vocab} build={index.build_seconds:.2f}s {index.stats()}")
+
+    terms = [term for term, _ in hashtags]
+    queries = {"syllable prefix": [], "partial jamo": [], "choseong": []}
+    for term in rng.choices(terms, k=args.queries):
+        prefix = term[:rng.randint(1, min(3, len(term)))]
+        queries["syllable prefix"].append(prefix)
+        queries["partial jamo"].append(autocomplete.jamo_key(prefix)[:-1] or prefix)
+        queries["choseong"].append(autocomplete.choseong_key(term)[:rng.randint(1, 3)])
+    for label, batch in queries.items():
+        samples = []
+        for query in batch:
+            started = time.perf_counter()
+            index.suggest(query, 10)
+            samples.append((time.perf_counter() - started) * 1000)
+        samples.sort()
+        print(
+            f"{label:<28} p50={samples[len(samples) // 2]:.4f}ms "
+            f"p99={samples[int(len(samples) * 0.99) - 1]:.4f}ms max={samples[-1]:.4f}ms"
+        )
+
+
+WORKER_BENCH_PATHS = (
+    "/api/movers?dimension=color&limit=10",
+    f"/api/item-type-keywords?category_l1={quote('상의')}&follower_count=1000",
+    f"/api/item-type-items?category_l1={quote('상의')}&category_l3={quote('티셔츠')}",
+    "/",
+)
+
+
+def _http_client(port, paths, seconds):
+    """keep-alive 연결로 deadline까지 순차 요청 → 완료 요청 수 (클라이언트 프로세스에서 실행)"""
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    deadline = time.monotonic() + seconds
+    sent = completed = 0
+    while time.monotonic() < deadline:
+        connection.request("GET", paths[sent % len(paths)])
+        sent += 1
+        response = connection.getresponse()
+        response.read()
+        if response.status == 200:
+            completed += 1
+    connection.close()
+    return completed
+
+
+def _memory_kb(pid):
+    """(RSS, PSS) kB — PSS는 공유 페이지를 공유 프로세스 수로 나눈 값"""
+    values = {}
+    for path in (f"/proc/{pid}/status", f"/proc/{pid}/smaps_rollup"):
+        with open(path) as stats:
+            for line in stats:
+                key, _, rest = line.partition(":")
+                if key in ("VmRSS", "Pss"):
+                    values[key] = int(rest.split()[0])
+    return values.get("VmRSS", 0), values.get("Pss", 0)
+
+
+def _server_workers(pid, workers):
+    if workers == 1:
+        return [pid]
+    with open(f"/proc/{pid}/task/{pid}/children") as children:
+        pids = [int(child) for child in children.read().split()]
+    return [child for child in pids if b"multiprocessing" in open(f"/proc/{child}/cmdline", "rb").read()]
+
+
+def _run_server(workers, port, shared):
+    env = dict(os.environ, WEB_WORKERS=str(workers), WEB_PORT=str(port), WEB_HOST="127.0.0.1",
+               SCHEDULER_ENABLED="false")
+    if not shared:
+        env["SHARED_DATA_DIR"] = ""
+    server = subprocess.Popen([sys.executable, "serve.py"], env=env, cwd=os.path.dirname(os.path.abspath(__file__)),
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 120
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=2).read()
+            return server
+        except OSError:
+            time.sleep(0.5)
+    server.terminate()
+    raise RuntimeError(f"서버가 시작되지 않았습니다 (workers={workers})")
+
+
+def bench_workers(args):
+    """워커 수 1→N 처리량 확장과 워커별 RSS/PSS 비교 (serve.py를 띄워 HTTP로 측정)"""
+    max_workers = args.max_workers or serve.available_cpus()
+    print(f"cpus={serve.available_cpus()} clients={args.clients} seconds={args.seconds} shared={not args.no_shared}")
+    baseline = None
+    for workers in range(1, max_workers + 1):
+        server = _run_server(workers, args.port, not args.no_shared)
+        try:
+            # 워커마다 데이터셋이 적재되도록 예열
+            with ProcessPoolExecutor(args.clients) as pool:
+                list(pool.map(_http_client, [args.port] * args.clients,
+                              [WORKER_BENCH_PATHS] * args.clients, [args.warmup] * args.clients))
+                started = time.perf_counter()
+                completed = sum(pool.map(_http_client, [args.port] * args.clients,
+                                         [WORKER_BENCH_PATHS] * args.clients, [args.seconds] * args.clients))
+                elapsed = time.perf_counter() - started
+            memory = [_memory_kb(pid) for pid in _server_workers(server.pid, workers)]
+        finally:
+            server.terminate()
+            server.wait()
+        throughput = completed / elapsed
+        baseline = baseline or throughput
+        rss = statistics.mean(value[0] for value in memory) / 1024
+        pss = statistics.mean(value[1] for value in memory) / 1024
+        print(
+            f"workers={workers:<3} {throughput:10,.0f} req/s  x{throughput / baseline:5.2f}  "
+            f"rss/worker={rss:8.1f}MB pss/worker={pss:8.1f}MB"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TrendAI 백엔드 벤치마크")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    prepared = subparsers.add_parser("prepared", help="prepared statement 플래닝 비용 비교")
+    prepared.add_argument("--iterations", type=int, default=200)
+    prepared.set_defaults(func=bench_prepared)
+
+    serialize = subparsers.add_parser("serialize", help="응답 직렬화 시간 비교")
+    serialize.add_argument("--rows", type=int, default=100_000)
+    serialize.add_argument("--iterations", type=int, default=3)
+    serialize.set_defaults(func=bench_serialize)
+
+    approx_parser = subparsers.add_parser("approx", help="원본 집계와 표본 근사 집계 비교")
+    approx_parser.add_argument("--iterations", type=int, default=20)
+    approx_parser.set_defaults(func=bench_approx)
+
+    copy_parser = subparsers.add_parser("copy", help="fetchall과 COPY 추출 초당 행 수 비교")
+    copy_parser.add_argument("--rows", type=int, default=1_000_000)
+    copy_parser.add_argument("--iterations", type=int, default=3)
+    copy_parser.set_defaults(func=bench_copy)
+
+    autocomplete_parser = subparsers.add_parser("autocomplete", help="자동완성 인덱스 조회 지연 (p50/p99)")
+    autocomplete_parser.add_argument("--vocab", type=int, default=200_000)
+    autocomplete_parser.add_argument("--queries", type=int, default=20_000)
+    autocomplete_parser.set_defaults(func=bench_autocomplete)
+
+    workers = subparsers.add_parser("workers", help="워커 수별 처리량 확장과 워커별 RSS/PSS 비교")
+    workers.add_argument("--max-workers", type=int, default=0, help="0이면 사용 가능한 CPU 수")
+    workers.add_argument("--clients", type=int, default=16)
+    workers.add_argument("--seconds", type=float, default=10)
+    workers.add_argument("--warmup", type=float, default=3)
+    workers.add_argument("--port", type=int, default=18001)
+    workers.add_argument("--no-shared", action="store_true", help="공유 스냅샷 없이 워커별로 적재 (RSS 비교용)")
+    workers.set_defaults(func=bench_workers)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+import json
+import logging
+
+import redis
+
+from config import REDIS_URL
+
+logger = logging.getLogger(__name__)
+
+# Redis 연결 설정
+redis_client = redis.from_url(REDIS_URL, decode_responses=True)
+
+
+def cached_json(key, loader, ttl):
+    """Redis에 JSON으로 캐시된 값 (없으면 loader 결과를 저장, Redis 장애 시 loader 직접 호출)"""
+    try:
+        cached = redis_client.get(key)
+        if cached:
+            return json.loads(cached)
+    except Exception as exc:
+        logger.warning("cache read failed for %s: %s", key, exc)
+
+    value = loader()
+    try:
+        redis_client.set(key, json.dumps(value, ensure_ascii=False), ex=ttl)
+    except Exception as exc:
+        logger.warning("cache write failed for %s: %s", key, exc)
+    return value
@@ -1,3 +1,4 @@
+import math
 import os
 from dotenv import load_dotenv
 
@@ -20,6 +21,184 @@ if DB_SSL_MODE:
 
 DB_CONNECT_TIMEOUT = int(os.getenv("DB_CONNECT_TIMEOUT", "5"))
 
+# 시작 시 미적용 인덱스 마이그레이션 자동 적용 여부
+DB_AUTO_MIGRATE = os.getenv("DB_AUTO_MIGRATE", "false").lower() == "true"
+
+# 서버 전체 워커 프로세스 수 (serve.py가 워커를 띄우기 전에 설정, 단일 프로세스 실행이면 1)
+# DB_POOL_MAX와 ADMISSION_* 한도는 서버 전체 값이며, 워커마다 워커 수로 나눈 몫(올림)을 사용한다
+WEB_WORKER_COUNT = max(1, int(os.getenv("WEB_WORKER_COUNT", "1")))
+
+
+def _per_worker(total):
+    return max(1, math.ceil(total / WEB_WORKER_COUNT))
+
+
+# 커넥션 풀 설정 (prepared statement는 커넥션 단위로 유지됨, 워커별 최대 = DB_POOL_MAX / 워커 수)
+DB_POOL_MAX = _per_worker(int(os.getenv("DB_POOL_MAX", "10")))
+DB_POOL_MIN = min(int(os.getenv("DB_POOL_MIN", "1")), DB_POOL_MAX)
+
+
+def _parse_replicas(value):
+    """"host[:port][=가중치]" 쉼표 목록 → [(host, port, 가중치)]"""
+    replicas = []
+    for item in value.split(","):
+        if not item.strip():
+            continue
+        address, _, weight = item.strip().partition("=")
+        host, _, port = address.partition(":")
+        replicas.append((host, port or DB_CONFIG["port"], float(weight) if weight else 1.0))
+    return replicas
+
+
+# 읽기 전용 복제본: "host[:port][=가중치]"를 쉼표로 구분 (비우면 모든 조회가 기본 DB로)
+# DB_REPLICA_MAX_LAG(초, 0이면 검사 안 함)를 넘게 뒤처진 복제본은 제외하고,
+# 사용할 수 있는 복제본이 없으면 기본 DB에서 조회한다.
+DB_REPLICAS = _parse_replicas(os.getenv("DB_REPLICA_HOSTS", ""))
+DB_REPLICA_MAX_LAG = float(os.getenv("DB_REPLICA_MAX_LAG", "30"))
+DB_REPLICA_CHECK_INTERVAL = float(os.getenv("DB_REPLICA_CHECK_INTERVAL", "10"))
+# 복제본이 있을 때 기본 DB도 조회를 나눠 받을 가중치 (0이면 복제본 장애 시에만 사용)
+DB_PRIMARY_READ_WEIGHT = float(os.getenv("DB_PRIMARY_READ_WEIGHT", "0"))
+
+# 요청 deadline과 쿼리 statement_timeout (초)
+# 대량 조회 엔드포인트는 BULK_STATEMENT_TIMEOUT, 엔드포인트별 지정은
+# QUERY_TIMEOUTS="/api/mood-rate=40,/api/coordi-combination=20" 형식
+REQUEST_DEADLINE = float(os.getenv("REQUEST_DEADLINE", "30"))
+STATEMENT_TIMEOUT = float(os.getenv("STATEMENT_TIMEOUT", "10"))
+BULK_STATEMENT_TIMEOUT = float(os.getenv("BULK_STATEMENT_TIMEOUT", "25"))
+QUERY_TIMEOUTS = {
+    path.strip(): float(seconds)
+    for path, seconds in (
+        item.split("=", 1) for item in os.getenv("QUERY_TIMEOUTS", "").split(",") if "=" in item
+    )
+}
+
+# 동시 실행 제한(admission control): 경로 등급별 동시 실행 수 / 대기열 길이 (서버 전체 값, 워커별로 나눔)
+# bulk = 테이블 전체 조회, lookup = 그 밖의 DB 조회 (lookup 동시 실행 수는 DB_POOL_MAX 이하 권장)
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "true").lower() == "true"
+ADMISSION_BULK_CONCURRENCY = _per_worker(int(os.getenv("ADMISSION_BULK_CONCURRENCY", "2")))
+ADMISSION_BULK_QUEUE = _per_worker(int(os.getenv("ADMISSION_BULK_QUEUE", "8")))
+ADMISSION_LOOKUP_CONCURRENCY = _per_worker(int(os.getenv("ADMISSION_LOOKUP_CONCURRENCY", "8")))
+ADMISSION_LOOKUP_QUEUE = _per_worker(int(os.getenv("ADMISSION_LOOKUP_QUEUE", "64")))
+
+# Redis 설정
+REDIS_URL = os.getenv("REDIS_URL", "redis://redis:6379")
+
+# 백그라운드 사전 계산 스케줄러 (cluster 작업은 Redis 리스 락을 잡은 프로세스 하나만 실행)
+# 리스 유지 시간 / 작업 제한 시간 / 다음 실행 무작위 지연 (초),
+# 실패 시 백오프 = SCHEDULER_BACKOFF_BASE × 2^(연속 실패 - 1), 최대 SCHEDULER_BACKOFF_MAX
+# 작업별 cron 일정(분 시 일 월 요일): SCHEDULER_CRON="approx-sample=0 4 * * *;itemset-mining=*/30 * * * *"
+SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "true").lower() == "true"
+SCHEDULER_LEASE_TTL = float(os.getenv("SCHEDULER_LEASE_TTL", "30"))
+SCHEDULER_JOB_TIMEOUT = float(os.getenv("SCHEDULER_JOB_TIMEOUT", "1800"))
+SCHEDULER_JITTER = float(os.getenv("SCHEDULER_JITTER", "30"))
+SCHEDULER_BACKOFF_BASE = float(os.getenv("SCHEDULER_BACKOFF_BASE", "60"))
+SCHEDULER_BACKOFF_MAX = float(os.getenv("SCHEDULER_BACKOFF_MAX", "1800"))
+SCHEDULER_CRON = {
+    name.strip(): expression.strip()
+    for name, expression in (
+        item.split("=", 1) for item in os.getenv("SCHEDULER_CRON", "").split(";") if "=" in item
+    )
+}
+
+# 데이터 버전(테이블 변경 워터마크) 재확인 주기 (초)
+DATA_VERSION_TTL = float(os.getenv("DATA_VERSION_TTL", "30"))
+# 데이터 버전 변경 알림(SSE): 구독자가 있는 동안 워터마크 확인 주기(초), 연결 유지용 주석 전송 주기(초),
+# 프로세스별 최대 동시 구독 수
+DATA_VERSION_NOTIFY_INTERVAL = float(os.getenv("DATA_VERSION_NOTIFY_INTERVAL", "10"))
+DATA_VERSION_KEEPALIVE = float(os.getenv("DATA_VERSION_KEEPALIVE", "20"))
+DATA_VERSION_MAX_SUBSCRIBERS = int(os.getenv("DATA_VERSION_MAX_SUBSCRIBERS", "2000"))
+
+# 해시태그 동시 출현 그래프 (이웃 수, 최소 동시 출현 수)
+HASHTAG_GRAPH_TOP_K = int(os.getenv("HASHTAG_GRAPH_TOP_K", "50"))
+HASHTAG_GRAPH_MIN_COUNT = int(os.getenv("HASHTAG_GRAPH_MIN_COUNT", "3"))
+
+# 코디 조합 빈발 아이템셋 마이닝
+ITEMSET_MIN_SUPPORT = int(os.getenv("ITEMSET_MIN_SUPPORT", "5"))
+ITEMSET_MAX_LENGTH = int(os.getenv("ITEMSET_MAX_LENGTH", "4"))
+ITEMSET_MAX_STORED = int(os.getenv("ITEMSET_MAX_STORED", "5000"))
+ITEMSET_REFRESH_INTERVAL = int(os.getenv("ITEMSET_REFRESH_INTERVAL", "3600"))
+# 팔로워 구간 (follower_count >= 구간 하한)
+FOLLOWER_TIERS = [
+    int(value) for value in os.getenv("FOLLOWER_TIERS", "0,10000,50000,100000,200000").split(",")
+]
+
+# 아이템 타입 OLAP 큐브 (팔로워 구간 크기/상한은 화면 슬라이더 step/max와 맞춤)
+CUBE_ENABLED = os.getenv("CUBE_ENABLED", "true").lower() == "true"
+FOLLOWER_BUCKET_SIZE = int(os.getenv("FOLLOWER_BUCKET_SIZE", "1000"))
+FOLLOWER_BUCKET_MAX = int(os.getenv("FOLLOWER_BUCKET_MAX", "200000"))
+
+# 상승/유지/하락 분류 (전월 대비 변화율 임계값 %, 최소 건수, 비교 기간 개월 수)
+MOVERS_THRESHOLD = float(os.getenv("MOVERS_THRESHOLD", "5"))
+MOVERS_MIN_SUPPORT = int(os.getenv("MOVERS_MIN_SUPPORT", "5"))
+MOVERS_WINDOW = int(os.getenv("MOVERS_WINDOW", "3"))
+
+# 월간 추이 롤업 캐시 유지 시간 (초, 데이터 버전이 바뀌면 키가 바뀜)
+TRENDS_CACHE_TTL = int(os.getenv("TRENDS_CACHE_TTL", "3600"))
+
+# 필터 패싯 건수 캐시 유지 시간 (초)
+FACETS_CACHE_TTL = int(os.getenv("FACETS_CACHE_TTL", "600"))
+
+# 근사 조회(approx=true): 표본 뷰 갱신 확인 주기(초, 스케줄러 approx-sample 작업), HLL 정밀도(레지스터 2^p개, 오차 약 1.04/sqrt(2^p))
+APPROX_REFRESH_INTERVAL = int(os.getenv("APPROX_REFRESH_INTERVAL", "3600"))
+APPROX_HLL_PRECISION = int(os.getenv("APPROX_HLL_PRECISION", "10"))
+
+# 엣지(nginx) 마이크로 캐시용 Cache-Control 힌트 (초, 0이면 no-store)
+# bulk = 테이블 전체 조회, taxonomy = 분류/메타데이터, default = 그 밖의 GET 조회
+HTTP_CACHE_BULK_TTL = int(os.getenv("HTTP_CACHE_BULK_TTL", "60"))
+HTTP_CACHE_TAXONOMY_TTL = int(os.getenv("HTTP_CACHE_TAXONOMY_TTL", "300"))
+HTTP_CACHE_DEFAULT_TTL = int(os.getenv("HTTP_CACHE_DEFAULT_TTL", "15"))
+HTTP_CACHE_STALE_IF_ERROR = int(os.getenv("HTTP_CACHE_STALE_IF_ERROR", "600"))
+
+# 요청별 샘플링 프로파일러: X-Profile-Token 헤더가 PROFILE_TOKEN과 같거나 PROFILE_SAMPLE_RATE 비율로 선택된
+# 요청의 스택을 PROFILE_INTERVAL_MS마다 샘플링해 PROFILE_DIR에 speedscope 파일로 저장 (최근 PROFILE_MAX_FILES개)
+# 토큰이 비어 있고 비율이 0이면 미들웨어를 설치하지 않는다
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN", "")
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", "/tmp/trendai-profiles")
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "200"))
+
+# 관리 API(/api/admin/*, /api/exports*, /api/item-type-cube/stats) 토큰: X-Admin-Token 헤더 또는 Authorization: Bearer (비우면 관리 API 비활성화)
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+# 썸네일 프록시 (원본: s3 | local, 디스크 LRU 캐시)
+THUMBNAIL_ORIGIN = os.getenv("THUMBNAIL_ORIGIN", "s3")
+# 원본 버킷 주소: 상대 key는 이 뒤에 붙이고, 전체 URL key는 이 주소로 시작할 때만 허용
+THUMBNAIL_ORIGIN_BASE_URL = os.getenv(
+    "THUMBNAIL_ORIGIN_BASE_URL", "https://bpcc-prd-s3-seoul-aim.s3.ap-northeast-2.amazonaws.com"
+)
+THUMBNAIL_LOCAL_DIR = os.getenv("THUMBNAIL_LOCAL_DIR", "./images")
+THUMBNAIL_CACHE_DIR = os.getenv("THUMBNAIL_CACHE_DIR", "/tmp/trendai-thumbnails")
+THUMBNAIL_CACHE_MAX_BYTES = int(os.getenv("THUMBNAIL_CACHE_MAX_BYTES", str(1024 * 1024 * 1024)))
+THUMBNAIL_WIDTHS = [int(value) for value in os.getenv("THUMBNAIL_WIDTHS", "160,320,640").split(",")]
+THUMBNAIL_WORKERS = int(os.getenv("THUMBNAIL_WORKERS", "2"))
+THUMBNAIL_FETCH_TIMEOUT = float(os.getenv("THUMBNAIL_FETCH_TIMEOUT", "10"))
+# 원본 요청 전용 스레드 수와 대기 한도 (넘으면 503, API 공용 스레드 풀과 분리)
+THUMBNAIL_FETCH_CONCURRENCY = int(os.getenv("THUMBNAIL_FETCH_CONCURRENCY", "8"))
+THUMBNAIL_FETCH_QUEUE = int(os.getenv("THUMBNAIL_FETCH_QUEUE", "64"))
+THUMBNAIL_PREFETCH_COUNT = int(os.getenv("THUMBNAIL_PREFETCH_COUNT", "8"))
+THUMBNAIL_MAX_AGE = int(os.getenv("THUMBNAIL_MAX_AGE", str(7 * 24 * 3600)))
+
+# 비동기 내보내기(export) 작업: 결과 파일 디렉터리, 프로세스별 작업 스레드 수, 배치 행 수,
+# 완료 파일 보관 시간(초), 만료 정리 주기(초), 상태 갱신이 이 시간(초) 동안 없으면 중단된 작업으로 간주
+EXPORT_DIR = os.getenv("EXPORT_DIR", "/tmp/trendai-exports")
+EXPORT_WORKERS = int(os.getenv("EXPORT_WORKERS", "2"))
+EXPORT_BATCH_ROWS = int(os.getenv("EXPORT_BATCH_ROWS", "50000"))
+EXPORT_TTL = int(os.getenv("EXPORT_TTL", str(24 * 3600)))
+EXPORT_CLEANUP_INTERVAL = int(os.getenv("EXPORT_CLEANUP_INTERVAL", "600"))
+EXPORT_STALE_SECONDS = int(os.getenv("EXPORT_STALE_SECONDS", "600"))
+EXPORT_PARQUET_COMPRESSION = os.getenv("EXPORT_PARQUET_COMPRESSION", "zstd")
+
+# 멀티 프로세스 서빙 (serve.py, WEB_WORKERS=0이면 사용 가능한 CPU 수)
+# serve.py가 실제 워커 수를 WEB_WORKER_COUNT로 넘겨 DB 풀/수락 제어 한도를 워커별로 나눈다
+WEB_HOST = os.getenv("WEB_HOST", "0.0.0.0")
+WEB_PORT = int(os.getenv("WEB_PORT", "8001"))
+WEB_WORKERS = int(os.getenv("WEB_WORKERS", "0"))
+# 읽기 전용 집계 배열(큐브/movers) 공유 스냅샷 디렉터리 (tmpfs 권장, 비우면 프로세스별로 메모리에 적재)
+# SHARED_DATA_PRELOAD=true면 serve.py가 워커를 띄우기 전에 스냅샷을 미리 만든다
+SHARED_DATA_DIR = os.getenv("SHARED_DATA_DIR", "/dev/shm/trendai-shared")
+SHARED_DATA_PRELOAD = os.getenv("SHARED_DATA_PRELOAD", "true").lower() == "true"
+
 PUBLIC_DB_CONFIG = {
     key: DB_CONFIG.get(key)
     for key in ("host", "port", "database", "user", "sslmode")
@@ -0,0 +1,114 @@
+"""COPY 기반 대량 추출
+
+테이블 전체를 읽는 조회는 `COPY (SELECT ...) TO STDOUT`(text 형식)으로 한 번에 받아
+컬럼별 값 목록(ColumnSet)으로 바로 디코딩한다.
+  - 행마다 커서가 튜플/타입 변환 객체를 만드는 대신, 버퍼 전체를 한 번 split한 뒤
+    컬럼 단위 슬라이스 + map(변환 함수)로 처리한다.
+  - text 형식은 값 안의 탭/줄바꿈을 이스케이프하므로 구분자로 바로 나눌 수 있다.
+    버퍼에 백슬래시가 없으면 NULL(\\N)/이스케이프 처리를 통째로 건너뛴다.
+  - 컬럼 타입은 쿼리별로 한 번 LIMIT 0으로 조회해 기억한다.
+API 경로에는 연결하지 않는다: 로컬 DB 측정(`python benchmark.py copy`)에서 추출은 fetchall과
+비슷하고 응답 직렬화까지 포함하면 더 느렸다 (pyarrow CSV 디코딩은 Python 값 변환 때문에 더 느림).
+실제 DB에서 측정해 이득이 확인된 조회에만 copy_rowset을 쓴다.
+"""
+import datetime
+import decimal
+import io
+import re
+import threading
+
+import orjson
+from psycopg2.extensions import encodings
+
+from serialization import ColumnSet, gc_paused
+
+NULL = "\\N"
+# pg_type OID → text 형식 값 변환 (없으면 문자열 그대로)
+DECODERS = {
+    16: "t".__eq__,                         # bool
+    20: int, 21: int, 23: int, 26: int,     # int8, int2, int4, oid
+    700: float, 701: float,                 # float4, float8
+    1700: decimal.Decimal,                  # numeric
+    1082: datetime.date.fromisoformat,      # date
+    1114: datetime.datetime.fromisoformat,  # timestamp
+    1184: datetime.datetime.fromisoformat,  # timestamptz
+    114: orjson.loads, 3802: orjson.loads,  # json, jsonb
+}
+# 앞쪽 DICTIONARY_SAMPLE개 값의 종류 수 × DICTIONARY_RATIO < 표본 수면 종류별 변환표 사용
+DICTIONARY_SAMPLE = 4096
+DICTIONARY_RATIO = 8
+_ESCAPE = re.compile(r"\\(.)", re.DOTALL)
+_ESCAPED_CHARS = {"b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t", "v": "\v"}
+# 쿼리 → (컬럼명, 타입 OID), 최대 DESCRIPTION_CACHE_SIZE개 (넘으면 가장 먼저 넣은 것부터 삭제)
+DESCRIPTION_CACHE_SIZE = 128
+_descriptions = {}
+_descriptions_lock = threading.Lock()
+
+
+def _unescape(value):
+    return _ESCAPE.sub(lambda match: _ESCAPED_CHARS.get(match.group(1), match.group(1)), value)
+
+
+def _decode_column(values, type_code, escaped):
+    decoder = DECODERS.get(type_code)
+    if not escaped:
+        if decoder is None:
+            return values
+        if len(set(values[:DICTIONARY_SAMPLE])) * DICTIONARY_RATIO < min(len(values), DICTIONARY_SAMPLE):
+            # 연도/월처럼 값 종류가 적은 컬럼은 종류별로 한 번만 변환 (값 객체도 공유)
+            table = {value: decoder(value) for value in set(values)}
+            return list(map(table.__getitem__, values))
+        return list(map(decoder, values))
+    decode = decoder or str
+    return [
+        None if value == NULL else decode(_unescape(value) if "\\" in value else value)
+        for value in values
+    ]
+
+
+def decode_text(data, type_codes, encoding="utf-8"):
+    """COPY text 형식 출력(bytes-like) → 컬럼별 값 목록
+
+    중간 문자열/필드 목록은 다음 단계로 넘어가는 즉시 버려 최대 메모리를 줄인다.
+    """
+    text = str(data, encoding).replace("\n", "\t")
+    if not text:
+        return [[] for _ in type_codes]
+    escaped = "\\" in text
+    fields = text.split("\t")
+    del text
+    fields.pop()  # 마지막 줄바꿈 뒤의 빈 값
+    width = len(type_codes)
+    if len(fields) % width:
+        raise ValueError(f"COPY 출력 필드 수({len(fields)})가 컬럼 수({width})와 맞지 않습니다.")
+    buffers = [fields[index::width] for index in range(width)]
+    del fields
+    for index, type_code in enumerate(type_codes):
+        buffers[index] = _decode_column(buffers[index], type_code, escaped)
+    return buffers
+
+
+def _describe(cursor, sql, params):
+    description = _descriptions.get(sql)
+    if description is None:
+        cursor.execute(f"SELECT * FROM ({sql}) AS copy_source LIMIT 0", params)
+        description = (
+            tuple(desc[0] for desc in cursor.description),
+            tuple(desc[1] for desc in cursor.description),
+        )
+        with _descriptions_lock:
+            while len(_descriptions) >= DESCRIPTION_CACHE_SIZE:
+                _descriptions.pop(next(iter(_descriptions)))
+            _descriptions[sql] = description
+    return description
+
+
+def copy_rowset(cursor, sql, params=None):
+    """SELECT 결과 전체를 COPY로 추출해 ColumnSet으로 반환 (RowSet과 같은 방식으로 사용)"""
+    columns, type_codes = _describe(cursor, sql, params)
+    query = cursor.mogrify(sql, params).decode() if params else sql
+    buffer = io.BytesIO()
+    cursor.copy_expert(f"COPY ({query}) TO STDOUT", buffer)
+    encoding = encodings.get(cursor.connection.encoding, "utf-8")
+    with gc_paused(), buffer.getbuffer() as data:
+        return ColumnSet(columns, decode_text(data, type_codes, encoding))
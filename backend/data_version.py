@@ -0,0 +1,73 @@
+"""테이블별 데이터 버전 (DB 변경 워터마크)
+
+pg_stat_user_tables의 insert/update/delete 누적 카운터를 버전으로 사용한다.
+ETL이 테이블을 갱신하면 값이 바뀌므로, 인메모리 캐시/인덱스의 무효화 기준이 된다.
+카운터가 바뀌면 같은 시점의 기본 DB WAL 위치를 db.require_replay_lsn()에 넘겨,
+그 위치까지 재생하지 못한 복제본에서 새 버전 데이터를 읽지 않도록 한다.
+"""
+import hashlib
+import threading
+import time
+
+from config import DATA_VERSION_TTL
+from db import pooled_connection, require_replay_lsn
+
+_lock = threading.Lock()
+_counters = {}
+_checked_at = 0.0
+
+
+def _load_counters():
+    # 통계 카운터는 인스턴스별이라 복제본에는 ETL 변경이 반영되지 않으므로 기본 DB에서 읽는다
+    with pooled_connection(primary=True) as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("""
+                SELECT schemaname || '.' || relname,
+                       n_tup_ins, n_tup_upd, n_tup_del
+                FROM pg_stat_user_tables
+                WHERE schemaname = 'ai_image_dm'
+            """)
+            counters = {
+                table: (inserted, updated, deleted)
+                for table, inserted, updated, deleted in cursor.fetchall()
+            }
+            # 카운터를 읽은 뒤의 WAL 위치이므로 카운터에 반영된 변경의 커밋 위치보다 항상 뒤
+            cursor.execute("SELECT pg_wal_lsn_diff(pg_current_wal_lsn(), '0/0')::bigint")
+            return counters, cursor.fetchone()[0]
+
+
+def table_counters(force=False):
+    """ai_image_dm 스키마 테이블별 (insert, update, delete) 누적 카운터 (DATA_VERSION_TTL 동안 캐시)"""
+    global _counters, _checked_at
+    now = time.monotonic()
+    if force or now - _checked_at >= DATA_VERSION_TTL:
+        with _lock:
+            if force or now - _checked_at >= DATA_VERSION_TTL:
+                counters, lsn = _load_counters()
+                if counters != _counters:
+                    require_replay_lsn(lsn)
+                _counters = counters
+                _checked_at = time.monotonic()
+    return _counters
+
+
+def _format_versions(counters):
+    return {table: ".".join(str(value) for value in values) for table, values in counters.items()}
+
+
+def table_versions(force=False):
+    """테이블별 버전 문자열"""
+    return _format_versions(table_counters(force))
+
+
+def cached_table_versions():
+    """이미 읽어 둔 카운터 기준 테이블별 버전 (DB를 조회하지 않음, 아직 읽은 적 없으면 빈 dict)"""
+    return _format_versions(_counters)
+
+
+def data_version(*tables, versions=None):
+    """여러 테이블의 버전을 하나의 짧은 문자열로 결합 (versions를 주면 그 값 기준)"""
+    if versions is None:
+        versions = table_versions()
+    joined = "|".join(f"{table}={versions.get(table, '0')}" for table in sorted(tables))
+    return hashlib.sha1(joined.encode("utf-8")).hexdigest()[:12]
@@ -0,0 +1,319 @@
+"""DB 커넥션 (기본 DB + 읽기 전용 복제본)
+
+쓰기/DDL은 get_db_connection()으로 항상 기본 DB(DB_CONFIG)에 연결한다.
+조회는 pooled_connection()이 호스트별 커넥션 풀 중 하나를 골라 빌려준다.
+  - 복제본(DB_REPLICA_HOSTS)이 있으면 가중치 / 헬스체크 응답 시간에 비례해 무작위로 고른다.
+  - 백그라운드 헬스체크가 DB_REPLICA_CHECK_INTERVAL마다 응답 시간과 복제 지연을 측정하고,
+    연결 실패/지연 초과 복제본은 다음 확인 때까지 제외한다.
+  - 데이터 버전(data_version)은 기본 DB에서 읽으므로, 버전이 바뀐 시점의 기본 DB WAL 위치까지
+    재생하지 못한 복제본도 제외한다 (새 버전 키로 이전 데이터가 캐시되지 않도록).
+  - 사용할 복제본이 없거나 primary=True면 기본 DB 풀을 사용한다.
+호스트별 조회 수/사용 시간은 host_stats()로 노출한다.
+"""
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+import psycopg2
+from psycopg2 import errors, extensions, pool
+
+from config import (
+    DB_CONFIG,
+    DB_CONNECT_TIMEOUT,
+    DB_POOL_MAX,
+    DB_POOL_MIN,
+    DB_PRIMARY_READ_WEIGHT,
+    DB_REPLICA_CHECK_INTERVAL,
+    DB_REPLICA_MAX_LAG,
+    DB_REPLICAS,
+)
+from deadlines import current_scope, record_query_cancel
+
+logger = logging.getLogger(__name__)
+
+# 응답 시간 지수 이동 평균 가중치
+EWMA_ALPHA = 0.3
+# 복제 지연 (초): WAL을 모두 재생했으면 0, 아니면 마지막 재생 트랜잭션 이후 경과 시간
+# + 재생한 WAL 위치 (바이트, 복제본이 아니면 NULL)
+LAG_QUERY = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END,
+    pg_wal_lsn_diff(pg_last_wal_replay_lsn(), '0/0')::bigint
+"""
+
+# 복제본이 재생해야 하는 기본 DB WAL 위치 (데이터 버전이 바뀐 시점, require_replay_lsn)
+_required_lsn = None
+
+
+def require_replay_lsn(lsn):
+    """이 WAL 위치까지 재생한 복제본만 조회에 사용 (data_version이 버전 변경 시 호출)"""
+    global _required_lsn
+    if lsn is not None and (_required_lsn is None or lsn > _required_lsn):
+        _required_lsn = lsn
+
+
+def get_db_connection():
+    """풀을 거치지 않는 기본 DB 단일 커넥션 (쓰기/DDL 용)"""
+    return psycopg2.connect(connect_timeout=DB_CONNECT_TIMEOUT, **DB_CONFIG)
+
+
+class PreparedConnection(extensions.connection):
+    """서버사이드 prepared statement 이름과 현재 statement_timeout을 기억하는 커넥션"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared_statements = set()
+        self.statement_timeout_ms = None
+
+    def apply_statement_timeout(self, timeout_ms):
+        """statement_timeout 설정 (0이면 제한 없음, 값이 바뀔 때만 SET)"""
+        if self.statement_timeout_ms != timeout_ms:
+            with self.cursor() as cursor:
+                cursor.execute("SET statement_timeout = %s", (timeout_ms,))
+            self.statement_timeout_ms = timeout_ms
+
+
+class DatabaseHost:
+    """호스트 하나의 커넥션 풀과 상태/통계"""
+
+    def __init__(self, name, config, weight, replica):
+        self.name = name
+        self.config = config
+        self.weight = weight
+        self.replica = replica
+        self.healthy = True
+        self.lag = None
+        self.replay_lsn = None
+        self.latency = None
+        self.last_error = None
+        self.queries = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+        self._pool = None
+        self._probe = None
+        self._lock = threading.Lock()
+
+    def get_pool(self):
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = pool.ThreadedConnectionPool(
+                        DB_POOL_MIN,
+                        DB_POOL_MAX,
+                        connection_factory=PreparedConnection,
+                        connect_timeout=DB_CONNECT_TIMEOUT,
+                        **self.config,
+                    )
+        return self._pool
+
+    def available(self):
+        if not self.healthy:
+            return False
+        if self.replica and _required_lsn is not None and (self.replay_lsn is None or self.replay_lsn < _required_lsn):
+            return False
+        return DB_REPLICA_MAX_LAG <= 0 or self.lag is None or self.lag <= DB_REPLICA_MAX_LAG
+
+    def score(self, default_latency=0.01):
+        """선택 가중치 (가중치 / 응답 시간, 아직 측정 전이면 default_latency 기준)"""
+        latency = default_latency if self.latency is None else self.latency
+        return self.weight / max(latency, 0.001)
+
+    def record(self, elapsed, failed=False):
+        with self._lock:
+            self.queries += 1
+            self.busy_seconds += elapsed
+            if failed:
+                self.errors += 1
+
+    def mark_failed(self, exc):
+        if self.healthy:
+            logger.warning("database host %s marked unhealthy: %s", self.name, exc)
+        self.healthy = False
+        self.last_error = str(exc)
+
+    def check(self):
+        """헬스체크: 응답 시간과 복제 지연 측정 (전용 커넥션 재사용)"""
+        started = time.perf_counter()
+        try:
+            if self._probe is None or self._probe.closed:
+                self._probe = psycopg2.connect(connect_timeout=DB_CONNECT_TIMEOUT, **self.config)
+                self._probe.autocommit = True
+                started = time.perf_counter()
+            with self._probe.cursor() as cursor:
+                cursor.execute(LAG_QUERY)
+                lag, replay_lsn = cursor.fetchone()
+                lag = float(lag)
+        except psycopg2.Error as exc:
+            self.mark_failed(exc)
+            if self._probe is not None:
+                self._probe.close()
+                self._probe = None
+            return
+        elapsed = time.perf_counter() - started
+        self.latency = elapsed if self.latency is None else self.latency + EWMA_ALPHA * (elapsed - self.latency)
+        self.lag = lag
+        self.replay_lsn = replay_lsn
+        if not self.healthy:
+            logger.info("database host %s is healthy again", self.name)
+        self.healthy = True
+        self.last_error = None
+
+    def close(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.closeall()
+                self._pool = None
+            if self._probe is not None:
+                self._probe.close()
+                self._probe = None
+
+    def stats(self):
+        return {
+            "host": self.name,
+            "replica": self.replica,
+            "weight": self.weight,
+            "healthy": self.healthy,
+            "available": self.available(),
+            "lag_seconds": round(self.lag, 3) if self.lag is not None else None,
+            "replay_lsn": self.replay_lsn,
+            "latency_ms": round(self.latency * 1000, 2) if self.latency is not None else None,
+            "queries": self.queries,
+            "errors": self.errors,
+            "avg_query_ms": round(self.busy_seconds / self.queries * 1000, 2) if self.queries else None,
+            "last_error": self.last_error,
+        }
+
+
+_primary = DatabaseHost(
+    f"{DB_CONFIG['host']}:{DB_CONFIG['port']}", DB_CONFIG, DB_PRIMARY_READ_WEIGHT, replica=False
+)
+_replicas = [
+    DatabaseHost(f"{host}:{port}", {**DB_CONFIG, "host": host, "port": port}, weight, replica=True)
+    for host, port, weight in DB_REPLICAS
+]
+_checker = None
+_checker_lock = threading.Lock()
+_stop = threading.Event()
+
+
+def _checked_hosts():
+    """헬스체크 대상 (기본 DB도 조회를 나눠 받으면 응답 시간을 같은 기준으로 측정)"""
+    if DB_PRIMARY_READ_WEIGHT > 0:
+        return _replicas + [_primary]
+    return list(_replicas)
+
+
+def _health_loop():
+    while not _stop.is_set():
+        for host in _checked_hosts():
+            host.check()
+        _stop.wait(DB_REPLICA_CHECK_INTERVAL)
+
+
+def _ensure_health_checker():
+    global _checker
+    if _replicas and _checker is None:
+        with _checker_lock:
+            if _checker is None:
+                _stop.clear()
+                _checker = threading.Thread(target=_health_loop, name="db-replica-health", daemon=True)
+                _checker.start()
+
+
+def choose_read_host():
+    """조회에 사용할 호스트 (복제본이 없거나 모두 사용할 수 없으면 기본 DB)"""
+    if not _replicas:
+        return _primary
+    _ensure_health_checker()
+    candidates = [host for host in _replicas if host.available()]
+    if DB_PRIMARY_READ_WEIGHT > 0:
+        candidates.append(_primary)
+    if not candidates:
+        return _primary
+    return random.choices(candidates, weights=_read_weights(candidates))[0]
+
+
+def _read_weights(candidates):
+    """측정 전 호스트는 측정된 호스트들의 평균 응답 시간으로 계산 (과대 선택 방지)"""
+    measured = [host.latency for host in candidates if host.latency is not None]
+    default_latency = sum(measured) / len(measured) if measured else 0.01
+    return [host.score(default_latency) for host in candidates]
+
+
+def get_pool():
+    """기본 DB 커넥션 풀 (지연 생성)"""
+    return _primary.get_pool()
+
+
+def _checkout(primary):
+    """(호스트, 커넥션) — 복제본 연결에 실패하면 제외 표시 후 기본 DB로"""
+    host = _primary if primary else choose_read_host()
+    try:
+        return host, host.get_pool().getconn()
+    except psycopg2.OperationalError as exc:
+        if host is _primary:
+            raise
+        host.mark_failed(exc)
+        return _primary, _primary.get_pool().getconn()
+
+
+@contextmanager
+def pooled_connection(primary=False):
+    """풀에서 커넥션을 빌려 사용 후 반납
+
+    조회 전용이므로 autocommit으로 사용하며, 오류로 끊어진 커넥션은 폐기한다.
+    기본적으로 복제본으로 라우팅하고, primary=True면 기본 DB를 사용한다
+    (pg_stat_user_tables 같은 인스턴스별 통계는 기본 DB에서만 의미가 있다).
+    요청 안에서 빌리면 요청의 deadline/엔드포인트 상한으로 statement_timeout을 맞추고,
+    연결 종료/deadline 초과 시 취소할 수 있도록 요청에 커넥션을 등록한다.
+    (백그라운드 작업은 요청 밖이므로 제한 없음)
+    """
+    scope = current_scope()
+    host, conn = _checkout(primary)
+    db_pool = host.get_pool()
+    discard = False
+    started = time.perf_counter()
+    try:
+        if not conn.autocommit:
+            conn.autocommit = True
+        conn.apply_statement_timeout(scope.statement_timeout_ms() if scope is not None else 0)
+        if scope is not None:
+            scope.attach(conn)
+            scope.check()
+        yield conn
+    except errors.QueryCanceled:
+        # statement_timeout/취소 후에도 커넥션은 정상이므로 재사용
+        record_query_cancel(scope)
+        raise
+    except (psycopg2.OperationalError, psycopg2.InterfaceError) as exc:
+        discard = True
+        if host.replica:
+            host.mark_failed(exc)
+        raise
+    finally:
+        if scope is not None:
+            scope.detach(conn)
+        host.record(time.perf_counter() - started, failed=discard)
+        db_pool.putconn(conn, close=discard or bool(conn.closed))
+
+
+def host_stats():
+    return {
+        "max_lag_seconds": DB_REPLICA_MAX_LAG or None,
+        "required_lsn": _required_lsn,
+        "hosts": [host.stats() for host in [_primary] + _replicas],
+    }
+
+
+def close_pool():
+    global _checker
+    _stop.set()
+    with _checker_lock:
+        _checker = None
+    for host in [_primary] + _replicas:
+        host.close()
@@ -0,0 +1,262 @@
+"""요청 deadline 전파와 쿼리 취소
+
+요청마다 RequestScope(마감 시각, 사용 중인 커넥션)를 contextvar로 전파한다.
+  - pooled_connection()은 커넥션을 빌려줄 때 엔드포인트별 상한과 남은 시간 중 작은 값으로
+    statement_timeout을 맞춘다 (값이 바뀔 때만 SET).
+  - 클라이언트 연결이 끊기거나 요청 deadline이 지나면, 그 요청이 사용 중인 커넥션에
+    서버 측 취소 요청(connection.cancel)을 보내 진행 중인 쿼리를 중단한다.
+클라이언트는 X-Request-Timeout 헤더(초)로 deadline을 더 짧게 지정할 수 있다.
+취소/타임아웃 건수는 counters()로 노출한다.
+요청 사이에 공유하는 인덱스는 DetachedBuild로 요청 범위 밖에서 만든다.
+"""
+import asyncio
+import contextvars
+import logging
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+
+from config import BULK_STATEMENT_TIMEOUT, QUERY_TIMEOUTS, REQUEST_DEADLINE, STATEMENT_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+# 테이블 전체를 읽는 대량 조회 엔드포인트
+BULK_ROUTES = frozenset({
+    "/api/mood-rate",
+    "/api/mood-style",
+    "/api/item-color",
+    "/api/item-pattern",
+    "/api/item-detail",
+    "/api/coordi-combination",
+})
+# 장시간 열어 두는 스트리밍 엔드포인트 (deadline/동시 실행 제한/엣지 캐시 대상 아님)
+STREAM_ROUTES = frozenset({"/api/data-versions/stream"})
+DEADLINE_HEADER = b"x-request-timeout"
+
+_current = contextvars.ContextVar("request_scope", default=None)
+_counters = Counter()
+_counters_lock = threading.Lock()
+
+
+class RequestCancelled(Exception):
+    """클라이언트 연결 종료 또는 deadline 초과로 취소된 요청"""
+
+
+def route_timeout(path):
+    """엔드포인트별 쿼리 상한 (초)"""
+    if path in QUERY_TIMEOUTS:
+        return QUERY_TIMEOUTS[path]
+    return BULK_STATEMENT_TIMEOUT if path in BULK_ROUTES else STATEMENT_TIMEOUT
+
+
+class RequestScope:
+    """요청 하나의 deadline과 사용 중인 DB 커넥션"""
+
+    def __init__(self, path, deadline=REQUEST_DEADLINE, statement_timeout=None):
+        self.path = path
+        self.deadline = time.monotonic() + deadline
+        self.statement_timeout = route_timeout(path) if statement_timeout is None else statement_timeout
+        self.cancel_reason = None
+        self._connections = set()
+        self._lock = threading.Lock()
+
+    def remaining(self):
+        return self.deadline - time.monotonic()
+
+    def statement_timeout_ms(self):
+        """이번 쿼리에 적용할 statement_timeout (ms, 최소 1)"""
+        return max(1, int(min(self.statement_timeout, self.remaining()) * 1000))
+
+    def check(self):
+        if self.cancel_reason is not None:
+            raise RequestCancelled(f"요청이 취소되었습니다: {self.cancel_reason}")
+        if self.remaining() <= 0:
+            if self.cancel_reason is None:
+                record("deadline_exceeded")
+            self.cancel("deadline")
+            raise RequestCancelled("요청 처리 시간이 초과되었습니다.")
+
+    def attach(self, conn):
+        with self._lock:
+            self._connections.add(conn)
+
+    def detach(self, conn):
+        with self._lock:
+            self._connections.discard(conn)
+
+    def cancel(self, reason):
+        """진행 중인 쿼리에 서버 측 취소 요청 (첫 사유만 기록)
+
+        detach와 같은 잠금 안에서 보내므로, 풀에 반납되어 다른 요청이 쓰는 커넥션은 취소하지 않는다.
+        """
+        with self._lock:
+            if self.cancel_reason is not None:
+                return
+            self.cancel_reason = reason
+            for conn in self._connections:
+                try:
+                    conn.cancel()
+                except Exception as exc:
+                    logger.warning("query cancel failed for %s: %s", self.path, exc)
+            if self._connections:
+                logger.info("cancelled %d in-flight queries for %s (%s)",
+                            len(self._connections), self.path, reason)
+
+
+def current_scope():
+    return _current.get()
+
+
+class DetachedBuild:
+    """요청 범위 밖에서 실행하는 공유 인덱스 빌드 (한 번에 하나)
+
+    요청 스레드에서 바로 만들면 요청의 statement_timeout을 물려받고 연결 종료/deadline 초과 시
+    취소되어, 다음 요청이 처음부터 다시 만들게 된다. 빌드는 빈 contextvars.Context의 데몬
+    스레드에서 실행하고, 요청은 자기 deadline 안에서만 결과를 기다린다
+    (요청이 먼저 끝나도 빌드는 계속되어 다음 요청이 그 결과를 쓴다).
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._lock = threading.Lock()
+        self._key = None
+        self._future = None
+
+    def _start(self, key, build, args):
+        future = Future()
+        context = contextvars.Context()
+
+        def run():
+            try:
+                future.set_result(context.run(build, *args))
+            except BaseException as exc:
+                logger.warning("%s build failed: %s", self.name, exc)
+                future.set_exception(exc)
+
+        self._key, self._future = key, future
+        threading.Thread(target=run, name=f"{self.name}-build", daemon=True).start()
+        return future
+
+    def wait(self, key, build, *args):
+        """key 빌드 결과 (진행 중인 같은 key 빌드는 공유, 다른 key가 진행 중이면 끝난 뒤 시작)"""
+        while True:
+            with self._lock:
+                current_key, future = self._key, self._future
+                if future is None or (future.done() and (current_key != key or future.exception() is not None)):
+                    current_key, future = key, self._start(key, build, args)
+            result = _wait_future(future)
+            if current_key == key:
+                return result
+
+
+def _wait_future(future):
+    """요청 안이면 취소/deadline을 확인하며 기다림 (빌드 자체는 취소하지 않음)"""
+    scope = current_scope()
+    if scope is None:
+        return future.result()
+    while True:
+        scope.check()
+        try:
+            return future.result(timeout=max(0.01, min(0.5, scope.remaining())))
+        except FutureTimeout:
+            continue
+
+
+def record(event):
+    with _counters_lock:
+        _counters[event] += 1
+
+
+def record_query_cancel(scope):
+    """QueryCanceled 발생 원인 집계 (취소 요청이 없었으면 statement_timeout)"""
+    if scope is not None and scope.cancel_reason is not None:
+        record(f"cancelled_{scope.cancel_reason}")
+    else:
+        record("statement_timeout")
+
+
+def counters():
+    with _counters_lock:
+        snapshot = dict(_counters)
+    return {
+        "statement_timeout": snapshot.get("statement_timeout", 0),
+        "cancelled_disconnect": snapshot.get("cancelled_disconnect", 0),
+        "cancelled_deadline": snapshot.get("cancelled_deadline", 0),
+        "client_disconnects": snapshot.get("client_disconnects", 0),
+        "deadline_exceeded": snapshot.get("deadline_exceeded", 0),
+    }
+
+
+def _header_timeout(scope):
+    for name, value in scope.get("headers", ()):
+        if name == DEADLINE_HEADER:
+            try:
+                return float(value)
+            except ValueError:
+                return None
+    return None
+
+
+class RequestDeadlineMiddleware:
+    """요청 deadline 설정 + 클라이언트 연결 종료 감지 (ASGI 미들웨어)
+
+    요청 본문/연결 종료 메시지를 백그라운드에서 받아 두었다가 앱에 넘겨주므로,
+    핸들러가 스레드풀에서 쿼리를 실행하는 동안에도 연결 종료를 바로 알 수 있다.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in STREAM_ROUTES:
+            await self.app(scope, receive, send)
+            return
+
+        requested = _header_timeout(scope)
+        deadline = min(REQUEST_DEADLINE, requested) if requested and requested > 0 else REQUEST_DEADLINE
+        request_scope = RequestScope(scope["path"], deadline)
+        token = _current.set(request_scope)
+
+        messages = asyncio.Queue()
+        state = {"disconnected": False, "completed": False}
+
+        async def watch_disconnect():
+            while True:
+                message = await receive()
+                if message["type"] == "http.disconnect":
+                    state["disconnected"] = True
+                    # 응답을 다 보낸 뒤의 종료 알림은 취소 대상이 아니다
+                    if not state["completed"]:
+                        if request_scope.cancel_reason is None:
+                            record("client_disconnects")
+                        request_scope.cancel("disconnect")
+                await messages.put(message)
+                if state["disconnected"]:
+                    return
+
+        async def receive_message():
+            if state["disconnected"] and messages.empty():
+                return {"type": "http.disconnect"}
+            return await messages.get()
+
+        async def send_message(message):
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                state["completed"] = True
+            await send(message)
+
+        def on_deadline():
+            if request_scope.cancel_reason is None:
+                record("deadline_exceeded")
+            request_scope.cancel("deadline")
+
+        loop = asyncio.get_running_loop()
+        watcher = loop.create_task(watch_disconnect())
+        timer = loop.call_later(deadline, on_deadline)
+        try:
+            await self.app(scope, receive_message, send_message)
+        finally:
+            state["completed"] = True
+            timer.cancel()
+            watcher.cancel()
+            _current.reset(token)
@@ -0,0 +1,399 @@
+"""비동기 내보내기(export) 작업
+
+필터를 받아 작업 id를 돌려주고, 작업 스레드 풀이 서버 측 커서(named cursor)로
+EXPORT_BATCH_ROWS행씩 읽어 압축 Parquet(zstd) / CSV(gzip) 파일로 스트리밍 저장한다.
+  - 메모리 사용량은 배치 하나 크기로 제한된다.
+  - 작업 상태는 EXPORT_DIR/<id>.json에 기록해 같은 호스트의 모든 워커 프로세스가 조회할 수 있다.
+  - 작업 id = (데이터셋, 형식, 정규화된 필터, 데이터 버전) 해시 — 같은 내보내기가 진행 중이거나
+    완료 파일이 남아 있으면 새로 만들지 않고 그 작업을 돌려준다 (상태 파일 생성은 link로 한 번만 성공).
+  - 진행률은 플래너 예상 행 수 대비 기록한 행 수 (추정치, 완료 전에는 최대 0.99).
+  - 진행 중 작업은 배치마다 상태 파일을 갱신하며, EXPORT_STALE_SECONDS 동안 갱신이 없으면
+    (프로세스 재시작 등) 중단된 작업으로 보고 다시 요청할 수 있다.
+  - 완료 파일은 EXPORT_TTL 후 스케줄러 export-cleanup 작업이 삭제한다.
+"""
+import csv
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+import orjson
+
+from config import (
+    EXPORT_BATCH_ROWS,
+    EXPORT_DIR,
+    EXPORT_PARQUET_COMPRESSION,
+    EXPORT_STALE_SECONDS,
+    EXPORT_TTL,
+    EXPORT_WORKERS,
+)
+from data_version import data_version
+from db import pooled_connection
+from query_builder import ITEMTYPE_TABLE, compile_shape, normalize_filters, select
+
+logger = logging.getLogger(__name__)
+
+MOOD_RATE_TABLE = "ai_image_dm.instagram_web_mood_rate"
+
+
+@dataclass(frozen=True)
+class ExportDataset:
+    table: str
+    columns: tuple
+    filters: frozenset  # 허용 필터 컬럼 (query_builder.FILTER_OPERATORS 부분집합)
+
+
+DATASETS = {
+    "itemtype": ExportDataset(
+        ITEMTYPE_TABLE,
+        ("post_id", "s3_key", "category_l1", "category_l3", "item_type",
+         "follower_count", "post_date", "post_year", "post_month"),
+        frozenset({"category_l1", "category_l3", "item_type", "post_year", "post_month", "follower_count"}),
+    ),
+    "mood-rate": ExportDataset(
+        MOOD_RATE_TABLE,
+        ("post_date", "category_l1", "category_l3", "mood_category", "mood_look",
+         "pattern", "color", "detail_1", "s3_key"),
+        frozenset({"category_l1", "category_l3", "color", "pattern", "detail_1"}),
+    ),
+}
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+_JOB_ID = re.compile(r"^[0-9a-f]{16}$")
+
+
+class _CsvWriter:
+    suffix = ".csv.gz"
+    media_type = "application/gzip"
+
+    def __init__(self, path, columns, type_codes):
+        self._file = gzip.open(path, "wt", encoding="utf-8", newline="")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(columns)
+
+    def write(self, rows):
+        self._writer.writerows(rows)
+
+    def close(self):
+        self._file.close()
+
+
+def _arrow_column(pa, type_code):
+    """pg_type OID → (Arrow 타입, None이 아닌 값 변환 함수 또는 None)"""
+    native = {
+        16: pa.bool_(), 20: pa.int64(), 21: pa.int16(), 23: pa.int32(),
+        700: pa.float32(), 701: pa.float64(), 1082: pa.date32(),
+        1114: pa.timestamp("us"), 1184: pa.timestamp("us", tz="UTC"),
+    }
+    if type_code in native:
+        return native[type_code], None
+    if type_code == 1700:
+        return pa.float64(), float
+    if type_code in (114, 3802):
+        return pa.string(), lambda value: orjson.dumps(value).decode()
+    return pa.string(), str
+
+
+class _ParquetWriter:
+    suffix = ".parquet"
+    media_type = "application/vnd.apache.parquet"
+
+    def __init__(self, path, columns, type_codes):
+        # pyarrow는 무거우므로 Parquet 내보내기를 처음 실행할 때 불러온다
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self._pa = pa
+        arrow_columns = [_arrow_column(pa, type_code) for type_code in type_codes]
+        self._schema = pa.schema([(name, arrow_type) for name, (arrow_type, _) in zip(columns, arrow_columns)])
+        self._converters = [converter for _, converter in arrow_columns]
+        self._writer = pq.ParquetWriter(path, self._schema, compression=EXPORT_PARQUET_COMPRESSION)
+
+    def write(self, rows):
+        arrays = []
+        for values, field, converter in zip(zip(*rows), self._schema, self._converters):
+            if converter is not None:
+                values = [None if value is None else converter(value) for value in values]
+            arrays.append(self._pa.array(values, type=field.type))
+        self._writer.write_table(self._pa.Table.from_arrays(arrays, schema=self._schema))
+
+    def close(self):
+        self._writer.close()
+
+
+WRITERS = {"parquet": _ParquetWriter, "csv": _CsvWriter}
+
+_executor = None
+_executor_lock = threading.Lock()
+# 이 프로세스에서 대기 중인 작업 (실행 중인 작업이 배치마다 상태 파일 갱신 시각을 같이 올린다)
+_pending = set()
+
+
+def _directory():
+    path = Path(EXPORT_DIR)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def _state_path(job_id):
+    return _directory() / f"{job_id}.json"
+
+
+def _read_state(job_id):
+    try:
+        return json.loads(_state_path(job_id).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def _write_state(state):
+    """임시 파일에 쓴 뒤 교체 (읽는 쪽은 항상 완전한 상태를 본다)"""
+    with tempfile.NamedTemporaryFile("w", dir=_directory(), suffix=".state", delete=False, encoding="utf-8") as handle:
+        json.dump(state, handle, ensure_ascii=False)
+    os.replace(handle.name, _state_path(state["id"]))
+
+
+def _create_state(state):
+    """상태 파일이 없을 때만 생성 (동일 작업 동시 요청 중 하나만 성공)"""
+    with tempfile.NamedTemporaryFile("w", dir=_directory(), suffix=".state", delete=False, encoding="utf-8") as handle:
+        json.dump(state, handle, ensure_ascii=False)
+    try:
+        os.link(handle.name, _state_path(state["id"]))
+        return True
+    except FileExistsError:
+        return False
+    finally:
+        os.unlink(handle.name)
+
+
+def _is_stale(job_id, state):
+    if state["status"] not in (QUEUED, RUNNING):
+        return False
+    try:
+        updated = _state_path(job_id).stat().st_mtime
+    except OSError:
+        return True
+    return time.time() - updated > EXPORT_STALE_SECONDS
+
+
+def _reusable(job_id, state):
+    if state["status"] == DONE:
+        return state["expires_at"] > time.time() and (_directory() / state["file"]).exists()
+    return state["status"] != FAILED and not _is_stale(job_id, state)
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=EXPORT_WORKERS, thread_name_prefix="export")
+    return _executor
+
+
+def submit(dataset, fmt="parquet", filters=None):
+    """내보내기 작업 등록 → 작업 상태 (동일 작업이 진행 중/완료 상태면 그 작업)"""
+    spec = DATASETS.get(dataset)
+    if spec is None:
+        raise ValueError(f"지원하지 않는 데이터셋입니다: {dataset} (가능: {', '.join(DATASETS)})")
+    if fmt not in WRITERS:
+        raise ValueError(f"지원하지 않는 형식입니다: {fmt} (가능: {', '.join(WRITERS)})")
+    filters = {key: value for key, value in (filters or {}).items() if value not in (None, "", 0)}
+    unsupported = set(filters) - spec.filters
+    if unsupported:
+        raise ValueError(f"{dataset} 데이터셋에서 지원하지 않는 필터입니다: {', '.join(sorted(unsupported))}")
+
+    keys, params = normalize_filters(filters)
+    version = data_version(spec.table)
+    digest = json.dumps([dataset, fmt, keys, params, version], ensure_ascii=False, default=str)
+    job_id = hashlib.sha1(digest.encode("utf-8")).hexdigest()[:16]
+
+    while True:
+        state = _read_state(job_id)
+        if state is not None:
+            if _reusable(job_id, state):
+                return state
+            _state_path(job_id).unlink(missing_ok=True)
+        now = time.time()
+        state = {
+            "id": job_id,
+            "dataset": dataset,
+            "format": fmt,
+            "filters": dict(zip(keys, params)),
+            "data_version": version,
+            "status": QUEUED,
+            "rows": 0,
+            "estimated_rows": None,
+            "progress": 0.0,
+            "file": None,
+            "bytes": None,
+            "error": None,
+            "created_at": now,
+            "started_at": None,
+            "finished_at": None,
+            "expires_at": None,
+        }
+        if _create_state(state):
+            break
+
+    _pending.add(job_id)
+    _get_executor().submit(_run, dict(state))
+    return state
+
+
+def _estimate_rows(cursor, sql, params):
+    cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+    plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def _heartbeat():
+    """대기 중인 작업의 상태 파일 갱신 시각을 올려 중단된 작업으로 보이지 않게 한다"""
+    for job_id in list(_pending):
+        try:
+            os.utime(_state_path(job_id))
+        except OSError:
+            pass
+
+
+def _export(state, temp_path):
+    spec = DATASETS[state["dataset"]]
+    query = select(spec.table, ", ".join(spec.columns), state["filters"])
+    sql = compile_shape(query.shape).text_sql
+    writer = None
+    with pooled_connection() as conn:
+        with conn.cursor() as cursor:
+            state["estimated_rows"] = _estimate_rows(cursor, sql, query.params)
+        # 서버 측 커서는 트랜잭션 안에서만 쓸 수 있다 (반납 시 풀이 autocommit을 되돌린다)
+        conn.autocommit = False
+        try:
+            with conn.cursor(name=f"export_{state['id']}") as cursor:
+                cursor.itersize = EXPORT_BATCH_ROWS
+                cursor.execute(sql, query.params)
+                while True:
+                    rows = cursor.fetchmany(EXPORT_BATCH_ROWS)
+                    if writer is None:
+                        writer = WRITERS[state["format"]](
+                            temp_path,
+                            [desc[0] for desc in cursor.description],
+                            [desc[1] for desc in cursor.description],
+                        )
+                    if not rows:
+                        break
+                    writer.write(rows)
+                    state["rows"] += len(rows)
+                    estimated = max(state["estimated_rows"] or 0, state["rows"])
+                    state["progress"] = round(min(state["rows"] / estimated, 0.99), 4)
+                    _write_state(state)
+                    _heartbeat()
+        finally:
+            if writer is not None:
+                writer.close()
+            conn.rollback()
+
+
+def _run(state):
+    job_id = state["id"]
+    _pending.discard(job_id)
+    state.update(status=RUNNING, started_at=time.time())
+    _write_state(state)
+    writer_class = WRITERS[state["format"]]
+    file_name = f"{job_id}{writer_class.suffix}"
+    temp_path = _directory() / f"{file_name}.tmp"
+    try:
+        _export(state, temp_path)
+        os.replace(temp_path, _directory() / file_name)
+        finished = time.time()
+        state.update(
+            status=DONE,
+            progress=1.0,
+            file=file_name,
+            bytes=(_directory() / file_name).stat().st_size,
+            finished_at=finished,
+            expires_at=finished + EXPORT_TTL,
+        )
+        logger.info("export %s finished: %s rows, %s bytes", job_id, state["rows"], state["bytes"])
+    except Exception as exc:
+        temp_path.unlink(missing_ok=True)
+        state.update(status=FAILED, error=str(exc), finished_at=time.time())
+        logger.exception("export %s failed", job_id)
+    _write_state(state)
+
+
+def get_job(job_id):
+    """작업 상태 (없으면 None, 중단된 작업은 failed로 표시)"""
+    if not _JOB_ID.match(job_id):
+        return None
+    state = _read_state(job_id)
+    if state is not None and _is_stale(job_id, state):
+        state.update(status=FAILED, error="작업을 실행하던 프로세스가 중단되었습니다. 다시 요청해 주세요.")
+    return state
+
+
+def result_file(state):
+    """(완료 파일 경로, media type, 다운로드 파일명) — 완료되지 않았거나 만료되었으면 None"""
+    if state is None or state["status"] != DONE or state["expires_at"] <= time.time():
+        return None
+    path = _directory() / state["file"]
+    if not path.exists():
+        return None
+    writer_class = WRITERS[state["format"]]
+    return path, writer_class.media_type, f"{state['dataset']}-{state['id']}{writer_class.suffix}"
+
+
+def list_jobs():
+    """상태 파일 목록 (최근 생성 순)"""
+    jobs = []
+    for path in _directory().glob("*.json"):
+        state = get_job(path.stem)
+        if state is not None:
+            jobs.append(state)
+    jobs.sort(key=lambda job: job["created_at"], reverse=True)
+    return jobs
+
+
+def cleanup():
+    """만료된 완료 파일, 오래된 실패/중단 작업 상태와 남은 임시 파일 삭제 (스케줄러 export-cleanup 작업)"""
+    now = time.time()
+    removed = 0
+    directory = _directory()
+    for path in directory.glob("*.json"):
+        state = _read_state(path.stem)
+        if state is None:
+            continue
+        expired = state["status"] == DONE and state["expires_at"] <= now
+        failed = (
+            (state["status"] == FAILED or _is_stale(path.stem, state))
+            and now - (state["finished_at"] or state["created_at"]) > EXPORT_TTL
+        )
+        if expired or failed:
+            if state["file"]:
+                (directory / state["file"]).unlink(missing_ok=True)
+            path.unlink(missing_ok=True)
+            removed += 1
+    for pattern in ("*.tmp", "*.state"):
+        for path in directory.glob(pattern):
+            try:
+                if now - path.stat().st_mtime > EXPORT_STALE_SECONDS:
+                    path.unlink()
+            except OSError:
+                pass
+    return {"removed": removed}
+
+
+def shutdown():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
@@ -0,0 +1,174 @@
+"""필터 드롭다운용 패싯 건수
+
+적용된 필터 기준으로 각 패싯(연도, 월, 대분류, 소분류, 팔로워 구간)의 값별 건수를
+GROUPING SETS 한 번으로 계산한다.
+패싯마다 자기 자신의 필터만 뺀 조건으로 세므로(COUNT(*) FILTER), 이미 연도를 골랐어도
+다른 연도로 바꿨을 때의 건수를 그대로 보여줄 수 있다.
+결과는 데이터 버전을 키에 포함해 Redis에 캐시한다.
+approx=true면(follow 소스) 표본(approx.sample_source)에서 추정 건수와 95% 오차 범위(error)를 계산한다.
+"""
+import hashlib
+import json
+
+import approx
+from cache import cached_json
+from config import FACETS_CACHE_TTL, FOLLOWER_TIERS
+from data_version import data_version
+from db import pooled_connection
+from query_builder import FOLLOW_TABLE, ITEMTYPE_TABLE, follower_tier_case, normalize_filters
+
+REDIS_PREFIX = "trendai:facets"
+
+# 소스 → (테이블, 패싯이 아닌 고정 필터로 허용하는 속성 컬럼)
+SOURCES = {
+    "follow": (FOLLOW_TABLE, ("color", "pattern", "detail_1")),
+    "itemtype": (ITEMTYPE_TABLE, ("item_type",)),
+}
+FACETS = ("post_year", "post_month", "category_l1", "category_l3", "follower_count")
+
+
+def _condition(filter_keys):
+    """필터 컬럼 목록 → %s 형식 SQL 조건 (follower_count는 이상 조건)"""
+    parts = [f"{key} {'>=' if key == 'follower_count' else '='} %s" for key in filter_keys]
+    return " AND ".join(parts) if parts else "TRUE"
+
+
+def _aggregates(approximate):
+    """[(집계 식)] — 근사 모드는 추정 건수와 분산 두 가지"""
+    if approximate:
+        return ("SUM(sample_weight)", "SUM(sample_weight * (sample_weight - 1))")
+    return ("COUNT(*)",)
+
+
+def facets_query(source, filters, approximate=False):
+    """(SQL, 파라미터)"""
+    if source not in SOURCES:
+        raise ValueError(f"지원하지 않는 패싯 소스입니다: {source}")
+    table, attributes = SOURCES[source]
+    if approximate:
+        if table != FOLLOW_TABLE:
+            raise ValueError(f"{source} 소스는 approx 모드를 지원하지 않습니다.")
+        table = approx.sample_source()
+    unknown = set(filters) - set(FACETS) - set(attributes)
+    if unknown:
+        raise ValueError(f"지원하지 않는 필터입니다: {', '.join(sorted(unknown))}")
+
+    keys, values = normalize_filters(filters)
+    applied = dict(zip(keys, values))
+    fixed = [key for key in keys if key not in FACETS]
+    facet_filters = [key for key in keys if key in FACETS]
+
+    # 집계 식마다 패싯별 값 + 전체 (근사 모드는 건수 6개 뒤에 분산 6개)
+    selects = []
+    params = []
+    for aggregate in _aggregates(approximate):
+        for facet in FACETS:
+            others = [key for key in facet_filters if key != facet]
+            selects.append(f"{aggregate} FILTER (WHERE {_condition(others)})")
+            params.extend(applied[key] for key in others)
+        selects.append(f"{aggregate} FILTER (WHERE {_condition(facet_filters)})")
+        params.extend(applied[key] for key in facet_filters)
+
+    where = " AND ".join(
+        [f"{key} = %s" for key in fixed]
+        + ["post_year IS NOT NULL", "post_month IS NOT NULL"]
+    )
+    params.extend(applied[key] for key in fixed)
+
+    sql = f"""
+        SELECT
+            post_year,
+            post_month,
+            category_l1,
+            category_l3,
+            {follower_tier_case(FOLLOWER_TIERS)} AS follower_tier,
+            GROUPING(post_year, post_month, category_l1, category_l3,
+                     {follower_tier_case(FOLLOWER_TIERS)}) AS grouping_id,
+            {", ".join(selects)}
+        FROM {table}
+        WHERE {where}
+        GROUP BY GROUPING SETS (
+            (post_year), (post_month), (category_l1), (category_l3),
+            ({follower_tier_case(FOLLOWER_TIERS)}), ()
+        )
+    """
+    return sql, params
+
+
+# GROUPING() 비트 (첫 인자가 최상위 비트, 집계에서 빠진 컬럼이 1)
+_GROUPING_IDS = {
+    0b01111: "post_year",
+    0b10111: "post_month",
+    0b11011: "category_l1",
+    0b11101: "category_l3",
+    0b11110: "follower_count",
+    0b11111: "total",
+}
+
+
+def _collect(rows, approximate=False):
+    width = len(FACETS) + 1
+    facets = {facet: [] for facet in FACETS}
+    total = total_variance = 0
+    tier_counts = [0] * len(FOLLOWER_TIERS)
+    tier_variances = [0] * len(FOLLOWER_TIERS)
+
+    def item(value, count, variance):
+        entry = {"value": value, "count": round(count or 0)}
+        if approximate:
+            entry["error"] = approx.error_bound(variance)
+        return entry
+
+    for row in rows:
+        year, month, category_l1, category_l3, tier, grouping_id = row[:6]
+        counts = dict(zip(FACETS + ("total",), row[6:6 + width]))
+        variances = dict(zip(FACETS + ("total",), row[6 + width:6 + 2 * width]))
+        facet = _GROUPING_IDS.get(grouping_id)
+        if facet == "total":
+            total, total_variance = counts[facet] or 0, variances.get(facet) or 0
+        elif facet == "follower_count":
+            if tier is not None:
+                tier_counts[tier] += counts[facet] or 0
+                tier_variances[tier] += variances.get(facet) or 0
+        elif facet is not None:
+            value = {"post_year": year, "post_month": month,
+                     "category_l1": category_l1, "category_l3": category_l3}[facet]
+            if value is not None and value != "":
+                facets[facet].append(item(value, counts[facet], variances.get(facet)))
+
+    # 팔로워 구간은 "하한 이상" 누적 건수
+    running = running_variance = 0
+    cumulative = []
+    for tier, count, variance in reversed(list(zip(FOLLOWER_TIERS, tier_counts, tier_variances))):
+        running += count
+        running_variance += variance
+        cumulative.append(item(tier, running, running_variance))
+    facets["follower_count"] = cumulative[::-1]
+
+    for facet in ("post_year", "post_month", "category_l1", "category_l3"):
+        facets[facet].sort(key=lambda item: item["value"])
+    result = {"total": round(total), "facets": facets, "approx": approximate}
+    if approximate:
+        result["total_error"] = approx.error_bound(total_variance)
+    return result
+
+
+def load_facets(source, filters, approximate=False):
+    """적용된 필터 기준 패싯별 값/건수 (데이터 버전이 같으면 Redis 캐시 사용)"""
+    sql, params = facets_query(source, filters, approximate)
+    tables = (SOURCES[source][0],) + ((approx.SAMPLE_TABLE,) if approximate else ())
+    signature = json.dumps(
+        [source, approximate, sorted(normalize_filters(filters)[0]), params], ensure_ascii=False
+    )
+    key = (
+        f"{REDIS_PREFIX}:{data_version(*tables)}:"
+        f"{hashlib.sha1(signature.encode('utf-8')).hexdigest()[:16]}"
+    )
+
+    def load():
+        with pooled_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(sql, params)
+                return _collect(cursor.fetchall(), approximate)
+
+    return cached_json(key, load, FACETS_CACHE_TTL)
@@ -0,0 +1,235 @@
+"""해시태그 동시 출현(co-occurrence) 그래프
+
+instagram_web_mood_hashtags의 desc_style을 해시태그 × 게시물 희소 행렬 X로 펼치고
+C = X·Xᵀ 로 동시 출현 횟수를 구한 뒤, 해시태그별 lift/PMI 상위 k개 이웃을 미리 계산한다.
+
+테이블에 insert만 발생한 경우(pg_stat 카운터 기준) 마지막으로 읽을 때의 트랜잭션 워터마크 이후에
+기록된 행(시스템 컬럼 xmin 기준)만 읽어 C에 ΔX·ΔXᵀ 를 더하고, update/delete가 있으면 전체를 다시 만든다.
+ETL 소유 테이블이라 적재 시각 컬럼/인덱스를 추가하지 않으며, 대신 증분 조회도 테이블을 순차 스캔한다
+(비용의 대부분인 JSON 파싱/행렬 연산은 새 행에만 든다).
+워터마크는 스냅샷의 가장 오래된 진행 중 트랜잭션이라 경계 부근 행을 다시 읽을 수 있고,
+이미 반영한 행은 s3_thumbnail_key로 건너뛴다.
+증분 갱신은 사본에 누적한 뒤 참조를 교체하므로 요청이 읽는 그래프는 바뀌지 않는다.
+"""
+
+import copy
+
+import numpy as np
+from scipy import sparse
+
+from config import HASHTAG_GRAPH_MIN_COUNT, HASHTAG_GRAPH_TOP_K
+from data_version import table_counters
+from db import pooled_connection
+from deadlines import DetachedBuild
+from mood_matching import HASHTAG_TABLE, normalize_tag, parse_desc_style
+
+# xmin은 32비트 트랜잭션 id이므로 워터마크와 2^32 나머지 거리로 비교 (2^31 이내면 워터마크 이후)
+XID_SPACE = 1 << 32
+
+
+def _resize_csr(matrix, size):
+    """정사각 CSR 행렬을 size × size 로 확장"""
+    if matrix.shape[0] == size:
+        return matrix
+    indptr = np.concatenate([
+        matrix.indptr,
+        np.full(size - matrix.shape[0], matrix.indptr[-1], dtype=matrix.indptr.dtype),
+    ])
+    return sparse.csr_matrix((matrix.data, matrix.indices, indptr), shape=(size, size))
+
+
+class HashtagGraph:
+    """해시태그 동시 출현 행렬 + 이웃 목록"""
+
+    def __init__(self, top_k=HASHTAG_GRAPH_TOP_K, min_count=HASHTAG_GRAPH_MIN_COUNT):
+        self.top_k = top_k
+        self.min_count = min_count
+        self.tags = []
+        self.tag_ids = {}
+        self.seen_keys = set()
+        self.post_count = 0
+        self.cooccurrence = sparse.csr_matrix((0, 0), dtype=np.int64)
+        self.counters = None
+        # 마지막 조회 시점 스냅샷의 xmin (64비트 txid, 이후 커밋되는 행의 xmin은 이보다 작지 않음)
+        self.watermark = None
+        # (indptr, 이웃 id, 동시 출현 수, lift, pmi) — 읽기 중 교체되어도 일관되도록 한 번에 교체
+        self._neighbors = (np.zeros(1, dtype=np.int64),) + (np.zeros(0),) * 4
+
+    def clone(self):
+        """증분 갱신용 사본 (누적 상태만 새로 만들고, 행렬/이웃 배열은 add_rows가 교체하므로 공유)"""
+        graph = copy.copy(self)
+        graph.tags = list(self.tags)
+        graph.tag_ids = dict(self.tag_ids)
+        graph.seen_keys = set(self.seen_keys)
+        return graph
+
+    def add_rows(self, rows):
+        """(desc_style, s3_thumbnail_key) 행을 그래프에 누적"""
+        tag_rows = []
+        post_cols = []
+        post_index = 0
+        for desc_style, key in rows:
+            if key in self.seen_keys:
+                continue
+            self.seen_keys.add(key)
+            tags = {normalize_tag(tag) for tag in parse_desc_style(desc_style)}
+            tags.discard("")
+            if not tags:
+                continue
+            for tag in tags:
+                tag_id = self.tag_ids.get(tag)
+                if tag_id is None:
+                    tag_id = self.tag_ids[tag] = len(self.tags)
+                    self.tags.append(tag)
+                tag_rows.append(tag_id)
+                post_cols.append(post_index)
+            post_index += 1
+
+        if not post_index:
+            return 0
+
+        size = len(self.tags)
+        incidence = sparse.csr_matrix(
+            (np.ones(len(tag_rows), dtype=np.int64), (tag_rows, post_cols)),
+            shape=(size, post_index),
+        )
+        delta = (incidence @ incidence.T).tocsr()
+        self.cooccurrence = _resize_csr(self.cooccurrence, size) + delta
+        self.post_count += post_index
+        self._compute_neighbors()
+        return post_index
+
+    def _compute_neighbors(self):
+        """모든 해시태그의 lift 상위 k 이웃을 벡터 연산으로 계산"""
+        matrix = self.cooccurrence.tocoo()
+        tag_counts = self.cooccurrence.diagonal().astype(np.float64)
+
+        mask = (matrix.row != matrix.col) & (matrix.data >= self.min_count)
+        rows, cols, counts = matrix.row[mask], matrix.col[mask], matrix.data[mask]
+
+        lift = counts * float(self.post_count) / (tag_counts[rows] * tag_counts[cols])
+        pmi = np.log2(lift)
+
+        # 행 오름차순, 행 내부는 lift 내림차순(동률이면 동시 출현 수 내림차순)
+        order = np.lexsort((-counts, -lift, rows))
+        rows, cols, counts, lift, pmi = rows[order], cols[order], counts[order], lift[order], pmi[order]
+
+        # 행 내 순위 < top_k 인 항목만 유지
+        row_starts = np.searchsorted(rows, np.arange(len(self.tags)))
+        rank = np.arange(len(rows)) - row_starts[rows]
+        keep = rank < self.top_k
+        rows, cols, counts, lift, pmi = rows[keep], cols[keep], counts[keep], lift[keep], pmi[keep]
+
+        indptr = np.searchsorted(rows, np.arange(len(self.tags) + 1))
+        self._neighbors = (indptr, cols, counts, lift, pmi)
+
+    def tag_count(self, tag_id):
+        return int(self.cooccurrence[tag_id, tag_id])
+
+    def neighbors(self, tag, limit=None):
+        """해시태그의 동시 출현 이웃 목록 (lift 내림차순)"""
+        indptr, neighbor_ids, neighbor_counts, neighbor_lift, neighbor_pmi = self._neighbors
+        tag_id = self.tag_ids.get(normalize_tag(tag))
+        if tag_id is None or tag_id + 1 >= len(indptr):
+            return None
+        start, end = indptr[tag_id], indptr[tag_id + 1]
+        if limit is not None:
+            end = min(end, start + limit)
+        return {
+            "tag": self.tags[tag_id],
+            "count": self.tag_count(tag_id),
+            "neighbors": [
+                {
+                    "tag": self.tags[neighbor_id],
+                    "count": int(count),
+                    "lift": round(float(lift), 4),
+                    "pmi": round(float(pmi), 4),
+                }
+                for neighbor_id, count, lift, pmi in zip(
+                    neighbor_ids[start:end],
+                    neighbor_counts[start:end],
+                    neighbor_lift[start:end],
+                    neighbor_pmi[start:end],
+                )
+            ],
+        }
+
+
+_graph = None
+_builds = DetachedBuild("hashtag-graph")
+
+
+def _snapshot_xmin(cursor):
+    """현재 스냅샷에서 아직 진행 중인 가장 오래된 트랜잭션 id (조회보다 먼저 구해야 누락이 없다)"""
+    cursor.execute("SELECT txid_snapshot_xmin(txid_current_snapshot())")
+    return cursor.fetchone()[0]
+
+
+def _fetch_rows(cursor, since=None):
+    """[(desc_style, s3_thumbnail_key)] (since가 있으면 그 워터마크 이후 기록된 행만)"""
+    query = f"""
+        SELECT desc_style, s3_thumbnail_key
+        FROM {HASHTAG_TABLE}
+        WHERE desc_style IS NOT NULL
+        AND desc_style != '[]'::jsonb
+        AND desc_style != 'null'
+    """
+    if since is None:
+        cursor.execute(query)
+    else:
+        cursor.execute(
+            query + " AND (xmin::text::bigint - %s + %s) %% %s < %s",
+            (since % XID_SPACE, XID_SPACE, XID_SPACE, XID_SPACE // 2),
+        )
+    return cursor.fetchall()
+
+
+def _build_full(counters):
+    graph = HashtagGraph()
+    with pooled_connection() as conn:
+        with conn.cursor() as cursor:
+            graph.watermark = _snapshot_xmin(cursor)
+            rows = _fetch_rows(cursor)
+    graph.add_rows(rows)
+    graph.counters = counters
+    return graph
+
+
+def _extend(graph, counters):
+    """insert만 발생한 경우: 워터마크 이후 기록된 행만 읽어 사본에 누적"""
+    with pooled_connection() as conn:
+        with conn.cursor() as cursor:
+            watermark = _snapshot_xmin(cursor)
+            rows = _fetch_rows(cursor, since=graph.watermark)
+    extended = graph.clone()
+    extended.add_rows(rows)
+    extended.watermark = watermark
+    extended.counters = counters
+    return extended
+
+
+def _refresh(counters):
+    global _graph
+    if _graph is None or _graph.counters is None or counters is None:
+        _graph = _build_full(counters)
+    elif _graph.counters != counters:
+        inserted, updated, deleted = counters
+        prev_inserted, prev_updated, prev_deleted = _graph.counters
+        insert_only = updated == prev_updated and deleted == prev_deleted and inserted >= prev_inserted
+        if insert_only and _graph.watermark is not None:
+            _graph = _extend(_graph, counters)
+        else:
+            _graph = _build_full(counters)
+    return _graph
+
+
+def get_graph():
+    """최신 데이터 기준 그래프 (insert만 있으면 증분 갱신, 그 외 변경은 전체 재생성)
+
+    갱신은 요청 밖에서 실행하고 요청은 자기 deadline 안에서 기다린다.
+    """
+    counters = table_counters().get(HASHTAG_TABLE)
+    graph = _graph
+    if graph is not None and graph.counters == counters:
+        return graph
+    return _builds.wait(counters, _refresh, counters)
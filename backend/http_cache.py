@@ -0,0 +1,97 @@
+"""엣지(nginx) 마이크로 캐시용 Cache-Control 힌트
+
+경로별 TTL로 `Cache-Control: public, max-age=..., stale-while-revalidate=..., stale-if-error=...`를
+붙여 nginx proxy_cache가 짧게 캐시하도록 한다.
+  - bulk     : 테이블 전체 조회 (deadlines.BULK_ROUTES)          → HTTP_CACHE_BULK_TTL
+  - taxonomy : 분류/메타데이터 조회                              → HTTP_CACHE_TAXONOMY_TTL
+  - 그 밖의 /api GET 조회                                        → HTTP_CACHE_DEFAULT_TTL
+  - 관리/헬스체크/쓰기/내보내기 작업 경로, 200이 아닌 응답, success=false 응답  → no-store
+핸들러는 오류를 200 + {"success": false}로 돌려주므로, 응답 시작 헤더를 첫 본문 조각까지
+보류했다가 본문 앞부분으로 오류 여부를 판단한다. 이미 Cache-Control이 있으면 그대로 둔다.
+캐시 대상 응답에는 요청을 시작할 때의 결합 데이터 버전을 X-Data-Version으로 붙여, 클라이언트가
+응답을 요청 전에 알던 버전이 아니라 실제로 읽은 데이터의 버전으로 저장하게 한다.
+"""
+from config import (
+    HTTP_CACHE_BULK_TTL,
+    HTTP_CACHE_DEFAULT_TTL,
+    HTTP_CACHE_STALE_IF_ERROR,
+    HTTP_CACHE_TAXONOMY_TTL,
+)
+from deadlines import BULK_ROUTES, STREAM_ROUTES
+from version_events import cached_combined_version
+
+TAXONOMY_ROUTES = frozenset({
+    "/api/mood-keywords",
+    "/api/item-type-categories",
+    "/api/item-type-meta",
+})
+NO_STORE_ROUTES = frozenset({"/health", "/api/health", "/api/test-db"})
+NO_STORE_PREFIXES = ("/api/admin/", "/api/exports", "/api/data-versions")
+NO_STORE = b"no-store"
+DATA_VERSION_HEADER = b"x-data-version"
+ERROR_PREFIX = b'{"success":false'
+
+
+def route_ttl(path):
+    """경로별 엣지 캐시 TTL (초, 0이면 캐시하지 않음)"""
+    if (
+        path in NO_STORE_ROUTES or path in STREAM_ROUTES or path.startswith(NO_STORE_PREFIXES)
+        or not path.startswith("/api/")
+    ):
+        return 0
+    if path in BULK_ROUTES:
+        return HTTP_CACHE_BULK_TTL
+    if path in TAXONOMY_ROUTES:
+        return HTTP_CACHE_TAXONOMY_TTL
+    return HTTP_CACHE_DEFAULT_TTL
+
+
+def cache_control(ttl):
+    if ttl <= 0:
+        return NO_STORE
+    return (
+        f"public, max-age={ttl}, stale-while-revalidate={ttl}, "
+        f"stale-if-error={HTTP_CACHE_STALE_IF_ERROR}"
+    ).encode()
+
+
+class CacheControlMiddleware:
+    """GET/HEAD 응답에 경로별 Cache-Control 헤더 추가 (ASGI 미들웨어)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+
+        ttl = route_ttl(scope["path"])
+        # 핸들러가 데이터를 읽기 전에 구해 두어야 응답 데이터가 이 버전보다 오래되지 않는다
+        version = cached_combined_version() if ttl > 0 else None
+        version_headers = [(DATA_VERSION_HEADER, version.encode())] if version else []
+        pending = None
+
+        async def send_with_cache_control(message):
+            nonlocal pending
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", [])) + version_headers
+                message = {**message, "headers": headers}
+                if any(name.lower() == b"cache-control" for name, _ in headers):
+                    await send(message)
+                else:
+                    pending = message
+                return
+            if message["type"] == "http.response.body" and pending is not None:
+                start, pending = pending, None
+                cacheable = ttl > 0 and start["status"] == 200 and not message.get("body", b"").startswith(ERROR_PREFIX)
+                start = {
+                    **start,
+                    "headers": list(start.get("headers", [])) + [
+                        (b"cache-control", cache_control(ttl if cacheable else 0))
+                    ],
+                }
+                await send(start)
+            await send(message)
+
+        await self.app(scope, receive, send_with_cache_control)
@@ -0,0 +1,235 @@
+"""ai_image_dm 인덱스 마이그레이션 관리
+
+migrations/*.sql 파일을 순서대로 적용하고, 적용 이력은
+ai_image_dm.schema_migrations 테이블에 기록한다.
+인덱스는 CREATE INDEX CONCURRENTLY로 만들기 때문에 구문 단위로 autocommit 실행한다.
+이미 적용된 파일이 바뀌면(체크섬 불일치) 다시 실행하므로 구문은 IF NOT EXISTS / IF EXISTS로
+멱등하게 작성하고, 인덱스 정의를 바꿀 때는 새 이름으로 만들고 이전 인덱스를 DROP한다.
+
+    python index_migrations.py status
+    python index_migrations.py apply
+"""
+import hashlib
+import logging
+import re
+import sys
+from pathlib import Path
+
+from config import DB_AUTO_MIGRATE
+from db import get_db_connection
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = Path(__file__).resolve().parent / "migrations"
+MIGRATIONS_TABLE = "ai_image_dm.schema_migrations"
+_INDEX_PATTERN = re.compile(
+    r"CREATE\s+(?:UNIQUE\s+)?INDEX\s+CONCURRENTLY\s+IF\s+NOT\s+EXISTS\s+(\w+)\s+ON\s+([\w.]+)",
+    re.IGNORECASE,
+)
+
+# 마이그레이션 실행 직렬화용 세션 advisory lock 키 (워커/배포 스크립트가 동시에 apply하지 않도록)
+ADVISORY_LOCK_KEY = int.from_bytes(hashlib.sha1(MIGRATIONS_TABLE.encode("utf-8")).digest()[:8], "big", signed=True)
+
+# 마지막 검증 결과 (인덱스 사용 현황 API에서 사용)
+last_verification = None
+
+
+def load_migrations():
+    """[(버전, 파일명, SQL, 체크섬, [(인덱스명, 테이블)])]"""
+    migrations = []
+    for path in sorted(MIGRATIONS_DIR.glob("*.sql")):
+        sql = path.read_text(encoding="utf-8")
+        migrations.append({
+            "version": path.stem.split("_", 1)[0],
+            "name": path.name,
+            "sql": sql,
+            "checksum": hashlib.sha1(sql.encode("utf-8")).hexdigest(),
+            "indexes": _INDEX_PATTERN.findall(sql),
+        })
+    return migrations
+
+
+def managed_indexes():
+    return {name: table for migration in load_migrations() for name, table in migration["indexes"]}
+
+
+def _statements(sql):
+    """주석 제거 후 ; 단위 구문 분리"""
+    lines = [line for line in sql.splitlines() if not line.strip().startswith("--")]
+    return [statement.strip() for statement in "\n".join(lines).split(";") if statement.strip()]
+
+
+def _ensure_table(cursor):
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS {MIGRATIONS_TABLE} (
+            version VARCHAR(32) PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            checksum VARCHAR(40) NOT NULL,
+            applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        )
+    """)
+
+
+def _existing_indexes(cursor, names):
+    """{인덱스명: 유효 여부} (CONCURRENTLY 실패로 남은 INVALID 인덱스 구분)"""
+    cursor.execute("""
+        SELECT c.relname, i.indisvalid
+        FROM pg_index i
+        JOIN pg_class c ON c.oid = i.indexrelid
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = 'ai_image_dm'
+        AND c.relname = ANY(%s)
+    """, (list(names),))
+    return dict(cursor.fetchall())
+
+
+def verify():
+    """적용 이력과 관리 대상 인덱스 존재/유효성 확인"""
+    global last_verification
+    migrations = load_migrations()
+    conn = get_db_connection()
+    try:
+        conn.autocommit = True
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT to_regclass(%s)", (MIGRATIONS_TABLE,))
+            applied = {}
+            if cursor.fetchone()[0] is not None:
+                cursor.execute(f"SELECT version, checksum FROM {MIGRATIONS_TABLE}")
+                applied = dict(cursor.fetchall())
+            expected = {name: table for migration in migrations for name, table in migration["indexes"]}
+            existing = _existing_indexes(cursor, expected)
+    finally:
+        conn.close()
+
+    result = {
+        "pending": [m["name"] for m in migrations if m["version"] not in applied],
+        "changed": [
+            m["name"] for m in migrations
+            if m["version"] in applied and applied[m["version"]] != m["checksum"]
+        ],
+        "missing_indexes": sorted(name for name in expected if name not in existing),
+        "invalid_indexes": sorted(name for name, valid in existing.items() if not valid),
+    }
+    result["ok"] = not any(result.values())
+    last_verification = result
+    return result
+
+
+def apply():
+    """미적용/변경된 마이그레이션 실행 (INVALID 인덱스는 삭제 후 재생성)
+
+    세션 advisory lock을 잡은 뒤 적용 이력을 다시 읽으므로, 여러 워커가 동시에 시작해도
+    한 곳만 실행하고 나머지는 끝날 때까지 기다렸다가 이미 적용된 것으로 건너뛴다.
+    """
+    migrations = load_migrations()
+    conn = get_db_connection()
+    try:
+        conn.autocommit = True
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_lock(%s)", (ADVISORY_LOCK_KEY,))
+            try:
+                applied_now = _apply_locked(cursor, migrations)
+            finally:
+                cursor.execute("SELECT pg_advisory_unlock(%s)", (ADVISORY_LOCK_KEY,))
+    finally:
+        conn.close()
+    return applied_now
+
+
+def _apply_locked(cursor, migrations):
+    """잠금을 잡은 상태에서 적용 이력을 다시 읽고 미적용/변경분 실행"""
+    applied_now = []
+    _ensure_table(cursor)
+    cursor.execute(f"SELECT version, checksum FROM {MIGRATIONS_TABLE}")
+    applied = dict(cursor.fetchall())
+
+    for migration in migrations:
+        if applied.get(migration["version"]) == migration["checksum"]:
+            continue
+        invalid = [
+            name for name, valid in
+            _existing_indexes(cursor, [name for name, _ in migration["indexes"]]).items()
+            if not valid
+        ]
+        for name in invalid:
+            cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS ai_image_dm.{name}")
+        for statement in _statements(migration["sql"]):
+            logger.info("migration %s: %s", migration["name"], statement.splitlines()[0])
+            cursor.execute(statement)
+        cursor.execute(
+            f"INSERT INTO {MIGRATIONS_TABLE} (version, name, checksum) VALUES (%s, %s, %s) "
+            "ON CONFLICT (version) DO UPDATE SET name = EXCLUDED.name, checksum = EXCLUDED.checksum, "
+            "applied_at = now()",
+            (migration["version"], migration["name"], migration["checksum"]),
+        )
+        applied_now.append(migration["name"])
+    return applied_now
+
+
+def verify_on_startup():
+    """시작 시 검증 (DB_AUTO_MIGRATE=true면 미적용분 적용)"""
+    try:
+        result = verify()
+        if not result["ok"] and DB_AUTO_MIGRATE:
+            logger.info("applying migrations: %s", apply())
+            result = verify()
+        if not result["ok"]:
+            logger.warning("index migrations not in sync: %s", result)
+    except Exception:
+        logger.exception("index migration verification failed")
+
+
+def index_usage_report():
+    """ai_image_dm 인덱스/테이블 스캔 통계"""
+    managed = managed_indexes()
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("""
+                SELECT s.relname, s.indexrelname, s.idx_scan, s.idx_tup_read, s.idx_tup_fetch,
+                       pg_relation_size(s.indexrelid), i.indisvalid
+                FROM pg_stat_user_indexes s
+                JOIN pg_index i ON i.indexrelid = s.indexrelid
+                WHERE s.schemaname = 'ai_image_dm'
+                ORDER BY s.relname, s.idx_scan DESC
+            """)
+            indexes = [
+                {
+                    "table": table,
+                    "index": index,
+                    "idx_scan": idx_scan,
+                    "idx_tup_read": idx_tup_read,
+                    "idx_tup_fetch": idx_tup_fetch,
+                    "size_bytes": size,
+                    "valid": valid,
+                    "managed": index in managed,
+                }
+                for table, index, idx_scan, idx_tup_read, idx_tup_fetch, size, valid in cursor.fetchall()
+            ]
+            cursor.execute("""
+                SELECT relname, seq_scan, seq_tup_read, idx_scan, n_live_tup
+                FROM pg_stat_user_tables
+                WHERE schemaname = 'ai_image_dm'
+                ORDER BY seq_tup_read DESC
+            """)
+            tables = [
+                {
+                    "table": table,
+                    "seq_scan": seq_scan,
+                    "seq_tup_read": seq_tup_read,
+                    "idx_scan": idx_scan,
+                    "live_rows": live_rows,
+                }
+                for table, seq_scan, seq_tup_read, idx_scan, live_rows in cursor.fetchall()
+            ]
+    finally:
+        conn.close()
+    return {"indexes": indexes, "tables": tables, "verification": last_verification}
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    command = sys.argv[1] if len(sys.argv) > 1 else "status"
+    if command == "apply":
+        print("applied:", apply())
+    print(verify())
@@ -0,0 +1,225 @@
+"""코디 조합 빈발 아이템셋 마이닝 (FP-growth)
+
+instagram_classification_web_date_follow_itemtype을 post_id 단위로 묶어
+(category_l1, item_type) 아이템의 2~4개 조합을 FP-growth로 찾는다.
+(연도, 월, 팔로워 구간)별 결과를 Redis에 저장해 두고 API는 저장된 결과만 읽는다.
+주기 실행은 스케줄러(scheduler.py)가 클러스터에서 한 프로세스만 하도록 맡는다.
+
+    python itemset_mining.py   # 한 번 실행
+"""
+import json
+import logging
+import time
+from collections import Counter, defaultdict
+
+from cache import redis_client
+from config import (
+    FOLLOWER_TIERS,
+    ITEMSET_MAX_LENGTH,
+    ITEMSET_MAX_STORED,
+    ITEMSET_MIN_SUPPORT,
+)
+from data_version import data_version
+from db import pooled_connection
+from query_builder import ITEMTYPE_TABLE, tier_for
+
+logger = logging.getLogger(__name__)
+
+REDIS_PREFIX = "trendai:itemsets"
+ITEM_SEPARATOR = "|"
+
+
+class _FPNode:
+    __slots__ = ("item", "count", "parent", "children")
+
+    def __init__(self, item, parent):
+        self.item = item
+        self.count = 0
+        self.parent = parent
+        self.children = {}
+
+
+def _build_tree(weighted_transactions, min_support):
+    """(아이템 튜플, 가중치) 목록 → (헤더 테이블, 아이템 빈도)"""
+    item_counts = Counter()
+    for items, weight in weighted_transactions:
+        for item in items:
+            item_counts[item] += weight
+    frequent = {item: count for item, count in item_counts.items() if count >= min_support}
+    if not frequent:
+        return {}, frequent
+
+    root = _FPNode(None, None)
+    header = defaultdict(list)
+    for items, weight in weighted_transactions:
+        ordered = sorted(
+            (item for item in items if item in frequent),
+            key=lambda item: (-frequent[item], item),
+        )
+        node = root
+        for item in ordered:
+            child = node.children.get(item)
+            if child is None:
+                child = node.children[item] = _FPNode(item, node)
+                header[item].append(child)
+            child.count += weight
+            node = child
+    return header, frequent
+
+
+def fp_growth(transactions, min_support, max_length=ITEMSET_MAX_LENGTH):
+    """빈발 아이템셋 {frozenset: 지지도(건수)}"""
+    weighted = list(Counter(frozenset(items) for items in transactions if items).items())
+    result = {}
+    _mine(weighted, min_support, max_length, (), result)
+    return result
+
+
+def _mine(weighted_transactions, min_support, max_length, suffix, result):
+    header, frequent = _build_tree(weighted_transactions, min_support)
+    # 빈도가 낮은 아이템부터 조건부 패턴 탐색
+    for item in sorted(frequent, key=lambda item: (frequent[item], item)):
+        itemset = suffix + (item,)
+        result[frozenset(itemset)] = frequent[item]
+        if len(itemset) >= max_length:
+            continue
+
+        conditional = []
+        for node in header[item]:
+            path = []
+            parent = node.parent
+            while parent is not None and parent.item is not None:
+                path.append(parent.item)
+                parent = parent.parent
+            if path:
+                conditional.append((path, node.count))
+        if conditional:
+            _mine(conditional, min_support, max_length, itemset, result)
+
+
+def _item_key(item):
+    return list(item.split(ITEM_SEPARATOR, 1))
+
+
+def mine_partition(transactions, min_support=ITEMSET_MIN_SUPPORT):
+    """한 파티션(연도/월/팔로워 구간)의 저장용 결과"""
+    itemsets = fp_growth(transactions, min_support)
+    item_support = {next(iter(items)): count for items, count in itemsets.items() if len(items) == 1}
+    combos = sorted(
+        ((items, count) for items, count in itemsets.items() if len(items) >= 2),
+        key=lambda pair: (-pair[1], sorted(pair[0])),
+    )[:ITEMSET_MAX_STORED]
+    return {
+        "transactions": len(transactions),
+        "item_support": item_support,
+        "itemsets": [
+            {"items": [_item_key(item) for item in sorted(items)], "support": count}
+            for items, count in combos
+        ],
+    }
+
+
+def _redis_key(post_year, post_month, tier):
+    return f"{REDIS_PREFIX}:{post_year}:{post_month}:{tier}"
+
+
+def _load_posts():
+    """(연도, 월) → [(팔로워 수, 아이템 튜플)]"""
+    with pooled_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(f"""
+                SELECT
+                    post_year,
+                    post_month,
+                    MAX(follower_count),
+                    array_agg(DISTINCT category_l1 || '{ITEM_SEPARATOR}' || item_type)
+                FROM {ITEMTYPE_TABLE}
+                WHERE post_id IS NOT NULL
+                AND post_year IS NOT NULL
+                AND post_month IS NOT NULL
+                AND category_l1 IS NOT NULL
+                AND item_type IS NOT NULL
+                AND item_type != ''
+                GROUP BY post_year, post_month, post_id
+            """)
+            posts = defaultdict(list)
+            for post_year, post_month, follower_count, items in cursor:
+                posts[(post_year, post_month)].append((follower_count or 0, tuple(items)))
+    return posts
+
+
+def run_mining():
+    """전체 (연도, 월, 팔로워 구간) 마이닝 후 Redis 저장"""
+    started = time.perf_counter()
+    version = data_version(ITEMTYPE_TABLE)
+    posts = _load_posts()
+    partitions = 0
+    pipeline = redis_client.pipeline()
+    for (post_year, post_month), month_posts in posts.items():
+        for tier in FOLLOWER_TIERS:
+            transactions = [items for followers, items in month_posts if followers >= tier]
+            result = mine_partition(transactions)
+            result.update({
+                "post_year": post_year,
+                "post_month": post_month,
+                "follower_tier": tier,
+                "version": version,
+                "generated_at": time.time(),
+            })
+            pipeline.set(_redis_key(post_year, post_month, tier), json.dumps(result, ensure_ascii=False))
+            partitions += 1
+    pipeline.set(f"{REDIS_PREFIX}:version", version)
+    pipeline.execute()
+    elapsed = time.perf_counter() - started
+    logger.info("itemset mining finished: %d partitions in %.1fs", partitions, elapsed)
+    return {"partitions": partitions, "elapsed": elapsed, "version": version}
+
+
+def refresh_if_stale():
+    """데이터 버전이 바뀐 경우에만 마이닝 (스케줄러 itemset-mining 작업)"""
+    if redis_client.get(f"{REDIS_PREFIX}:version") == data_version(ITEMTYPE_TABLE):
+        return None
+    return run_mining()
+
+
+def load_partition(post_year, post_month, follower_count=None):
+    raw = redis_client.get(_redis_key(post_year, post_month, tier_for(follower_count, FOLLOWER_TIERS)))
+    return json.loads(raw) if raw else None
+
+
+def top_combinations(partition, size=None, anchor=None, limit=20):
+    """저장된 결과에서 상위 조합 선택
+
+    anchor=[category_l1, item_type]가 있으면 해당 아이템을 포함한 조합만,
+    confidence = support(조합) / support(anchor) 로 계산한다.
+    """
+    item_support = partition["item_support"]
+    transactions = partition["transactions"] or 1
+    anchor_key = ITEM_SEPARATOR.join(anchor) if anchor else None
+    anchor_support = item_support.get(anchor_key) if anchor_key else None
+
+    result = []
+    for itemset in partition["itemsets"]:
+        items = itemset["items"]
+        if size and len(items) != size:
+            continue
+        keys = [ITEM_SEPARATOR.join(item) for item in items]
+        if anchor_key and anchor_key not in keys:
+            continue
+        support = itemset["support"]
+        result.append({
+            "items": [{"category_l1": category, "item_type": item_type} for category, item_type in items],
+            "size": len(items),
+            "support": support,
+            "support_ratio": round(support / transactions, 6),
+            "confidence": round(support / anchor_support, 4) if anchor_support else None,
+            "all_confidence": round(support / max(item_support[key] for key in keys), 4),
+        })
+        if len(result) >= limit:
+            break
+    return result
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    print(run_mining())
@@ -1,23 +1,64 @@
-from fastapi import FastAPI, status
+import os
+import threading
+from typing import List
+
+from fastapi import FastAPI, Query, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-import psycopg2
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
 from psycopg2.extras import RealDictCursor
-import redis
-import os
-from config import DB_CONFIG, DB_CONNECT_TIMEOUT, PUBLIC_DB_CONFIG
+from admin_auth import AdminTokenMiddleware
+from admission import AdmissionMiddleware, stats as admission_stats
+from approx import approx_status, refresh_sample_if_stale
+from cache import redis_client
+from config import (
+    APPROX_REFRESH_INTERVAL,
+    CUBE_ENABLED,
+    DATA_VERSION_TTL,
+    EXPORT_CLEANUP_INTERVAL,
+    FOLLOWER_TIERS,
+    ITEMSET_REFRESH_INTERVAL,
+    PUBLIC_DB_CONFIG,
+    THUMBNAIL_MAX_AGE,
+)
+from db import close_pool, get_db_connection, host_stats, pooled_connection
+from deadlines import RequestDeadlineMiddleware, counters as deadline_counters
+from facets import load_facets
+from hashtag_graph import get_graph as get_hashtag_graph
+from http_cache import CacheControlMiddleware
+from index_migrations import index_usage_report, verify_on_startup
+from itemset_mining import load_partition, refresh_if_stale as refresh_itemsets, top_combinations
+from mood_matching import get_index as get_mood_match_index
+from movers import get_engine as get_movers_engine
+from olap_cube import cube_status, get_cube as get_item_type_cube, warm_cube
+from query_builder import (
+    IMAGE_CONDITIONS,
+    IMAGE_KEYSET,
+    ITEMTYPE_IMAGE_COLUMNS,
+    ITEMTYPE_TABLE,
+    MAX_PAGE_SIZE,
+    attribute_images_query,
+    encode_cursor,
+    execute,
+    fetch_all,
+    image_page_options,
+    previous_month,
+    select,
+    tier_for,
+    with_limit,
+)
+from serialization import FastJSONResponse, RowSet, fetch_rowset, rows_payload
+import autocomplete
+import exports
+import profiling
+import scheduler
+import shared_data
+import thumbnails
+import trends
+import version_events
 
 app = FastAPI(title="TrendAI Prototype API", version="1.0.0")
 
-# Redis 연결 설정
-REDIS_URL = os.getenv("REDIS_URL", "redis://redis:6379")
-redis_client = redis.from_url(REDIS_URL, decode_responses=True)
-
 # 데이터베이스 연결 헬퍼
-def get_db_connection():
-    return psycopg2.connect(connect_timeout=DB_CONNECT_TIMEOUT, **DB_CONFIG)
-
-
 def check_db_health():
     conn = None
     try:
@@ -32,14 +73,45 @@ def check_db_health():
         if conn is not None:
             conn.close()
 
-# CORS 설정
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["http://localhost", "http://localhost:80", "http://localhost:3001"],  # Nginx 프록시 및 개발 서버
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+# 키워드 목록 크기 상한
+MAX_KEYWORD_LIMIT = 5000
+
+def register_background_jobs():
+    """주기적인 사전 계산 작업 등록 (cluster 작업은 클러스터에서 한 프로세스만 실행)"""
+    if ITEMSET_REFRESH_INTERVAL > 0:
+        scheduler.register("itemset-mining", refresh_itemsets, interval=ITEMSET_REFRESH_INTERVAL)
+    if APPROX_REFRESH_INTERVAL > 0:
+        scheduler.register("approx-sample", refresh_sample_if_stale, interval=APPROX_REFRESH_INTERVAL)
+    if CUBE_ENABLED:
+        # 인메모리 큐브는 프로세스마다 필요하므로 local 작업
+        scheduler.register("itemtype-cube", warm_cube, interval=DATA_VERSION_TTL, cluster=False)
+    if EXPORT_CLEANUP_INTERVAL > 0:
+        # 내보내기 파일은 호스트 로컬 디스크에 있으므로 local 작업
+        scheduler.register("export-cleanup", exports.cleanup, interval=EXPORT_CLEANUP_INTERVAL, cluster=False)
+
+@app.on_event("startup")
+def start_background_jobs():
+    threading.Thread(target=verify_on_startup, name="index-migrations", daemon=True).start()
+    register_background_jobs()
+    scheduler.start()
+
+@app.on_event("shutdown")
+def shutdown_db_pool():
+    scheduler.stop()
+    exports.shutdown()
+    thumbnails.shutdown()
+    close_pool()
+
+# 관리 API(/api/admin/*, 내보내기, 큐브 상태) 토큰 인증 (ADMIN_TOKEN 미설정 시 403)
+app.add_middleware(AdminTokenMiddleware)
+
+# nginx 마이크로 캐시용 경로별 Cache-Control 힌트
+app.add_middleware(CacheControlMiddleware)
+# 경로 등급별 동시 실행 제한 (초과 시 503 + Retry-After)
+app.add_middleware(AdmissionMiddleware)
+# 요청 deadline + 클라이언트 연결 종료 시 진행 중인 쿼리 취소 (admission 바깥쪽)
+# (DB를 조회하는 핸들러는 동기 함수로 두어 스레드풀에서 실행되므로, 쿼리 중에도 연결 종료를 감지한다)
+app.add_middleware(RequestDeadlineMiddleware)
 
 # PostgreSQL 연결 테스트 함수
 def test_db_connection():
@@ -101,7 +173,7 @@ async def root():
 
 @app.get("/health")
 @app.get("/api/health")
-async def health_check():
+def health_check():
     redis_status = {"status": "connected"}
     try:
         redis_client.ping()
@@ -130,55 +202,162 @@ async def health_check():
     return JSONResponse(status_code=status_code, content=payload)
 
 @app.get("/api/test-db")
-async def test_db():
+def test_db():
     """DB 연결 테스트 API"""
     result = test_db_connection()
     return result
 
+@app.get("/api/admin/index-usage")
+def get_index_usage():
+    """ai_image_dm 인덱스 사용 현황 및 마이그레이션 검증 결과 조회 API"""
+    try:
+        report = index_usage_report()
+        return FastJSONResponse({
+            "success": True,
+            "data": report,
+            "count": len(report["indexes"]),
+            "message": f"성공적으로 {len(report['indexes'])}개 인덱스의 사용 현황을 조회했습니다."
+        })
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e),
+            "message": "인덱스 사용 현황 조회 중 오류가 발생했습니다."
+        }
+
+@app.get("/api/admin/query-deadlines")
+async def get_query_deadlines():
+    """쿼리 statement_timeout / 취소 건수 조회 API"""
+    data = deadline_counters()
+    return FastJSONResponse({
+        "success": True,
+        "data": data,
+        "count": sum(data.values()),
+        "message": "쿼리 타임아웃/취소 현황을 조회했습니다."
+    })
+
+@app.get("/api/admin/db-hosts")
+async def get_db_hosts():
+    """기본 DB/복제본별 상태, 조회 수, 응답 시간 조회 API"""
+    data = host_stats()
+    return FastJSONResponse({
+        "success": True,
+        "data": data,
+        "count": len(data["hosts"]),
+        "message": f"성공적으로 {len(data['hosts'])}개 DB 호스트의 상태를 조회했습니다."
+    })
+
+@app.get("/api/admin/admission")
+async def get_admission_stats():
+    """경로 등급별 동시 실행/대기열/부하 차단 현황 조회 API"""
+    data = admission_stats()
+    return FastJSONResponse({
+        "success": True,
+        "data": data,
+        "count": len(data["classes"]),
+        "message": "동시 실행 제한 현황을 조회했습니다."
+    })
+
+@app.get("/api/admin/approx-status")
+async def get_approx_status():
+    """근사 조회(approx=true) 표본/스케치 상태 조회 API"""
+    status_data = approx_status()
+    return FastJSONResponse({
+        "success": True,
+        "data": status_data,
+        "count": len(status_data["sketches"]),
+        "message": "근사 조회 상태를 조회했습니다."
+    })
+
+@app.get("/api/admin/shared-data")
+async def get_shared_data_status():
+    """워커 프로세스 간 공유 데이터셋 스냅샷 목록 조회 API (pid = 응답한 워커)"""
+    data = shared_data.status()
+    data["pid"] = os.getpid()
+    return FastJSONResponse({
+        "success": True,
+        "data": data,
+        "count": len(data["snapshots"]),
+        "message": f"성공적으로 {len(data['snapshots'])}개 공유 데이터셋 스냅샷을 조회했습니다."
+    })
+
+@app.get("/api/admin/scheduler")
+def get_scheduler_status():
+    """백그라운드 작업별 일정, 마지막 실행/소요 시간, 실패 상태 조회 API"""
+    try:
+        data = scheduler.status()
+        return FastJSONResponse({
+            "success": True,
+            "data": data,
+            "count": len(data["jobs"]),
+            "message": f"성공적으로 {len(data['jobs'])}개 백그라운드 작업의 상태를 조회했습니다."
+        })
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e),
+            "message": "백그라운드 작업 상태 조회 중 오류가 발생했습니다."
+        }
+
+@app.get("/api/admin/profiles")
+def get_profiles(limit: int = 50):
+    """저장된 요청 프로파일 목록 조회 API (경로, 파라미터, 구간별 시간)"""
+    try:
+        profiles = profiling.list_profiles(min(max(limit, 1), 500))
+        return FastJSONResponse({
+            "success": True,
+            "enabled": profiling.enabled(),
+            "data": profiles,
+            "count": len(profiles),
+            "message": f"성공적으로 {len(profiles)}개의 프로파일을 조회했습니다."
+        })
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e),
+            "message": "프로파일 목록 조회 중 오류가 발생했습니다."
+        }
+
+@app.get("/api/admin/profiles/{profile_id}")
+def get_profile(profile_id: str):
+    """요청 프로파일 speedscope 파일 다운로드 API"""
+    path = profiling.profile_path(profile_id)
+    if path is None:
+        return JSONResponse(status_code=status.HTTP_404_NOT_FOUND, content={
+            "success": False,
+            "error": f"profile not found: {profile_id}",
+            "message": "프로파일을 찾을 수 없습니다."
+        })
+    return FileResponse(path, media_type="application/json", filename=os.path.basename(path))
+
 @app.get("/api/mood-keywords")
-async def get_mood_keywords():
+def get_mood_keywords():
     """무드 센싱 키워드 데이터 조회 API"""
     try:
-        # PostgreSQL 연결
-        conn = get_db_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        
-        # 무드 키워드 데이터 조회
-        cursor.execute("""
-            SELECT DISTINCT keyword_cate1, keyword_cate2, tag_norm
-            FROM ai_image_dm.instagram_tpo_keyword_master 
-            WHERE keyword_cate1 IS NOT NULL 
-            AND keyword_cate2 IS NOT NULL
-            ORDER BY keyword_cate1, keyword_cate2
-        """)
-        result = cursor.fetchall()
-        
-        # 딕셔너리로 변환
-        data = [dict(row) for row in result]
-        
+        with pooled_connection() as conn:
+            with conn.cursor() as cursor:
+                # 무드 키워드 데이터 조회
+                cursor.execute("""
+                    SELECT DISTINCT keyword_cate1, keyword_cate2, tag_norm
+                    FROM ai_image_dm.instagram_tpo_keyword_master 
+                    WHERE keyword_cate1 IS NOT NULL 
+                    AND keyword_cate2 IS NOT NULL
+                    ORDER BY keyword_cate1, keyword_cate2
+                """)
+                data = fetch_rowset(cursor)
+
         # 카테고리별로 그룹화
         categories = {}
-        for item in data:
-            cate1 = item['keyword_cate1']
-            cate2 = item['keyword_cate2']
-            
-            if cate1 not in categories:
-                categories[cate1] = {}
-            if cate2 not in categories[cate1]:
-                categories[cate1][cate2] = []
-            
-            categories[cate1][cate2].append(item['tag_norm'])
-        
-        cursor.close()
-        conn.close()
-        
-        return {
+        for cate1, cate2, tag_norm in data:
+            categories.setdefault(cate1, {}).setdefault(cate2, []).append(tag_norm)
+
+        return FastJSONResponse({
             "success": True,
             "data": data,
             "categories": categories,
             "count": len(data),
             "message": f"성공적으로 {len(data)}개의 무드 키워드 데이터를 조회했습니다."
-        }
+        })
     except Exception as e:
         return {
             "success": False,
@@ -187,61 +366,40 @@ async def get_mood_keywords():
         }
 
 @app.get("/api/mood-rate")
-async def get_mood_rate():
+def get_mood_rate(columnar: bool = False):
     """무드 센싱 가칭1 데이터 조회 API"""
     try:
-        # PostgreSQL 연결
-        conn = get_db_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        
-        # 무드 레이트 데이터 조회
-        # 간단한 테스트 쿼리
-        cursor.execute("""
-            SELECT COUNT(*) as total_count
-            FROM ai_image_dm.instagram_web_mood_rate
-        """)
-        count_result = cursor.fetchone()
-        print("총 데이터 개수:", count_result)
-        
-        # 데이터가 있으면 조회
-        if count_result and count_result['total_count'] > 0:
-            cursor.execute("""
-                SELECT 
-                    post_date,
-                    category_l1,
-                    category_l3,
-                    mood_category,
-                    mood_look,
-                    pattern,
-                    color,
-                    detail_1,
-                    s3_key
-                FROM ai_image_dm.instagram_web_mood_rate 
-                ORDER BY post_date DESC
-            """)
-        else:
-            print("데이터가 없습니다.")
-            result = []
-        result = cursor.fetchall()
-        
-        # 딕셔너리로 변환
-        data = [dict(row) for row in result]
-        
+        with pooled_connection() as conn:
+            with conn.cursor() as cursor:
+                # 무드 레이트 데이터 조회
+                cursor.execute("""
+                    SELECT 
+                        post_date,
+                        category_l1,
+                        category_l3,
+                        mood_category,
+                        mood_look,
+                        pattern,
+                        color,
+                        detail_1,
+                        s3_key
+                    FROM ai_image_dm.instagram_web_mood_rate 
+                    ORDER BY post_date DESC
+                """)
+                data = fetch_rowset(cursor)
+
         # 카테고리 정보 추출
-        categories_main = list(set([item['category_l1'] for item in data if item['category_l1']]))
-        categories_sub = list(set([item['category_l3'] for item in data if item['category_l3']]))
-        
-        cursor.close()
-        conn.close()
-        
-        return {
+        categories_main = list(set(value for value in data.column('category_l1') if value))
+        categories_sub = list(set(value for value in data.column('category_l3') if value))
+
+        return FastJSONResponse({
             "success": True,
-            "data": data,
+            "data": rows_payload(data, columnar),
             "categories_main": categories_main,
             "categories_sub": categories_sub,
             "count": len(data),
             "message": f"성공적으로 {len(data)}개의 무드 레이트 데이터를 조회했습니다."
-        }
+        })
     except Exception as e:
         return {
             "success": False,
@@ -250,37 +408,29 @@ async def get_mood_rate():
         }
 
 @app.get("/api/mood-style")
-async def get_mood_style():
+def get_mood_style(columnar: bool = False):
     """무드 센싱 가칭2 데이터 조회 API"""
     try:
-        # PostgreSQL 연결
-        conn = get_db_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        
-        # 무드 스타일 데이터 조회 (필수 컬럼만)
-        cursor.execute("""
-            SELECT 
-                desc_style,
-                s3_thumbnail_key
-            FROM ai_image_dm.instagram_web_mood_hashtags 
-            WHERE desc_style IS NOT NULL 
-            AND desc_style != '[]'::jsonb
-            AND desc_style != 'null'
-        """)
-        result = cursor.fetchall()
-        
-        # 딕셔너리로 변환
-        data = [dict(row) for row in result]
-        
-        cursor.close()
-        conn.close()
-        
-        return {
+        with pooled_connection() as conn:
+            with conn.cursor() as cursor:
+                # 무드 스타일 데이터 조회 (필수 컬럼만)
+                cursor.execute("""
+                    SELECT 
+                        desc_style,
+                        s3_thumbnail_key
+                    FROM ai_image_dm.instagram_web_mood_hashtags 
+                    WHERE desc_style IS NOT NULL 
+                    AND desc_style != '[]'::jsonb
+                    AND desc_style != 'null'
+                """)
+                data = fetch_rowset(cursor)
+
+        return FastJSONResponse({
             "success": True,
-            "data": data,
+            "data": rows_payload(data, columnar),
             "count": len(data),
             "message": f"성공적으로 {len(data)}개의 무드 스타일 데이터를 조회했습니다."
-        }
+        })
     except Exception as e:
         return {
             "success": False,
@@ -288,43 +438,190 @@ async def get_mood_style():
             "message": "무드 스타일 데이터 조회 중 오류가 발생했습니다."
         }
 
-@app.get("/api/item-color")
-async def get_item_color():
-    """아이템 센싱 컬러 데이터 조회 API"""
+@app.get("/api/mood-style/matches")
+def get_mood_style_matches(
+    cate1: str = None,
+    cate2: str = None,
+    keyword: str = None,
+    page: int = 1,
+    page_size: int = 20,
+    keyword_limit: int = 500,
+    keyword_offset: int = 0
+):
+    """무드 센싱 가칭2 해시태그-무드 키워드 매칭 조회 API
+
+    카테고리별 매칭 수, (필터된) 해시태그 빈도 목록, 선택 해시태그의 썸네일 페이지를 반환
+    """
     try:
-        # PostgreSQL 연결
-        conn = get_db_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        
-        # 아이템 컬러 데이터 조회
-        cursor.execute("""
-            SELECT 
-                category_l1,
-                category_l3,
-                follower_count,
-                post_date,
-                post_year,
-                post_month,
-                color
-            FROM ai_image_dm.instagram_classification_web_date_follow 
-            WHERE color IS NOT NULL 
-            AND color != ''
-            AND color != 'null'
-        """)
-        result = cursor.fetchall()
-        
-        # 딕셔너리로 변환
-        data = [dict(row) for row in result]
-        
-        cursor.close()
-        conn.close()
-        
+        index = get_mood_match_index()
+        page = max(page, 1)
+        page_size = min(max(page_size, 1), MAX_PAGE_SIZE)
+        keyword_limit = min(max(keyword_limit, 1), MAX_KEYWORD_LIMIT)
+
+        keywords, keyword_total = index.keywords(cate1, cate2, keyword_limit, max(keyword_offset, 0))
+        tag_norms = index.taxonomy.get(cate1, {}).get(cate2, []) if cate1 and cate2 else []
+
+        return FastJSONResponse({
+            "success": True,
+            "version": index.version,
+            "categories": index.category_counts,
+            "tag_norms": tag_norms,
+            "keywords": keywords,
+            "keyword_total": keyword_total,
+            "total_keywords": len(index.hashtags),
+            "images": index.images(keyword, page, page_size) if keyword else None,
+            "message": f"성공적으로 {keyword_total}개의 매칭 키워드를 조회했습니다."
+        })
+    except Exception as e:
         return {
+            "success": False,
+            "error": str(e),
+            "message": "무드 키워드 매칭 조회 중 오류가 발생했습니다."
+        }
+
+@app.get("/api/data-versions")
+async def get_data_versions():
+    """테이블별 데이터 버전 조회 API (version = 전체 결합 버전, 변경 알림 스트림의 이벤트 id와 같음)"""
+    try:
+        data = await version_events.hub.snapshot()
+        return FastJSONResponse({
             "success": True,
             "data": data,
+            "count": len(data["tables"]),
+            "message": f"성공적으로 {len(data['tables'])}개 테이블의 데이터 버전을 조회했습니다."
+        })
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e),
+            "message": "데이터 버전 조회 중 오류가 발생했습니다."
+        }
+
+@app.get("/api/data-versions/stream")
+async def stream_data_versions():
+    """데이터 버전 변경 알림 API (Server-Sent Events)
+
+    연결 직후 현재 버전을, 이후 ETL로 테이블 버전이 바뀔 때마다 versions 이벤트를 보낸다.
+    data = {"version", "tables": {테이블: 버전}, "changed": [바뀐 테이블]}
+    """
+    try:
+        stream = await version_events.hub.stream()
+    except version_events.TooManySubscribers as e:
+        return JSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, headers={"Retry-After": "30"}, content={
+            "success": False,
+            "error": str(e),
+            "message": "데이터 버전 알림 구독 중 오류가 발생했습니다."
+        })
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e),
+            "message": "데이터 버전 알림 구독 중 오류가 발생했습니다."
+        }
+    return StreamingResponse(stream, media_type="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",
+    })
+
+@app.get("/api/admin/data-versions")
+async def get_data_version_notify_status():
+    """데이터 버전 알림 구독 수/확인 횟수 조회 API (pid = 응답한 워커)"""
+    data = version_events.hub.stats()
+    data["pid"] = os.getpid()
+    return FastJSONResponse({
+        "success": True,
+        "data": data,
+        "count": data["subscribers"],
+        "message": f"현재 {data['subscribers']}개 연결이 데이터 버전 알림을 구독 중입니다."
+    })
+
+@app.get("/api/autocomplete")
+def get_autocomplete(q: str, limit: int = 10, type: str = None):
+    """해시태그/TPO 키워드 자동완성 API (자모/초성 접두사 일치, 빈도 순)
+
+    type: hashtag | keyword (생략 시 모두)
+    """
+    try:
+        if type is not None and type not in autocomplete.KINDS:
+            raise ValueError(f"지원하지 않는 자동완성 유형입니다: {type} (가능: {', '.join(autocomplete.KINDS)})")
+        index = autocomplete.get_index()
+        suggestions = index.suggest(q, limit, type)
+        return FastJSONResponse({
+            "success": True,
+            "version": index.version,
+            "data": suggestions,
+            "count": len(suggestions),
+            "message": f"성공적으로 {len(suggestions)}개의 자동완성 결과를 조회했습니다."
+        })
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e),
+            "message": "자동완성 조회 중 오류가 발생했습니다."
+        }
+
+@app.get("/api/hashtags/cooccurrence")
+def get_hashtag_cooccurrence(tag: str, limit: int = 20):
+    """해시태그 동시 출현 상위 이웃 조회 API (lift/PMI 기준)"""
+    try:
+        graph = get_hashtag_graph()
+        result = graph.neighbors(tag, min(max(limit, 1), graph.top_k))
+
+        if result is None:
+            return FastJSONResponse({
+                "success": True,
+                "data": {"tag": tag, "count": 0, "neighbors": []},
+                "count": 0,
+                "message": f"'{tag}' 해시태그 데이터가 없습니다."
+            })
+
+        return FastJSONResponse({
+            "success": True,
+            "data": result,
+            "count": len(result["neighbors"]),
+            "post_count": graph.post_count,
+            "message": f"성공적으로 {len(result['neighbors'])}개의 동시 출현 해시태그를 조회했습니다."
+        })
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e),
+            "message": "해시태그 동시 출현 조회 중 오류가 발생했습니다."
+        }
+
+
+def fetch_item_attribute_rows(column):
+    """아이템 센싱 속성(color/pattern/detail_1) 전체 데이터 조회"""
+    with pooled_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(f"""
+                SELECT 
+                    category_l1,
+                    category_l3,
+                    follower_count,
+                    post_date,
+                    post_year,
+                    post_month,
+                    {column}
+                FROM ai_image_dm.instagram_classification_web_date_follow 
+                WHERE {column} IS NOT NULL 
+                AND {column} != ''
+                AND {column} != 'null'
+            """)
+            return fetch_rowset(cursor)
+
+@app.get("/api/item-color")
+def get_item_color(columnar: bool = False):
+    """아이템 센싱 컬러 데이터 조회 API"""
+    try:
+        data = fetch_item_attribute_rows("color")
+
+        return FastJSONResponse({
+            "success": True,
+            "data": rows_payload(data, columnar),
             "count": len(data),
             "message": f"성공적으로 {len(data)}개의 아이템 컬러 데이터를 조회했습니다."
-        }
+        })
     except Exception as e:
         return {
             "success": False,
@@ -333,42 +630,17 @@ async def get_item_color():
         }
 
 @app.get("/api/item-pattern")
-async def get_item_pattern():
+def get_item_pattern(columnar: bool = False):
     """아이템 센싱 패턴 데이터 조회 API"""
     try:
-        # PostgreSQL 연결
-        conn = get_db_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        
-        # 아이템 패턴 데이터 조회
-        cursor.execute("""
-            SELECT 
-                category_l1,
-                category_l3,
-                follower_count,
-                post_date,
-                post_year,
-                post_month,
-                pattern
-            FROM ai_image_dm.instagram_classification_web_date_follow 
-            WHERE pattern IS NOT NULL 
-            AND pattern != ''
-            AND pattern != 'null'
-        """)
-        result = cursor.fetchall()
-        
-        # 딕셔너리로 변환
-        data = [dict(row) for row in result]
-        
-        cursor.close()
-        conn.close()
-        
-        return {
+        data = fetch_item_attribute_rows("pattern")
+
+        return FastJSONResponse({
             "success": True,
-            "data": data,
+            "data": rows_payload(data, columnar),
             "count": len(data),
             "message": f"성공적으로 {len(data)}개의 아이템 패턴 데이터를 조회했습니다."
-        }
+        })
     except Exception as e:
         return {
             "success": False,
@@ -377,42 +649,17 @@ async def get_item_pattern():
         }
 
 @app.get("/api/item-detail")
-async def get_item_detail():
+def get_item_detail(columnar: bool = False):
     """아이템 센싱 디테일 데이터 조회 API"""
     try:
-        # PostgreSQL 연결
-        conn = get_db_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        
-        # 아이템 디테일 데이터 조회
-        cursor.execute("""
-            SELECT 
-                category_l1,
-                category_l3,
-                follower_count,
-                post_date,
-                post_year,
-                post_month,
-                detail_1
-            FROM ai_image_dm.instagram_classification_web_date_follow 
-            WHERE detail_1 IS NOT NULL 
-            AND detail_1 != ''
-            AND detail_1 != 'null'
-        """)
-        result = cursor.fetchall()
-        
-        # 딕셔너리로 변환
-        data = [dict(row) for row in result]
-        
-        cursor.close()
-        conn.close()
-        
-        return {
+        data = fetch_item_attribute_rows("detail_1")
+
+        return FastJSONResponse({
             "success": True,
-            "data": data,
+            "data": rows_payload(data, columnar),
             "count": len(data),
             "message": f"성공적으로 {len(data)}개의 아이템 디테일 데이터를 조회했습니다."
-        }
+        })
     except Exception as e:
         return {
             "success": False,
@@ -421,34 +668,26 @@ async def get_item_detail():
         }
 
 @app.get("/api/item-type-categories")
-async def get_item_type_categories():
+def get_item_type_categories():
     """아이템 타입 대분류 목록 조회 API"""
     try:
-        # PostgreSQL 연결
-        conn = get_db_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        
-        # 대분류 목록 조회
-        cursor.execute("""
-            SELECT DISTINCT category_l1
-            FROM ai_image_dm.instagram_classification_web_date_follow_itemtype
-            WHERE category_l1 IS NOT NULL
-            ORDER BY category_l1
-        """)
-        result = cursor.fetchall()
-        
-        # 딕셔너리로 변환
-        data = [dict(row) for row in result]
-        
-        cursor.close()
-        conn.close()
-        
-        return {
+        with pooled_connection() as conn:
+            with conn.cursor() as cursor:
+                # 대분류 목록 조회
+                cursor.execute("""
+                    SELECT DISTINCT category_l1
+                    FROM ai_image_dm.instagram_classification_web_date_follow_itemtype
+                    WHERE category_l1 IS NOT NULL
+                    ORDER BY category_l1
+                """)
+                data = fetch_rowset(cursor)
+
+        return FastJSONResponse({
             "success": True,
             "data": data,
             "count": len(data),
             "message": f"성공적으로 {len(data)}개의 대분류를 조회했습니다."
-        }
+        })
     except Exception as e:
         return {
             "success": False,
@@ -457,40 +696,32 @@ async def get_item_type_categories():
         }
 
 @app.get("/api/item-type-meta")
-async def get_item_type_meta():
+def get_item_type_meta():
     """아이템 타입 메타데이터 조회 API (연도/월 정보)"""
     try:
-        # PostgreSQL 연결
-        conn = get_db_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        
-        # 연도/월 데이터 조회
-        cursor.execute("""
-            SELECT DISTINCT post_year, post_month
-            FROM ai_image_dm.instagram_classification_web_date_follow_itemtype
-            WHERE post_year IS NOT NULL AND post_month IS NOT NULL
-            ORDER BY post_year DESC, post_month DESC
-        """)
-        result = cursor.fetchall()
-        
-        # 딕셔너리로 변환
-        data = [dict(row) for row in result]
-        
+        with pooled_connection() as conn:
+            with conn.cursor() as cursor:
+                # 연도/월 데이터 조회
+                cursor.execute("""
+                    SELECT DISTINCT post_year, post_month
+                    FROM ai_image_dm.instagram_classification_web_date_follow_itemtype
+                    WHERE post_year IS NOT NULL AND post_month IS NOT NULL
+                    ORDER BY post_year DESC, post_month DESC
+                """)
+                data = fetch_rowset(cursor)
+
         # 연도와 월을 별도로 추출
-        years = sorted(list(set([item['post_year'] for item in data if item['post_year']])))
-        months = sorted(list(set([item['post_month'] for item in data if item['post_month']])))
-        
-        cursor.close()
-        conn.close()
-        
-        return {
+        years = sorted(set(year for year, _ in data if year))
+        months = sorted(set(month for _, month in data if month))
+
+        return FastJSONResponse({
             "success": True,
             "data": data,
             "years": years,
             "months": months,
             "count": len(data),
             "message": f"성공적으로 {len(data)}개의 메타데이터를 조회했습니다."
-        }
+        })
     except Exception as e:
         return {
             "success": False,
@@ -498,128 +729,175 @@ async def get_item_type_meta():
             "message": "메타데이터 조회 중 오류가 발생했습니다."
         }
 
-@app.get("/api/item-type-keywords")
-async def get_item_type_keywords(
+@app.get("/api/facets")
+def get_facets(
+    source: str = "follow",
     category_l1: str = None,
+    category_l3: str = None,
     post_year: int = None,
     post_month: int = None,
-    follower_count: int = None
+    follower_count: int = None,
+    color: str = None,
+    pattern: str = None,
+    detail_1: str = None,
+    item_type: str = None,
+    approx: bool = False
 ):
-    """아이템 타입 키워드 상위 10개 조회 API"""
+    """필터 드롭다운 패싯 건수 조회 API (연도/월/대분류/소분류/팔로워 구간, approx=true면 표본 추정치)"""
     try:
-        # PostgreSQL 연결
-        conn = get_db_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        
-        # WHERE 조건 구성
-        where_conditions = []
-        params = []
-        
-        if category_l1:
-            where_conditions.append("category_l1 = %s")
-            params.append(category_l1)
-        
-        if post_year:
-            where_conditions.append("post_year = %s")
-            params.append(post_year)
-            
-        if post_month:
-            where_conditions.append("post_month = %s")
-            params.append(post_month)
-            
-        if follower_count:
-            where_conditions.append("follower_count >= %s")
-            params.append(follower_count)
-        
-        where_clause = " AND ".join(where_conditions) if where_conditions else "1=1"
-        
-        # 현재 월 데이터 조회
-        current_query = f"""
-            SELECT 
-                category_l3,
-                COUNT(*) as count
-            FROM ai_image_dm.instagram_classification_web_date_follow_itemtype
-            WHERE {where_clause}
-            AND category_l3 IS NOT NULL
-            AND category_l3 != ''
-            GROUP BY category_l3
-            ORDER BY count DESC
-            LIMIT 10
-        """
-        
-        cursor.execute(current_query, params)
-        current_result = cursor.fetchall()
-        
-        # 전월 데이터 조회 (비교용) - 연도/월이 모두 있을 때만
-        prev_data = {}
-        if post_year and post_month:
-            prev_month = post_month - 1 if post_month > 1 else 12
-            prev_year = post_year if post_month > 1 else (post_year - 1)
-            
-            # 전월용 WHERE 조건 구성
-            prev_where_conditions = []
-            prev_params = []
-            
-            if category_l1:
-                prev_where_conditions.append("category_l1 = %s")
-                prev_params.append(category_l1)
-            
-            prev_where_conditions.append("post_year = %s")
-            prev_params.append(prev_year)
-            
-            prev_where_conditions.append("post_month = %s")
-            prev_params.append(prev_month)
-                
-            if follower_count:
-                prev_where_conditions.append("follower_count >= %s")
-                prev_params.append(follower_count)
-            
-            prev_where_clause = " AND ".join(prev_where_conditions)
-            
-            prev_query = f"""
-                SELECT 
-                    category_l3,
-                    COUNT(*) as count
-                FROM ai_image_dm.instagram_classification_web_date_follow_itemtype
-                WHERE {prev_where_clause}
-                AND category_l3 IS NOT NULL
-                AND category_l3 != ''
-                GROUP BY category_l3
-            """
-            
-            cursor.execute(prev_query, prev_params)
-            prev_result = cursor.fetchall()
-            
-            # 전월 데이터를 딕셔너리로 변환
-            prev_data = {row['category_l3']: row['count'] for row in prev_result}
-        
-        # 현재 데이터에 전월 대비 증감률 계산
-        result_data = []
-        for row in current_result:
-            current_count = row['count']
-            prev_count = prev_data.get(row['category_l3'], 0)
-            
-            if prev_count > 0:
-                change_rate = ((current_count - prev_count) / prev_count) * 100
-            else:
-                change_rate = 100 if current_count > 0 else 0
-            
-            result_data.append({
-                'category_l3': row['category_l3'],
-                'count': current_count,
-                'prev_count': prev_count,
-                'change_rate': round(change_rate, 2)
-            })
-        
-        cursor.close()
-        conn.close()
-        
+        filters = {
+            "category_l1": category_l1,
+            "category_l3": category_l3,
+            "post_year": post_year,
+            "post_month": post_month,
+            "follower_count": follower_count,
+            "color": color,
+            "pattern": pattern,
+            "detail_1": detail_1,
+            "item_type": item_type,
+        }
+        result = load_facets(source, {key: value for key, value in filters.items() if value}, approx)
+
+        return FastJSONResponse({
+            "success": True,
+            "data": result,
+            "count": result["total"],
+            "message": f"성공적으로 {len(result['facets'])}개 패싯의 건수를 조회했습니다."
+        })
+    except Exception as e:
         return {
+            "success": False,
+            "error": str(e),
+            "message": "패싯 건수 조회 중 오류가 발생했습니다."
+        }
+
+# 이미지 조회 시 중복 제거를 감안해 LIMIT 대비 더 읽어오는 배수
+IMAGE_OVERFETCH = 2
+
+
+def fetch_top_counts_from_db(column, filters, prev_filters, limit, required=()):
+    """column별 상위 건수 (현재 조건) + 전체 건수 (전월 조건) SQL 조회"""
+    not_empty = (f"{column} IS NOT NULL", f"{column} != ''")
+
+    with pooled_connection() as conn:
+        with conn.cursor() as cursor:
+            # 현재 월 데이터 조회
+            current_result = fetch_all(cursor, select(
+                ITEMTYPE_TABLE,
+                f"{column}, COUNT(*) as count",
+                filters,
+                conditions=not_empty,
+                group_by=column,
+                order_by="count DESC",
+                limit=limit,
+                required=required,
+            ))
+
+            # 전월 데이터 조회 (비교용) - 연도/월이 모두 있을 때만
+            prev_data = {}
+            if prev_filters:
+                prev_data = dict(fetch_all(cursor, select(
+                    ITEMTYPE_TABLE,
+                    f"{column}, COUNT(*) as count",
+                    prev_filters,
+                    conditions=not_empty,
+                    group_by=column,
+                    required=required,
+                )))
+    return current_result, prev_data
+
+
+def fetch_top_counts_with_change_rate(column, filters, limit=10, required=()):
+    """column별 상위 건수와 전월 대비 증감률 조회 (큐브 우선, 불가하면 SQL)
+
+    required: 값이 비어 있어도 조건에 포함할 필수 필터 (큐브는 빈 값을 조건 없음으로 보므로 SQL로 조회)
+    """
+    prev_filters = None
+    if filters.get("post_year") and filters.get("post_month"):
+        prev_year, prev_month = previous_month(filters["post_year"], filters["post_month"])
+        prev_filters = {**filters, "post_year": prev_year, "post_month": prev_month}
+
+    cube = get_item_type_cube()
+    if cube is not None and cube.can_answer(filters) and all(filters.get(key) for key in required):
+        current_result = cube.top_counts(column, filters, limit)
+        prev_data = dict(cube.top_counts(column, prev_filters)) if prev_filters else {}
+    else:
+        current_result, prev_data = fetch_top_counts_from_db(column, filters, prev_filters, limit, required)
+
+    # 현재 데이터에 전월 대비 증감률 계산
+    result_data = []
+    for value, current_count in current_result:
+        prev_count = prev_data.get(value, 0)
+
+        if prev_count > 0:
+            change_rate = ((current_count - prev_count) / prev_count) * 100
+        else:
+            change_rate = 100 if current_count > 0 else 0
+
+        result_data.append({
+            column: value,
+            'count': current_count,
+            'prev_count': prev_count,
+            'change_rate': round(change_rate, 2)
+        })
+    return result_data
+
+
+def fetch_images(query):
+    """이미지 한 페이지 조회 → (RowSet, 다음 페이지 커서)
+
+    (follower_count, post_id, s3_key) 내림차순 키셋 페이지네이션으로, 몇 번째 페이지든
+    인덱스에서 커서 위치부터 읽고 LIMIT에서 멈춘다.
+    SELECT DISTINCT 대신 여유 있게 읽은 뒤 s3_key 기준으로 중복을 제거하고,
+    중복이 많아 한 페이지를 못 채우면 읽는 양을 늘려 다시 조회한다.
+    """
+    limit = query.params[-1]
+    # 다음 페이지 존재 여부를 알기 위해 한 건 더 확보
+    fetch_limit = (limit + 1) * IMAGE_OVERFETCH
+    with pooled_connection() as conn:
+        with conn.cursor() as cursor:
+            while True:
+                execute(cursor, with_limit(query, fetch_limit))
+                rowset = fetch_rowset(cursor)
+                key_index = rowset.index("s3_key")
+                unique_rows = {}
+                for row in rowset.rows:
+                    unique_rows.setdefault(row[key_index], row)
+                if len(unique_rows) > limit or len(rowset) < fetch_limit:
+                    break
+                fetch_limit *= IMAGE_OVERFETCH
+
+    rows = list(unique_rows.values())
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        next_cursor = encode_cursor(*(last[rowset.index(column)] for column in IMAGE_KEYSET))
+    page = RowSet(rowset.columns, rows[:limit])
+    thumbnails.prefetch_rowset(page)
+    return page, next_cursor
+
+@app.get("/api/item-type-keywords")
+def get_item_type_keywords(
+    category_l1: str = None,
+    post_year: int = None,
+    post_month: int = None,
+    follower_count: int = None
+):
+    """아이템 타입 키워드 상위 10개 조회 API"""
+    try:
+        result_data = fetch_top_counts_with_change_rate("category_l3", {
+            "category_l1": category_l1,
+            "post_year": post_year,
+            "post_month": post_month,
+            "follower_count": follower_count,
+        })
+
+        return FastJSONResponse({
             "success": True,
             "data": result_data,
             "count": len(result_data),
             "message": f"성공적으로 {len(result_data)}개의 아이템 키워드를 조회했습니다."
-        }
+        })
     except Exception as e:
         return {
             "success": False,
@@ -628,7 +906,7 @@ async def get_item_type_keywords(
         }
 
 @app.get("/api/item-type-items")
-async def get_item_type_items(
+def get_item_type_items(
     category_l3: str,
     category_l1: str = None,
     post_year: int = None,
@@ -637,119 +915,20 @@ async def get_item_type_items(
 ):
     """선택된 아이템의 유형 상위 10개 조회 API"""
     try:
-        # PostgreSQL 연결
-        conn = get_db_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        
-        # WHERE 조건 구성
-        where_conditions = ["category_l3 = %s"]
-        params = [category_l3]
-        
-        if category_l1:
-            where_conditions.append("category_l1 = %s")
-            params.append(category_l1)
-        
-        if post_year:
-            where_conditions.append("post_year = %s")
-            params.append(post_year)
-            
-        if post_month:
-            where_conditions.append("post_month = %s")
-            params.append(post_month)
-            
-        if follower_count:
-            where_conditions.append("follower_count >= %s")
-            params.append(follower_count)
-        
-        where_clause = " AND ".join(where_conditions)
-        
-        # 현재 월 데이터 조회
-        current_query = f"""
-            SELECT 
-                item_type,
-                COUNT(*) as count
-            FROM ai_image_dm.instagram_classification_web_date_follow_itemtype
-            WHERE {where_clause}
-            AND item_type IS NOT NULL
-            AND item_type != ''
-            GROUP BY item_type
-            ORDER BY count DESC
-            LIMIT 10
-        """
-        
-        cursor.execute(current_query, params)
-        current_result = cursor.fetchall()
-        
-        # 전월 데이터 조회 (비교용) - 연도/월이 모두 있을 때만
-        prev_data = {}
-        if post_year and post_month:
-            prev_month = post_month - 1 if post_month > 1 else 12
-            prev_year = post_year if post_month > 1 else (post_year - 1)
-            
-            # 전월용 WHERE 조건 구성
-            prev_where_conditions = ["category_l3 = %s"]
-            prev_params = [category_l3]
-            
-            if category_l1:
-                prev_where_conditions.append("category_l1 = %s")
-                prev_params.append(category_l1)
-            
-            prev_where_conditions.append("post_year = %s")
-            prev_params.append(prev_year)
-            
-            prev_where_conditions.append("post_month = %s")
-            prev_params.append(prev_month)
-                
-            if follower_count:
-                prev_where_conditions.append("follower_count >= %s")
-                prev_params.append(follower_count)
-            
-            prev_where_clause = " AND ".join(prev_where_conditions)
-            
-            prev_query = f"""
-                SELECT 
-                    item_type,
-                    COUNT(*) as count
-                FROM ai_image_dm.instagram_classification_web_date_follow_itemtype
-                WHERE {prev_where_clause}
-                AND item_type IS NOT NULL
-                AND item_type != ''
-                GROUP BY item_type
-            """
-            
-            cursor.execute(prev_query, prev_params)
-            prev_result = cursor.fetchall()
-            
-            # 전월 데이터를 딕셔너리로 변환
-            prev_data = {row['item_type']: row['count'] for row in prev_result}
-        
-        # 현재 데이터에 전월 대비 증감률 계산
-        result_data = []
-        for row in current_result:
-            current_count = row['count']
-            prev_count = prev_data.get(row['item_type'], 0)
-            
-            if prev_count > 0:
-                change_rate = ((current_count - prev_count) / prev_count) * 100
-            else:
-                change_rate = 100 if current_count > 0 else 0
-            
-            result_data.append({
-                'item_type': row['item_type'],
-                'count': current_count,
-                'prev_count': prev_count,
-                'change_rate': round(change_rate, 2)
-            })
-        
-        cursor.close()
-        conn.close()
-        
-        return {
+        result_data = fetch_top_counts_with_change_rate("item_type", {
+            "category_l3": category_l3,
+            "category_l1": category_l1,
+            "post_year": post_year,
+            "post_month": post_month,
+            "follower_count": follower_count,
+        }, required=("category_l3",))
+
+        return FastJSONResponse({
             "success": True,
             "data": result_data,
             "count": len(result_data),
             "message": f"성공적으로 {len(result_data)}개의 아이템 유형을 조회했습니다."
-        }
+        })
     except Exception as e:
         return {
             "success": False,
@@ -757,8 +936,18 @@ async def get_item_type_items(
             "message": "아이템 유형 조회 중 오류가 발생했습니다."
         }
 
+@app.get("/api/item-type-cube/stats")
+async def get_item_type_cube_stats():
+    """아이템 타입 큐브 상태 조회 API (메모리, 재생성 시간)"""
+    get_item_type_cube()
+    return FastJSONResponse({
+        "success": True,
+        "data": cube_status(),
+        "message": "아이템 타입 큐브 상태를 조회했습니다."
+    })
+
 @app.get("/api/coordi-combination")
-async def get_coordi_combination(
+def get_coordi_combination(
     item_type: str,
     main_category: str,
     post_year: int = None,
@@ -767,102 +956,70 @@ async def get_coordi_combination(
 ):
     """코디 조합 조회 API"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-
-        # 1. 선택된 아이템 유형의 post_id들을 가져옴
-        where_conditions = []
-        params = []
-
-        where_conditions.append("item_type = %s")
-        params.append(item_type)
-
-        where_conditions.append("category_l1 = %s")
-        params.append(main_category)
-
-        if post_year:
-            where_conditions.append("post_year = %s")
-            params.append(post_year)
-
-        if post_month:
-            where_conditions.append("post_month = %s")
-            params.append(post_month)
-
-        if follower_count:
-            where_conditions.append("follower_count >= %s")
-            params.append(follower_count)
-
-        where_clause = " AND ".join(where_conditions)
-
-        # 선택된 아이템의 post_id 조회
-        post_ids_query = f"""
-            SELECT DISTINCT post_id
-            FROM ai_image_dm.instagram_classification_web_date_follow_itemtype
-            WHERE {where_clause}
-            AND post_id IS NOT NULL
-        """
-
-        cursor.execute(post_ids_query, params)
-        post_ids_result = cursor.fetchall()
-        
-        if not post_ids_result:
-            return {
-                "success": True,
-                "data": {"left": [], "right": []},
-                "message": "해당 조건에 맞는 데이터가 없습니다."
-            }
-
-        post_ids = [row['post_id'] for row in post_ids_result]
-        post_ids_str = ','.join([f"'{pid}'" for pid in post_ids])
+        # 1. 선택된 아이템 유형의 post_id 서브쿼리
+        post_ids_query = select(
+            ITEMTYPE_TABLE,
+            "post_id",
+            {
+                "item_type": item_type,
+                "category_l1": main_category,
+                "post_year": post_year,
+                "post_month": post_month,
+                "follower_count": follower_count,
+            },
+            conditions=("post_id IS NOT NULL",),
+            distinct=True,
+            required=("item_type", "category_l1"),
+        )
 
         # 2. 다른 대분류들 정의
         all_categories = ['상의', '아우터', '하의']
         other_categories = [cat for cat in all_categories if cat != main_category]
         
         if len(other_categories) < 2:
-            return {
+            return FastJSONResponse({
                 "success": True,
                 "data": {"left": [], "right": []},
                 "message": "코디 조합을 위한 충분한 대분류가 없습니다."
-            }
+            })
 
         # 3. 각 다른 대분류에서 코디 조합 아이템들 조회
         result_data = {"left": [], "right": []}
-        
-        for i, category in enumerate(other_categories):
-            coordi_query = f"""
-                SELECT
-                    item_type,
-                    COUNT(*) as count
-                FROM ai_image_dm.instagram_classification_web_date_follow_itemtype
-                WHERE post_id IN ({post_ids_str})
-                AND category_l1 = %s
-                AND item_type IS NOT NULL
-                AND item_type != ''
-                GROUP BY item_type
-                ORDER BY count DESC
-                LIMIT 10
-            """
-            
-            cursor.execute(coordi_query, [category])
-            coordi_result = cursor.fetchall()
-            
-            coordi_data = [dict(row) for row in coordi_result]
-            
-            # left 또는 right에 할당
-            if i == 0:
-                result_data["left"] = coordi_data
-            else:
-                result_data["right"] = coordi_data
 
-        cursor.close()
-        conn.close()
+        with pooled_connection() as conn:
+            with conn.cursor() as cursor:
+                for i, category in enumerate(other_categories):
+                    execute(cursor, select(
+                        ITEMTYPE_TABLE,
+                        "item_type, COUNT(*) as count",
+                        {"category_l1": category},
+                        conditions=("item_type IS NOT NULL", "item_type != ''"),
+                        subquery=("post_id", post_ids_query),
+                        group_by="item_type",
+                        order_by="count DESC",
+                        limit=10,
+                    ))
+
+                    coordi_data = fetch_rowset(cursor)
+
+                    # left 또는 right에 할당
+                    if i == 0:
+                        result_data["left"] = coordi_data
+                    else:
+                        result_data["right"] = coordi_data
+
+        if not result_data["left"] and not result_data["right"]:
+            return FastJSONResponse({
+                "success": True,
+                "data": {"left": [], "right": []},
+                "message": "해당 조건에 맞는 데이터가 없습니다."
+            })
 
-        return {
+        return FastJSONResponse({
             "success": True,
             "data": result_data,
             "message": f"성공적으로 코디 조합을 조회했습니다. (상위 {len(result_data['left'])} + {len(result_data['right'])}개)"
-        }
+        })
 
     except Exception as e:
         return {
@@ -871,86 +1028,163 @@ async def get_coordi_combination(
             "message": "코디 조합 조회 중 오류가 발생했습니다."
         }
 
-@app.get("/api/color-images")
-async def get_color_images(
-    color: str,
-    category_l1: str = None,
-    category_l3: str = None,
-    post_year: int = None,
-    post_month: int = None,
+@app.get("/api/coordi-itemsets")
+def get_coordi_itemsets(
+    post_year: int,
+    post_month: int,
     follower_count: int = None,
+    size: int = None,
+    item_type: str = None,
+    main_category: str = None,
     limit: int = 20
 ):
-    """컬러별 이미지 조회 API"""
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-
-        # WHERE 조건 구성
-        where_conditions = []
-        params = []
-
-        where_conditions.append("color = %s")
-        params.append(color)
+    """코디 빈발 조합(2~4개 아이템) 조회 API - 백그라운드 마이닝 결과 사용
 
-        if category_l1:
-            where_conditions.append("category_l1 = %s")
-            params.append(category_l1)
-
-        if category_l3:
-            where_conditions.append("category_l3 = %s")
-            params.append(category_l3)
-
-        if post_year:
-            where_conditions.append("post_year = %s")
-            params.append(post_year)
+    마이닝 결과는 FOLLOWER_TIERS 구간별로만 저장되므로, follower_count는 그 이하의 가장 큰 구간으로
+    조회하고 실제 사용한 구간을 follower_tier로, 요청 값과 같은지를 follower_tier_exact로 돌려준다.
+    """
+    try:
+        tier = tier_for(follower_count, FOLLOWER_TIERS)
+        tier_info = {
+            "follower_tier": tier,
+            "follower_tier_exact": (follower_count or 0) == tier,
+            "follower_tiers": FOLLOWER_TIERS,
+        }
+        tier_note = "" if tier_info["follower_tier_exact"] else f" (팔로워 {tier} 이상 구간 기준)"
+        partition = load_partition(post_year, post_month, follower_count)
+        if partition is None:
+            return FastJSONResponse({
+                "success": True,
+                "data": [],
+                "count": 0,
+                **tier_info,
+                "message": f"해당 조건의 코디 조합 분석 결과가 아직 없습니다.{tier_note}"
+            })
 
-        if post_month:
-            where_conditions.append("post_month = %s")
-            params.append(post_month)
+        anchor = [main_category, item_type] if main_category and item_type else None
+        result_data = top_combinations(partition, size, anchor, min(max(limit, 1), MAX_PAGE_SIZE))
 
-        if follower_count:
-            where_conditions.append("follower_count >= %s")
-            params.append(follower_count)
+        return FastJSONResponse({
+            "success": True,
+            "data": result_data,
+            "count": len(result_data),
+            **tier_info,
+            "transactions": partition["transactions"],
+            "generated_at": partition["generated_at"],
+            "message": f"성공적으로 {len(result_data)}개의 코디 조합을 조회했습니다.{tier_note}"
+        })
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e),
+            "message": "코디 빈발 조합 조회 중 오류가 발생했습니다."
+        }
 
-        where_clause = " AND ".join(where_conditions)
+@app.get("/api/trends/series")
+def get_trend_series(
+    dimension: str,
+    values: List[str] = Query(None),
+    category_l1: str = None,
+    category_l3: str = None,
+    follower_count: int = None,
+    months: int = 12,
+    end_year: int = None,
+    end_month: int = None,
+    top: int = 10,
+    approx: bool = False
+):
+    """속성별 월간 건수/비중 추이 조회 API (values를 여러 개 지정하면 한 번에 조회)
 
-        # s3_key가 있는 이미지들 조회
-        images_query = f"""
-            SELECT DISTINCT s3_key, post_id, category_l1, category_l3, follower_count, post_date
-            FROM ai_image_dm.instagram_classification_web_date_follow 
-            WHERE {where_clause}
-            AND s3_key IS NOT NULL
-            AND s3_key != ''
-            ORDER BY follower_count DESC
-            LIMIT %s
-        """
+    approx=true면 표본 기반 추정 건수와 95% 오차 범위(errors), HLL 기반 고유 게시물 수(posts)를 돌려준다.
+    """
+    try:
+        months = max(1, min(months, trends.MAX_MONTHS))
+        values = (values or [])[:trends.MAX_VALUES]
+        top = max(1, min(top, trends.MAX_VALUES))
+        rows = trends.load_rollup(dimension, category_l1, category_l3, follower_count, approx)
+        result = trends.build_series(rows, values, months, end_year, end_month, top)
+        result["dimension"] = dimension
+        result["approx"] = approx
+        if approx:
+            result["posts_estimated"] = trends.attach_distinct_posts(
+                result, dimension, category_l1, category_l3, follower_count
+            )
 
-        params.append(limit)
-        cursor.execute(images_query, params)
-        result = cursor.fetchall()
+        return FastJSONResponse({
+            "success": True,
+            "data": result,
+            "count": len(result["series"]),
+            "message": f"성공적으로 {len(result['series'])}개 {dimension} 값의 {len(result['periods'])}개월 추이를 조회했습니다."
+        })
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e),
+            "message": "추이 데이터 조회 중 오류가 발생했습니다."
+        }
 
-        # 결과 데이터 정리
-        image_data = []
-        for row in result:
-            image_data.append({
-                's3_key': row['s3_key'],
-                'post_id': row['post_id'],
-                'category_l1': row['category_l1'],
-                'category_l3': row['category_l3'],
-                'follower_count': row['follower_count'],
-                'post_date': row['post_date']
-            })
+@app.get("/api/movers")
+def get_movers(
+    dimension: str,
+    category_l1: str = None,
+    category_l3: str = None,
+    post_year: int = None,
+    post_month: int = None,
+    follower_count: int = None,
+    limit: int = 10
+):
+    """상승/유지/하락 항목 조회 API (연도/월 미지정 시 최근 월)"""
+    try:
+        result = get_movers_engine().movers(
+            dimension,
+            category_l1=category_l1,
+            category_l3=category_l3,
+            post_year=post_year,
+            post_month=post_month,
+            follower_count=follower_count,
+            limit=max(1, min(limit, MAX_PAGE_SIZE)),
+        )
+        count = len(result["rising"]) + len(result["stable"]) + len(result["falling"])
+
+        return FastJSONResponse({
+            "success": True,
+            "data": result,
+            "count": count,
+            "message": f"성공적으로 {count}개의 {dimension} 상승/유지/하락 항목을 조회했습니다."
+        })
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e),
+            "message": "상승/하락 항목 조회 중 오류가 발생했습니다."
+        }
 
-        cursor.close()
-        conn.close()
+@app.get("/api/color-images")
+def get_color_images(
+    color: str,
+    category_l1: str = None,
+    category_l3: str = None,
+    post_year: int = None,
+    post_month: int = None,
+    follower_count: int = None,
+    limit: int = 20,
+    cursor: str = None
+):
+    """컬러별 이미지 조회 API (cursor로 다음 페이지 조회)"""
+    try:
+        image_data, next_cursor = fetch_images(attribute_images_query(
+            "color", color, category_l1, category_l3,
+            post_year, post_month, follower_count, limit, cursor,
+        ))
 
-        return {
+        return FastJSONResponse({
             "success": True,
             "data": image_data,
             "count": len(image_data),
+            "next_cursor": next_cursor,
+            "has_more": next_cursor is not None,
             "message": f"성공적으로 {len(image_data)}개의 {color} 컬러 이미지를 조회했습니다."
-        }
+        })
 
     except Exception as e:
         return {
@@ -960,85 +1194,31 @@ async def get_color_images(
         }
 
 @app.get("/api/pattern-images")
-async def get_pattern_images(
+def get_pattern_images(
     pattern: str,
     category_l1: str = None,
     category_l3: str = None,
     post_year: int = None,
     post_month: int = None,
     follower_count: int = None,
-    limit: int = 20
+    limit: int = 20,
+    cursor: str = None
 ):
-    """패턴별 이미지 조회 API"""
+    """패턴별 이미지 조회 API (cursor로 다음 페이지 조회)"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-
-        # WHERE 조건 구성
-        where_conditions = []
-        params = []
-
-        where_conditions.append("pattern = %s")
-        params.append(pattern)
+        image_data, next_cursor = fetch_images(attribute_images_query(
+            "pattern", pattern, category_l1, category_l3,
+            post_year, post_month, follower_count, limit, cursor,
+        ))
 
-        if category_l1:
-            where_conditions.append("category_l1 = %s")
-            params.append(category_l1)
-
-        if category_l3:
-            where_conditions.append("category_l3 = %s")
-            params.append(category_l3)
-
-        if post_year:
-            where_conditions.append("post_year = %s")
-            params.append(post_year)
-
-        if post_month:
-            where_conditions.append("post_month = %s")
-            params.append(post_month)
-
-        if follower_count:
-            where_conditions.append("follower_count >= %s")
-            params.append(follower_count)
-
-        where_clause = " AND ".join(where_conditions)
-
-        # s3_key가 있는 이미지들 조회
-        images_query = f"""
-            SELECT DISTINCT s3_key, post_id, category_l1, category_l3, follower_count, post_date
-            FROM ai_image_dm.instagram_classification_web_date_follow 
-            WHERE {where_clause}
-            AND s3_key IS NOT NULL
-            AND s3_key != ''
-            ORDER BY follower_count DESC
-            LIMIT %s
-        """
-
-        params.append(limit)
-        cursor.execute(images_query, params)
-        result = cursor.fetchall()
-
-        # 결과 데이터 정리
-        image_data = []
-        for row in result:
-            image_data.append({
-                's3_key': row['s3_key'],
-                'post_id': row['post_id'],
-                'category_l1': row['category_l1'],
-                'category_l3': row['category_l3'],
-                'follower_count': row['follower_count'],
-                'post_date': row['post_date']
-            })
-
-        cursor.close()
-        conn.close()
-
-        return {
+        return FastJSONResponse({
             "success": True,
             "data": image_data,
             "count": len(image_data),
+            "next_cursor": next_cursor,
+            "has_more": next_cursor is not None,
             "message": f"성공적으로 {len(image_data)}개의 {pattern} 패턴 이미지를 조회했습니다."
-        }
+        })
 
     except Exception as e:
         return {
@@ -1048,85 +1228,31 @@ async def get_pattern_images(
         }
 
 @app.get("/api/detail-images")
-async def get_detail_images(
+def get_detail_images(
     detail_1: str,
     category_l1: str = None,
     category_l3: str = None,
     post_year: int = None,
     post_month: int = None,
     follower_count: int = None,
-    limit: int = 20
+    limit: int = 20,
+    cursor: str = None
 ):
-    """디테일별 이미지 조회 API"""
+    """디테일별 이미지 조회 API (cursor로 다음 페이지 조회)"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-
-        # WHERE 조건 구성
-        where_conditions = []
-        params = []
-
-        where_conditions.append("detail_1 = %s")
-        params.append(detail_1)
-
-        if category_l1:
-            where_conditions.append("category_l1 = %s")
-            params.append(category_l1)
-
-        if category_l3:
-            where_conditions.append("category_l3 = %s")
-            params.append(category_l3)
-
-        if post_year:
-            where_conditions.append("post_year = %s")
-            params.append(post_year)
-
-        if post_month:
-            where_conditions.append("post_month = %s")
-            params.append(post_month)
-
-        if follower_count:
-            where_conditions.append("follower_count >= %s")
-            params.append(follower_count)
-
-        where_clause = " AND ".join(where_conditions)
-
-        # s3_key가 있는 이미지들 조회
-        images_query = f"""
-            SELECT DISTINCT s3_key, post_id, category_l1, category_l3, follower_count, post_date
-            FROM ai_image_dm.instagram_classification_web_date_follow 
-            WHERE {where_clause}
-            AND s3_key IS NOT NULL
-            AND s3_key != ''
-            ORDER BY follower_count DESC
-            LIMIT %s
-        """
-
-        params.append(limit)
-        cursor.execute(images_query, params)
-        result = cursor.fetchall()
-
-        # 결과 데이터 정리
-        image_data = []
-        for row in result:
-            image_data.append({
-                's3_key': row['s3_key'],
-                'post_id': row['post_id'],
-                'category_l1': row['category_l1'],
-                'category_l3': row['category_l3'],
-                'follower_count': row['follower_count'],
-                'post_date': row['post_date']
-            })
+        image_data, next_cursor = fetch_images(attribute_images_query(
+            "detail_1", detail_1, category_l1, category_l3,
+            post_year, post_month, follower_count, limit, cursor,
+        ))
 
-        cursor.close()
-        conn.close()
-
-        return {
+        return FastJSONResponse({
             "success": True,
             "data": image_data,
             "count": len(image_data),
+            "next_cursor": next_cursor,
+            "has_more": next_cursor is not None,
             "message": f"성공적으로 {len(image_data)}개의 {detail_1} 디테일 이미지를 조회했습니다."
-        }
+        })
 
     except Exception as e:
         return {
@@ -1136,7 +1262,7 @@ async def get_detail_images(
         }
 
 @app.get("/api/coordi-images")
-async def get_coordi_images(
+def get_coordi_images(
     item_type: str,
     main_category: str,
     post_year: int = None,
@@ -1144,155 +1270,77 @@ async def get_coordi_images(
     follower_count: int = None,
     limit: int = 20,
     coordi_main_category: str = None,
-    coordi_item_type: str = None
+    coordi_item_type: str = None,
+    cursor: str = None
 ):
-    """코디 조합 이미지 조회 API"""
+    """코디 조합 이미지 조회 API (cursor로 다음 페이지 조회)"""
     try:
-        
-        conn = get_db_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-
         # 코디 조합 필터링: 선택된 상의 + 클릭한 코디 아이템이 함께 있는 post_id들만 조회
         if coordi_main_category and coordi_item_type:
-            
-            # 1. 선택된 상의와 클릭한 코디 아이템이 모두 있는 post_id들을 찾기
-            coordi_where_conditions = []
-            coordi_params = []
-            
-            # 상의 조건
-            coordi_where_conditions.append("category_l1 = %s")
-            coordi_params.append(coordi_main_category)
-            coordi_where_conditions.append("item_type = %s")
-            coordi_params.append(coordi_item_type)
-            
-            # 코디 아이템 조건
-            coordi_where_conditions.append("category_l1 = %s")
-            coordi_params.append(main_category)
-            coordi_where_conditions.append("item_type = %s")
-            coordi_params.append(item_type)
-            
-            # 추가 필터 조건
-            if post_year:
-                coordi_where_conditions.append("post_year = %s")
-                coordi_params.append(post_year)
-            
-            if post_month:
-                coordi_where_conditions.append("post_month = %s")
-                coordi_params.append(post_month)
-            
-            if follower_count:
-                coordi_where_conditions.append("follower_count >= %s")
-                coordi_params.append(follower_count)
-            
-            coordi_where_clause = " AND ".join(coordi_where_conditions)
-            
-            # 공통 post_id를 가진 레코드들 찾기 (연도/월 필터 포함)
-            coordi_query = f"""
-                SELECT DISTINCT a.post_id
-                FROM ai_image_dm.instagram_classification_web_date_follow_itemtype a
-                INNER JOIN ai_image_dm.instagram_classification_web_date_follow_itemtype b 
-                ON a.post_id = b.post_id
-                WHERE a.category_l1 = %s AND a.item_type = %s
-                AND b.category_l1 = %s AND b.item_type = %s
-            """
-            
-            coordi_params_simple = [coordi_main_category, coordi_item_type, main_category, item_type]
-            
-            # 연도/월/팔로워 필터 추가
-            if post_year:
-                coordi_query += " AND a.post_year = %s"
-                coordi_params_simple.append(post_year)
-            if post_month:
-                coordi_query += " AND a.post_month = %s"
-                coordi_params_simple.append(post_month)
-            if follower_count:
-                coordi_query += " AND a.follower_count >= %s"
-                coordi_params_simple.append(follower_count)
-            
-            cursor.execute(coordi_query, coordi_params_simple)
-            coordi_result = cursor.fetchall()
-            
-            if not coordi_result:
-                return {
-                    "success": True,
-                    "data": [],
-                    "count": 0,
-                    "message": f"'{coordi_item_type}'와 '{item_type}'이 함께 찍힌 사진이 없습니다."
-                }
-            
-            coordi_post_ids = [row['post_id'] for row in coordi_result]
-            coordi_post_ids_str = ','.join([f"'{pid}'" for pid in coordi_post_ids])
-            
-            # 2. 해당 post_id들 중에서 요청된 코디 아이템의 이미지들만 조회
-            where_conditions = []
-            params = []
-            
-            where_conditions.append(f"post_id IN ({coordi_post_ids_str})")
-            where_conditions.append("item_type = %s")
-            params.append(item_type)
-            where_conditions.append("category_l1 = %s")
-            params.append(main_category)
-            
+            # 선택된 상의와 클릭한 코디 아이템이 모두 있는 post_id 서브쿼리 (연도/월 필터 포함)
+            coordi_post_ids_query = select(
+                f"{ITEMTYPE_TABLE} a INNER JOIN {ITEMTYPE_TABLE} b ON a.post_id = b.post_id",
+                "a.post_id",
+                {
+                    "a.category_l1": coordi_main_category,
+                    "a.item_type": coordi_item_type,
+                    "b.category_l1": main_category,
+                    "b.item_type": item_type,
+                    "a.post_year": post_year,
+                    "a.post_month": post_month,
+                    "a.follower_count": follower_count,
+                },
+                distinct=True,
+                required=("a.category_l1", "a.item_type", "b.category_l1", "b.item_type"),
+            )
+
+            # 해당 post_id들 중에서 요청된 코디 아이템의 이미지들만 조회
+            images_query = select(
+                ITEMTYPE_TABLE,
+                ITEMTYPE_IMAGE_COLUMNS,
+                {"item_type": item_type, "category_l1": main_category},
+                conditions=IMAGE_CONDITIONS,
+                subquery=("post_id", coordi_post_ids_query),
+                required=("item_type", "category_l1"),
+                **image_page_options(cursor, limit),
+            )
         else:
             # 기존 로직 (코디 조합 필터링이 없는 경우)
-            where_conditions = []
-            params = []
-
-            where_conditions.append("item_type = %s")
-            params.append(item_type)
-
-            where_conditions.append("category_l1 = %s")
-            params.append(main_category)
-
-            if post_year:
-                where_conditions.append("post_year = %s")
-                params.append(post_year)
-
-            if post_month:
-                where_conditions.append("post_month = %s")
-                params.append(post_month)
-
-            if follower_count:
-                where_conditions.append("follower_count >= %s")
-                params.append(follower_count)
-
-        where_clause = " AND ".join(where_conditions)
-
-        # s3_key가 있는 이미지들 조회
-        images_query = f"""
-            SELECT DISTINCT s3_key, post_id, category_l3, item_type, follower_count
-            FROM ai_image_dm.instagram_classification_web_date_follow_itemtype
-            WHERE {where_clause}
-            AND s3_key IS NOT NULL
-            AND s3_key != ''
-            ORDER BY follower_count DESC
-            LIMIT %s
-        """
-
-        params.append(limit)
-        cursor.execute(images_query, params)
-        result = cursor.fetchall()
+            images_query = select(
+                ITEMTYPE_TABLE,
+                ITEMTYPE_IMAGE_COLUMNS,
+                {
+                    "item_type": item_type,
+                    "category_l1": main_category,
+                    "post_year": post_year,
+                    "post_month": post_month,
+                    "follower_count": follower_count,
+                },
+                conditions=IMAGE_CONDITIONS,
+                required=("item_type", "category_l1"),
+                **image_page_options(cursor, limit),
+            )
 
-        # 결과 데이터 정리
-        image_data = []
-        for row in result:
-            image_data.append({
-                's3_key': row['s3_key'],
-                'post_id': row['post_id'],
-                'category_l3': row['category_l3'],
-                'item_type': row['item_type'],
-                'follower_count': row['follower_count']
-            })
+        image_data, next_cursor = fetch_images(images_query)
 
-        cursor.close()
-        conn.close()
+        if not image_data and coordi_main_category and coordi_item_type:
+            return FastJSONResponse({
+                "success": True,
+                "data": [],
+                "count": 0,
+                "next_cursor": None,
+                "has_more": False,
+                "message": f"'{coordi_item_type}'와 '{item_type}'이 함께 찍힌 사진이 없습니다."
+            })
 
-        return {
+        return FastJSONResponse({
             "success": True,
             "data": image_data,
             "count": len(image_data),
+            "next_cursor": next_cursor,
+            "has_more": next_cursor is not None,
             "message": f"성공적으로 {len(image_data)}개의 이미지를 조회했습니다."
-        }
+        })
 
     except Exception as e:
         return {
@@ -1301,6 +1349,160 @@ async def get_coordi_images(
             "message": "이미지 조회 중 오류가 발생했습니다."
         }
 
+@app.post("/api/exports")
+def create_export(
+    dataset: str,
+    format: str = "parquet",
+    category_l1: str = None,
+    category_l3: str = None,
+    item_type: str = None,
+    color: str = None,
+    pattern: str = None,
+    detail_1: str = None,
+    post_year: int = None,
+    post_month: int = None,
+    follower_count: int = None
+):
+    """필터 조건 내보내기 작업 등록 API (dataset: itemtype | mood-rate, format: parquet | csv)
+
+    같은 조건의 작업이 진행 중이거나 완료 파일이 남아 있으면 그 작업을 돌려준다.
+    """
+    try:
+        job = exports.submit(dataset, format, {
+            "category_l1": category_l1,
+            "category_l3": category_l3,
+            "item_type": item_type,
+            "color": color,
+            "pattern": pattern,
+            "detail_1": detail_1,
+            "post_year": post_year,
+            "post_month": post_month,
+            "follower_count": follower_count,
+        })
+        return FastJSONResponse({
+            "success": True,
+            "data": job,
+            "message": f"내보내기 작업({job['id']})이 {job['status']} 상태입니다."
+        })
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e),
+            "message": "내보내기 작업 등록 중 오류가 발생했습니다."
+        }
+
+@app.get("/api/exports")
+def get_exports():
+    """내보내기 작업 목록 조회 API"""
+    try:
+        jobs = exports.list_jobs()
+        return FastJSONResponse({
+            "success": True,
+            "data": jobs,
+            "count": len(jobs),
+            "message": f"성공적으로 {len(jobs)}개의 내보내기 작업을 조회했습니다."
+        })
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e),
+            "message": "내보내기 작업 목록 조회 중 오류가 발생했습니다."
+        }
+
+@app.get("/api/exports/{job_id}")
+def get_export(job_id: str):
+    """내보내기 작업 상태/진행률 조회 API"""
+    job = exports.get_job(job_id)
+    if job is None:
+        return JSONResponse(status_code=status.HTTP_404_NOT_FOUND, content={
+            "success": False,
+            "error": f"export not found: {job_id}",
+            "message": "내보내기 작업을 찾을 수 없습니다."
+        })
+    return FastJSONResponse({
+        "success": True,
+        "data": job,
+        "message": f"내보내기 작업({job_id})이 {job['status']} 상태입니다."
+    })
+
+@app.get("/api/exports/{job_id}/download")
+def download_export(job_id: str):
+    """완료된 내보내기 파일 다운로드 API"""
+    result = exports.result_file(exports.get_job(job_id))
+    if result is None:
+        return JSONResponse(status_code=status.HTTP_404_NOT_FOUND, content={
+            "success": False,
+            "error": f"export file not ready: {job_id}",
+            "message": "내보내기 파일이 없거나 아직 완료되지 않았습니다."
+        })
+    path, media_type, filename = result
+    return FileResponse(path, media_type=media_type, filename=filename)
+
+@app.get("/api/images/thumbnail")
+async def get_thumbnail(request: Request, key: str, width: int = thumbnails.DEFAULT_WIDTH, format: str = None):
+    """갤러리 썸네일 프록시 API (WebP 지원 브라우저는 WebP, 그 외 JPEG)"""
+    if format is None:
+        format = "webp" if "image/webp" in request.headers.get("accept", "") else "jpeg"
+    try:
+        data = await thumbnails.get_service().fetch(key, width, format)
+    except thumbnails.Busy as e:
+        return JSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, headers={"Retry-After": str(e.retry_after)}, content={
+            "success": False,
+            "error": str(e),
+            "message": "썸네일 요청이 많아 잠시 후 다시 시도해 주세요."
+        })
+    except ValueError as e:
+        return JSONResponse(status_code=status.HTTP_400_BAD_REQUEST, content={
+            "success": False,
+            "error": str(e),
+            "message": "썸네일 요청이 올바르지 않습니다."
+        })
+    except thumbnails.OriginError as e:
+        return JSONResponse(status_code=status.HTTP_404_NOT_FOUND, content={
+            "success": False,
+            "error": str(e),
+            "message": "원본 이미지를 찾을 수 없습니다."
+        })
+    except Exception as e:
+        return JSONResponse(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, content={
+            "success": False,
+            "error": str(e),
+            "message": "썸네일 생성 중 오류가 발생했습니다."
+        })
+
+    return Response(
+        content=data,
+        media_type=thumbnails.FORMATS[format][1],
+        headers={
+            "Cache-Control": f"public, max-age={THUMBNAIL_MAX_AGE}, immutable",
+            "Vary": "Accept",
+        },
+    )
+
+@app.get("/api/images/thumbnail/stats")
+async def get_thumbnail_stats():
+    """썸네일 디스크 캐시 상태 조회 API"""
+    return FastJSONResponse({
+        "success": True,
+        "data": thumbnails.get_service().cache.stats(),
+        "message": "썸네일 캐시 상태를 조회했습니다."
+    })
+
+# 요청별 샘플링 프로파일러 (PROFILE_TOKEN/PROFILE_SAMPLE_RATE 설정 시에만, 모든 라우트 등록 후 설치)
+profiling.install(app)
+
+# CORS 설정 — 마지막에 추가해 가장 바깥쪽에 둔다
+# (관리 API 403, admission 503처럼 안쪽 미들웨어가 직접 만든 응답에도 CORS 헤더가 붙도록)
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["http://localhost", "http://localhost:80", "http://localhost:3001"],  # Nginx 프록시 및 개발 서버
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+    # 응답 캐시 저장 기준 버전 (frontend config/api.js)
+    expose_headers=["X-Data-Version"],
+)
+
 if __name__ == "__main__":
     import uvicorn
     print("🚀 서버 시작 중...")
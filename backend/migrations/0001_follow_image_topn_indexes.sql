@@ -0,0 +1,24 @@
+-- 컬러/패턴/디테일 이미지 Top-N 조회용 인덱스
+-- 속성 = ?, 연도/월 = ? 조건 후 (follower_count, post_id, s3_key) DESC 순서 그대로 읽고 LIMIT에서 멈추도록 한다.
+-- 키셋 커서 (follower_count, post_id, s3_key) 전체를 인덱스 키에 두어 페이지 경계도 인덱스에서 찾는다.
+-- INCLUDE 컬럼으로 힙 접근 없이(index-only) 응답 컬럼을 읽는다.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_follow_color_period_keyset
+    ON ai_image_dm.instagram_classification_web_date_follow
+    (color, post_year, post_month, follower_count DESC, post_id DESC, s3_key DESC)
+    INCLUDE (category_l1, category_l3, post_date);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_follow_pattern_period_keyset
+    ON ai_image_dm.instagram_classification_web_date_follow
+    (pattern, post_year, post_month, follower_count DESC, post_id DESC, s3_key DESC)
+    INCLUDE (category_l1, category_l3, post_date);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_follow_detail_period_keyset
+    ON ai_image_dm.instagram_classification_web_date_follow
+    (detail_1, post_year, post_month, follower_count DESC, post_id DESC, s3_key DESC)
+    INCLUDE (category_l1, category_l3, post_date);
+
+-- 이전 정의 (follower_count DESC만 키, 나머지는 INCLUDE)
+DROP INDEX CONCURRENTLY IF EXISTS ai_image_dm.idx_follow_color_period_follower;
+DROP INDEX CONCURRENTLY IF EXISTS ai_image_dm.idx_follow_pattern_period_follower;
+DROP INDEX CONCURRENTLY IF EXISTS ai_image_dm.idx_follow_detail_period_follower;
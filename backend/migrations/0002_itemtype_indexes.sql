@@ -0,0 +1,22 @@
+-- 아이템 타입 / 코디 조합 조회용 인덱스
+
+-- 코디 이미지 Top-N: item_type, category_l1, 연도/월 조건 + (follower_count, post_id, s3_key) DESC 키셋
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_itemtype_item_period_keyset
+    ON ai_image_dm.instagram_classification_web_date_follow_itemtype
+    (item_type, category_l1, post_year, post_month, follower_count DESC, post_id DESC, s3_key DESC)
+    INCLUDE (category_l3);
+
+-- 이전 정의 (follower_count DESC만 키)
+DROP INDEX CONCURRENTLY IF EXISTS ai_image_dm.idx_itemtype_item_period_follower;
+
+-- 아이템 키워드/유형 집계: 대분류, 연도/월 조건 + follower_count 범위
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_itemtype_l1_period_follower
+    ON ai_image_dm.instagram_classification_web_date_follow_itemtype
+    (category_l1, post_year, post_month, follower_count)
+    INCLUDE (category_l3, item_type);
+
+-- 코디 조합 post_id 서브쿼리/셀프 조인
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_itemtype_post_id
+    ON ai_image_dm.instagram_classification_web_date_follow_itemtype
+    (post_id)
+    INCLUDE (category_l1, item_type);
@@ -0,0 +1,39 @@
+-- 근사 조회(approx=true)용 층화 행 표본
+-- (연도, 월, 대분류) 층마다 기본 5%를 뽑고, 작은 층은 최소 500행이 되도록 비율을 높인다.
+-- sample_weight = 1 / 표본 비율 (건수 추정 가중치). REFRESH MATERIALIZED VIEW 때마다 다시 뽑는다.
+-- REFRESH ... CONCURRENTLY(읽기 차단 없음)에는 유니크 인덱스가 필요한데 post_id는 원본에서도 중복되므로
+-- 표본 행 번호(sample_id)를 키로 둔다. 정의가 바뀌면 이 파일이 다시 실행되므로 먼저 지우고 만든다.
+DROP MATERIALIZED VIEW IF EXISTS ai_image_dm.follow_sample;
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS ai_image_dm.follow_sample AS
+WITH strata AS (
+    SELECT post_year, post_month, category_l1,
+           LEAST(1.0, GREATEST(0.05, 500.0 / COUNT(*)))::float8 AS sample_rate
+    FROM ai_image_dm.instagram_classification_web_date_follow
+    WHERE post_year IS NOT NULL
+    AND post_month IS NOT NULL
+    GROUP BY post_year, post_month, category_l1
+)
+SELECT row_number() OVER () AS sample_id,
+       f.post_id, f.post_year, f.post_month, f.category_l1, f.category_l3, f.follower_count,
+       f.color, f.pattern, f.detail_1, 1.0 / s.sample_rate AS sample_weight
+FROM (
+    -- 난수를 행마다 뽑도록 원본 쪽에서 계산 (조건에 두면 strata 쪽으로 내려가 층 단위로 뽑힘)
+    SELECT *, random() AS draw
+    FROM ai_image_dm.instagram_classification_web_date_follow
+) f
+JOIN strata s
+ON s.post_year = f.post_year
+AND s.post_month = f.post_month
+AND s.category_l1 IS NOT DISTINCT FROM f.category_l1
+WHERE f.draw < s.sample_rate;
+
+-- REFRESH MATERIALIZED VIEW CONCURRENTLY용 유니크 인덱스
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS idx_follow_sample_id
+    ON ai_image_dm.follow_sample
+    (sample_id);
+
+-- 표본 집계: 대분류, 연도/월 조건 + follower_count 범위
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_follow_sample_l1_period_follower
+    ON ai_image_dm.follow_sample
+    (category_l1, post_year, post_month, follower_count);
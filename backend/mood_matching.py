@@ -0,0 +1,254 @@
+"""무드 센싱 가칭2: 해시태그 ↔ 무드 키워드(tag_norm) 매칭 엔진
+
+브라우저에서 하던 매칭(해시태그가 tag_norm을 포함하거나, tag_norm이 해시태그를
+포함하면 매칭)을 서버에서 한 번만 계산해 인덱스로 보관한다.
+
+- 해시태그 ⊇ tag_norm : tag_norm 전체로 만든 Aho-Corasick 오토마톤으로 한 번에 탐색
+- 해시태그 ⊆ tag_norm : tag_norm의 모든 부분문자열 해시 테이블 조회
+
+인덱스는 두 테이블의 데이터 버전이 바뀔 때만 다시 만든다.
+"""
+import json
+import unicodedata
+from array import array
+from collections import deque
+
+from data_version import data_version
+from db import pooled_connection
+from deadlines import DetachedBuild
+
+HASHTAG_TABLE = "ai_image_dm.instagram_web_mood_hashtags"
+KEYWORD_TABLE = "ai_image_dm.instagram_tpo_keyword_master"
+
+
+def normalize_tag(tag):
+    """해시태그 정규화 (NFKC, 앞의 #, 공백 제거, 소문자)"""
+    return unicodedata.normalize("NFKC", tag).strip().lstrip("#").strip().lower()
+
+
+def parse_desc_style(desc_style):
+    """desc_style(JSONB 배열 / JSON 문자열 / 쉼표 구분 문자열) → 해시태그 목록"""
+    if isinstance(desc_style, list):
+        tags = desc_style
+    elif isinstance(desc_style, str):
+        if desc_style.startswith("[") and desc_style.endswith("]"):
+            try:
+                tags = json.loads(desc_style)
+            except ValueError:
+                return []
+        else:
+            tags = desc_style.split(",")
+    else:
+        return []
+    if not isinstance(tags, list):
+        return []
+    return [tag for tag in tags if isinstance(tag, str) and tag.strip()]
+
+
+class AhoCorasick:
+    """다중 패턴 부분문자열 탐색 오토마톤"""
+
+    def __init__(self, patterns):
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [()]
+        for pattern_id, pattern in enumerate(patterns):
+            if pattern:
+                self._add(pattern, pattern_id)
+        self._build()
+
+    def _add(self, pattern, pattern_id):
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+            state = next_state
+        self._output[state] += (pattern_id,)
+
+    def _build(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._output[next_state] += self._output[self._fail[next_state]]
+
+    def find(self, text):
+        """text에 포함된 패턴 id 집합"""
+        goto, fail, output = self._goto, self._fail, self._output
+        found = set()
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                found.update(output[state])
+        return found
+
+
+class MoodMatchIndex:
+    """해시태그 사전 인덱스 + 무드 키워드 매칭 결과"""
+
+    def __init__(self, keyword_rows, style_rows, version=None):
+        self.version = version
+
+        # 1. 무드 키워드 taxonomy
+        self.taxonomy = {}
+        tag_ids = {}
+        tag_categories = []
+        for cate1, cate2, tag_norm in keyword_rows:
+            if not tag_norm:
+                continue
+            self.taxonomy.setdefault(cate1, {}).setdefault(cate2, []).append(tag_norm)
+            normalized = normalize_tag(tag_norm)
+            if not normalized:
+                continue
+            if normalized not in tag_ids:
+                tag_ids[normalized] = len(tag_ids)
+                tag_categories.append(set())
+            tag_categories[tag_ids[normalized]].add((cate1, cate2))
+        tags = list(tag_ids)
+
+        # 2. 해시태그 → 썸네일 포스팅 리스트
+        self.thumbnails = []
+        hashtag_ids = {}
+        postings = []
+        for desc_style, thumbnail in style_rows:
+            thumbnail_id = len(self.thumbnails)
+            self.thumbnails.append(thumbnail)
+            seen = set()
+            for raw_tag in parse_desc_style(desc_style):
+                hashtag = normalize_tag(raw_tag)
+                if not hashtag or hashtag in seen:
+                    continue
+                seen.add(hashtag)
+                hashtag_id = hashtag_ids.get(hashtag)
+                if hashtag_id is None:
+                    hashtag_id = hashtag_ids[hashtag] = len(postings)
+                    postings.append(array("I"))
+                postings[hashtag_id].append(thumbnail_id)
+
+        # 빈도 내림차순으로 해시태그 id 재배치
+        order = sorted(range(len(postings)), key=lambda i: -len(postings[i]))
+        names = list(hashtag_ids)
+        self.hashtags = [names[i] for i in order]
+        self.postings = [postings[i] for i in order]
+        self.hashtag_ids = {name: new_id for new_id, name in enumerate(self.hashtags)}
+
+        # 3. 해시태그 ↔ tag_norm 매칭
+        automaton = AhoCorasick(tags)
+        substrings = {}
+        for tag_id, tag in enumerate(tags):
+            for start in range(len(tag)):
+                for end in range(start + 1, len(tag) + 1):
+                    substrings.setdefault(tag[start:end], set()).add(tag_id)
+
+        self.category_hashtags = {}
+        for hashtag_id, hashtag in enumerate(self.hashtags):
+            matched = automaton.find(hashtag)
+            matched.update(substrings.get(hashtag, ()))
+            categories = set()
+            for tag_id in matched:
+                categories.update(tag_categories[tag_id])
+            for category in categories:
+                self.category_hashtags.setdefault(category, array("I")).append(hashtag_id)
+
+        self.category_counts = self._category_counts()
+
+    def _category_counts(self):
+        """1차/2차 카테고리별 매칭 해시태그 수와 이미지 수"""
+        result = {}
+        for cate1, cate2s in self.taxonomy.items():
+            result[cate1] = {}
+            for cate2 in cate2s:
+                hashtag_ids = self.category_hashtags.get((cate1, cate2), ())
+                result[cate1][cate2] = {
+                    "keyword_count": len(hashtag_ids),
+                    "image_count": sum(len(self.postings[i]) for i in hashtag_ids),
+                }
+        return result
+
+    def keywords(self, cate1=None, cate2=None, limit=500, offset=0):
+        """(해시태그, 빈도) 목록과 전체 매칭 수 — 빈도 내림차순"""
+        if cate1 and cate2:
+            hashtag_ids = self.category_hashtags.get((cate1, cate2), ())
+        elif cate1:
+            merged = set()
+            for cate2_name in self.taxonomy.get(cate1, {}):
+                merged.update(self.category_hashtags.get((cate1, cate2_name), ()))
+            hashtag_ids = sorted(merged)
+        else:
+            hashtag_ids = range(len(self.hashtags))
+        page = hashtag_ids[offset:offset + limit]
+        return (
+            [{"keyword": self.hashtags[i], "count": len(self.postings[i])} for i in page],
+            len(hashtag_ids),
+        )
+
+    def images(self, keyword, page=1, page_size=20):
+        """선택 해시태그의 썸네일 페이지"""
+        hashtag_id = self.hashtag_ids.get(normalize_tag(keyword))
+        posting = self.postings[hashtag_id] if hashtag_id is not None else ()
+        total = len(posting)
+        start = (page - 1) * page_size
+        return {
+            "keyword": keyword,
+            "count": total,
+            "page": page,
+            "page_size": page_size,
+            "total_pages": (total + page_size - 1) // page_size,
+            "data": [self.thumbnails[i] for i in posting[start:start + page_size]],
+        }
+
+
+_index = None
+_builds = DetachedBuild("mood-matching")
+
+
+def _load_index(version):
+    with pooled_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(f"""
+                SELECT DISTINCT keyword_cate1, keyword_cate2, tag_norm
+                FROM {KEYWORD_TABLE}
+                WHERE keyword_cate1 IS NOT NULL
+                AND keyword_cate2 IS NOT NULL
+                ORDER BY keyword_cate1, keyword_cate2
+            """)
+            keyword_rows = cursor.fetchall()
+
+            cursor.execute(f"""
+                SELECT desc_style, s3_thumbnail_key
+                FROM {HASHTAG_TABLE}
+                WHERE desc_style IS NOT NULL
+                AND desc_style != '[]'::jsonb
+                AND desc_style != 'null'
+            """)
+            style_rows = cursor.fetchall()
+    return MoodMatchIndex(keyword_rows, style_rows, version)
+
+
+def _rebuild(version):
+    global _index
+    _index = _load_index(version)
+    return _index
+
+
+def get_index():
+    """현재 데이터 버전의 매칭 인덱스 (버전이 바뀌면 요청 밖에서 재생성하고 기다림)"""
+    version = data_version(HASHTAG_TABLE, KEYWORD_TABLE)
+    index = _index
+    if index is None or index.version != version:
+        index = _builds.wait(version, _rebuild, version)
+    return index
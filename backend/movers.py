@@ -0,0 +1,337 @@
+"""상승/유지/하락(movers) 엔진
+
+컬러/패턴/디테일/아이템 타입 각 차원을 (팔로워 구간, 슬라이스, 값) × 월 건수 배열로 적재하고
+모든 월·슬라이스에 대한 점수를 한 번에 벡터 연산으로 계산해 둔다.
+  - 슬라이스   : 전체 / category_l1 / category_l1 + category_l3
+  - 팔로워 축  : FOLLOWER_TIERS 하한별 누적 (follower_count >= 하한)
+  - 점수       : 전월 대비 변화율, 직전 MOVERS_WINDOW개월 비중 평균 대비 성장률과 z-score
+전월+당월 건수가 MOVERS_MIN_SUPPORT 미만인 값은 분류에서 제외한다.
+순위(슬라이스 내 z-score 내림차순)도 데이터 버전이 바뀔 때 미리 계산하고,
+API는 메모리의 결과를 잘라서 돌려준다.
+계산된 배열은 데이터 버전별 공유 스냅샷(shared_data)으로 저장해 워커 프로세스끼리 메모리를 공유한다.
+"""
+import logging
+import time
+
+import numpy as np
+
+from config import FOLLOWER_TIERS, MOVERS_MIN_SUPPORT, MOVERS_THRESHOLD, MOVERS_WINDOW
+from data_version import data_version
+from db import pooled_connection
+from deadlines import DetachedBuild
+from query_builder import FOLLOW_TABLE, ITEMTYPE_TABLE, follower_tier_case, tier_for
+import shared_data
+
+logger = logging.getLogger(__name__)
+
+DIMENSIONS = {
+    "color": FOLLOW_TABLE,
+    "pattern": FOLLOW_TABLE,
+    "detail_1": FOLLOW_TABLE,
+    "item_type": ITEMTYPE_TABLE,
+}
+# z-score 분모 하한 (비중 %p) — 변동이 거의 없던 값의 점수가 폭주하지 않도록
+MIN_STD = 0.5
+
+RISING, STABLE, FALLING, EXCLUDED = 1, 0, -1, 2
+
+
+class MoversIndex:
+    """한 차원의 movers 점수 배열"""
+
+    def __init__(self, dimension, rows, tiers=FOLLOWER_TIERS, window=MOVERS_WINDOW,
+                 threshold=MOVERS_THRESHOLD, min_support=MOVERS_MIN_SUPPORT):
+        """rows: (팔로워 구간 index, post_year, post_month, category_l1, category_l3, 값, 건수)"""
+        started = time.perf_counter()
+        self.dimension = dimension
+        self.tiers = list(tiers)
+        self.window = window
+        self.threshold = threshold
+        self.min_support = min_support
+
+        rows = [row for row in rows if row[5]]
+        month_index = [year * 12 + month - 1 for _, year, month, _, _, _, _ in rows]
+        self.first_month = min(month_index) if rows else 0
+        period_count = (max(month_index) - self.first_month + 1) if rows else 0
+
+        # 슬라이스 → id, (슬라이스, 값) → 시리즈 id
+        slice_ids = {}
+        series_ids = {}
+        tier_idx, series_idx, period_idx, counts = [], [], [], []
+        for (tier, _, _, l1, l3, value, count), month in zip(rows, month_index):
+            slices = [("", "")]
+            if l1:
+                slices.append((l1, ""))
+                if l3:
+                    slices.append((l1, l3))
+            for slice_key in slices:
+                slice_id = slice_ids.setdefault(slice_key, len(slice_ids))
+                series_id = series_ids.setdefault((slice_id, value), len(series_ids))
+                tier_idx.append(tier)
+                series_idx.append(series_id)
+                period_idx.append(month - self.first_month)
+                counts.append(count)
+
+        # 시리즈를 슬라이스 순으로 재배치해 슬라이스별 연속 구간으로 만든다
+        series_keys = list(series_ids)
+        order = sorted(range(len(series_keys)), key=lambda i: series_keys[i])
+        remap = np.empty(len(series_keys), dtype=np.intp)
+        remap[order] = np.arange(len(series_keys))
+        self.slices = list(slice_ids)
+        self.series_slice = np.array([series_keys[i][0] for i in order], dtype=np.int32)
+        self.series_value = [series_keys[i][1] for i in order]
+        self.slice_bounds = np.searchsorted(self.series_slice, np.arange(len(self.slices) + 1))
+        self.slice_ids = slice_ids
+
+        shape = (len(self.tiers), len(series_keys), period_count)
+        cube = np.zeros(shape, dtype=np.int32)
+        if rows:
+            np.add.at(cube, (np.array(tier_idx, dtype=np.intp),
+                             remap[np.array(series_idx, dtype=np.intp)],
+                             np.array(period_idx, dtype=np.intp)), np.array(counts, dtype=np.int32))
+        # 팔로워 축 역방향 누적합: cube[k] = follower_count >= tiers[k]
+        self.counts = np.flip(np.cumsum(np.flip(cube, axis=0), axis=0), axis=0)
+        self._score()
+        self.build_seconds = time.perf_counter() - started
+
+    def _score(self):
+        counts = self.counts.astype(np.float32)
+        tiers, series, periods = counts.shape
+
+        # 슬라이스별 월 합계 → 비중(%)
+        if series:
+            totals = np.add.reduceat(counts, self.slice_bounds[:-1], axis=1)
+            share_base = totals[:, self.series_slice, :]
+        else:
+            share_base = np.zeros_like(counts)
+        share = np.divide(counts * 100, share_base, out=np.zeros_like(counts), where=share_base > 0)
+
+        previous = np.zeros_like(counts)
+        previous[:, :, 1:] = counts[:, :, :-1]
+        change = np.where(
+            previous > 0,
+            (counts - previous) / np.maximum(previous, 1) * 100,
+            np.where(counts > 0, 100.0, 0.0),
+        ).astype(np.float32)
+
+        # 직전 window개월 비중의 평균/표준편차 (누적합으로 모든 월 동시 계산)
+        padded = np.zeros((tiers, series, periods + 1), dtype=np.float64)
+        padded_sq = np.zeros_like(padded)
+        np.cumsum(share, axis=2, out=padded[:, :, 1:])
+        np.cumsum(share.astype(np.float64) ** 2, axis=2, out=padded_sq[:, :, 1:])
+        end = np.arange(periods)
+        start = np.maximum(end - self.window, 0)
+        span = np.maximum(end - start, 1)
+        mean = (padded[:, :, end] - padded[:, :, start]) / span
+        variance = (padded_sq[:, :, end] - padded_sq[:, :, start]) / span - mean ** 2
+        std = np.sqrt(np.maximum(variance, 0))
+        has_history = (end - start) > 0
+
+        self.share = share
+        self.previous = previous.astype(np.int32)
+        self.change = change
+        self.zscore = np.where(has_history, (share - mean) / np.maximum(std, MIN_STD), 0).astype(np.float32)
+        self.growth = np.where(
+            has_history & (mean > 0), (share - mean) / np.where(mean > 0, mean, 1) * 100, 0
+        ).astype(np.float32)
+
+        supported = (counts + previous) >= self.min_support
+        present = (counts > 0) | (previous > 0)
+        status = np.full(counts.shape, EXCLUDED, dtype=np.int8)
+        status[present & supported & (change > self.threshold)] = RISING
+        status[present & supported & (change < -self.threshold)] = FALLING
+        status[present & supported & (np.abs(change) <= self.threshold)] = STABLE
+        self.status = status
+
+        # 슬라이스 내 z-score 내림차순 순위 (모든 구간/월)
+        self.ranking = np.empty(counts.shape, dtype=np.int32)
+        for tier in range(tiers):
+            for period in range(periods):
+                self.ranking[tier, :, period] = np.lexsort(
+                    (-self.zscore[tier, :, period], self.series_slice)
+                )
+
+    # 공유 스냅샷으로 저장하는 배열 / 메타 필드
+    SNAPSHOT_ARRAYS = ("counts", "share", "previous", "change", "zscore", "growth", "status", "ranking",
+                       "series_slice", "slice_bounds")
+    SNAPSHOT_META = ("dimension", "tiers", "window", "threshold", "min_support", "first_month",
+                     "series_value", "build_seconds")
+
+    def snapshot(self):
+        """(배열 dict, meta dict) — shared_data 스냅샷 형식"""
+        meta = {name: getattr(self, name) for name in self.SNAPSHOT_META}
+        meta["slices"] = self.slices
+        return {name: getattr(self, name) for name in self.SNAPSHOT_ARRAYS}, meta
+
+    @classmethod
+    def from_snapshot(cls, arrays, meta):
+        """스냅샷(읽기 전용 memmap 가능)에서 복원 — 배열은 복사하지 않는다"""
+        index = cls.__new__(cls)
+        for name in cls.SNAPSHOT_META:
+            setattr(index, name, meta[name])
+        index.slices = [tuple(slice_key) for slice_key in meta["slices"]]
+        index.slice_ids = {slice_key: slice_id for slice_id, slice_key in enumerate(index.slices)}
+        for name in cls.SNAPSHOT_ARRAYS:
+            setattr(index, name, arrays[name])
+        return index
+
+    def period_index(self, post_year=None, post_month=None):
+        periods = self.counts.shape[2]
+        if not periods:
+            return None
+        if not post_year or not post_month:
+            return periods - 1
+        index = post_year * 12 + post_month - 1 - self.first_month
+        return index if 0 <= index < periods else None
+
+    def _item(self, tier, series, period):
+        return {
+            self.dimension: self.series_value[series],
+            "count": int(self.counts[tier, series, period]),
+            "prev_count": int(self.previous[tier, series, period]),
+            "share": round(float(self.share[tier, series, period]), 2),
+            "change_rate": round(float(self.change[tier, series, period]), 2),
+            "zscore": round(float(self.zscore[tier, series, period]), 3),
+            "growth": round(float(self.growth[tier, series, period]), 2),
+        }
+
+    def movers(self, category_l1=None, category_l3=None, post_year=None, post_month=None,
+               follower_count=None, limit=10):
+        """상승/유지/하락 목록 (상승·하락은 z-score 순, 유지는 비중 순)"""
+        slice_key = (category_l1, category_l3 or "") if category_l1 else ("", "")
+        slice_id = self.slice_ids.get(slice_key)
+        period = self.period_index(post_year, post_month)
+        tier_value = tier_for(follower_count, self.tiers)
+        tier = self.tiers.index(tier_value)
+        result = {"rising": [], "stable": [], "falling": [], "excluded": 0}
+        if slice_id is None or period is None:
+            return result
+
+        start, end = self.slice_bounds[slice_id], self.slice_bounds[slice_id + 1]
+        ranked = self.ranking[tier, start:end, period]
+        status = self.status[tier, ranked, period]
+        rising = ranked[status == RISING][:limit]
+        falling = ranked[status == FALLING][::-1][:limit]
+        stable = ranked[status == STABLE]
+        stable = stable[np.argsort(-self.share[tier, stable, period], kind="stable")][:limit]
+
+        year, month = divmod(self.first_month + period, 12)
+        result.update({
+            "rising": [self._item(tier, i, period) for i in rising],
+            "stable": [self._item(tier, i, period) for i in stable],
+            "falling": [self._item(tier, i, period) for i in falling],
+            "excluded": int(np.count_nonzero(
+                (status == EXCLUDED) & (self.counts[tier, ranked, period] > 0)
+            )),
+            "post_year": year,
+            "post_month": month + 1,
+            "follower_tier": tier_value,
+        })
+        return result
+
+    def stats(self):
+        return {
+            "dimension": self.dimension,
+            "shape": list(self.counts.shape),
+            "slices": len(self.slices),
+            "build_seconds": round(self.build_seconds, 3),
+            "shared": isinstance(self.counts, np.memmap),
+        }
+
+
+class MoversEngine:
+    """전체 차원 movers 인덱스 묶음"""
+
+    def __init__(self, indexes, version=None):
+        self.indexes = indexes
+        self.version = version
+
+    def movers(self, dimension, **filters):
+        if dimension not in self.indexes:
+            raise ValueError(f"지원하지 않는 차원입니다: {dimension}")
+        return self.indexes[dimension].movers(**filters)
+
+    def snapshot(self):
+        """차원별 스냅샷을 "차원.필드" 키로 합친 (배열 dict, meta dict)"""
+        arrays, meta = {}, {"version": self.version, "dimensions": {}}
+        for dimension, index in self.indexes.items():
+            index_arrays, meta["dimensions"][dimension] = index.snapshot()
+            arrays.update({f"{dimension}.{name}": array for name, array in index_arrays.items()})
+        return arrays, meta
+
+    @classmethod
+    def from_snapshot(cls, arrays, meta):
+        indexes = {
+            dimension: MoversIndex.from_snapshot(
+                {name: arrays[f"{dimension}.{name}"] for name in MoversIndex.SNAPSHOT_ARRAYS}, index_meta
+            )
+            for dimension, index_meta in meta["dimensions"].items()
+        }
+        return cls(indexes, meta["version"])
+
+    def stats(self):
+        return {
+            "version": self.version,
+            "dimensions": [index.stats() for index in self.indexes.values()],
+        }
+
+
+def _load_rows(cursor, dimension, table):
+    cursor.execute(f"""
+        SELECT
+            {follower_tier_case(FOLLOWER_TIERS)} AS follower_tier,
+            post_year,
+            post_month,
+            category_l1,
+            category_l3,
+            {dimension},
+            COUNT(*)
+        FROM {table}
+        WHERE {dimension} IS NOT NULL
+        AND {dimension} != ''
+        AND post_year IS NOT NULL
+        AND post_month IS NOT NULL
+        AND follower_count >= {min(FOLLOWER_TIERS)}
+        GROUP BY 1, 2, 3, 4, 5, 6
+    """)
+    return cursor.fetchall()
+
+
+def _tables_version():
+    return data_version(*set(DIMENSIONS.values()))
+
+
+def build_engine(version=None):
+    indexes = {}
+    with pooled_connection() as conn:
+        with conn.cursor() as cursor:
+            for dimension, table in DIMENSIONS.items():
+                indexes[dimension] = MoversIndex(dimension, _load_rows(cursor, dimension, table))
+    engine = MoversEngine(indexes, version)
+    logger.info("movers engine built: %s", engine.stats())
+    return engine
+
+
+def load_engine(version):
+    """데이터 버전별 엔진 (공유 스냅샷이 있으면 매핑, 없으면 계산해서 공개)"""
+    arrays, meta = shared_data.load_or_build("movers", version, lambda: build_engine(version).snapshot())
+    return MoversEngine.from_snapshot(arrays, meta)
+
+
+_engine = None
+_builds = DetachedBuild("movers")
+
+
+def _rebuild(version):
+    global _engine
+    _engine = load_engine(version)
+    return _engine
+
+
+def get_engine():
+    """현재 데이터 버전의 movers 엔진 (버전이 바뀌면 요청 밖에서 재계산하고 기다림)"""
+    version = _tables_version()
+    engine = _engine
+    if engine is None or engine.version != version:
+        engine = _builds.wait(version, _rebuild, version)
+    return engine
@@ -0,0 +1,298 @@
+"""아이템 타입 집계용 인메모리 OLAP 큐브
+
+instagram_classification_web_date_follow_itemtype을
+(기간, 팔로워 구간, (category_l1, category_l3, item_type) 조합) 3차원 건수 배열로 적재한다.
+
+팔로워 축은 구간별 건수를 뒤에서부터 누적합해 두므로
+`follower_count >= X` 조건(X가 구간 크기의 배수)은 슬라이스 한 번이 된다.
+  - 슬롯 0      : 전체 행 (follower_count 조건 없음)
+  - 슬롯 1 + b : follower_count >= b * FOLLOWER_BUCKET_SIZE
+
+배열과 값 사전은 데이터 버전별 공유 스냅샷(shared_data)으로 저장해 워커 프로세스끼리 메모리를 공유한다.
+
+/api/item-type-keywords, /api/item-type-items는 큐브가 준비되어 있고
+조건을 표현할 수 있으면 SQL 대신 벡터 연산으로 응답한다.
+"""
+import logging
+import threading
+import time
+
+import numpy as np
+
+from config import CUBE_ENABLED, FOLLOWER_BUCKET_MAX, FOLLOWER_BUCKET_SIZE
+from data_version import data_version
+from db import pooled_connection
+from query_builder import ITEMTYPE_TABLE
+import shared_data
+
+logger = logging.getLogger(__name__)
+
+# 큐브에서 답할 수 있는 필터 컬럼
+CUBE_FILTERS = {"category_l1", "category_l3", "post_year", "post_month", "follower_count"}
+
+
+class _Dictionary:
+    """값 ↔ 정수 코드 사전 인코딩"""
+
+    def __init__(self, values=()):
+        self.values = list(values)
+        self.codes = {value: code for code, value in enumerate(self.values)}
+
+    def encode(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class ItemTypeCube:
+    def __init__(self, rows, version=None,
+                 bucket_size=FOLLOWER_BUCKET_SIZE, bucket_max=FOLLOWER_BUCKET_MAX):
+        """rows: (category_l1, post_year, post_month, 팔로워 슬롯, category_l3, item_type, 건수)"""
+        started = time.perf_counter()
+        self.version = version
+        self.bucket_size = bucket_size
+        self.slot_count = bucket_max // bucket_size + 2
+
+        self.category_l1 = _Dictionary()
+        self.category_l3 = _Dictionary()
+        self.item_type = _Dictionary()
+        periods = _Dictionary()
+        combos = _Dictionary()
+
+        period_idx, slot_idx, combo_idx, counts = [], [], [], []
+        self.row_count = 0
+        for l1, year, month, slot, l3, item_type, count in rows:
+            period_idx.append(periods.encode((year, month)))
+            slot_idx.append(slot)
+            combo_idx.append(combos.encode((
+                self.category_l1.encode(l1),
+                self.category_l3.encode(l3),
+                self.item_type.encode(item_type or None),
+            )))
+            counts.append(count)
+            self.row_count += count
+
+        self.period_years = np.array([year if year is not None else -1 for year, _ in periods.values], dtype=np.int32)
+        self.period_months = np.array([month if month is not None else -1 for _, month in periods.values], dtype=np.int32)
+        combo_codes = np.array(combos.values, dtype=np.int32).reshape(-1, 3)
+        self.combo_l1 = combo_codes[:, 0]
+        self.combo_l3 = combo_codes[:, 1]
+        self.combo_item = combo_codes[:, 2]
+        # item_type이 비어있는 조합은 item_type 집계에서 제외
+        self.combo_has_item = np.array(
+            [self.item_type.values[code] is not None for code in self.combo_item], dtype=bool
+        )
+
+        cube = np.zeros((len(periods.values), self.slot_count, len(combos.values)), dtype=np.int32)
+        np.add.at(cube, (np.array(period_idx, dtype=np.intp),
+                         np.array(slot_idx, dtype=np.intp),
+                         np.array(combo_idx, dtype=np.intp)), np.array(counts, dtype=np.int32))
+        # 팔로워 축 역방향 누적합: cube[:, s, :] = 슬롯 s 이상 건수
+        self.counts = np.ascontiguousarray(np.flip(np.cumsum(np.flip(cube, axis=1), axis=1), axis=1))
+        self.build_seconds = time.perf_counter() - started
+
+    # 공유 스냅샷으로 저장하는 배열 / 메타 필드
+    SNAPSHOT_ARRAYS = ("counts", "period_years", "period_months", "combo_l1", "combo_l3", "combo_item", "combo_has_item")
+    SNAPSHOT_DICTIONARIES = ("category_l1", "category_l3", "item_type")
+
+    def snapshot(self):
+        """(배열 dict, meta dict) — shared_data 스냅샷 형식"""
+        meta = {
+            "version": self.version,
+            "bucket_size": self.bucket_size,
+            "slot_count": self.slot_count,
+            "row_count": self.row_count,
+            "build_seconds": self.build_seconds,
+        }
+        meta.update({name: getattr(self, name).values for name in self.SNAPSHOT_DICTIONARIES})
+        return {name: getattr(self, name) for name in self.SNAPSHOT_ARRAYS}, meta
+
+    @classmethod
+    def from_snapshot(cls, arrays, meta):
+        """스냅샷(읽기 전용 memmap 가능)에서 큐브 복원 — 배열은 복사하지 않는다"""
+        cube = cls.__new__(cls)
+        for name in ("version", "bucket_size", "slot_count", "row_count", "build_seconds"):
+            setattr(cube, name, meta[name])
+        for name in cls.SNAPSHOT_DICTIONARIES:
+            setattr(cube, name, _Dictionary(meta[name]))
+        for name in cls.SNAPSHOT_ARRAYS:
+            setattr(cube, name, arrays[name])
+        return cube
+
+    @property
+    def shared(self):
+        return isinstance(self.counts, np.memmap)
+
+    @property
+    def nbytes(self):
+        return int(self.counts.nbytes + self.period_years.nbytes + self.period_months.nbytes
+                   + self.combo_l1.nbytes * 3 + self.combo_has_item.nbytes)
+
+    def follower_slot(self, follower_count):
+        """follower_count >= X 조건의 슬롯 (표현할 수 없으면 None)"""
+        if not follower_count:
+            return 0
+        if follower_count < 0 or follower_count % self.bucket_size:
+            return None
+        bucket = follower_count // self.bucket_size
+        if bucket > self.slot_count - 2:
+            return None
+        return 1 + bucket
+
+    def can_answer(self, filters):
+        if set(filters) - CUBE_FILTERS:
+            return False
+        return self.follower_slot(filters.get("follower_count")) is not None
+
+    def _combo_totals(self, filters):
+        period_mask = np.ones(len(self.period_years), dtype=bool)
+        if filters.get("post_year"):
+            period_mask &= self.period_years == filters["post_year"]
+        if filters.get("post_month"):
+            period_mask &= self.period_months == filters["post_month"]
+        slot = self.follower_slot(filters.get("follower_count"))
+        totals = self.counts[period_mask, slot, :].sum(axis=0, dtype=np.int64)
+
+        for column, dictionary, codes in (
+            ("category_l1", self.category_l1, self.combo_l1),
+            ("category_l3", self.category_l3, self.combo_l3),
+        ):
+            value = filters.get(column)
+            if value:
+                code = dictionary.codes.get(value)
+                if code is None:
+                    return np.zeros_like(totals)
+                totals = np.where(codes == code, totals, 0)
+        return totals
+
+    def counts_by(self, column, filters):
+        """column 값별 건수 배열 (index = 사전 코드)"""
+        totals = self._combo_totals(filters)
+        if column == "category_l3":
+            return np.bincount(self.combo_l3, weights=totals, minlength=len(self.category_l3.values)), self.category_l3
+        if column == "item_type":
+            totals = np.where(self.combo_has_item, totals, 0)
+            return np.bincount(self.combo_item, weights=totals, minlength=len(self.item_type.values)), self.item_type
+        raise ValueError(f"큐브에서 지원하지 않는 집계 컬럼입니다: {column}")
+
+    def top_counts(self, column, filters, limit=None):
+        """[(값, 건수)] 건수 내림차순 (0건 제외)"""
+        values, dictionary = self.counts_by(column, filters)
+        order = np.argsort(-values, kind="stable")
+        nonzero = order[values[order] > 0]
+        if limit is not None:
+            nonzero = nonzero[:limit]
+        return [(dictionary.values[code], int(values[code])) for code in nonzero]
+
+    def stats(self):
+        return {
+            "version": self.version,
+            "shape": list(self.counts.shape),
+            "nbytes": self.nbytes,
+            "rows": self.row_count,
+            "build_seconds": round(self.build_seconds, 3),
+            "periods": len(self.period_years),
+            "combos": len(self.combo_l1),
+            "bucket_size": self.bucket_size,
+            "shared": self.shared,
+        }
+
+
+_cube = None
+_cube_lock = threading.Lock()
+_building = False
+_last_error = None
+
+
+def _build_cube(version):
+    started = time.perf_counter()
+    bucket_max = FOLLOWER_BUCKET_MAX // FOLLOWER_BUCKET_SIZE
+    with pooled_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(f"""
+                SELECT
+                    category_l1,
+                    post_year,
+                    post_month,
+                    CASE
+                        WHEN follower_count IS NULL OR follower_count < 0 THEN 0
+                        ELSE 1 + LEAST(FLOOR(follower_count::numeric / {FOLLOWER_BUCKET_SIZE})::int, {bucket_max})
+                    END AS follower_slot,
+                    category_l3,
+                    NULLIF(item_type, '') AS item_type,
+                    COUNT(*)
+                FROM {ITEMTYPE_TABLE}
+                WHERE category_l3 IS NOT NULL
+                AND category_l3 != ''
+                GROUP BY 1, 2, 3, 4, 5, 6
+            """)
+            rows = cursor.fetchall()
+    cube = ItemTypeCube(rows, version)
+    cube.build_seconds = time.perf_counter() - started
+    logger.info("item type cube built: %s", cube.stats())
+    return cube
+
+
+def _load_cube(version):
+    """데이터 버전별 큐브 (공유 스냅샷이 있으면 매핑, 없으면 만들어서 공개)"""
+    arrays, meta = shared_data.load_or_build(
+        "itemtype-cube", version, lambda: _build_cube(version).snapshot()
+    )
+    return ItemTypeCube.from_snapshot(arrays, meta)
+
+
+def _rebuild(version):
+    global _cube, _building, _last_error
+    try:
+        _cube = _load_cube(version)
+        _last_error = None
+    except Exception as exc:
+        _last_error = str(exc)
+        logger.exception("item type cube build failed")
+    finally:
+        _building = False
+
+
+def get_cube():
+    """현재 데이터 버전의 큐브
+
+    없거나 오래되었으면 백그라운드에서 재생성하고, 그동안에는 None을 돌려줘 SQL로 답하게 한다.
+    이전 버전 큐브로 답하면 응답이 새 버전으로 표시되어 캐시되므로 쓰지 않는다.
+    """
+    global _building
+    if not CUBE_ENABLED:
+        return None
+    version = data_version(ITEMTYPE_TABLE)
+    cube = _cube
+    if cube is not None and cube.version == version:
+        return cube
+    with _cube_lock:
+        if not _building and (_cube is None or _cube.version != version):
+            _building = True
+            threading.Thread(target=_rebuild, args=(version,), name="itemtype-cube", daemon=True).start()
+    return None
+
+
+def preload():
+    """현재 데이터 버전의 공유 스냅샷을 만들어 둔다 (serve.py가 워커 시작 전에 호출)"""
+    if CUBE_ENABLED:
+        _load_cube(data_version(ITEMTYPE_TABLE))
+
+
+def warm_cube():
+    """현재 데이터 버전의 큐브를 미리 만들어 둔다 (스케줄러 itemtype-cube 작업, 프로세스마다 실행)"""
+    cube = get_cube()
+    return cube.stats() if cube is not None else None
+
+
+def cube_status():
+    cube = _cube
+    return {
+        "enabled": CUBE_ENABLED,
+        "ready": cube is not None,
+        "building": _building,
+        "error": _last_error,
+        "stats": cube.stats() if cube is not None else None,
+    }
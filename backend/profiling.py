@@ -0,0 +1,381 @@
+"""요청별 샘플링 프로파일러 (speedscope 출력)
+
+X-Profile-Token 헤더가 PROFILE_TOKEN과 같거나 PROFILE_SAMPLE_RATE 비율로 뽑힌 /api 요청만 프로파일링한다.
+  - 핸들러를 실행하는 스레드(동기 핸들러는 스레드풀, 비동기 핸들러는 이벤트 루프)를 요청에 등록하고,
+    샘플러 스레드가 PROFILE_INTERVAL_MS마다 sys._current_frames()로 그 스레드의 스택을 읽는다.
+    스택은 핸들러 래퍼까지만 잘라 쓰므로 이벤트 루프의 다른 요청 스택은 섞이지 않는다.
+  - 요청이 끝나면 PROFILE_DIR에 <id>.speedscope.json(https://www.speedscope.app 에서 열기)과
+    경로/파라미터/상태/구간별 시간(DB 대기, 행 변환, JSON 인코딩, 그 밖의 파이썬 처리)을 담은 <id>.meta.json을 쓴다.
+토큰이 비어 있고 비율이 0이면 install()이 아무것도 설치하지 않으므로 비활성 시 비용이 없다.
+"""
+import asyncio
+import datetime
+import functools
+import glob
+import hmac
+import linecache
+import logging
+import os
+import random
+import re
+import secrets
+import sys
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from urllib.parse import parse_qsl
+
+import orjson
+from fastapi.routing import APIRoute
+from starlette.concurrency import run_in_threadpool
+
+from config import PROFILE_DIR, PROFILE_INTERVAL_MS, PROFILE_MAX_FILES, PROFILE_SAMPLE_RATE, PROFILE_TOKEN
+
+logger = logging.getLogger(__name__)
+
+TOKEN_HEADER = b"x-profile-token"
+SPEEDSCOPE_SCHEMA = "https://www.speedscope.app/file-format-schema.json"
+# 프로파일 조회 API 자체는 프로파일링하지 않는다
+EXCLUDED_PREFIXES = ("/api/admin/profiles",)
+PROFILE_ID = re.compile(r"^[\w.-]+$")
+# 스택에서 가장 안쪽에 있는 함수로 구간 분류 (행 변환 / JSON 인코딩)
+CATEGORY_FUNCTIONS = {
+    "records": "rows",
+    "project": "rows",
+    "columnar": "rows",
+    "decode_text": "rows",
+    "dumps": "encode",
+    "render": "encode",
+    "jsonable_encoder": "encode",
+    "serialize_response": "encode",
+}
+CATEGORIES = ("db", "rows", "encode", "python")
+# 가장 안쪽 프레임의 현재 줄이 이 호출이면 DB 대기로 분류 (C 확장 호출은 프레임이 없으므로)
+DB_CALL = re.compile(r"\.(execute|executemany|fetchone|fetchmany|fetchall|copy_expert|getconn)\(")
+
+_active = ContextVar("profile_session", default=None)
+_sessions = set()
+_lock = threading.Lock()
+_sampler = None
+# 스택을 자르는 기준이 되는 핸들러 래퍼 코드 객체
+_boundaries = set()
+_enabled = False
+
+
+def enabled():
+    return _enabled
+
+
+class ProfileSession:
+    """프로파일링 중인 요청 하나의 등록 스레드와 샘플"""
+
+    def __init__(self, scope, trigger):
+        self.path = scope["path"]
+        self.method = scope["method"]
+        self.params = dict(parse_qsl(scope.get("query_string", b"").decode("latin-1")))
+        self.trigger = trigger
+        now = time.time()
+        self.id = "{}{:03d}-{}-{}".format(
+            time.strftime("%Y%m%d-%H%M%S", time.localtime(now)),
+            int(now * 1000) % 1000,
+            self.path.strip("/").replace("/", "-") or "root",
+            secrets.token_hex(3),
+        )
+        self.created_at = datetime.datetime.now().isoformat(timespec="seconds")
+        self.status = None
+        self.started = time.perf_counter()
+        self.handler_started = None
+        self.handler_finished = None
+        self.response_started = None
+        self.finished = None
+        self.threads = Counter()
+        self.thread_names = {}
+        self.samples = []
+        self._lock = threading.Lock()
+
+    def enter(self):
+        ident = threading.get_ident()
+        with self._lock:
+            self.threads[ident] += 1
+            self.thread_names[ident] = threading.current_thread().name
+            if self.handler_started is None:
+                self.handler_started = time.perf_counter()
+
+    def exit(self):
+        ident = threading.get_ident()
+        with self._lock:
+            self.threads[ident] -= 1
+            if self.threads[ident] <= 0:
+                del self.threads[ident]
+            self.handler_finished = time.perf_counter()
+
+    def bound_threads(self):
+        with self._lock:
+            return list(self.threads)
+
+    def add_sample(self, ident, stack, weight):
+        with self._lock:
+            self.samples.append((ident, stack, weight))
+
+    def breakdown(self):
+        """샘플 분류별 시간 (ms)"""
+        totals = Counter()
+        for _, stack, weight in self.samples:
+            totals[_category(stack)] += weight
+        return {f"{name}_ms": round(totals[name], 1) for name in CATEGORIES}
+
+    def metadata(self):
+        def span(start, end):
+            return round((end - start) * 1000, 1) if start is not None and end is not None else None
+
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "params": self.params,
+            "status": self.status,
+            "trigger": self.trigger,
+            "created_at": self.created_at,
+            "wall_ms": span(self.started, self.finished),
+            "queued_ms": span(self.started, self.handler_started),
+            "handler_ms": span(self.handler_started, self.handler_finished),
+            "first_byte_ms": span(self.started, self.response_started),
+            "interval_ms": PROFILE_INTERVAL_MS,
+            "samples": len(self.samples),
+            "sampled_ms": round(sum(weight for _, _, weight in self.samples), 1),
+            **self.breakdown(),
+        }
+
+    def speedscope(self):
+        """speedscope 'sampled' 형식 (스레드별 프로파일 하나)"""
+        frames = []
+        frame_index = {}
+        profiles = {}
+        for ident, stack, weight in self.samples:
+            indexes = []
+            for code, _ in reversed(stack):
+                index = frame_index.get(code)
+                if index is None:
+                    index = frame_index[code] = len(frames)
+                    frames.append({"name": code.co_qualname, "file": code.co_filename, "line": code.co_firstlineno})
+                indexes.append(index)
+            profile = profiles.setdefault(ident, {"samples": [], "weights": []})
+            profile["samples"].append(indexes)
+            profile["weights"].append(round(weight, 3))
+        return {
+            "$schema": SPEEDSCOPE_SCHEMA,
+            "name": f"{self.method} {self.path}",
+            "exporter": "trendai-profiler",
+            "activeProfileIndex": 0,
+            "shared": {"frames": frames},
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": self.thread_names.get(ident, str(ident)),
+                    "unit": "milliseconds",
+                    "startValue": 0,
+                    "endValue": round(sum(profile["weights"]), 3),
+                    "samples": profile["samples"],
+                    "weights": profile["weights"],
+                }
+                for ident, profile in profiles.items()
+            ],
+        }
+
+
+def _category(stack):
+    for code, _ in stack:
+        category = CATEGORY_FUNCTIONS.get(code.co_name)
+        if category is not None:
+            return category
+    code, lineno = stack[0]
+    if "psycopg2" in code.co_filename or DB_CALL.search(linecache.getline(code.co_filename, lineno)):
+        return "db"
+    return "python"
+
+
+def _stack(frame):
+    """가장 안쪽부터 핸들러 래퍼 직전까지의 (코드, 줄) 목록 (래퍼가 없으면 None)"""
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        if code in _boundaries:
+            return tuple(stack) if stack else None
+        stack.append((code, frame.f_lineno))
+        frame = frame.f_back
+    return None
+
+
+def _sample_loop():
+    global _sampler
+    interval = PROFILE_INTERVAL_MS / 1000
+    last = time.perf_counter()
+    while True:
+        with _lock:
+            if not _sessions:
+                _sampler = None
+                return
+            sessions = list(_sessions)
+        time.sleep(interval)
+        now = time.perf_counter()
+        weight, last = (now - last) * 1000, now
+        frames = sys._current_frames()
+        for session in sessions:
+            for ident in session.bound_threads():
+                frame = frames.get(ident)
+                stack = _stack(frame) if frame is not None else None
+                if stack:
+                    session.add_sample(ident, stack, weight)
+        del frames
+
+
+def _register(session):
+    global _sampler
+    with _lock:
+        _sessions.add(session)
+        if _sampler is None:
+            _sampler = threading.Thread(target=_sample_loop, name="request-profiler", daemon=True)
+            _sampler.start()
+
+
+def _unregister(session):
+    with _lock:
+        _sessions.discard(session)
+
+
+def _trigger(scope):
+    """프로파일링 사유 (token | sampled, 대상이 아니면 None)"""
+    path = scope["path"]
+    if not path.startswith("/api/") or path.startswith(EXCLUDED_PREFIXES):
+        return None
+    if PROFILE_TOKEN:
+        for name, value in scope.get("headers", ()):
+            if name == TOKEN_HEADER:
+                if hmac.compare_digest(value, PROFILE_TOKEN.encode()):
+                    return "token"
+                break
+    if PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE:
+        return "sampled"
+    return None
+
+
+def _bind(func):
+    """핸들러 실행 스레드를 현재 요청의 프로파일에 등록하는 래퍼"""
+    if asyncio.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def profiled(*args, **kwargs):
+            session = _active.get()
+            if session is None:
+                return await func(*args, **kwargs)
+            session.enter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                session.exit()
+    else:
+        @functools.wraps(func)
+        def profiled(*args, **kwargs):
+            session = _active.get()
+            if session is None:
+                return func(*args, **kwargs)
+            session.enter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                session.exit()
+    _boundaries.add(profiled.__code__)
+    return profiled
+
+
+def save(session):
+    """프로파일/메타데이터 파일 저장 후 오래된 파일 정리"""
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    base = os.path.join(PROFILE_DIR, session.id)
+    with open(f"{base}.speedscope.json", "wb") as handle:
+        handle.write(orjson.dumps(session.speedscope()))
+    with open(f"{base}.meta.json", "wb") as handle:
+        handle.write(orjson.dumps(session.metadata()))
+
+    if PROFILE_MAX_FILES <= 0:
+        return
+    # id가 시각으로 시작하므로 이름순 = 생성순
+    for path in sorted(glob.glob(os.path.join(PROFILE_DIR, "*.meta.json")))[:-PROFILE_MAX_FILES]:
+        stem = path[:-len(".meta.json")]
+        for suffix in (".meta.json", ".speedscope.json"):
+            try:
+                os.remove(stem + suffix)
+            except FileNotFoundError:
+                pass
+
+
+def list_profiles(limit=50):
+    """저장된 프로파일 메타데이터 (최신순)"""
+    paths = sorted(glob.glob(os.path.join(PROFILE_DIR, "*.meta.json")), reverse=True)[:limit]
+    profiles = []
+    for path in paths:
+        try:
+            with open(path, "rb") as handle:
+                profiles.append(orjson.loads(handle.read()))
+        except (OSError, orjson.JSONDecodeError):
+            continue
+    return profiles
+
+
+def profile_path(profile_id):
+    """speedscope 파일 경로 (없거나 잘못된 id면 None)"""
+    if not PROFILE_ID.match(profile_id):
+        return None
+    path = os.path.join(PROFILE_DIR, f"{profile_id}.speedscope.json")
+    return path if os.path.isfile(path) else None
+
+
+class ProfilingMiddleware:
+    """선택된 요청을 프로파일링하고 X-Profile-Id 헤더로 id를 알려준다 (ASGI 미들웨어, CORS 바로 안쪽)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        trigger = _trigger(scope) if scope["type"] == "http" else None
+        if trigger is None:
+            await self.app(scope, receive, send)
+            return
+
+        session = ProfileSession(scope, trigger)
+
+        async def send_with_profile_id(message):
+            if message["type"] == "http.response.start":
+                session.status = message["status"]
+                session.response_started = time.perf_counter()
+                message = {
+                    **message,
+                    "headers": list(message.get("headers", [])) + [(b"x-profile-id", session.id.encode())],
+                }
+            await send(message)
+
+        token = _active.set(session)
+        _register(session)
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            session.finished = time.perf_counter()
+            _unregister(session)
+            _active.reset(token)
+            try:
+                await run_in_threadpool(save, session)
+                logger.info("profile captured: %s (%s)", session.id, trigger)
+            except Exception as exc:
+                logger.warning("profile save failed for %s: %s", session.path, exc)
+
+
+def install(app):
+    """프로파일링이 설정된 경우에만 핸들러 래퍼 + 미들웨어 설치 (모든 라우트 등록 후 호출)"""
+    global _enabled
+    if not PROFILE_TOKEN and PROFILE_SAMPLE_RATE <= 0:
+        return
+    for route in app.routes:
+        if isinstance(route, APIRoute):
+            route.dependant.call = _bind(route.dependant.call)
+    app.add_middleware(ProfilingMiddleware)
+    _enabled = True
@@ -0,0 +1,276 @@
+"""필터 조건 → 정규화된 SQL 형태 변환 및 prepared statement 실행
+
+핸들러마다 WHERE 절을 f-string으로 조립하던 로직을 한 곳으로 모은 모듈.
+같은 필터 조합(형태)은 항상 같은 SQL 문자열이 되므로, 형태별로 한 번만
+컴파일하고 커넥션별로 한 번만 PREPARE 한다.
+"""
+import base64
+import hashlib
+import json
+from dataclasses import dataclass
+from functools import lru_cache
+
+ITEMTYPE_TABLE = "ai_image_dm.instagram_classification_web_date_follow_itemtype"
+FOLLOW_TABLE = "ai_image_dm.instagram_classification_web_date_follow"
+
+# 페이지 크기 상한
+MAX_PAGE_SIZE = 100
+
+# 이미지 조회 공통 조건/컬럼
+IMAGE_CONDITIONS = ("s3_key IS NOT NULL", "s3_key != ''", "follower_count IS NOT NULL")
+# 이미지 갤러리 정렬 및 키셋 (follower_count DESC 인덱스 순서 + post_id, s3_key 동률 정리)
+# post_id 하나에 이미지가 여러 장이라 s3_key까지 포함해야 커서가 행 하나를 가리킨다.
+IMAGE_ORDER = "follower_count DESC, post_id DESC, s3_key DESC"
+IMAGE_KEYSET = ("follower_count", "post_id", "s3_key")
+FOLLOW_IMAGE_COLUMNS = "s3_key, post_id, category_l1, category_l3, follower_count, post_date"
+ITEMTYPE_IMAGE_COLUMNS = "s3_key, post_id, category_l3, item_type, follower_count"
+
+# 필터 컬럼별 비교 연산자 (정의 순서가 곧 WHERE 절의 정규화 순서)
+FILTER_OPERATORS = {
+    "post_id": "=",
+    "color": "=",
+    "pattern": "=",
+    "detail_1": "=",
+    "item_type": "=",
+    "category_l1": "=",
+    "category_l3": "=",
+    "post_year": "=",
+    "post_month": "=",
+    "follower_count": ">=",
+}
+_FILTER_ORDER = {column: index for index, column in enumerate(FILTER_OPERATORS)}
+
+
+@dataclass(frozen=True)
+class QueryShape:
+    """파라미터 값을 제외한 쿼리의 형태 (캐시 키)"""
+    table: str
+    columns: str
+    filters: tuple = ()
+    conditions: tuple = ()
+    subquery: tuple = None  # (컬럼, QueryShape)
+    keyset: tuple = ()      # 키셋 페이지네이션 컬럼
+    group_by: str = None
+    order_by: str = None
+    limit: bool = False
+    distinct: bool = False
+
+
+@dataclass(frozen=True)
+class BoundQuery:
+    shape: QueryShape
+    params: tuple
+
+
+@dataclass(frozen=True)
+class CompiledQuery:
+    name: str
+    sql: str        # $1, $2 ... 형식 (PREPARE 용)
+    text_sql: str   # %s 형식 (일반 execute 용)
+    param_count: int
+
+
+def _filter_sort_key(key):
+    alias, _, column = key.rpartition(".")
+    return (alias, _FILTER_ORDER[column])
+
+
+def normalize_filters(filters, required=()):
+    """값이 비어있는 필터를 제외하고 정규화 순서로 정렬
+
+    선택 필터는 기존 핸들러의 `if 값:` 조건과 같이 None/""/0이면 제외한다.
+    required에 있는 필수 필터는 값이 비어 있어도 그대로 비교한다 (color="" → 0건).
+    """
+    present = []
+    for key, value in (filters or {}).items():
+        column = key.rpartition(".")[2]
+        if column not in FILTER_OPERATORS:
+            raise ValueError(f"지원하지 않는 필터 컬럼입니다: {key}")
+        if key not in required and (value is None or value == "" or value == 0):
+            continue
+        present.append((key, value))
+    present.sort(key=lambda item: _filter_sort_key(item[0]))
+    return tuple(key for key, _ in present), tuple(value for _, value in present)
+
+
+def select(table, columns, filters=None, conditions=(), subquery=None,
+           group_by=None, order_by=None, limit=None, distinct=False, keyset=None, required=()):
+    """필터 dict로부터 BoundQuery 생성
+
+    required는 값이 비어 있어도 조건에 포함할 필수 필터 키 (normalize_filters 참고).
+    subquery는 (컬럼, BoundQuery) 형태로 `컬럼 IN (서브쿼리)` 조건이 된다.
+    keyset은 ((컬럼, ...), (값, ...)) 형태로 `(컬럼, ...) < (값, ...)` 조건이 된다.
+    """
+    filter_keys, params = normalize_filters(filters, required)
+    keyset_columns = ()
+    if keyset is not None:
+        keyset_columns, keyset_values = keyset
+        keyset_columns = tuple(keyset_columns)
+        params += tuple(keyset_values)
+    sub_shape = None
+    if subquery is not None:
+        sub_column, sub_query = subquery
+        sub_shape = (sub_column, sub_query.shape)
+        params += sub_query.params
+    if limit is not None:
+        params += (limit,)
+    shape = QueryShape(
+        table=table,
+        columns=columns,
+        filters=filter_keys,
+        conditions=tuple(conditions),
+        subquery=sub_shape,
+        keyset=keyset_columns,
+        group_by=group_by,
+        order_by=order_by,
+        limit=limit is not None,
+        distinct=distinct,
+    )
+    return BoundQuery(shape, params)
+
+
+def with_limit(query, limit):
+    """LIMIT 값만 바꾼 BoundQuery (LIMIT은 항상 마지막 파라미터)"""
+    if not query.shape.limit:
+        raise ValueError("LIMIT이 없는 쿼리입니다.")
+    return BoundQuery(query.shape, query.params[:-1] + (limit,))
+
+
+def _render(shape, start):
+    """QueryShape → ($n 형식 SQL, 다음 파라미터 번호)"""
+    index = start
+    where = []
+    for key in shape.filters:
+        operator = FILTER_OPERATORS[key.rpartition(".")[2]]
+        where.append(f"{key} {operator} ${index}")
+        index += 1
+    where.extend(shape.conditions)
+    if shape.keyset:
+        placeholders = ", ".join(f"${index + offset}" for offset in range(len(shape.keyset)))
+        where.append(f"({', '.join(shape.keyset)}) < ({placeholders})")
+        index += len(shape.keyset)
+    if shape.subquery is not None:
+        sub_column, sub_shape = shape.subquery
+        sub_sql, index = _render(sub_shape, index)
+        where.append(f"{sub_column} IN ({sub_sql})")
+
+    sql = f"SELECT {'DISTINCT ' if shape.distinct else ''}{shape.columns} FROM {shape.table}"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    if shape.group_by:
+        sql += f" GROUP BY {shape.group_by}"
+    if shape.order_by:
+        sql += f" ORDER BY {shape.order_by}"
+    if shape.limit:
+        sql += f" LIMIT ${index}"
+        index += 1
+    return sql, index
+
+
+@lru_cache(maxsize=512)
+def compile_shape(shape):
+    sql, next_index = _render(shape, 1)
+    param_count = next_index - 1
+    text_sql = sql
+    # 큰 번호부터 치환해야 $1이 $10의 앞부분을 바꾸지 않는다
+    for number in range(param_count, 0, -1):
+        text_sql = text_sql.replace(f"${number}", "%s")
+    name = "q_" + hashlib.sha1(sql.encode("utf-8")).hexdigest()[:16]
+    return CompiledQuery(name=name, sql=sql, text_sql=text_sql, param_count=param_count)
+
+
+def execute(cursor, query):
+    """BoundQuery 실행
+
+    풀 커넥션(PreparedConnection)이면 형태별로 한 번만 PREPARE 하고
+    이후에는 EXECUTE만 보내 파싱/플래닝 비용을 커넥션당 한 번으로 줄인다.
+    """
+    compiled = compile_shape(query.shape)
+    prepared = getattr(cursor.connection, "prepared_statements", None)
+    if prepared is None:
+        cursor.execute(compiled.text_sql, query.params)
+        return
+
+    if compiled.name not in prepared:
+        cursor.execute(f"PREPARE {compiled.name} AS {compiled.sql}")
+        prepared.add(compiled.name)
+
+    if compiled.param_count:
+        placeholders = ", ".join(["%s"] * compiled.param_count)
+        cursor.execute(f"EXECUTE {compiled.name} ({placeholders})", query.params)
+    else:
+        cursor.execute(f"EXECUTE {compiled.name}")
+
+
+def fetch_all(cursor, query):
+    execute(cursor, query)
+    return cursor.fetchall()
+
+
+def follower_tier_case(tiers, column="follower_count"):
+    """follower_count → 팔로워 구간 index CASE 식 (하한 이상인 가장 높은 구간, 최저 하한 미만은 NULL)"""
+    cases = " ".join(
+        f"WHEN {column} >= {int(tier)} THEN {index}"
+        for index, tier in sorted(enumerate(tiers), key=lambda pair: -pair[1])
+    )
+    return f"CASE {cases} END"
+
+
+def tier_for(follower_count, tiers):
+    """follower_count 이상 조건에 가장 가까운 (작거나 같은) 팔로워 구간 하한"""
+    eligible = [tier for tier in tiers if tier <= (follower_count or 0)]
+    return max(eligible) if eligible else min(tiers)
+
+
+def encode_cursor(*values):
+    """키셋 값 → 불투명한 페이지 커서 문자열"""
+    raw = json.dumps(values, ensure_ascii=False, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor, size):
+    """페이지 커서 → 키셋 값 튜플"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except ValueError:
+        raise ValueError("잘못된 페이지 커서입니다.") from None
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("잘못된 페이지 커서입니다.")
+    return tuple(values)
+
+
+def previous_month(post_year, post_month):
+    """전월 (연도, 월) 계산"""
+    if post_month > 1:
+        return post_year, post_month - 1
+    return post_year - 1, 12
+
+
+def image_page_options(cursor, limit):
+    """이미지 갤러리 페이지 조건 (키셋 + 상한을 적용한 페이지 크기)"""
+    keyset = (IMAGE_KEYSET, decode_cursor(cursor, len(IMAGE_KEYSET))) if cursor else None
+    return {
+        "order_by": IMAGE_ORDER,
+        "keyset": keyset,
+        "limit": max(1, min(limit, MAX_PAGE_SIZE)),
+    }
+
+
+def attribute_images_query(column, value, category_l1, category_l3,
+                           post_year, post_month, follower_count, limit, cursor=None):
+    """컬러/패턴/디테일 이미지 조회 쿼리"""
+    return select(
+        FOLLOW_TABLE,
+        FOLLOW_IMAGE_COLUMNS,
+        {
+            column: value,
+            "category_l1": category_l1,
+            "category_l3": category_l3,
+            "post_year": post_year,
+            "post_month": post_month,
+            "follower_count": follower_count,
+        },
+        conditions=IMAGE_CONDITIONS,
+        required=(column,),
+        **image_page_options(cursor, limit),
+    )
@@ -0,0 +1,385 @@
+"""백그라운드 사전 계산 작업 스케줄러
+
+등록한 작업을 주기(interval) 또는 cron 일정으로 실행한다.
+  - cluster 작업: Redis 리스 락(SET NX PX, 실행 중 주기적으로 연장)을 잡은 프로세스 하나만 실행한다.
+    다음 실행 시각과 마지막 실행 결과를 Redis 해시에 공유하므로, 블루/그린 컨테이너나
+    여러 워커가 떠 있어도 작업은 클러스터에서 한 번만 돈다. Redis에 연결할 수 없으면 건너뛴다.
+  - local 작업: 프로세스마다 실행한다 (인메모리 큐브 미리 만들기 등).
+작업마다 제한 시간(넘으면 timeout으로 기록하고, 작업 스레드가 실제로 끝날 때까지 락은 계속 연장),
+다음 실행 시각 무작위 지연(jitter), 연속 실패 시 지수 백오프를 적용한다. 마지막 실행/소요 시간/실패 상태는 status()로 노출한다.
+"""
+import datetime
+import logging
+import os
+import random
+import secrets
+import socket
+import threading
+import time
+
+import orjson
+import redis
+
+from cache import redis_client
+from config import (
+    SCHEDULER_BACKOFF_BASE,
+    SCHEDULER_BACKOFF_MAX,
+    SCHEDULER_CRON,
+    SCHEDULER_ENABLED,
+    SCHEDULER_JITTER,
+    SCHEDULER_JOB_TIMEOUT,
+    SCHEDULER_LEASE_TTL,
+)
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "trendai:scheduler"
+OWNER = f"{socket.gethostname()}:{os.getpid()}"
+# 실행할 작업 확인 주기 (초)
+TICK = 1.0
+# 락을 다른 프로세스가 잡고 있거나 Redis 오류일 때 다시 확인할 때까지 (초)
+RETRY_DELAY = 5.0
+MAX_RESULT_LENGTH = 1000
+
+_release_lease = redis_client.register_script(
+    "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) end return 0"
+)
+_extend_lease = redis_client.register_script(
+    "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('pexpire', KEYS[1], ARGV[2]) end return 0"
+)
+
+
+def _parse_field(text, low, high):
+    values = set()
+    for part in text.split(","):
+        expression, _, step = part.partition("/")
+        step = int(step) if step else 1
+        if expression == "*":
+            start, end = low, high
+        elif "-" in expression:
+            start, end = (int(value) for value in expression.split("-", 1))
+        else:
+            start = int(expression)
+            end = high if step > 1 else start
+        if step < 1 or start < low or end > high or start > end:
+            raise ValueError(f"cron 필드 값이 범위({low}-{high})를 벗어났습니다: {text}")
+        values.update(range(start, end + 1, step))
+    return frozenset(values)
+
+
+class IntervalSchedule:
+    """이전 실행이 끝난 뒤 일정 시간마다"""
+
+    def __init__(self, seconds):
+        if seconds <= 0:
+            raise ValueError("실행 주기는 0보다 커야 합니다.")
+        self.seconds = seconds
+
+    def next_after(self, timestamp):
+        return timestamp + self.seconds
+
+    def __str__(self):
+        return f"every {self.seconds:g}s"
+
+
+class CronSchedule:
+    """5필드 cron 일정 (분 시 일 월 요일, 서버 로컬 시각, 요일 0과 7은 일요일)
+
+    일과 요일이 모두 지정되면 둘 중 하나만 맞아도 실행한다 (cron과 동일).
+    """
+
+    def __init__(self, expression):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"cron 일정은 5개 필드여야 합니다: {expression}")
+        self.expression = expression
+        self.minutes = _parse_field(fields[0], 0, 59)
+        self.hours = _parse_field(fields[1], 0, 23)
+        self.days = _parse_field(fields[2], 1, 31)
+        self.months = _parse_field(fields[3], 1, 12)
+        self.weekdays = frozenset(day % 7 for day in _parse_field(fields[4], 0, 7))
+        self.day_restricted = fields[2] != "*"
+        self.weekday_restricted = fields[4] != "*"
+
+    def _day_matches(self, moment):
+        day = moment.day in self.days
+        weekday = moment.isoweekday() % 7 in self.weekdays
+        if self.day_restricted and self.weekday_restricted:
+            return day or weekday
+        return day and weekday
+
+    def next_after(self, timestamp):
+        moment = datetime.datetime.fromtimestamp(timestamp).replace(second=0, microsecond=0)
+        moment += datetime.timedelta(minutes=1)
+        limit = moment + datetime.timedelta(days=4 * 366)
+        while moment < limit:
+            if moment.month not in self.months:
+                moment = (moment.replace(day=1, hour=0, minute=0) + datetime.timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(moment):
+                moment = moment.replace(hour=0, minute=0) + datetime.timedelta(days=1)
+            elif moment.hour not in self.hours:
+                moment = moment.replace(minute=0) + datetime.timedelta(hours=1)
+            elif moment.minute not in self.minutes:
+                moment += datetime.timedelta(minutes=1)
+            else:
+                return moment.timestamp()
+        raise ValueError(f"cron 일정에 맞는 시각이 없습니다: {self.expression}")
+
+    def __str__(self):
+        return f"cron {self.expression}"
+
+
+class Job:
+    """등록된 작업 하나 (일정, 제한 시간, 이 프로세스의 실행 상태)"""
+
+    def __init__(self, name, func, schedule, cluster, timeout, jitter):
+        self.name = name
+        self.func = func
+        self.schedule = schedule
+        self.cluster = cluster
+        self.timeout = timeout
+        self.jitter = jitter
+        self.running = False
+        # 이 시각 전에는 공유 상태를 다시 읽지 않는다
+        self.check_at = 0.0
+        self.state_error = None
+        self._local_state = {}
+
+    @property
+    def state_key(self):
+        return f"{KEY_PREFIX}:job:{self.name}"
+
+    @property
+    def lock_key(self):
+        return f"{KEY_PREFIX}:lock:{self.name}"
+
+    def read_state(self):
+        if not self.cluster:
+            return dict(self._local_state)
+        return redis_client.hgetall(self.state_key)
+
+    def write_state(self, **values):
+        values = {key: "" if value is None else value for key, value in values.items()}
+        if not self.cluster:
+            self._local_state.update(values)
+            return
+        redis_client.hset(self.state_key, mapping=values)
+
+    def next_run_at(self, finished, failures):
+        """다음 실행 시각 (성공이면 일정대로, 실패면 백오프) + 무작위 지연"""
+        jitter = random.uniform(0, self.jitter)
+        if failures:
+            return finished + min(SCHEDULER_BACKOFF_MAX, SCHEDULER_BACKOFF_BASE * 2 ** (failures - 1)) + jitter
+        return self.schedule.next_after(finished) + jitter
+
+
+_jobs = {}
+_thread = None
+_stop = threading.Event()
+
+
+def _float(value):
+    try:
+        return float(value) if value not in (None, "") else None
+    except (TypeError, ValueError):
+        return None
+
+
+def register(name, func, *, interval=None, cron=None, cluster=True,
+             timeout=SCHEDULER_JOB_TIMEOUT, jitter=SCHEDULER_JITTER):
+    """작업 등록 (SCHEDULER_CRON에 같은 이름이 있으면 그 cron 일정을 우선 사용)"""
+    cron = SCHEDULER_CRON.get(name, cron)
+    schedule = CronSchedule(cron) if cron else IntervalSchedule(interval)
+    _jobs[name] = Job(name, func, schedule, cluster, timeout, jitter)
+    return _jobs[name]
+
+
+def _call(job, outcome):
+    try:
+        outcome["result"] = job.func()
+    except Exception as exc:
+        outcome["error"] = str(exc)
+        logger.exception("scheduled job %s failed", job.name)
+
+
+def _summary(result):
+    if result is None:
+        return None
+    text = orjson.dumps(result, default=str).decode()
+    if len(text) > MAX_RESULT_LENGTH:
+        # 잘린 JSON 대신 앞부분을 문자열 값으로 저장
+        text = orjson.dumps(text[:MAX_RESULT_LENGTH] + "...").decode()
+    return text
+
+
+def _keep_lease(job, token):
+    """리스 연장 (Redis 오류는 기록만 하고 다음 주기에 다시 시도)"""
+    if token is None:
+        return
+    try:
+        if not _extend_lease(keys=[job.lock_key], args=[token, int(SCHEDULER_LEASE_TTL * 1000)]):
+            logger.warning("scheduled job %s lost its lease", job.name)
+    except redis.RedisError as exc:
+        logger.warning("scheduled job %s lease extension failed: %s", job.name, exc)
+
+
+def _run(job, token):
+    """작업 실행 (별도 스레드) + 리스 연장 / 제한 시간 감시 후 결과 기록
+
+    제한 시간을 넘겨도 파이썬 스레드는 멈출 수 없으므로, timeout을 기록한 뒤에도 작업 스레드가
+    끝날 때까지 리스를 연장하고 그 뒤에 반납한다 (다른 프로세스가 같은 작업을 겹쳐 실행하지 않도록).
+    """
+    started = time.time()
+    outcome = {}
+    worker = None
+    try:
+        job.write_state(status="running", owner=OWNER, last_started=started)
+        worker = threading.Thread(target=_call, args=(job, outcome), name=f"job-{job.name}-worker", daemon=True)
+        worker.start()
+        deadline = time.monotonic() + job.timeout
+        while True:
+            worker.join(max(0.0, min(SCHEDULER_LEASE_TTL / 3, deadline - time.monotonic())))
+            if not worker.is_alive():
+                status, error = ("failed", outcome["error"]) if "error" in outcome else ("ok", None)
+                break
+            if time.monotonic() >= deadline:
+                status, error = "timeout", f"제한 시간({job.timeout:g}초) 안에 끝나지 않았습니다."
+                logger.warning("scheduled job %s timed out after %.0fs", job.name, job.timeout)
+                break
+            _keep_lease(job, token)
+
+        finished = time.time()
+        failures = 0 if status == "ok" else int(_float(job.read_state().get("failures")) or 0) + 1
+        next_run = job.next_run_at(finished, failures)
+        job.write_state(
+            status=status,
+            last_finished=finished,
+            last_duration=round(finished - started, 3),
+            last_error=error,
+            last_result=_summary(outcome.get("result")) if status == "ok" else None,
+            failures=failures,
+            next_run=next_run,
+        )
+        job.check_at = next_run
+        logger.info("scheduled job %s %s in %.1fs", job.name, status, finished - started)
+    except Exception as exc:
+        # Redis 오류뿐 아니라 다음 실행 시각 계산 오류 등도 여기서 잡아 running 상태가 남지 않게 한다
+        logger.warning("scheduled job %s state update failed: %s", job.name, exc)
+        job.check_at = time.time() + RETRY_DELAY
+    finally:
+        try:
+            # 제한 시간을 넘긴 작업이 끝날 때까지 리스를 유지하고, 이 프로세스에서도 다시 시작하지 않는다
+            while worker is not None and worker.is_alive():
+                worker.join(SCHEDULER_LEASE_TTL / 3)
+                if worker.is_alive():
+                    _keep_lease(job, token)
+            if token is not None:
+                try:
+                    _release_lease(keys=[job.lock_key], args=[token])
+                except redis.RedisError:
+                    pass
+        finally:
+            job.running = False
+
+
+def _dispatch(job, now):
+    """실행할 때가 되었으면 (cluster 작업은 리스를 잡은 뒤) 실행 스레드 시작"""
+    state = job.read_state()
+    next_run = _float(state.get("next_run"))
+    if next_run is None:
+        # 처음 등록된 작업은 시작 직후 (jitter 범위 안에서) 실행
+        next_run = now + random.uniform(0, job.jitter)
+        if job.cluster:
+            redis_client.hsetnx(job.state_key, "next_run", next_run)
+            next_run = _float(redis_client.hget(job.state_key, "next_run"))
+        else:
+            job.write_state(next_run=next_run)
+    if now < next_run:
+        job.check_at = next_run
+        return
+
+    token = None
+    if job.cluster:
+        token = secrets.token_hex(8)
+        if not redis_client.set(job.lock_key, token, nx=True, px=int(SCHEDULER_LEASE_TTL * 1000)):
+            job.check_at = now + RETRY_DELAY
+            return
+        # 락을 기다리는 사이 다른 프로세스가 실행을 끝냈을 수 있다
+        next_run = _float(redis_client.hget(job.state_key, "next_run"))
+        if next_run is not None and now < next_run:
+            _release_lease(keys=[job.lock_key], args=[token])
+            job.check_at = next_run
+            return
+
+    job.running = True
+    threading.Thread(target=_run, args=(job, token), name=f"job-{job.name}", daemon=True).start()
+
+
+def _loop():
+    while not _stop.wait(TICK):
+        now = time.time()
+        for job in list(_jobs.values()):
+            if job.running or now < job.check_at:
+                continue
+            try:
+                _dispatch(job, now)
+                job.state_error = None
+            except redis.RedisError as exc:
+                if job.state_error is None:
+                    logger.warning("scheduler cannot reach redis for %s: %s", job.name, exc)
+                job.state_error = str(exc)
+                job.check_at = now + RETRY_DELAY
+
+
+def start():
+    global _thread
+    if not SCHEDULER_ENABLED or (_thread is not None and _thread.is_alive()):
+        return
+    _stop.clear()
+    _thread = threading.Thread(target=_loop, name="job-scheduler", daemon=True)
+    _thread.start()
+    logger.info("job scheduler started (%s): %s", OWNER, ", ".join(_jobs))
+
+
+def stop():
+    _stop.set()
+
+
+def _iso(value):
+    timestamp = _float(value)
+    return datetime.datetime.fromtimestamp(timestamp).isoformat(timespec="seconds") if timestamp else None
+
+
+def status():
+    jobs = []
+    for job in _jobs.values():
+        try:
+            state = job.read_state()
+            state_error = job.state_error
+        except redis.RedisError as exc:
+            state, state_error = {}, str(exc)
+        result = state.get("last_result")
+        jobs.append({
+            "name": job.name,
+            "scope": "cluster" if job.cluster else "local",
+            "schedule": str(job.schedule),
+            "timeout": job.timeout,
+            "jitter": job.jitter,
+            "running_here": job.running,
+            "status": state.get("status") or None,
+            "owner": state.get("owner") or None,
+            "next_run": _iso(state.get("next_run")),
+            "last_started": _iso(state.get("last_started")),
+            "last_finished": _iso(state.get("last_finished")),
+            "last_duration": _float(state.get("last_duration")),
+            "last_error": state.get("last_error") or None,
+            "last_result": orjson.loads(result) if result else None,
+            "failures": int(_float(state.get("failures")) or 0),
+            "state_error": state_error,
+        })
+    return {
+        "enabled": SCHEDULER_ENABLED,
+        "owner": OWNER,
+        "running": _thread is not None and _thread.is_alive(),
+        "jobs": jobs,
+    }
@@ -0,0 +1,233 @@
+"""튜플 커서 결과를 그대로 orjson으로 직렬화하는 응답 파이프라인
+
+RealDictCursor → dict 복사 → jsonable_encoder → json.dumps 로 이어지던
+세 번의 행 복사를 없애고, 컬럼명은 한 번만 보관한 채 튜플 행을 직렬화한다.
+
+기본 응답 형식(행 객체 배열)도 행별 dict 없이 컬럼 단위로 만든다 (records_json).
+RECORD_CHUNK_ROWS 행씩 컬럼으로 나눈 뒤, 컬럼마다 값 JSON 앞뒤에 `"컬럼":` 조각을 붙인 목록을 만들고
+행 순서로 끼워 넣어 한 번에 join한다.
+  - 종류가 적은 컬럼(연도/카테고리/색상)은 종류별로 한 번만 직렬화해 조각을 행끼리 공유한다.
+  - 숫자/날짜/bool/None만 있는 컬럼은 값 JSON에 쉼표가 없으므로 컬럼 전체를 orjson.dumps 한 번으로
+    직렬화하고 쉼표 자리에 조각을 끼운 뒤 나눈다.
+  - 문자열만 있는 컬럼도 한 번에 직렬화한다. 이스케이프(백슬래시)가 없으면 따옴표는 값 경계에만 있으므로
+    `","`는 값 경계이거나 값 자체가 ","인 경우뿐이다. 나눌 때는 JSON 출력에 나올 수 없는 NUL 바이트를
+    구분자로 쓴다.
+  - 그 밖의 값(jsonb 목록, 이스케이프가 있는 문자열 등)은 값마다 직렬화한다.
+대량 할당 중 순환 GC가 반복해서 돌지 않도록 인코딩 구간은 GC를 멈춘다.
+"""
+import datetime
+import decimal
+import gc
+from contextlib import contextmanager
+from operator import itemgetter
+
+import orjson
+from fastapi.responses import JSONResponse
+
+
+@contextmanager
+def gc_paused():
+    """대량 튜플/리스트 생성 중 순환 GC 일시 중지
+
+    수백만 개 객체를 만드는 동안 세대별 GC가 반복해서 전체를 훑지 않도록 한다.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+NONE_TYPE = type(None)
+# 값 JSON에 쉼표가 들어가지 않는 타입 (컬럼을 한 번에 직렬화한 뒤 쉼표로 나눌 수 있음)
+SPLITTABLE_TYPES = frozenset({int, float, bool, NONE_TYPE, datetime.date, datetime.datetime})
+# 종류별 변환표를 쓸 수 있는 타입 (서로 같다고 비교되는 1/True/1.0이 섞이지 않도록 한 타입만)
+DICTIONARY_TYPES = frozenset({str, int, datetime.date, datetime.datetime})
+# 종류 수 × DICTIONARY_RATIO <= 값 수면 종류별 변환표 사용 (조각 객체를 행끼리 공유)
+DICTIONARY_RATIO = 4
+STRING_BOUNDARY = b'","'
+RECORD_CHUNK_ROWS = 2048
+
+
+def _column_fragments(values, prefix, suffix):
+    """컬럼 값마다 prefix + 값 JSON + suffix 조각 목록"""
+    types = set(map(type, values))
+    has_none = NONE_TYPE in types
+    types.discard(NONE_TYPE)
+    if len(types) <= 1 and types <= DICTIONARY_TYPES:
+        distinct = set(values)
+        if len(distinct) * DICTIONARY_RATIO <= len(values):
+            table = {value: prefix + orjson.dumps(value) + suffix for value in distinct}
+            return list(map(table.__getitem__, values))
+    if types <= SPLITTABLE_TYPES:
+        body = orjson.dumps(values)[1:-1]
+        return (prefix + body.replace(b",", suffix + b"," + prefix) + suffix).split(b",")
+    if types == {str} and not has_none:
+        body = orjson.dumps(values)[1:-1]
+        if b"\\" not in body and "," not in values:
+            body = body.replace(STRING_BOUNDARY, b'"' + suffix + b"\0" + prefix + b'"')
+            return (prefix + body + suffix).split(b"\0")
+    return [prefix + dumps(value) + suffix for value in values]
+
+
+def encode_records(columns, column_chunks):
+    """컬럼별 값 목록 묶음(RECORD_CHUNK_ROWS 행 단위) → 행 객체 JSON 배열 바이트"""
+    width = len(columns)
+    prefixes = [(b"{" if index == 0 else b"") + orjson.dumps(name) + b":" for index, name in enumerate(columns)]
+    suffixes = [b"}" if index == width - 1 else b"" for index in range(width)]
+    parts = [b"["]
+    with gc_paused():
+        for chunk in column_chunks:
+            fragments = [None] * (len(chunk[0]) * width)
+            for index, values in enumerate(chunk):
+                fragments[index::width] = _column_fragments(values, prefixes[index], suffixes[index])
+            if len(parts) > 1:
+                parts.append(b",")
+            parts.append(b",".join(fragments))
+    parts.append(b"]")
+    return b"".join(parts)
+
+
+class RowSet:
+    """컬럼명 + 튜플 행 묶음"""
+
+    __slots__ = ("columns", "rows")
+
+    def __init__(self, columns, rows):
+        self.columns = tuple(columns)
+        self.rows = rows
+
+    @classmethod
+    def from_cursor(cls, cursor):
+        return cls((desc[0] for desc in cursor.description), cursor.fetchall())
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def index(self, name):
+        return self.columns.index(name)
+
+    def column(self, name):
+        """단일 컬럼 값 목록"""
+        index = self.columns.index(name)
+        return [row[index] for row in self.rows]
+
+    def project(self, *names):
+        """컬럼 부분집합 (행은 튜플 그대로 유지)"""
+        if names == self.columns:
+            return self
+        getter = itemgetter(*[self.columns.index(name) for name in names])
+        if len(names) == 1:
+            return RowSet(names, [(getter(row),) for row in self.rows])
+        return RowSet(names, [getter(row) for row in self.rows])
+
+    def records(self):
+        """행 객체 목록 (기존 API 응답 형식)"""
+        columns = self.columns
+        return [dict(zip(columns, row)) for row in self.rows]
+
+    def records_json(self):
+        """records()와 같은 JSON을 행별 dict 없이 생성"""
+        rows = self.rows
+        if not rows or not self.columns:
+            return dumps(self.records())
+        return encode_records(self.columns, (
+            list(zip(*rows[start:start + RECORD_CHUNK_ROWS]))
+            for start in range(0, len(rows), RECORD_CHUNK_ROWS)
+        ))
+
+    def columnar(self):
+        """행별 dict 없이 컬럼명 + 행 배열로 표현"""
+        return {"columns": self.columns, "rows": self.rows}
+
+
+class ColumnSet(RowSet):
+    """컬럼별 값 목록 묶음 (COPY 추출 결과)
+
+    컬럼 조회/부분집합은 값 목록을 그대로 쓰고, 행 튜플은 필요할 때 zip으로 한 번에 만든다.
+    """
+
+    __slots__ = ("buffers", "_rows")
+
+    def __init__(self, columns, buffers):
+        self.columns = tuple(columns)
+        self.buffers = buffers
+        self._rows = None
+
+    @property
+    def rows(self):
+        if self._rows is None:
+            with gc_paused():
+                self._rows = list(zip(*self.buffers))
+        return self._rows
+
+    def __len__(self):
+        return len(self.buffers[0]) if self.buffers else 0
+
+    def __iter__(self):
+        if self._rows is not None:
+            return iter(self._rows)
+        return zip(*self.buffers)
+
+    def column(self, name):
+        return self.buffers[self.columns.index(name)]
+
+    def project(self, *names):
+        if names == self.columns:
+            return self
+        return ColumnSet(names, [self.buffers[self.columns.index(name)] for name in names])
+
+    def records(self):
+        columns = self.columns
+        return [dict(zip(columns, row)) for row in zip(*self.buffers)]
+
+    def records_json(self):
+        count = len(self)
+        if not count or not self.columns:
+            return dumps(self.records())
+        return encode_records(self.columns, (
+            [values[start:start + RECORD_CHUNK_ROWS] for values in self.buffers]
+            for start in range(0, count, RECORD_CHUNK_ROWS)
+        ))
+
+
+def fetch_rowset(cursor):
+    return RowSet.from_cursor(cursor)
+
+
+def _default(obj):
+    if isinstance(obj, RowSet):
+        return orjson.Fragment(obj.records_json())
+    if isinstance(obj, decimal.Decimal):
+        # jsonable_encoder와 동일하게 정수면 int, 아니면 float
+        return int(obj) if obj.as_tuple().exponent >= 0 else float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, datetime.timedelta):
+        return obj.total_seconds()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(content):
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class FastJSONResponse(JSONResponse):
+    """orjson 기반 응답 클래스
+
+    핸들러가 이 응답을 직접 반환하면 FastAPI의 jsonable_encoder 단계를 건너뛴다.
+    """
+    media_type = "application/json"
+
+    def render(self, content):
+        return dumps(content)
+
+
+def rows_payload(rowset, columnar=False):
+    """응답 data 필드 값 (columnar 요청 시 행별 dict 생성 없음)"""
+    return rowset.columnar() if columnar else rowset
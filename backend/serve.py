@@ -0,0 +1,76 @@
+"""멀티 프로세스 서빙 진입점
+
+    python serve.py    # WEB_WORKERS=0(기본값)이면 사용 가능한 CPU 수만큼 워커 실행
+
+워커가 둘 이상이면 시작 전에 읽기 전용 집계 배열(큐브/movers)의 공유 스냅샷을 만들어 두고,
+각 워커는 같은 파일을 매핑만 한다 (shared_data 참고).
+워커 수는 WEB_WORKER_COUNT 환경 변수로 워커에 전달되어, DB_POOL_MAX/ADMISSION_* 같은
+서버 전체 한도를 워커별로 나누는 데 쓰인다 (config 참고).
+"""
+import logging
+import math
+import os
+import time
+
+import uvicorn
+
+from config import SHARED_DATA_PRELOAD, WEB_HOST, WEB_PORT, WEB_WORKERS
+import shared_data
+
+logger = logging.getLogger("serve")
+
+CGROUP_CPU_MAX = "/sys/fs/cgroup/cpu.max"
+
+
+def available_cpus():
+    """CPU affinity와 컨테이너 CPU 제한(cgroup v2 cpu.max)을 반영한 사용 가능 CPU 수"""
+    if hasattr(os, "sched_getaffinity"):
+        count = len(os.sched_getaffinity(0))
+    else:
+        count = os.cpu_count() or 1
+    try:
+        with open(CGROUP_CPU_MAX) as cpu_max:
+            quota, period = cpu_max.read().split()
+        if quota != "max":
+            count = min(count, max(1, math.ceil(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return count
+
+
+def worker_count():
+    return WEB_WORKERS if WEB_WORKERS > 0 else available_cpus()
+
+
+def preload():
+    """워커 시작 전에 공유 스냅샷 생성 (실패하면 워커가 처음 사용할 때 만든다)"""
+    if not (SHARED_DATA_PRELOAD and shared_data.enabled()):
+        return
+    import movers
+    import olap_cube
+    from db import close_pool
+
+    for name, load in (("itemtype-cube", olap_cube.preload), ("movers", movers.get_engine)):
+        started = time.perf_counter()
+        try:
+            load()
+        except Exception:
+            logger.exception("shared dataset %s preload failed", name)
+        else:
+            logger.info("shared dataset %s ready in %.3fs", name, time.perf_counter() - started)
+    close_pool()
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s:     %(message)s")
+    workers = worker_count()
+    logger.info("starting %d worker(s) on %s:%d", workers, WEB_HOST, WEB_PORT)
+    # 워커 프로세스는 config를 새로 읽으므로 환경 변수로 넘긴다
+    os.environ["WEB_WORKER_COUNT"] = str(workers)
+    if workers > 1:
+        preload()
+    uvicorn.run("main:app", host=WEB_HOST, port=WEB_PORT, workers=workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""프로세스 간 공유 읽기 전용 데이터셋 스냅샷
+
+워커 프로세스가 여러 개일 때 큐브/movers 같은 집계 배열을 프로세스마다 따로 만들면
+메모리가 워커 수만큼 늘어나므로, 데이터 버전별로 한 번만 만들어 SHARED_DATA_DIR(tmpfs 권장)에
+.npy 파일로 저장하고 각 프로세스는 np.load(mmap_mode="r")로 매핑한다.
+  - 같은 파일을 매핑한 프로세스들은 페이지 캐시의 같은 물리 페이지를 공유한다 (읽기 전용).
+  - 사전/분류 같은 작은 값 목록은 meta.json에 함께 저장한다.
+  - 데이터셋별 파일 잠금(flock)으로 한 프로세스만 만들고, 나머지는 기다렸다가 매핑한다.
+  - 스냅샷 디렉터리는 임시 디렉터리에 쓴 뒤 rename으로 한 번에 공개한다.
+이전 버전 디렉터리는 새 버전 공개 시 최근 KEEP_VERSIONS개만 남기고 삭제한다 (이미 매핑한 프로세스는 매핑이 유지된다).
+SHARED_DATA_DIR이 비어 있으면 기존처럼 프로세스 메모리에 만든다.
+"""
+import fcntl
+import json
+import logging
+import os
+import re
+import shutil
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+from config import SHARED_DATA_DIR
+
+logger = logging.getLogger(__name__)
+
+META_FILE = "meta.json"
+KEEP_VERSIONS = 2
+_SAFE_NAME = re.compile(r"^[A-Za-z0-9_.-]+$")
+
+
+def enabled():
+    return bool(SHARED_DATA_DIR)
+
+
+def _snapshot_dir(name, version):
+    if not _SAFE_NAME.match(f"{name}{version}"):
+        raise ValueError(f"공유 데이터셋 이름/버전에 사용할 수 없는 문자가 있습니다: {name}, {version}")
+    return os.path.join(SHARED_DATA_DIR, f"{name}@{version}")
+
+
+@contextmanager
+def _locked(name):
+    os.makedirs(SHARED_DATA_DIR, exist_ok=True)
+    with open(os.path.join(SHARED_DATA_DIR, f".{name}.lock"), "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _read(path):
+    with open(os.path.join(path, META_FILE), encoding="utf-8") as meta_file:
+        meta = json.load(meta_file)
+    arrays = {
+        key: np.load(os.path.join(path, f"{key}.npy"), mmap_mode="r", allow_pickle=False)
+        for key in meta.pop("_arrays")
+    }
+    return arrays, meta
+
+
+def _write(path, arrays, meta):
+    staging = f"{path}.tmp{os.getpid()}"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+    try:
+        for key, array in arrays.items():
+            np.save(os.path.join(staging, f"{key}.npy"), np.ascontiguousarray(array), allow_pickle=False)
+        with open(os.path.join(staging, META_FILE), "w", encoding="utf-8") as meta_file:
+            json.dump({**meta, "_arrays": list(arrays)}, meta_file, ensure_ascii=False)
+        os.rename(staging, path)
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+
+def _prune(name):
+    """데이터셋별 최근 KEEP_VERSIONS개만 남긴다 (버전 확인 주기 차이로 직전 버전을 읽는 프로세스 대비)"""
+    paths = [
+        os.path.join(SHARED_DATA_DIR, entry)
+        for entry in os.listdir(SHARED_DATA_DIR)
+        if entry.startswith(f"{name}@") and ".tmp" not in entry
+    ]
+    paths.sort(key=os.path.getmtime, reverse=True)
+    for path in paths[KEEP_VERSIONS:]:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def load_or_build(name, version, build):
+    """(배열 dict, meta dict) 스냅샷 — 공유 디렉터리에 있으면 매핑, 없으면 build() 후 저장
+
+    build: () → (배열 dict, JSON 직렬화 가능한 meta dict)
+    반환 배열은 공유 모드에서 읽기 전용 memmap이다.
+    """
+    if not enabled():
+        return build()
+
+    path = _snapshot_dir(name, version)
+    if os.path.isdir(path):
+        try:
+            return _read(path)
+        except FileNotFoundError:
+            pass  # 읽는 도중 정리된 오래된 버전
+    with _locked(name):
+        if not os.path.isdir(path):
+            started = time.perf_counter()
+            arrays, meta = build()
+            _write(path, arrays, meta)
+            _prune(name)
+            logger.info("shared dataset %s@%s published in %.3fs", name, version, time.perf_counter() - started)
+    return _read(path)
+
+
+def status():
+    """공유 스냅샷 목록 (이름, 버전, 파일 크기)"""
+    if not enabled() or not os.path.isdir(SHARED_DATA_DIR):
+        return {"enabled": enabled(), "dir": SHARED_DATA_DIR, "snapshots": []}
+    snapshots = []
+    for entry in sorted(os.listdir(SHARED_DATA_DIR)):
+        path = os.path.join(SHARED_DATA_DIR, entry)
+        if "@" not in entry or ".tmp" in entry or not os.path.isdir(path):
+            continue
+        name, version = entry.split("@", 1)
+        files = os.listdir(path)
+        snapshots.append({
+            "name": name,
+            "version": version,
+            "files": len(files),
+            "bytes": sum(os.path.getsize(os.path.join(path, file)) for file in files),
+        })
+    return {"enabled": True, "dir": SHARED_DATA_DIR, "snapshots": snapshots}
@@ -0,0 +1,9 @@
+"""backend 모듈은 패키지가 아닌 평면 구조이므로 테스트에서 바로 import할 수 있게 경로 추가
+
+DB/Redis 없이 실행하는 순수 로직 테스트만 둔다.
+    cd backend && python -m pytest -q
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
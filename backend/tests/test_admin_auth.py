@@ -0,0 +1,55 @@
+import asyncio
+
+import pytest
+
+import admin_auth
+from admin_auth import AdminTokenMiddleware
+
+TOKEN = "s3cret"
+
+
+async def ok_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+def status(path, method="GET", headers=()):
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": method, "path": path, "headers": list(headers)}
+    asyncio.run(AdminTokenMiddleware(ok_app)(scope, None, send))
+    return sent[0]["status"]
+
+
+@pytest.fixture(autouse=True)
+def admin_token(monkeypatch):
+    monkeypatch.setattr(admin_auth, "ADMIN_TOKEN", TOKEN)
+
+
+@pytest.mark.parametrize("path, method", [
+    ("/api/admin/indexes", "GET"),
+    ("/api/exports", "GET"),
+    ("/api/exports", "POST"),
+    ("/api/exports/abc123", "GET"),
+    ("/api/exports/abc123/download", "GET"),
+    ("/api/item-type-cube/stats", "GET"),
+])
+def test_protected_routes_require_token(path, method):
+    assert status(path, method) == 403
+    assert status(path, method, [(b"x-admin-token", b"wrong")]) == 403
+    assert status(path, method, [(b"x-admin-token", TOKEN.encode())]) == 200
+    assert status(path, method, [(b"authorization", b"Bearer " + TOKEN.encode())]) == 200
+
+
+def test_public_routes_and_preflight_pass():
+    assert status("/api/item-type-top") == 200
+    assert status("/api/item-type-cube") == 200
+    assert status("/api/exports", "OPTIONS") == 200
+
+
+def test_empty_token_disables_protected_routes(monkeypatch):
+    monkeypatch.setattr(admin_auth, "ADMIN_TOKEN", "")
+    assert status("/api/exports", headers=[(b"x-admin-token", b"")]) == 403
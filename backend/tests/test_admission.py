@@ -0,0 +1,106 @@
+import asyncio
+
+import pytest
+
+from admission import RouteClass, Shed, route_class
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+async def settle():
+    # wait_for + shield로 감싼 대기는 깨어나는 데 이벤트 루프 몇 바퀴가 필요하다
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_admits_up_to_concurrency_then_queues_in_order():
+    async def scenario():
+        route = RouteClass("lookup", concurrency=2, queue_size=4)
+        await route.acquire(None)
+        await route.acquire(None)
+        order = []
+
+        async def waiter(name):
+            await route.acquire(None)
+            order.append(name)
+
+        tasks = [asyncio.create_task(waiter(name)) for name in ("a", "b")]
+        await settle()
+        assert route.active == 2 and len(route.waiters) == 2
+
+        # 반납한 슬롯은 대기 중인 요청에 그대로 넘어간다 (active 유지)
+        route.release(0.1)
+        await settle()
+        assert order == ["a"] and route.active == 2
+        route.release(0.1)
+        await asyncio.gather(*tasks)
+        assert order == ["a", "b"]
+        route.release(0.1)
+        route.release(0.1)
+        assert route.active == 0
+        assert route.counters["admitted"] == 4 and route.counters["queued"] == 2
+
+    run(scenario())
+
+
+def test_sheds_when_queue_is_full():
+    async def scenario():
+        route = RouteClass("lookup", concurrency=1, queue_size=1)
+        await route.acquire(None)
+        queued = asyncio.create_task(route.acquire(None))
+        await settle()
+        with pytest.raises(Shed) as shed:
+            await route.acquire(None)
+        assert shed.value.reason == "queue_full"
+        assert shed.value.retry_after >= 1
+        route.release(0)
+        await queued
+        route.release(0)
+
+    run(scenario())
+
+
+def test_sheds_when_expected_wait_exceeds_deadline():
+    async def scenario():
+        route = RouteClass("bulk", concurrency=1, queue_size=8)
+        route.service_time = 5.0
+        await route.acquire(None)
+        with pytest.raises(Shed) as shed:
+            await route.acquire(1.0)
+        assert shed.value.reason == "deadline"
+        assert route.counters["shed_deadline"] == 1
+
+    run(scenario())
+
+
+def test_queued_request_times_out_and_leaves_queue():
+    async def scenario():
+        route = RouteClass("lookup", concurrency=1, queue_size=8)
+        route.service_time = 0.01
+        await route.acquire(None)
+        with pytest.raises(Shed) as shed:
+            await route.acquire(0.05)
+        assert shed.value.reason == "timeout"
+        assert not route.waiters
+        route.release(0)
+        assert route.active == 0
+
+    run(scenario())
+
+
+def test_release_updates_service_time_average():
+    route = RouteClass("lookup", concurrency=1, queue_size=1)
+    route.active = 1
+    before = route.service_time
+    route.release(before + 1.0)
+    assert route.service_time > before
+
+
+def test_route_class_by_path():
+    assert route_class("/api/mood-rate") == "bulk"
+    assert route_class("/api/color-images") == "lookup"
+    assert route_class("/api/admin/admission") is None
+    assert route_class("/api/data-versions/stream") is None
+    assert route_class("/health") is None
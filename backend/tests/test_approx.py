@@ -0,0 +1,97 @@
+import math
+import random
+
+import numpy as np
+import pytest
+
+import approx
+from approx import Z_95, HyperLogLog, SketchIndex, error_bound
+
+PRECISION = 10
+
+
+def registers_for(hashes, precision=PRECISION):
+    """approx.register_query와 같은 규칙: 하위 precision비트 = 레지스터, 나머지 비트의 선행 0 개수 + 1 = rank"""
+    width = 64 - precision
+    registers = np.zeros(1 << precision, dtype=np.uint8)
+    for value in hashes:
+        register = value & ((1 << precision) - 1)
+        rest = (value >> precision) & ((1 << width) - 1)
+        rank = width + 1 if rest == 0 else width - int(math.floor(math.log2(rest)))
+        registers[register] = max(registers[register], rank)
+    return registers
+
+
+def random_hashes(count, seed):
+    rng = random.Random(seed)
+    return [rng.getrandbits(64) for _ in range(count)]
+
+
+@pytest.mark.parametrize("count", [50, 2000, 50000])
+def test_hll_estimate_within_error_bound(count):
+    sketch = HyperLogLog(registers_for(random_hashes(count, seed=count)))
+    # 표준 오차 1.04/√m의 4배 이내 (고정 시드라 결정적)
+    assert abs(sketch.estimate() - count) <= 4 * sketch.relative_error * count
+
+
+def test_hll_merge_equals_sketch_of_union():
+    first, second = random_hashes(3000, seed=1), random_hashes(3000, seed=2)
+    merged = HyperLogLog(registers_for(first)).merge(HyperLogLog(registers_for(second)))
+    assert np.array_equal(merged.registers, registers_for(first + second))
+
+
+def test_empty_sketch_estimates_zero():
+    assert HyperLogLog.empty(PRECISION).estimate() == 0
+
+
+def test_sketch_index_merges_categories_when_unfiltered():
+    top, bottom = random_hashes(1500, seed=3), random_hashes(1500, seed=4)
+    rows = []
+    for category_l1, hashes in (("상의", top), ("하의", bottom)):
+        registers = registers_for(hashes)
+        indexes = np.nonzero(registers)[0]
+        rows.append((2024, 1, category_l1, "레드", indexes.tolist(), registers[indexes].tolist()))
+    index = SketchIndex("color", rows, precision=PRECISION)
+
+    (total, bound), = index.distinct_posts("레드", [(2024, 1)])
+    assert abs(total - 3000) <= 4 * bound
+    (top_only, _), = index.distinct_posts("레드", [(2024, 1)], category_l1="상의")
+    assert top_only < total
+    assert index.distinct_posts("레드", [(2023, 12)]) == [(0, 0)]
+
+
+def test_stratified_variance_estimator_matches_sampling_variance():
+    # 층마다 비율 p로 베르누이 추출하면 Σw는 N의 불편 추정량이고, Σ w(w-1)은 그 분산 N(1-p)/p의 불편 추정량이다
+    rng = np.random.default_rng(5)
+    strata = [(20000, 0.05), (800, 0.625), (300, 1.0)]
+    estimates, variances = [], []
+    for _ in range(2000):
+        weights = np.concatenate([
+            np.full(rng.binomial(size, rate), 1.0 / rate) for size, rate in strata
+        ])
+        estimates.append(weights.sum())
+        variances.append(np.sum(weights * (weights - 1)))
+    true_total = sum(size for size, _ in strata)
+    true_variance = sum(size * (1 - rate) / rate for size, rate in strata)
+    assert abs(np.mean(estimates) - true_total) < 0.01 * true_total
+    assert abs(np.mean(variances) - true_variance) < 0.05 * true_variance
+    assert abs(np.var(estimates) - true_variance) < 0.1 * true_variance
+
+
+def test_error_bound_is_95_percent_interval():
+    assert error_bound(10000) == round(Z_95 * 100)
+    assert error_bound(None) == 0
+    assert error_bound(-5) == 0
+
+
+def test_sketch_from_previous_version_is_not_served(monkeypatch):
+    index = SketchIndex("color", [])
+    started = []
+    monkeypatch.setattr(approx, "_sketches", ("v1", {"color": index}))
+    monkeypatch.setattr(approx, "_sketches_building", True)
+    monkeypatch.setattr(approx, "data_version", lambda table: "v1")
+    assert approx.get_sketch("color") is index
+
+    monkeypatch.setattr(approx, "data_version", lambda table: "v2")
+    assert approx.get_sketch("color") is None
+    assert approx.get_sketch("unknown") is None
@@ -0,0 +1,55 @@
+from autocomplete import AutocompleteIndex, choseong_key, is_choseong_query, jamo_key
+from mood_matching import normalize_tag
+
+
+def test_jamo_key_decomposes_syllables_and_compound_jamo():
+    assert jamo_key("블랙") == "ㅂㅡㄹㄹㅐㄱ"
+    assert jamo_key("봐") == "ㅂㅗㅏ"
+    assert jamo_key("닭") == "ㄷㅏㄹㄱ"
+    # 겹받침/겹모음 호환 자모는 음절 분해 결과와 같도록 낱자로 푼다
+    assert jamo_key("ㄺ") == "ㄹㄱ"
+    assert jamo_key("black") == "black"
+
+
+def test_jamo_key_accepts_nfkc_normalized_jamo():
+    # normalize_tag의 NFKC는 호환 자모를 첫가끝 자모로 바꾸므로 같은 키로 되돌아와야 한다
+    assert jamo_key(normalize_tag("ㅂㄹ")) == "ㅂㄹ"
+    assert jamo_key(normalize_tag("블ㄹ")) == "ㅂㅡㄹㄹ"
+
+
+def test_choseong_key_keeps_non_hangul():
+    assert choseong_key("블랙") == "ㅂㄹ"
+    assert choseong_key("y2k룩") == "y2kㄹ"
+
+
+def test_is_choseong_query():
+    assert is_choseong_query("ㅂㄹ")
+    assert not is_choseong_query("ㅂㅡ")
+    assert not is_choseong_query("")
+
+
+def build_index():
+    hashtags = [("블랙", 50), ("블랙코디", 30), ("블루", 20), ("black", 10), ("브라운", 5)]
+    keywords = [("블랙", "컬러", "무채색"), ("출근룩", "TPO", "오피스")]
+    return AutocompleteIndex(hashtags, keywords, "v1")
+
+
+def test_suggest_by_partial_syllable_orders_by_count():
+    index = build_index()
+    # "블ㄹ"은 "블랙", "블루" 모두의 자모 접두사
+    assert [item["text"] for item in index.suggest("블ㄹ")] == ["블랙", "블랙코디", "블루"]
+
+
+def test_suggest_by_choseong():
+    index = build_index()
+    assert [item["text"] for item in index.suggest("ㅂㄹ")] == ["블랙", "블랙코디", "블루", "브라운"]
+    assert [item["text"] for item in index.suggest("ㅊㄱ")] == ["출근룩"]
+
+
+def test_suggest_puts_exact_match_first_and_reports_categories():
+    index = build_index()
+    suggestions = index.suggest("#블랙코디", limit=3)
+    assert suggestions[0]["text"] == "블랙코디"
+    keyword = index.suggest("블랙", kind="keyword")
+    assert keyword == [{"text": "블랙", "count": 50, "type": "keyword", "categories": [["컬러", "무채색"]]}]
+    assert index.suggest("   ") == []
@@ -0,0 +1,70 @@
+import datetime
+import decimal
+
+import pytest
+
+import copy_extract
+from copy_extract import DICTIONARY_SAMPLE, decode_text
+
+INT4, TEXT, BOOL, NUMERIC, DATE, TIMESTAMPTZ, JSONB = 23, 25, 16, 1700, 1082, 1184, 3802
+
+
+def test_decode_plain_columns():
+    data = b"1\t\xeb\xa0\x88\xeb\x93\x9c\tt\n2\tblue\tf\n"
+    assert decode_text(data, (INT4, TEXT, BOOL)) == [[1, 2], ["레드", "blue"], [True, False]]
+
+
+def test_decode_typed_values():
+    data = (
+        "12.50\t2024-03-01\t2024-03-01 09:30:00+09\t[\"미니멀\", \"캐주얼\"]\n"
+    ).encode("utf-8")
+    numeric, date, timestamp, tags = decode_text(data, (NUMERIC, DATE, TIMESTAMPTZ, JSONB))
+    assert numeric == [decimal.Decimal("12.50")]
+    assert date == [datetime.date(2024, 3, 1)]
+    assert timestamp[0] == datetime.datetime(2024, 3, 1, 9, 30, tzinfo=datetime.timezone(datetime.timedelta(hours=9)))
+    assert tags == [["미니멀", "캐주얼"]]
+
+
+def test_decode_nulls_and_escapes():
+    # COPY text 형식: NULL은 \N, 값 안의 탭/줄바꿈/백슬래시는 이스케이프된다
+    data = b"\\N\ta\\tb\n3\tline\\nbreak \\\\ end\n"
+    assert decode_text(data, (INT4, TEXT)) == [[None, 3], ["a\tb", "line\nbreak \\ end"]]
+
+
+def test_decode_low_cardinality_column_shares_values():
+    rows = DICTIONARY_SAMPLE * 2
+    data = "".join(f"{2023 + i % 2}\t{i}\n" for i in range(rows)).encode()
+    years, ids = decode_text(data, (INT4, INT4))
+    assert years[:4] == [2023, 2024, 2023, 2024]
+    assert ids[-1] == rows - 1
+    # 종류별 변환표를 쓰면 같은 값은 같은 객체
+    assert all(year is years[0] for year in years[::2])
+
+
+def test_decode_empty_output():
+    assert decode_text(b"", (INT4, TEXT)) == [[], []]
+
+
+def test_decode_rejects_field_count_mismatch():
+    with pytest.raises(ValueError):
+        decode_text(b"1\t2\t3\n", (INT4, INT4))
+
+
+class DescribeCursor:
+    description = (("color", 25),)
+
+    def __init__(self):
+        self.executed = 0
+
+    def execute(self, sql, params=None):
+        self.executed += 1
+
+
+def test_describe_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(copy_extract, "_descriptions", {})
+    monkeypatch.setattr(copy_extract, "DESCRIPTION_CACHE_SIZE", 2)
+    cursor = DescribeCursor()
+    for sql in ("SELECT 1", "SELECT 2", "SELECT 1", "SELECT 3"):
+        assert copy_extract._describe(cursor, sql, None) == (("color",), (25,))
+    assert cursor.executed == 3
+    assert list(copy_extract._descriptions) == ["SELECT 2", "SELECT 3"]
@@ -0,0 +1,16 @@
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.testclient import TestClient
+
+import main
+
+ORIGIN = "http://localhost:3001"
+
+
+def test_cors_is_the_outermost_middleware():
+    assert main.app.user_middleware[0].cls is CORSMiddleware
+
+
+def test_middleware_rejections_carry_cors_headers():
+    response = TestClient(main.app).get("/api/admin/indexes", headers={"Origin": ORIGIN})
+    assert response.status_code == 403
+    assert response.headers["access-control-allow-origin"] == ORIGIN
@@ -0,0 +1,31 @@
+import pytest
+
+import db
+from db import DatabaseHost
+
+
+def host(name, weight, latency, replica=True):
+    database_host = DatabaseHost(name, {}, weight, replica=replica)
+    database_host.latency = latency
+    return database_host
+
+
+def test_unmeasured_host_gets_average_latency():
+    replica = host("replica", 1, 0.004)
+    primary = host("primary", 1, None, replica=False)
+    weights = db._read_weights([replica, primary])
+    assert weights[0] == pytest.approx(weights[1])
+
+
+def test_measured_latency_drives_weights():
+    fast, slow = host("fast", 1, 0.002), host("slow", 1, 0.008)
+    assert db._read_weights([fast, slow]) == pytest.approx([500, 125])
+
+
+def test_primary_is_health_checked_when_it_takes_reads(monkeypatch):
+    replica = host("replica", 1, None)
+    monkeypatch.setattr(db, "_replicas", [replica])
+    monkeypatch.setattr(db, "DB_PRIMARY_READ_WEIGHT", 0)
+    assert db._checked_hosts() == [replica]
+    monkeypatch.setattr(db, "DB_PRIMARY_READ_WEIGHT", 1)
+    assert db._checked_hosts() == [replica, db._primary]
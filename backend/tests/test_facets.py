@@ -0,0 +1,104 @@
+import pytest
+
+import approx
+import facets
+from facets import _collect, facets_query
+
+
+@pytest.fixture(autouse=True)
+def tiers(monkeypatch):
+    monkeypatch.setattr(facets, "FOLLOWER_TIERS", [0, 10000, 50000])
+
+
+def row(grouping_id, count, year=None, month=None, l1=None, l3=None, tier=None, variance=None):
+    # 패싯별 COUNT FILTER 열 중 해당 grouping set의 패싯 열만 의미가 있음
+    counts = [count] * (len(facets.FACETS) + 1)
+    extra = [variance] * (len(facets.FACETS) + 1) if variance is not None else []
+    return (year, month, l1, l3, tier, grouping_id, *counts, *extra)
+
+
+ROWS = [
+    row(0b01111, 30, year=2025),
+    row(0b01111, 70, year=2024),
+    row(0b10111, 40, month=3),
+    row(0b10111, 60, month=1),
+    row(0b11011, 55, l1="하의"),
+    row(0b11011, 45, l1="상의"),
+    row(0b11011, 5, l1=""),
+    row(0b11101, 10, l3=None),
+    row(0b11101, 90, l3="니트"),
+    row(0b11110, 50, tier=0),
+    row(0b11110, 30, tier=1),
+    row(0b11110, 20, tier=2),
+    # 최저 하한 미만 (CASE 결과 NULL)은 어느 구간에도 포함되지 않음
+    row(0b11110, 7, tier=None),
+    row(0b11111, 100),
+]
+
+
+def test_values_are_sorted_and_empty_values_dropped():
+    result = _collect(ROWS)
+    assert result["total"] == 100 and result["approx"] is False
+    assert result["facets"]["post_year"] == [{"value": 2024, "count": 70}, {"value": 2025, "count": 30}]
+    assert [item["value"] for item in result["facets"]["post_month"]] == [1, 3]
+    assert [item["value"] for item in result["facets"]["category_l1"]] == ["상의", "하의"]
+    assert result["facets"]["category_l3"] == [{"value": "니트", "count": 90}]
+
+
+def test_follower_tiers_are_cumulative_lower_bounds():
+    assert _collect(ROWS)["facets"]["follower_count"] == [
+        {"value": 0, "count": 100},
+        {"value": 10000, "count": 50},
+        {"value": 50000, "count": 20},
+    ]
+
+
+def test_missing_tiers_and_total_default_to_zero():
+    result = _collect([row(0b11110, 4, tier=2)])
+    assert result["total"] == 0
+    assert [item["count"] for item in result["facets"]["follower_count"]] == [4, 4, 4]
+
+
+def test_approximate_rows_round_counts_and_add_error_bounds():
+    rows = [
+        row(0b01111, 69.6, year=2024, variance=25.0),
+        row(0b11110, 10.2, tier=1, variance=9.0),
+        row(0b11110, 5.0, tier=2, variance=16.0),
+        row(0b11111, 69.6, variance=25.0),
+    ]
+    result = _collect(rows, approximate=True)
+    assert result["facets"]["post_year"] == [
+        {"value": 2024, "count": 70, "error": approx.error_bound(25.0)},
+    ]
+    # 누적 구간은 분산도 누적
+    assert result["facets"]["follower_count"][1] == {
+        "value": 10000, "count": 15, "error": approx.error_bound(25.0),
+    }
+    assert result["total"] == 70
+    assert result["total_error"] == approx.error_bound(25.0)
+
+
+def test_each_facet_drops_only_its_own_filter():
+    sql, params = facets_query("follow", {"post_year": 2024, "category_l1": "상의", "color": "블랙"})
+    # 패싯 순서(연도, 월, 대분류, 소분류, 팔로워, 전체)대로, 자기 필터만 뺀 조건의 파라미터
+    assert params == [
+        "상의",
+        "상의", 2024,
+        2024,
+        "상의", 2024,
+        "상의", 2024,
+        "상의", 2024,
+        "블랙",
+    ]
+    assert "COUNT(*) FILTER (WHERE category_l1 = %s)," in sql
+    assert "COUNT(*) FILTER (WHERE post_year = %s)," in sql
+    assert "WHERE color = %s AND post_year IS NOT NULL" in sql
+
+
+def test_facets_query_rejects_unknown_filters_and_sources():
+    with pytest.raises(ValueError):
+        facets_query("follow", {"item_type": "셔츠"})
+    with pytest.raises(ValueError):
+        facets_query("unknown", {})
+    with pytest.raises(ValueError):
+        facets_query("itemtype", {}, approximate=True)
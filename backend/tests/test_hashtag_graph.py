@@ -0,0 +1,54 @@
+import json
+
+import pytest
+
+from hashtag_graph import HashtagGraph
+
+
+def row(key, *tags):
+    return json.dumps(list(tags), ensure_ascii=False), key
+
+
+@pytest.fixture
+def graph():
+    graph = HashtagGraph(top_k=5, min_count=1)
+    graph.add_rows([
+        row("a", "#데일리룩", "#미니멀"),
+        row("b", "#데일리룩", "#미니멀", "#OOTD"),
+        row("c", "#데일리룩", "#ootd"),
+        row("d", "#캠퍼스룩"),
+    ])
+    return graph
+
+
+def test_counts_and_lift(graph):
+    result = graph.neighbors("데일리룩")
+    assert result["count"] == 3
+    by_tag = {neighbor["tag"]: neighbor for neighbor in result["neighbors"]}
+    assert by_tag["미니멀"]["count"] == 2
+    # lift = 2 * 4 / (3 * 2)
+    assert by_tag["미니멀"]["lift"] == pytest.approx(4 / 3, abs=1e-4)
+    # 정규화(NFKC/소문자/# 제거) 후 같은 태그로 합쳐짐
+    assert by_tag["ootd"]["count"] == 2
+    assert graph.neighbors("캠퍼스룩")["neighbors"] == []
+    assert graph.neighbors("없는태그") is None
+
+
+def test_rows_already_seen_are_skipped(graph):
+    assert graph.add_rows([row("a", "#데일리룩", "#미니멀")]) == 0
+    assert graph.post_count == 4
+
+
+def test_clone_leaves_the_published_graph_untouched(graph):
+    before = graph.neighbors("데일리룩")
+    extended = graph.clone()
+    assert extended.add_rows([row("e", "#데일리룩", "#캠퍼스룩"), row("f", "#새태그")]) == 2
+
+    assert graph.neighbors("데일리룩") == before
+    assert graph.post_count == 4
+    assert "새태그" not in graph.tag_ids
+    assert "e" not in graph.seen_keys
+
+    assert extended.post_count == 6
+    assert extended.neighbors("데일리룩")["count"] == 4
+    assert extended.neighbors("새태그")["count"] == 1
@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+
+import http_cache
+from http_cache import CacheControlMiddleware, route_ttl
+
+
+def json_app(body, status=200, headers=()):
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": status, "headers": list(headers)})
+        await send({"type": "http.response.body", "body": body})
+    return app
+
+
+def run(app, path="/api/item-type-top", method="GET"):
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": method, "path": path}
+    asyncio.run(CacheControlMiddleware(app)(scope, None, send))
+    start = sent[0]
+    assert start["type"] == "http.response.start"
+    return dict(start["headers"]), sent[1:]
+
+
+@pytest.fixture(autouse=True)
+def fixed_version(monkeypatch):
+    monkeypatch.setattr(http_cache, "cached_combined_version", lambda: "v42")
+
+
+def test_success_response_is_cacheable_and_versioned():
+    headers, body = run(json_app(b'{"success":true,"data":[]}'))
+    assert headers[b"cache-control"].startswith(b"public, max-age=")
+    assert headers[b"x-data-version"] == b"v42"
+    assert body[0]["body"] == b'{"success":true,"data":[]}'
+
+
+def test_success_false_body_is_not_stored():
+    headers, _ = run(json_app(b'{"success":false,"error":"boom"}'))
+    assert headers[b"cache-control"] == b"no-store"
+
+
+def test_non_200_is_not_stored():
+    headers, _ = run(json_app(b'{"success":true}', status=503))
+    assert headers[b"cache-control"] == b"no-store"
+
+
+def test_handler_cache_control_is_kept():
+    headers, _ = run(json_app(b"img", headers=[(b"cache-control", b"public, max-age=60")]))
+    assert headers[b"cache-control"] == b"public, max-age=60"
+
+
+def test_no_store_routes_skip_version_lookup(monkeypatch):
+    monkeypatch.setattr(http_cache, "cached_combined_version", lambda: pytest.fail("버전 조회 불필요"))
+    headers, _ = run(json_app(b'{"success":true}'), path="/api/admin/indexes")
+    assert headers[b"cache-control"] == b"no-store"
+    assert b"x-data-version" not in headers
+
+
+def test_route_ttl_classes():
+    assert route_ttl("/api/exports") == 0
+    assert route_ttl("/api/data-versions/stream") == 0
+    assert route_ttl("/docs") == 0
+    assert route_ttl("/api/item-color") == http_cache.HTTP_CACHE_BULK_TTL
+    assert route_ttl("/api/mood-keywords") == http_cache.HTTP_CACHE_TAXONOMY_TTL
@@ -0,0 +1,45 @@
+import random
+from itertools import combinations
+
+from itemset_mining import fp_growth, mine_partition
+
+
+def brute_force(transactions, min_support, max_length):
+    counts = {}
+    for items in transactions:
+        items = sorted(set(items))
+        for size in range(1, min(max_length, len(items)) + 1):
+            for combo in combinations(items, size):
+                key = frozenset(combo)
+                counts[key] = counts.get(key, 0) + 1
+    return {items: count for items, count in counts.items() if count >= min_support}
+
+
+def test_fp_growth_matches_brute_force_on_random_baskets():
+    rng = random.Random(7)
+    items = [f"item{i}" for i in range(12)]
+    transactions = [
+        rng.sample(items, rng.randint(1, 6)) for _ in range(400)
+    ] + [[]]
+    for min_support, max_length in ((5, 2), (10, 3), (25, 4)):
+        assert fp_growth(transactions, min_support, max_length) == brute_force(transactions, min_support, max_length)
+
+
+def test_fp_growth_counts_duplicate_transactions():
+    transactions = [["상의|셔츠", "하의|슬랙스"]] * 3 + [["상의|셔츠"]]
+    result = fp_growth(transactions, min_support=3, max_length=2)
+    assert result == {
+        frozenset({"상의|셔츠"}): 4,
+        frozenset({"하의|슬랙스"}): 3,
+        frozenset({"상의|셔츠", "하의|슬랙스"}): 3,
+    }
+
+
+def test_mine_partition_splits_item_keys_and_orders_by_support():
+    transactions = [["상의|셔츠", "하의|슬랙스", "신발|로퍼"]] * 4 + [["상의|셔츠", "하의|슬랙스"]] * 2
+    result = mine_partition(transactions, min_support=2)
+    assert result["transactions"] == 6
+    assert result["item_support"]["상의|셔츠"] == 6
+    supports = [itemset["support"] for itemset in result["itemsets"]]
+    assert supports == sorted(supports, reverse=True)
+    assert result["itemsets"][0] == {"items": [["상의", "셔츠"], ["하의", "슬랙스"]], "support": 6}
@@ -0,0 +1,83 @@
+import random
+
+import pytest
+
+from mood_matching import AhoCorasick, MoodMatchIndex, normalize_tag, parse_desc_style
+
+
+def test_aho_corasick_matches_naive_search():
+    patterns = ["he", "she", "his", "hers", "", "미니멀", "멀"]
+    automaton = AhoCorasick(patterns)
+    assert automaton.find("ushers") == {0, 1, 3}
+    assert automaton.find("미니멀룩") == {5, 6}
+    assert automaton.find("") == set()
+
+    rng = random.Random(7)
+    patterns = ["".join(rng.choice("abc") for _ in range(rng.randint(1, 4))) for _ in range(40)]
+    automaton = AhoCorasick(patterns)
+    for _ in range(200):
+        text = "".join(rng.choice("abc") for _ in range(rng.randint(0, 12)))
+        expected = {i for i, pattern in enumerate(patterns) if pattern in text}
+        assert automaton.find(text) == expected
+
+
+def test_normalize_and_parse():
+    assert normalize_tag(" #ＯＯＴＤ ") == "ootd"
+    assert normalize_tag("##데일리룩") == "데일리룩"
+    assert parse_desc_style('["#a", " ", 3]') == ["#a"]
+    assert parse_desc_style("#a, #b") == ["#a", " #b"]
+    assert parse_desc_style("[broken") == ["[broken"]
+    assert parse_desc_style(None) == []
+
+
+@pytest.fixture
+def index():
+    keyword_rows = [
+        ("스타일", "미니멀", "미니멀"),
+        ("스타일", "미니멀", "#Simple"),
+        ("스타일", "캐주얼", "데일리룩"),
+        ("계절", "여름", "여름"),
+    ]
+    style_rows = [
+        ('["#미니멀룩", "#데일리룩"]', "a.jpg"),
+        ('["#미니멀룩", "#미니멀룩"]', "b.jpg"),
+        ('["#SIMPLE", "#여름"]', "c.jpg"),
+        ('["#룩"]', "d.jpg"),
+        ("#데일리, #여름코디", "e.jpg"),
+    ]
+    return MoodMatchIndex(keyword_rows, style_rows, version="v1")
+
+
+def test_hashtags_are_counted_per_thumbnail_by_frequency(index):
+    keywords, total = index.keywords()
+    assert total == len(index.hashtags) == 7
+    assert keywords[0] == {"keyword": "미니멀룩", "count": 2}
+    counts = [keyword["count"] for keyword in keywords]
+    assert counts == sorted(counts, reverse=True)
+
+
+def test_two_way_substring_matching(index):
+    minimal, _ = index.keywords("스타일", "미니멀")
+    # 해시태그 ⊇ tag_norm (미니멀룩 ⊇ 미니멀), 대소문자 무시 (simple)
+    assert {keyword["keyword"] for keyword in minimal} == {"미니멀룩", "simple"}
+
+    casual, _ = index.keywords("스타일", "캐주얼")
+    # 해시태그 ⊆ tag_norm (룩, 데일리 ⊆ 데일리룩)
+    assert {keyword["keyword"] for keyword in casual} == {"데일리룩", "데일리", "룩"}
+
+    style, total = index.keywords("스타일")
+    assert total == 5
+    assert index.keywords("없음", "없음") == ([], 0)
+
+
+def test_category_counts(index):
+    assert index.category_counts["계절"]["여름"] == {"keyword_count": 2, "image_count": 2}
+    assert index.category_counts["스타일"]["미니멀"] == {"keyword_count": 2, "image_count": 3}
+
+
+def test_images_page_by_normalized_keyword(index):
+    page = index.images("#미니멀룩", page=1, page_size=1)
+    assert page["count"] == 2 and page["total_pages"] == 2
+    assert page["data"] == ["a.jpg"]
+    assert index.images("미니멀룩", page=2, page_size=1)["data"] == ["b.jpg"]
+    assert index.images("없는태그")["count"] == 0
@@ -0,0 +1,63 @@
+import pytest
+
+from movers import MoversIndex
+
+
+def month_rows(tier, month, counts):
+    return [(tier, 2024, month, "상의", "티셔츠", color, count) for color, count in counts.items()]
+
+
+@pytest.fixture
+def index():
+    rows = (
+        month_rows(0, 1, {"블랙": 10, "화이트": 10, "그레이": 5})
+        + month_rows(0, 2, {"블랙": 20, "화이트": 5, "그레이": 5})
+        # 팔로워 10000 이상 구간 (하위 구간에도 누적됨)
+        + month_rows(1, 1, {"블랙": 2})
+        + month_rows(1, 2, {"블랙": 1})
+        + [(0, 2024, 2, "상의", "티셔츠", None, 3)]
+    )
+    return MoversIndex("color", rows, tiers=[0, 10000], window=3, threshold=10, min_support=1)
+
+
+def colors(items):
+    return [item["color"] for item in items]
+
+
+def test_latest_month_classification(index):
+    result = index.movers()
+    assert (result["post_year"], result["post_month"], result["follower_tier"]) == (2024, 2, 0)
+    assert colors(result["rising"]) == ["블랙"]
+    assert colors(result["falling"]) == ["화이트"]
+    assert colors(result["stable"]) == ["그레이"]
+
+    black = result["rising"][0]
+    # 하위 구간은 상위 구간 건수까지 누적 (20 + 1, 직전 10 + 2)
+    assert (black["count"], black["prev_count"]) == (21, 12)
+    assert black["change_rate"] == pytest.approx(75.0)
+    assert black["share"] == pytest.approx(21 / 31 * 100, abs=0.01)
+
+
+def test_follower_count_uses_the_index_tiers(index):
+    # FOLLOWER_TIERS(0, 10000, 50000, ...)가 아니라 인덱스의 구간 기준으로 선택
+    result = index.movers(follower_count=60000)
+    assert result["follower_tier"] == 10000
+    assert colors(result["falling"]) == ["블랙"]
+    assert result["rising"] == [] and result["stable"] == []
+
+
+def test_slices_and_periods(index):
+    assert colors(index.movers(category_l1="상의")["rising"]) == ["블랙"]
+    assert colors(index.movers(category_l1="상의", category_l3="티셔츠")["rising"]) == ["블랙"]
+    assert index.movers(category_l1="하의")["rising"] == []
+
+    first = index.movers(post_year=2024, post_month=1)
+    # 직전 달이 없으면 등장한 값은 모두 상승
+    assert set(colors(first["rising"])) == {"블랙", "화이트", "그레이"}
+    assert index.movers(post_year=2023, post_month=12)["rising"] == []
+
+
+def test_snapshot_round_trip(index):
+    restored = MoversIndex.from_snapshot(*index.snapshot())
+    assert restored.movers(limit=5) == index.movers(limit=5)
+    assert restored.movers(follower_count=20000) == index.movers(follower_count=20000)
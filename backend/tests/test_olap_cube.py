@@ -0,0 +1,111 @@
+import random
+import threading
+from collections import Counter
+
+import pytest
+
+import olap_cube
+from olap_cube import ItemTypeCube
+
+BUCKET_SIZE = 100
+BUCKET_MAX = 500
+
+
+def slot_for(follower_count):
+    # olap_cube._build_cube SQL의 follower_slot CASE와 같은 규칙
+    if follower_count is None or follower_count < 0:
+        return 0
+    return 1 + min(follower_count // BUCKET_SIZE, BUCKET_MAX // BUCKET_SIZE)
+
+
+@pytest.fixture(scope="module")
+def posts():
+    rng = random.Random(11)
+    return [
+        {
+            "category_l1": rng.choice(["상의", "하의", "아우터"]),
+            "post_year": rng.choice([2023, 2024]),
+            "post_month": rng.randint(1, 3),
+            "follower_count": rng.choice([None, rng.randint(0, 900)]),
+            "category_l3": rng.choice(["셔츠", "니트", "슬랙스", "코트"]),
+            "item_type": rng.choice(["", "A", "B"]),
+        }
+        for _ in range(3000)
+    ]
+
+
+@pytest.fixture(scope="module")
+def cube(posts):
+    grouped = Counter(
+        (post["category_l1"], post["post_year"], post["post_month"], slot_for(post["follower_count"]),
+         post["category_l3"], post["item_type"] or None)
+        for post in posts
+    )
+    rows = [key + (count,) for key, count in grouped.items()]
+    return ItemTypeCube(rows, "v1", bucket_size=BUCKET_SIZE, bucket_max=BUCKET_MAX)
+
+
+def brute_force(posts, column, filters):
+    counts = Counter()
+    for post in posts:
+        if any(value and post[key] != value for key, value in filters.items() if key != "follower_count"):
+            continue
+        threshold = filters.get("follower_count")
+        if threshold and (post["follower_count"] is None or post["follower_count"] < threshold):
+            continue
+        if post[column]:
+            counts[post[column]] += 1
+    return counts
+
+
+@pytest.mark.parametrize("filters", [
+    {},
+    {"post_year": 2024},
+    {"post_year": 2023, "post_month": 2},
+    {"category_l1": "상의", "post_year": 2024, "post_month": 1},
+    {"category_l3": "니트", "follower_count": 300},
+    {"follower_count": 500},  # 최상위 버킷 (BUCKET_MAX 이상)
+    {"category_l1": "없는값"},
+])
+@pytest.mark.parametrize("column", ["category_l3", "item_type"])
+def test_cube_counts_match_brute_force(posts, cube, column, filters):
+    assert cube.can_answer(filters)
+    assert dict(cube.top_counts(column, filters)) == brute_force(posts, column, filters)
+
+
+def test_top_counts_is_sorted_and_limited(cube):
+    result = cube.top_counts("category_l3", {}, limit=2)
+    assert len(result) == 2
+    assert result[0][1] >= result[1][1]
+
+
+def test_cube_declines_filters_it_cannot_answer(cube):
+    assert not cube.can_answer({"color": "레드"})
+    assert not cube.can_answer({"follower_count": 150})    # 버킷 경계가 아님
+    assert not cube.can_answer({"follower_count": 10000})  # 최대 버킷 초과
+
+
+def test_snapshot_round_trip_keeps_answers(cube):
+    arrays, meta = cube.snapshot()
+    restored = ItemTypeCube.from_snapshot(arrays, meta)
+    filters = {"post_year": 2024, "follower_count": 200}
+    assert restored.top_counts("item_type", filters) == cube.top_counts("item_type", filters)
+
+
+def test_stale_cube_is_not_served_while_rebuilding(cube, monkeypatch):
+    started = []
+    monkeypatch.setattr(olap_cube, "CUBE_ENABLED", True)
+    monkeypatch.setattr(olap_cube, "_cube", cube)
+    monkeypatch.setattr(olap_cube, "_building", False)
+    monkeypatch.setattr(olap_cube, "_rebuild", started.append)
+    monkeypatch.setattr(olap_cube, "data_version", lambda table: "v1")
+    assert olap_cube.get_cube() is cube
+
+    monkeypatch.setattr(olap_cube, "data_version", lambda table: "v2")
+    assert olap_cube.get_cube() is None
+    assert olap_cube.get_cube() is None
+    for _ in range(50):
+        if started:
+            break
+        threading.Event().wait(0.01)
+    assert started == ["v2"]
@@ -0,0 +1,119 @@
+import pytest
+
+from query_builder import (
+    FOLLOW_TABLE,
+    MAX_PAGE_SIZE,
+    attribute_images_query,
+    compile_shape,
+    decode_cursor,
+    encode_cursor,
+    normalize_filters,
+    select,
+    tier_for,
+    with_limit,
+)
+
+
+def test_normalize_filters_orders_and_drops_empty_values():
+    keys, params = normalize_filters({
+        "post_month": 3,
+        "color": "레드",
+        "category_l1": "",
+        "follower_count": 0,
+        "post_year": 2024,
+        "category_l3": None,
+    })
+    assert keys == ("color", "post_year", "post_month")
+    assert params == ("레드", 2024, 3)
+
+
+def test_normalize_filters_keeps_required_empty_values():
+    # 선택 필터는 ""/0이면 빠지지만, 필수 필터는 빈 값도 그대로 비교한다 (color="" → 0건)
+    keys, params = normalize_filters({"color": "", "post_year": 0}, required=("color",))
+    assert keys == ("color",)
+    assert params == ("",)
+
+
+def test_normalize_filters_sorts_aliased_keys_by_alias_then_column():
+    keys, _ = normalize_filters({"b.item_type": "x", "a.category_l1": "y", "a.item_type": "z"})
+    assert keys == ("a.item_type", "a.category_l1", "b.item_type")
+
+
+def test_normalize_filters_rejects_unknown_column():
+    with pytest.raises(ValueError):
+        normalize_filters({"s3_key": "x"})
+
+
+def test_same_filter_shape_compiles_to_same_statement():
+    first = select(FOLLOW_TABLE, "s3_key", {"color": "레드", "post_year": 2024})
+    second = select(FOLLOW_TABLE, "s3_key", {"post_year": 2023, "color": "블루"})
+    assert first.shape == second.shape
+    assert compile_shape(first.shape) is compile_shape(second.shape)
+    assert first.params != second.params
+
+
+def test_compile_shape_numbers_parameters_in_order():
+    query = select(
+        FOLLOW_TABLE, "s3_key", {"color": "레드", "follower_count": 100},
+        conditions=("s3_key IS NOT NULL",), order_by="follower_count DESC", limit=20,
+    )
+    compiled = compile_shape(query.shape)
+    assert compiled.sql == (
+        f"SELECT s3_key FROM {FOLLOW_TABLE} WHERE color = $1 AND follower_count >= $2 "
+        "AND s3_key IS NOT NULL ORDER BY follower_count DESC LIMIT $3"
+    )
+    assert compiled.text_sql.count("%s") == compiled.param_count == len(query.params) == 3
+    assert query.params == ("레드", 100, 20)
+
+
+def test_keyset_condition_and_subquery_parameters():
+    sub = select(FOLLOW_TABLE, "post_id", {"pattern": "스트라이프"})
+    query = select(
+        FOLLOW_TABLE, "s3_key", {"color": "레드"},
+        subquery=("post_id", sub),
+        keyset=(("follower_count", "post_id", "s3_key"), (500, 42, "img/1.jpg")),
+        order_by="follower_count DESC, post_id DESC, s3_key DESC", limit=10,
+    )
+    compiled = compile_shape(query.shape)
+    assert "(follower_count, post_id, s3_key) < ($2, $3, $4)" in compiled.sql
+    assert f"post_id IN (SELECT post_id FROM {FOLLOW_TABLE} WHERE pattern = $5)" in compiled.sql
+    assert compiled.sql.endswith("LIMIT $6")
+    assert query.params == ("레드", 500, 42, "img/1.jpg", "스트라이프", 10)
+
+
+def test_attribute_images_query_pages_by_keyset():
+    cursor = encode_cursor(1200, 98765, "img/1.jpg")
+    query = attribute_images_query("color", "", "상의", None, 2024, 3, 0, 10 ** 6, cursor)
+    compiled = compile_shape(query.shape)
+    # 필수 컬럼은 빈 값도 비교, 선택 필터는 빈 값이면 제외
+    assert f"FROM {FOLLOW_TABLE} WHERE color = $1 AND category_l1 = $2" in compiled.sql
+    assert "(follower_count, post_id, s3_key) < (" in compiled.sql
+    assert query.params == ("", "상의", 2024, 3, 1200, 98765, "img/1.jpg", MAX_PAGE_SIZE)
+
+
+def test_with_limit_replaces_only_the_last_parameter():
+    query = select(FOLLOW_TABLE, "s3_key", {"color": "레드"}, limit=10)
+    assert with_limit(query, 44).params == ("레드", 44)
+    with pytest.raises(ValueError):
+        with_limit(select(FOLLOW_TABLE, "s3_key", {"color": "레드"}), 5)
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor(1200, 98765, "img/한글 파일.jpg")
+    assert "=" not in cursor
+    assert decode_cursor(cursor, 3) == (1200, 98765, "img/한글 파일.jpg")
+
+
+@pytest.mark.parametrize("cursor", ["not-base64!!", encode_cursor(1, 2), encode_cursor(1, 2, 3, 4)])
+def test_decode_cursor_rejects_malformed_or_wrong_size(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, 3)
+
+
+def test_tier_for_picks_the_closest_lower_tier():
+    tiers = [0, 10000, 50000]
+    assert tier_for(None, tiers) == 0
+    assert tier_for(9999, tiers) == 0
+    assert tier_for(10000, tiers) == 10000
+    assert tier_for(60000, tiers) == 50000
+    assert tier_for(5, [10, 100]) == 10
@@ -0,0 +1,56 @@
+import datetime
+
+import pytest
+
+from scheduler import CronSchedule, IntervalSchedule
+
+
+def next_after(expression, moment):
+    timestamp = CronSchedule(expression).next_after(moment.timestamp())
+    return datetime.datetime.fromtimestamp(timestamp)
+
+
+def test_every_minute_rounds_up_to_next_minute():
+    assert next_after("* * * * *", datetime.datetime(2024, 3, 1, 10, 15, 30)) == datetime.datetime(2024, 3, 1, 10, 16)
+
+
+def test_step_and_range_fields():
+    start = datetime.datetime(2024, 3, 1, 10, 16)
+    assert next_after("*/15 * * * *", start) == datetime.datetime(2024, 3, 1, 10, 30)
+    assert next_after("0 9-17/4 * * *", start) == datetime.datetime(2024, 3, 1, 13, 0)
+    assert next_after("5,35 3 * * *", start) == datetime.datetime(2024, 3, 2, 3, 5)
+
+
+def test_month_and_year_rollover():
+    assert next_after("0 0 1 1 *", datetime.datetime(2024, 6, 1)) == datetime.datetime(2025, 1, 1)
+    assert next_after("30 2 29 2 *", datetime.datetime(2024, 3, 1)) == datetime.datetime(2028, 2, 29, 2, 30)
+
+
+def test_weekday_sunday_is_zero_or_seven():
+    # 2024-03-01은 금요일
+    start = datetime.datetime(2024, 3, 1, 12, 0)
+    assert next_after("0 4 * * 0", start) == datetime.datetime(2024, 3, 3, 4, 0)
+    assert next_after("0 4 * * 7", start) == datetime.datetime(2024, 3, 3, 4, 0)
+    assert next_after("0 4 * * 1-5", start) == datetime.datetime(2024, 3, 4, 4, 0)
+
+
+def test_day_and_weekday_restrictions_are_ored():
+    # 일과 요일이 모두 지정되면 cron처럼 둘 중 하나만 맞아도 실행 (15일 또는 월요일)
+    assert next_after("0 0 15 * 1", datetime.datetime(2024, 3, 1)) == datetime.datetime(2024, 3, 4)
+
+
+@pytest.mark.parametrize("expression", ["* * * *", "60 * * * *", "* 24 * * *", "* * 0 * *", "*/0 * * * *"])
+def test_invalid_expressions(expression):
+    with pytest.raises(ValueError):
+        CronSchedule(expression)
+
+
+def test_impossible_date_raises_on_next_after():
+    with pytest.raises(ValueError):
+        CronSchedule("0 0 31 2 *").next_after(datetime.datetime(2024, 1, 1).timestamp())
+
+
+def test_interval_schedule():
+    assert IntervalSchedule(30).next_after(100.0) == 130.0
+    with pytest.raises(ValueError):
+        IntervalSchedule(0)
@@ -0,0 +1,71 @@
+import datetime
+import decimal
+
+import orjson
+import pytest
+
+import serialization
+from serialization import ColumnSet, RowSet, dumps, rows_payload
+
+COLUMNS = ("category_l1", "follower_count", "post_date", "ratio", "color", "tags", "price")
+ROWS = [
+    ("상의", 1200, datetime.datetime(2024, 3, 1, 9, 30), 0.5, "블랙", ["#미니멀", "#데일리"], decimal.Decimal("12.50")),
+    ("하의", None, datetime.datetime(2024, 3, 2), 1.0, "화이트, 아이보리", [], decimal.Decimal("3")),
+    ("상의", 0, None, None, None, {"k": "v"}, None),
+    ("아우터", 5, datetime.datetime(2024, 3, 3, 0, 0, 1), 2.25, '따옴표 " 포함', None, decimal.Decimal("0.1")),
+]
+
+
+def expected_records(columns, rows):
+    return orjson.loads(dumps([dict(zip(columns, row)) for row in rows]))
+
+
+@pytest.fixture(autouse=True)
+def small_chunks(monkeypatch):
+    # 청크 경계를 넘는 경우까지 확인
+    monkeypatch.setattr(serialization, "RECORD_CHUNK_ROWS", 3)
+
+
+def test_rowset_encodes_row_objects_without_dicts():
+    encoded = dumps({"success": True, "data": RowSet(COLUMNS, ROWS)})
+    payload = orjson.loads(encoded)
+    assert payload["data"] == expected_records(COLUMNS, ROWS)
+    assert payload["data"][0]["price"] == 12.5
+    assert payload["data"][1]["price"] == 3
+    assert payload["data"][0]["post_date"] == "2024-03-01T09:30:00"
+    assert payload["data"][1]["color"] == "화이트, 아이보리"
+
+
+def test_columnset_matches_rowset_bytes():
+    buffers = [list(values) for values in zip(*ROWS)]
+    assert dumps(ColumnSet(COLUMNS, buffers)) == dumps(RowSet(COLUMNS, ROWS))
+
+
+def test_bool_and_int_are_not_merged():
+    rows = [(1, True), (True, 1), (0, False)]
+    assert orjson.loads(dumps(RowSet(("a", "b"), rows))) == [
+        {"a": 1, "b": True}, {"a": True, "b": 1}, {"a": 0, "b": False},
+    ]
+
+
+def test_empty_results():
+    assert dumps(RowSet(COLUMNS, [])) == b"[]"
+    assert dumps(ColumnSet(COLUMNS, [[] for _ in COLUMNS])) == b"[]"
+
+
+def test_project_and_column():
+    rowset = RowSet(COLUMNS, ROWS)
+    assert rowset.column("color") == ["블랙", "화이트, 아이보리", None, '따옴표 " 포함']
+    projected = rowset.project("color", "category_l1")
+    assert projected.columns == ("color", "category_l1")
+    assert projected.rows[0] == ("블랙", "상의")
+    assert rowset.project(*COLUMNS) is rowset
+
+    columnset = ColumnSet(COLUMNS, [list(values) for values in zip(*ROWS)])
+    assert columnset.project("follower_count").column("follower_count") == [1200, None, 0, 5]
+    assert list(columnset) == ROWS
+
+
+def test_columnar_payload_keeps_tuples():
+    payload = orjson.loads(dumps(rows_payload(RowSet(("a", "b"), [(1, "x")]), columnar=True)))
+    assert payload == {"columns": ["a", "b"], "rows": [[1, "x"]]}
@@ -0,0 +1,90 @@
+import asyncio
+import io
+import threading
+
+import pytest
+from PIL import Image
+
+from thumbnails import Busy, DiskLRUCache, HttpOrigin, LocalOrigin, OriginError, ThumbnailService, origin_path
+
+BASE = "https://bpcc-prd-s3-seoul-aim.s3.ap-northeast-2.amazonaws.com"
+# DB의 s3_key 실제 형태 (frontend/public/data/temp_style.csv)
+REAL_KEY = f"{BASE}/ai_trend/instagram/thumbnail/yen2zang/C_iSVEXypay.jpg"
+
+
+def test_full_url_key_under_base_is_accepted():
+    assert origin_path(REAL_KEY, BASE) == "ai_trend/instagram/thumbnail/yen2zang/C_iSVEXypay.jpg"
+    assert HttpOrigin(BASE).url(REAL_KEY) == REAL_KEY
+
+
+def test_relative_key_is_joined_to_base():
+    assert HttpOrigin(BASE + "/").url("ai_trend/a b.jpg") == f"{BASE}/ai_trend/a%20b.jpg"
+
+
+def test_encoded_full_url_round_trips():
+    assert HttpOrigin(BASE).url(f"{BASE}/ai_trend/a%20b.jpg") == f"{BASE}/ai_trend/a%20b.jpg"
+
+
+@pytest.mark.parametrize("key", [
+    "https://evil.example.com/ai_trend/a.jpg",
+    "http://bpcc-prd-s3-seoul-aim.s3.ap-northeast-2.amazonaws.com/ai_trend/a.jpg",
+    "https://user@bpcc-prd-s3-seoul-aim.s3.ap-northeast-2.amazonaws.com/ai_trend/a.jpg",
+    "//evil.example.com/a.jpg",
+    f"{BASE}/ai_trend/a.jpg?x-id=GetObject",
+    "ai_trend/../../etc/passwd",
+])
+def test_keys_outside_base_are_rejected(key):
+    with pytest.raises(OriginError):
+        HttpOrigin(BASE).url(key)
+
+
+def test_base_path_prefix_must_match_whole_segment():
+    with pytest.raises(OriginError):
+        origin_path(f"{BASE}/ai_trend_other/a.jpg", BASE + "/ai_trend")
+    assert origin_path(f"{BASE}/ai_trend/a.jpg", BASE + "/ai_trend") == "a.jpg"
+
+
+def test_local_origin_reads_full_url_key(tmp_path):
+    target = tmp_path / "ai_trend/instagram/thumbnail/yen2zang/C_iSVEXypay.jpg"
+    target.parent.mkdir(parents=True)
+    target.write_bytes(b"jpeg")
+    origin = LocalOrigin(tmp_path, BASE)
+    assert origin.fetch(REAL_KEY) == b"jpeg"
+    with pytest.raises(OriginError):
+        origin.fetch("https://evil.example.com/ai_trend/instagram/thumbnail/yen2zang/C_iSVEXypay.jpg")
+
+
+class BlockingOrigin:
+    def __init__(self):
+        self.release = threading.Event()
+
+    def fetch(self, key):
+        self.release.wait(5)
+        image = Image.new("RGB", (400, 300), "red")
+        output = io.BytesIO()
+        image.save(output, "JPEG")
+        return output.getvalue()
+
+
+def test_fetch_sheds_when_origin_queue_is_full(tmp_path):
+    origin = BlockingOrigin()
+    service = ThumbnailService(origin=origin, cache=DiskLRUCache(tmp_path, 10 ** 9, 1),
+                               workers=1, fetch_concurrency=1, fetch_queue=1)
+
+    async def scenario():
+        first = asyncio.ensure_future(service.fetch(REAL_KEY, 160, "jpeg"))
+        second = asyncio.ensure_future(service.fetch(REAL_KEY, 320, "jpeg"))
+        await asyncio.sleep(0)
+        with pytest.raises(Busy):
+            await service.fetch(REAL_KEY, 640, "jpeg")
+        origin.release.set()
+        return await first, await second
+
+    try:
+        small, medium = asyncio.run(scenario())
+        assert Image.open(io.BytesIO(small)).width == 160
+        assert Image.open(io.BytesIO(medium)).width == 320
+        # 캐시 적중은 풀을 거치지 않음
+        assert asyncio.run(service.fetch(REAL_KEY, 160, "jpeg")) == small
+    finally:
+        service.shutdown()
@@ -0,0 +1,62 @@
+import pytest
+
+import approx
+from trends import build_series, month_range, rollup_query
+
+ROWS = [
+    (2023, 12, "블랙", 6),
+    (2023, 12, "화이트", 2),
+    (2024, 1, "블랙", 3),
+    (2024, 2, "화이트", 9),
+    (2024, 2, "블랙", 1),
+    (2024, 2, "레드", 1),
+    # 기간 밖 행은 무시
+    (2023, 1, "레드", 100),
+]
+
+
+def test_month_range_crosses_year_boundary():
+    assert month_range(2024, 2, 4) == [(2023, 11), (2023, 12), (2024, 1), (2024, 2)]
+
+
+def test_series_fill_empty_months_and_compute_shares():
+    result = build_series(ROWS, months=4)
+    assert result["periods"] == ["2023-11", "2023-12", "2024-01", "2024-02"]
+    assert result["totals"] == [0, 8, 3, 11]
+    by_value = {item["value"]: item for item in result["series"]}
+    assert by_value["블랙"]["counts"] == [0, 6, 3, 1]
+    assert by_value["블랙"]["shares"] == [0, 75.0, 100.0, 9.09]
+    assert by_value["화이트"]["total"] == 11
+    assert "errors" not in by_value["블랙"]
+
+
+def test_top_values_by_period_total_then_name():
+    result = build_series(ROWS, months=4, top=2)
+    assert [item["value"] for item in result["series"]] == ["화이트", "블랙"]
+
+
+def test_explicit_values_and_end_month():
+    result = build_series(ROWS, values=["레드", "그레이"], months=2, end_year=2024, end_month=1)
+    assert result["periods"] == ["2023-12", "2024-01"]
+    assert result["series"] == [
+        {"value": "레드", "total": 0, "counts": [0, 0], "shares": [0, 0]},
+        {"value": "그레이", "total": 0, "counts": [0, 0], "shares": [0, 0]},
+    ]
+
+
+def test_approximate_rows_carry_error_bounds():
+    rows = [(2024, 1, "블랙", 40.4, 100.0), (2024, 1, "화이트", 59.6, 0.0)]
+    result = build_series(rows, months=1)
+    black = result["series"][1]
+    assert black["counts"] == [40]
+    assert black["errors"] == [approx.error_bound(100.0)]
+    assert result["totals"] == [100]
+
+
+def test_empty_rows():
+    assert build_series([]) == {"periods": [], "totals": [], "series": []}
+
+
+def test_rollup_query_rejects_unknown_dimension():
+    with pytest.raises(ValueError):
+        rollup_query("unknown")
@@ -0,0 +1,395 @@
+"""갤러리용 썸네일 프록시
+
+원본 이미지를 origin(S3 URL 또는 로컬 디렉토리)에서 받아 고정 폭(THUMBNAIL_WIDTHS)의
+WebP/JPEG 썸네일로 변환하고, 용량 상한이 있는 디스크 LRU 캐시에 보관한다.
+리사이즈는 CPU 작업이므로 프로세스 풀에서 실행한다.
+
+    THUMBNAIL_ORIGIN=s3     # THUMBNAIL_ORIGIN_BASE_URL 아래 key (리다이렉트는 거부)
+    THUMBNAIL_ORIGIN=local  # THUMBNAIL_LOCAL_DIR 아래 파일 (개발/테스트 용)
+
+key는 DB의 s3_key 그대로(THUMBNAIL_ORIGIN_BASE_URL로 시작하는 전체 URL) 또는 base 아래 상대 경로다.
+원본 요청은 전용 스레드 풀(THUMBNAIL_FETCH_CONCURRENCY + 대기 THUMBNAIL_FETCH_QUEUE)에서만
+실행하므로, 느린 원본이 API 공용 스레드 풀을 점유하지 않는다.
+"""
+import asyncio
+import fcntl
+import hashlib
+import io
+import logging
+import os
+import tempfile
+import threading
+import urllib.request
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import quote, unquote, urlparse
+
+from PIL import Image, ImageOps
+
+from config import (
+    THUMBNAIL_CACHE_DIR,
+    THUMBNAIL_CACHE_MAX_BYTES,
+    THUMBNAIL_FETCH_CONCURRENCY,
+    THUMBNAIL_FETCH_QUEUE,
+    THUMBNAIL_FETCH_TIMEOUT,
+    THUMBNAIL_LOCAL_DIR,
+    THUMBNAIL_ORIGIN,
+    THUMBNAIL_ORIGIN_BASE_URL,
+    THUMBNAIL_PREFETCH_COUNT,
+    THUMBNAIL_WIDTHS,
+    THUMBNAIL_WORKERS,
+    WEB_WORKER_COUNT,
+)
+
+logger = logging.getLogger(__name__)
+
+FORMATS = {
+    "webp": ("WEBP", "image/webp", {"quality": 80, "method": 4}),
+    "jpeg": ("JPEG", "image/jpeg", {"quality": 82, "optimize": True, "progressive": True}),
+}
+DEFAULT_WIDTH = THUMBNAIL_WIDTHS[len(THUMBNAIL_WIDTHS) // 2]
+MAX_ORIGINAL_BYTES = 30 * 1024 * 1024
+
+
+class OriginError(Exception):
+    """원본 이미지를 가져올 수 없음"""
+
+
+class _RefuseRedirects(urllib.request.HTTPRedirectHandler):
+    """리다이렉트를 따라가지 않음 (원본 버킷 밖으로 요청이 나가지 않도록)"""
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        raise OriginError(f"원본 이미지 리다이렉트는 허용되지 않습니다: {code}")
+
+
+class Busy(Exception):
+    """원본 요청 대기열이 가득 참 (재시도 권장 초)"""
+
+    retry_after = 1
+
+
+def origin_path(key, base_url=THUMBNAIL_ORIGIN_BASE_URL):
+    """key → base_url 아래 상대 경로 ('a/b.jpg')
+
+    전체 URL은 스킴/호스트가 base_url과 같고 경로가 base_url 경로 아래일 때만 허용한다.
+    query/fragment나 '..' 경로 조각이 있으면 거부한다.
+    """
+    parsed = urlparse(key)
+    if parsed.query or parsed.fragment or parsed.params:
+        raise OriginError("이미지 키에 query/fragment는 허용되지 않습니다.")
+    if parsed.scheme or parsed.netloc or key.startswith("//"):
+        base = urlparse(base_url.rstrip("/"))
+        if not base.netloc:
+            raise OriginError("THUMBNAIL_ORIGIN_BASE_URL이 설정되지 않아 전체 URL 키를 받을 수 없습니다.")
+        prefix = base.path + "/"
+        if (parsed.scheme.lower() != base.scheme.lower()
+                or parsed.netloc.lower() != base.netloc.lower()
+                or not parsed.path.startswith(prefix)):
+            raise OriginError("허용되지 않은 원본 주소입니다.")
+        path = unquote(parsed.path[len(prefix):])
+    else:
+        path = key
+    path = path.lstrip("/")
+    if not path or ".." in path.split("/"):
+        raise OriginError("허용되지 않은 이미지 경로입니다.")
+    return path
+
+
+class HttpOrigin:
+    """S3(HTTP) 원본: THUMBNAIL_ORIGIN_BASE_URL 아래 key만 요청
+
+    key는 클라이언트가 보낸 값이므로 origin_path로 base_url 아래 경로만 남기고,
+    경로는 quote로 다시 인코딩해 base_url 뒤에 붙인다.
+    """
+
+    def __init__(self, base_url=THUMBNAIL_ORIGIN_BASE_URL, timeout=THUMBNAIL_FETCH_TIMEOUT):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self._opener = urllib.request.build_opener(_RefuseRedirects)
+
+    def url(self, key):
+        if not self.base_url:
+            raise OriginError("THUMBNAIL_ORIGIN_BASE_URL이 설정되지 않았습니다.")
+        return f"{self.base_url}/{quote(origin_path(key, self.base_url))}"
+
+    def fetch(self, key):
+        try:
+            with self._opener.open(self.url(key), timeout=self.timeout) as response:
+                data = response.read(MAX_ORIGINAL_BYTES + 1)
+        except OSError as exc:
+            raise OriginError(f"원본 이미지를 가져오지 못했습니다: {exc}") from exc
+        if len(data) > MAX_ORIGINAL_BYTES:
+            raise OriginError("원본 이미지가 너무 큽니다.")
+        return data
+
+
+class LocalOrigin:
+    """로컬 디렉토리 원본 (S3 대용, key 해석은 HttpOrigin과 같음)"""
+
+    def __init__(self, directory=THUMBNAIL_LOCAL_DIR, base_url=THUMBNAIL_ORIGIN_BASE_URL):
+        self.directory = Path(directory).resolve()
+        self.base_url = base_url
+
+    def fetch(self, key):
+        path = (self.directory / origin_path(key, self.base_url)).resolve()
+        if self.directory not in path.parents:
+            raise OriginError("허용되지 않은 이미지 경로입니다.")
+        try:
+            return path.read_bytes()
+        except OSError as exc:
+            raise OriginError(f"원본 이미지를 읽지 못했습니다: {exc}") from exc
+
+
+def make_origin(kind=THUMBNAIL_ORIGIN):
+    if kind == "local":
+        return LocalOrigin()
+    if kind == "s3":
+        return HttpOrigin()
+    raise ValueError(f"지원하지 않는 THUMBNAIL_ORIGIN입니다: {kind}")
+
+
+def render_thumbnail(data, width, fmt):
+    """원본 바이트 → 썸네일 바이트 (프로세스 풀에서 실행)"""
+    pil_format, _, options = FORMATS[fmt]
+    with Image.open(io.BytesIO(data)) as image:
+        image = ImageOps.exif_transpose(image)
+        if image.width > width:
+            height = max(1, round(image.height * width / image.width))
+            image = image.resize((width, height), Image.LANCZOS)
+        if fmt == "jpeg" and image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        elif image.mode not in ("RGB", "RGBA", "L"):
+            image = image.convert("RGBA")
+        output = io.BytesIO()
+        image.save(output, pil_format, **options)
+    return output.getvalue()
+
+
+class DiskLRUCache:
+    """용량 상한이 있는 파일 캐시 (mtime = 최근 사용 시각)
+
+    캐시 디렉터리는 모든 워커가 함께 쓰므로 용량은 디렉터리를 다시 훑어서 계산한다.
+    워커는 마지막 스캔 이후 자기가 쓴 양만 더해 두었다가, 남은 여유의 1/워커 수를 넘으면
+    flock을 잡은 한 워커만 스캔/삭제한다 (다른 워커가 정리 중이면 다음 put에서 다시 확인).
+    """
+
+    LOCK_NAME = ".evict.lock"
+
+    def __init__(self, directory=THUMBNAIL_CACHE_DIR, max_bytes=THUMBNAIL_CACHE_MAX_BYTES,
+                 workers=WEB_WORKER_COUNT):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.workers = max(1, workers)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+        entries = self._scan()
+        self._set_scanned(sum(size for _, size, _ in entries), len(entries))
+
+    @staticmethod
+    def key_name(key, width, fmt):
+        return hashlib.sha1(f"{key}\0{width}\0{fmt}".encode("utf-8")).hexdigest() + ".thumb"
+
+    def get(self, name):
+        path = self.directory / name
+        try:
+            data = path.read_bytes()
+            os.utime(path)
+        except OSError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return data
+
+    def put(self, name, data):
+        with tempfile.NamedTemporaryFile(dir=self.directory, suffix=".tmp", delete=False) as handle:
+            handle.write(data)
+        os.replace(handle.name, self.directory / name)
+        with self._lock:
+            self.total_bytes += len(data)
+            self.files += 1
+            if self.total_bytes >= self._check_at:
+                self._evict()
+
+    def _scan(self):
+        """[(mtime, 크기, 파일명)] (다른 워커가 지운 파일은 건너뜀)"""
+        entries = []
+        with os.scandir(self.directory) as scan:
+            for entry in scan:
+                if not entry.name.endswith(".thumb"):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.name))
+        return entries
+
+    def _set_scanned(self, total_bytes, files):
+        self.total_bytes = total_bytes
+        self.files = files
+        # 다음 확인까지 이 워커가 더 쓸 수 있는 양 = 남은 여유 / 워커 수
+        self._check_at = total_bytes + max(0, self.max_bytes - total_bytes) / self.workers
+
+    def _evict(self):
+        """디렉터리 전체를 다시 훑어 상한을 넘었으면 가장 오래 사용하지 않은 파일부터 상한의 90%까지 삭제"""
+        with open(self.directory / self.LOCK_NAME, "a") as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return
+            entries = self._scan()
+            total_bytes = sum(size for _, size, _ in entries)
+            files = len(entries)
+            if total_bytes > self.max_bytes:
+                target = self.max_bytes * 0.9
+                for _, size, name in sorted(entries):
+                    if total_bytes <= target:
+                        break
+                    try:
+                        (self.directory / name).unlink()
+                    except OSError:
+                        continue
+                    total_bytes -= size
+                    files -= 1
+                    self.evicted += 1
+            self._set_scanned(total_bytes, files)
+
+    def stats(self):
+        return {
+            "files": self.files,
+            "bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evicted": self.evicted,
+        }
+
+
+class ThumbnailService:
+    def __init__(self, origin=None, cache=None, workers=THUMBNAIL_WORKERS,
+                 fetch_concurrency=THUMBNAIL_FETCH_CONCURRENCY, fetch_queue=THUMBNAIL_FETCH_QUEUE):
+        self.origin = origin or make_origin()
+        self.cache = cache or DiskLRUCache()
+        self._render_pool = ProcessPoolExecutor(max_workers=workers)
+        self._prefetch_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="thumbnail-prefetch")
+        self._fetch_pool = ThreadPoolExecutor(max_workers=max(1, fetch_concurrency),
+                                              thread_name_prefix="thumbnail-fetch")
+        self._fetch_limit = max(1, fetch_concurrency) + max(0, fetch_queue)
+        self._fetch_pending = 0
+        self._fetch_lock = threading.Lock()
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+
+    @staticmethod
+    def _validate(width, fmt):
+        if width not in THUMBNAIL_WIDTHS:
+            raise ValueError(f"지원하지 않는 썸네일 폭입니다: {width}")
+        if fmt not in FORMATS:
+            raise ValueError(f"지원하지 않는 썸네일 형식입니다: {fmt}")
+
+    async def fetch(self, key, width=DEFAULT_WIDTH, fmt="webp"):
+        """요청 경로용: 캐시 적중은 바로 반환, 미스는 전용 풀에서 생성 (대기열이 차면 Busy)"""
+        self._validate(width, fmt)
+        name = self.cache.key_name(key, width, fmt)
+        data = self.cache.get(name)
+        if data is not None:
+            return data
+        with self._fetch_lock:
+            if self._fetch_pending >= self._fetch_limit:
+                raise Busy("썸네일 원본 요청 대기열이 가득 찼습니다.")
+            self._fetch_pending += 1
+        try:
+            future = self._fetch_pool.submit(self._generate, key, width, fmt, name)
+        except BaseException:
+            self._fetch_done(None)
+            raise
+        future.add_done_callback(self._fetch_done)
+        return await asyncio.wrap_future(future)
+
+    def _fetch_done(self, _future):
+        with self._fetch_lock:
+            self._fetch_pending -= 1
+
+    def get(self, key, width=DEFAULT_WIDTH, fmt="webp"):
+        """썸네일 바이트 (호출한 스레드에서 바로 생성, 프리페치용)"""
+        self._validate(width, fmt)
+        name = self.cache.key_name(key, width, fmt)
+        data = self.cache.get(name)
+        if data is not None:
+            return data
+        return self._generate(key, width, fmt, name)
+
+    def _generate(self, key, width, fmt, name):
+        """캐시 미스: 원본을 받아 생성 (같은 썸네일 동시 요청은 한 번만 생성)"""
+        with self._inflight_lock:
+            event = self._inflight.get(name)
+            owner = event is None
+            if owner:
+                event = self._inflight[name] = threading.Event()
+        if not owner:
+            event.wait()
+            data = self.cache.get(name)
+            if data is not None:
+                return data
+
+        try:
+            original = self.origin.fetch(key)
+            data = self._render_pool.submit(render_thumbnail, original, width, fmt).result()
+            self.cache.put(name, data)
+            return data
+        finally:
+            if owner:
+                with self._inflight_lock:
+                    self._inflight.pop(name, None)
+                event.set()
+
+    def prefetch(self, keys, width=DEFAULT_WIDTH, fmt="webp"):
+        """조회 결과 상위 이미지의 썸네일을 백그라운드에서 미리 생성"""
+        for key in list(keys)[:THUMBNAIL_PREFETCH_COUNT]:
+            if key:
+                self._prefetch_pool.submit(self._prefetch_one, key, width, fmt)
+
+    def _prefetch_one(self, key, width, fmt):
+        try:
+            self.get(key, width, fmt)
+        except Exception as exc:
+            logger.debug("thumbnail prefetch failed for %s: %s", key, exc)
+
+    def shutdown(self):
+        self._prefetch_pool.shutdown(wait=False, cancel_futures=True)
+        self._fetch_pool.shutdown(wait=False, cancel_futures=True)
+        self._render_pool.shutdown(wait=False, cancel_futures=True)
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_service():
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = ThumbnailService()
+    return _service
+
+
+def prefetch_rowset(rowset):
+    """이미지 조회 RowSet의 s3_key 썸네일 미리 생성 (프리페치 비활성화 시 무시)"""
+    if THUMBNAIL_PREFETCH_COUNT <= 0 or not rowset:
+        return
+    try:
+        get_service().prefetch(rowset.column("s3_key"))
+    except Exception:
+        logger.exception("thumbnail prefetch scheduling failed")
+
+
+def shutdown():
+    global _service
+    with _service_lock:
+        if _service is not None:
+            _service.shutdown()
+            _service = None
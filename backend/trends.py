@@ -0,0 +1,177 @@
+"""속성별 월간 추이(시계열) 조회
+
+차원(color, pattern, detail_1, category_l3, item_type, mood_look)과 필터 조합마다
+(연도, 월, 값)별 건수를 GROUP BY 한 번으로 집계한 롤업을 만들고,
+데이터 버전을 키에 포함해 Redis에 캐시한다.
+요청된 값들의 월별 건수/비중 시계열은 캐시된 롤업에서 빈 달을 0으로 채워 만든다.
+approx=true면 원본 대신 표본(approx.sample_source)에서 추정 건수와 95% 오차 범위를 집계하고,
+HLL 스케치로 월별 고유 게시물 수 추정치를 덧붙인다.
+"""
+import hashlib
+import json
+
+import approx
+from cache import cached_json
+from config import TRENDS_CACHE_TTL
+from data_version import data_version
+from db import pooled_connection
+from query_builder import FOLLOW_TABLE, ITEMTYPE_TABLE, execute, select
+
+MOOD_RATE_TABLE = "ai_image_dm.instagram_web_mood_rate"
+REDIS_PREFIX = "trendai:trends"
+MAX_MONTHS = 60
+MAX_VALUES = 50
+
+# 차원 → (테이블, 연도 식, 월 식, follower_count 필터 지원 여부)
+_PERIOD_COLUMNS = ("post_year", "post_month", True)
+_DATE_PERIOD = (
+    "EXTRACT(YEAR FROM post_date)::int",
+    "EXTRACT(MONTH FROM post_date)::int",
+    False,
+)
+DIMENSIONS = {
+    "color": (FOLLOW_TABLE,) + _PERIOD_COLUMNS,
+    "pattern": (FOLLOW_TABLE,) + _PERIOD_COLUMNS,
+    "detail_1": (FOLLOW_TABLE,) + _PERIOD_COLUMNS,
+    "category_l3": (FOLLOW_TABLE,) + _PERIOD_COLUMNS,
+    "item_type": (ITEMTYPE_TABLE,) + _PERIOD_COLUMNS,
+    "mood_look": (MOOD_RATE_TABLE,) + _DATE_PERIOD,
+}
+
+
+def rollup_query(dimension, category_l1=None, category_l3=None, follower_count=None, approximate=False):
+    """(연도, 월, 값, 건수) 롤업 쿼리 (approximate면 (연도, 월, 값, 추정 건수, 분산))"""
+    if dimension not in DIMENSIONS:
+        raise ValueError(f"지원하지 않는 차원입니다: {dimension}")
+    table, year_expr, month_expr, supports_followers = DIMENSIONS[dimension]
+    if follower_count and not supports_followers:
+        raise ValueError(f"{dimension} 차원은 follower_count 필터를 지원하지 않습니다.")
+    aggregate = "COUNT(*) AS count"
+    if approximate:
+        if table != FOLLOW_TABLE:
+            raise ValueError(f"{dimension} 차원은 approx 모드를 지원하지 않습니다.")
+        table, aggregate = approx.sample_source(), approx.ESTIMATE_COLUMNS
+    return select(
+        table,
+        f"{year_expr} AS post_year, {month_expr} AS post_month, {dimension}, {aggregate}",
+        {
+            "category_l1": category_l1,
+            "category_l3": category_l3 if dimension != "category_l3" else None,
+            "follower_count": follower_count,
+        },
+        conditions=(
+            f"{dimension} IS NOT NULL",
+            f"{dimension} != ''",
+            f"{year_expr} IS NOT NULL",
+            f"{month_expr} IS NOT NULL",
+        ),
+        group_by="1, 2, 3",
+    )
+
+
+def load_rollup(dimension, category_l1=None, category_l3=None, follower_count=None, approximate=False):
+    """롤업 행 목록 [(연도, 월, 값, 건수)] — 데이터 버전이 같으면 Redis 캐시 사용
+
+    approximate면 [(연도, 월, 값, 추정 건수, 분산)]
+    """
+    query = rollup_query(dimension, category_l1, category_l3, follower_count, approximate)
+    tables = (DIMENSIONS[dimension][0],) + ((approx.SAMPLE_TABLE,) if approximate else ())
+    signature = json.dumps([dimension, approximate, query.params], ensure_ascii=False, default=str)
+    key = (
+        f"{REDIS_PREFIX}:{data_version(*tables)}:"
+        f"{hashlib.sha1(signature.encode('utf-8')).hexdigest()[:16]}"
+    )
+
+    def load():
+        with pooled_connection() as conn:
+            with conn.cursor() as cursor:
+                execute(cursor, query)
+                if approximate:
+                    return [
+                        (int(year), int(month), value, float(estimate), float(variance))
+                        for year, month, value, estimate, variance in cursor
+                    ]
+                return [(int(year), int(month), value, int(count)) for year, month, value, count in cursor]
+
+    return [tuple(row) for row in cached_json(key, load, TRENDS_CACHE_TTL)]
+
+
+def month_range(end_year, end_month, months):
+    """(end_year, end_month)까지 months개월 [(연도, 월)] 오름차순"""
+    index = end_year * 12 + end_month - 1
+    return [(i // 12, i % 12 + 1) for i in range(index - months + 1, index + 1)]
+
+
+def build_series(rows, values=None, months=12, end_year=None, end_month=None, top=10):
+    """롤업 행 → 빈 달을 0으로 채운 월별 건수/비중 시계열
+
+    values가 없으면 기간 내 건수 상위 top개 값을 사용한다.
+    비중(share)은 같은 달 전체 건수 대비 백분율.
+    근사 롤업(분산 포함 행)이면 건수는 추정치이고, 값별 월간 95% 오차 범위(errors)를 함께 돌려준다.
+    """
+    if not rows:
+        return {"periods": [], "totals": [], "series": []}
+    if end_year is None or end_month is None:
+        end_year, end_month = max((row[0], row[1]) for row in rows)
+    periods = month_range(end_year, end_month, months)
+    position = {period: i for i, period in enumerate(periods)}
+    approximate = len(rows[0]) > 4
+
+    totals = [0] * len(periods)
+    counts = {}
+    variances = {}
+    for year, month, value, count, *variance in rows:
+        i = position.get((year, month))
+        if i is None:
+            continue
+        totals[i] += count
+        counts.setdefault(value, [0] * len(periods))[i] += count
+        if variance:
+            variances.setdefault(value, [0] * len(periods))[i] += variance[0]
+
+    if not values:
+        values = sorted(counts, key=lambda value: (-sum(counts[value]), value))[:top]
+
+    series = []
+    for value in values:
+        value_counts = counts.get(value, [0] * len(periods))
+        item = {
+            "value": value,
+            "total": round(sum(value_counts)),
+            "counts": [round(count) for count in value_counts],
+            "shares": [
+                round(count / total * 100, 2) if total else 0
+                for count, total in zip(value_counts, totals)
+            ],
+        }
+        if approximate:
+            item["errors"] = [
+                approx.error_bound(variance)
+                for variance in variances.get(value, [0] * len(periods))
+            ]
+        series.append(item)
+
+    return {
+        "periods": [f"{year}-{month:02d}" for year, month in periods],
+        "totals": [round(total) for total in totals],
+        "series": series,
+    }
+
+
+def attach_distinct_posts(result, dimension, category_l1=None, category_l3=None, follower_count=None):
+    """시계열에 HLL 스케치 기반 월별 고유 게시물 수 추정치(posts, posts_errors)를 덧붙인다
+
+    스케치는 (값, 연도, 월, 대분류) 단위라 소분류/팔로워 필터가 있거나
+    스케치가 아직 준비되지 않았으면 덧붙이지 않고 False를 돌려준다.
+    """
+    if (category_l3 and dimension != "category_l3") or follower_count:
+        return False
+    sketch = approx.get_sketch(dimension)
+    if sketch is None:
+        return False
+    periods = [tuple(int(part) for part in period.split("-")) for period in result["periods"]]
+    for item in result["series"]:
+        estimates = sketch.distinct_posts(item["value"], periods, category_l1)
+        item["posts"] = [estimate for estimate, _ in estimates]
+        item["posts_errors"] = [error for _, error in estimates]
+    return True
@@ -0,0 +1,153 @@
+"""데이터 버전 변경 알림 (Server-Sent Events)
+
+클라이언트는 /api/data-versions/stream을 구독해 두고, 테이블별 데이터 버전이 바뀌었다는
+이벤트를 받았을 때만 해당 데이터를 다시 조회한다.
+  - 프로세스마다 감시 작업 하나가 구독자가 있는 동안만 DATA_VERSION_NOTIFY_INTERVAL마다
+    pg_stat_user_tables 워터마크(data_version)를 확인하고, 바뀐 테이블이 있으면 모든 구독자에게 알린다.
+  - 구독 연결은 이벤트 대기만 하는 코루틴이므로 유휴 연결은 스레드/DB 연결을 쓰지 않는다.
+    알림은 asyncio.Event 하나를 교체하는 방식이라 구독자 수와 관계없이 O(1)이다.
+  - 프록시가 유휴 연결을 끊지 않도록 DATA_VERSION_KEEPALIVE마다 주석 줄을 보낸다.
+"""
+import asyncio
+import hashlib
+import logging
+
+import orjson
+from anyio import to_thread
+
+from config import DATA_VERSION_KEEPALIVE, DATA_VERSION_MAX_SUBSCRIBERS, DATA_VERSION_NOTIFY_INTERVAL
+from data_version import cached_table_versions, data_version, table_counters
+
+logger = logging.getLogger(__name__)
+
+# 재연결 대기 시간 (밀리초, EventSource retry 필드)
+RETRY_MS = 5000
+
+
+class TooManySubscribers(Exception):
+    """프로세스별 최대 구독 수 초과"""
+
+
+def load_versions(force=False):
+    """테이블별 데이터 버전 (data_version 토큰, 서버 캐시 키와 같은 값)"""
+    return {table: data_version(table) for table in sorted(table_counters(force))}
+
+
+def cached_combined_version():
+    """이 프로세스가 이미 읽어 둔 카운터 기준 결합 버전 (DB 조회 없음, 아직 없으면 None)
+
+    요청 시작 시점에 구해 두면, 그 요청이 읽는 데이터는 항상 이 버전 이후의 것이다.
+    """
+    versions = cached_table_versions()
+    if not versions:
+        return None
+    return combined_version({table: data_version(table, versions=versions) for table in versions})
+
+
+def combined_version(versions):
+    joined = "|".join(f"{table}={version}" for table, version in sorted(versions.items()))
+    return hashlib.sha1(joined.encode("utf-8")).hexdigest()[:12]
+
+
+def _event(name, data, event_id=None):
+    lines = [f"event: {name}"]
+    if event_id:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {orjson.dumps(data).decode()}")
+    return ("\n".join(lines) + "\n\n").encode("utf-8")
+
+
+class VersionHub:
+    """프로세스 단위 데이터 버전 감시 + 구독자 알림"""
+
+    def __init__(self, interval=DATA_VERSION_NOTIFY_INTERVAL):
+        self.interval = interval
+        self.versions = None
+        self.subscribers = 0
+        self.checks = 0
+        self.notifications = 0
+        self.last_error = None
+        self._changed = asyncio.Event()
+        self._task = None
+
+    def _payload(self, changed=()):
+        return {
+            "version": combined_version(self.versions),
+            "tables": self.versions,
+            "changed": list(changed),
+        }
+
+    async def _refresh(self):
+        versions = await to_thread.run_sync(load_versions, True)
+        self.checks += 1
+        if self.versions is None:
+            self.versions = versions
+            return
+        changed = sorted(
+            table for table in versions.keys() | self.versions.keys()
+            if versions.get(table) != self.versions.get(table)
+        )
+        if changed:
+            self.versions = versions
+            self.notifications += 1
+            changed_event, self._changed = self._changed, asyncio.Event()
+            changed_event.changed = changed
+            changed_event.set()
+
+    async def _watch(self):
+        while self.subscribers:
+            await asyncio.sleep(self.interval)
+            try:
+                await self._refresh()
+                self.last_error = None
+            except Exception as exc:
+                self.last_error = str(exc)
+                logger.warning("data version check failed: %s", exc)
+        self._task = None
+
+    async def snapshot(self):
+        """현재 버전 (감시 중이 아니면 새로 조회)"""
+        if self.versions is None or self._task is None:
+            await self._refresh()
+        return self._payload()
+
+    async def stream(self):
+        """SSE 바이트 스트림: 처음 한 번 현재 버전, 이후 변경 시 versions 이벤트"""
+        if self.subscribers >= DATA_VERSION_MAX_SUBSCRIBERS:
+            raise TooManySubscribers(f"데이터 버전 구독 수가 상한({DATA_VERSION_MAX_SUBSCRIBERS})에 도달했습니다.")
+        initial = await self.snapshot()
+        return self._subscribe(initial)
+
+    async def _subscribe(self, initial):
+        self.subscribers += 1
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._watch())
+        try:
+            yield f"retry: {RETRY_MS}\n\n".encode("utf-8")
+            yield _event("versions", initial, initial["version"])
+            while True:
+                changed_event = self._changed
+                try:
+                    await asyncio.wait_for(changed_event.wait(), DATA_VERSION_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    yield b": keepalive\n\n"
+                    continue
+                payload = self._payload(changed_event.changed)
+                yield _event("versions", payload, payload["version"])
+        finally:
+            self.subscribers -= 1
+
+    def stats(self):
+        return {
+            "subscribers": self.subscribers,
+            "max_subscribers": DATA_VERSION_MAX_SUBSCRIBERS,
+            "interval": self.interval,
+            "watching": self._task is not None,
+            "checks": self.checks,
+            "notifications": self.notifications,
+            "last_error": self.last_error,
+            "version": combined_version(self.versions) if self.versions is not None else None,
+        }
+
+
+hub = VersionHub()
@@ -1,6 +1,7 @@
 import React, { useState, useEffect } from "react";
-import API_ENDPOINTS, { apiCall } from "../config/api";
+import API_ENDPOINTS, { apiCall, thumbnailUrl } from "../config/api";
 import { clothingCategories } from "../data/clothingCategories";
+import useInfiniteImages from "../hooks/useInfiniteImages";
 import ImageModal from "./ImageModal";
 import "./ColorAnalysis.css";
 
@@ -31,15 +32,24 @@ function ColorAnalysis() {
 
   // 이미지 갤러리 관련 상태
   const [selectedColor, setSelectedColor] = useState("");
-  const [colorImages, setColorImages] = useState([]);
-  const [showImageGallery, setShowImageGallery] = useState(false);
-  const [imageLoading, setImageLoading] = useState(false);
 
   // 이미지 모달 상태
   const [isModalOpen, setIsModalOpen] = useState(false);
   const [selectedImageData, setSelectedImageData] = useState(null);
   const [error, setError] = useState("");
 
+  // 이미지 갤러리 (커서 페이지네이션 무한 스크롤)
+  const {
+    images: colorImages,
+    nextCursor,
+    loading: imageLoading,
+    loadingMore,
+    showGallery: showImageGallery,
+    loadMoreRef,
+    load: loadColorImages,
+    reset: resetColorImages,
+  } = useInfiniteImages(API_ENDPOINTS.COLOR_IMAGES, "color-images", setError);
+
   // 정렬 상태 관리
   const [sortConfig, setSortConfig] = useState({
     rising: { key: null, direction: "asc" },
@@ -137,66 +147,43 @@ function ColorAnalysis() {
     setFilters(resetFilters);
     setAppliedFilters(resetFilters);
     setSelectedColor("");
-    setColorImages([]);
-    setShowImageGallery(false);
+    resetColorImages();
     setError("");
   };
 
-  // 컬러 이미지 조회 함수
-  const fetchColorImages = async (color, currentPercent) => {
-    try {
-      setImageLoading(true);
-      setError("");
-
-      const params = new URLSearchParams({
-        color: color,
-      });
-
-      if (appliedFilters.mainCategory) {
-        params.append("category_l1", appliedFilters.mainCategory);
-      }
-      if (appliedFilters.subCategory) {
-        params.append("category_l3", appliedFilters.subCategory);
-      }
-      if (appliedFilters.year) {
-        params.append("post_year", appliedFilters.year);
-      }
-      if (appliedFilters.month) {
-        params.append("post_month", appliedFilters.month);
-      }
-      if (appliedFilters.followersMin > 0) {
-        params.append("follower_count", appliedFilters.followersMin);
-      }
+  // 컬러 이미지 조회 함수 (다음 페이지는 useInfiniteImages가 같은 조건으로 이어서 조회)
+  const fetchColorImages = (color, pageSize) => {
+    const params = new URLSearchParams({
+      color: color,
+    });
 
-      // 비중에 따라 이미지 수 동적 조정 (최소 10개, 최대 50개)
-      const imageLimit = Math.max(
-        10,
-        Math.min(50, Math.round(currentPercent * 2))
-      );
-      params.append("limit", imageLimit.toString());
+    if (appliedFilters.mainCategory) {
+      params.append("category_l1", appliedFilters.mainCategory);
+    }
+    if (appliedFilters.subCategory) {
+      params.append("category_l3", appliedFilters.subCategory);
+    }
+    if (appliedFilters.year) {
+      params.append("post_year", appliedFilters.year);
+    }
+    if (appliedFilters.month) {
+      params.append("post_month", appliedFilters.month);
+    }
+    if (appliedFilters.followersMin > 0) {
+      params.append("follower_count", appliedFilters.followersMin);
+    }
 
-      const data = await apiCall(`${API_ENDPOINTS.COLOR_IMAGES}?${params}`);
+    params.append("limit", pageSize.toString());
 
-      if (data.success) {
-        setColorImages(data.data);
-        setShowImageGallery(true);
-      } else {
-        setError(data.message);
-      }
-    } catch (err) {
-      setError("이미지를 불러오는 중 오류가 발생했습니다.");
-    } finally {
-      setImageLoading(false);
-    }
+    loadColorImages(params);
   };
 
   // 컬러 클릭 핸들러
   const handleColorClick = (color, currentPercent) => {
     setSelectedColor(color);
-    setShowImageGallery(false);
-    setColorImages([]);
-    setError("");
-    fetchColorImages(color, currentPercent);
+    // 비중에 따라 페이지당 이미지 수 동적 조정 (최소 10개, 최대 50개)
+    const pageSize = Math.max(10, Math.min(50, Math.round(currentPercent * 2)));
+    fetchColorImages(color, pageSize);
   };
 
   // 이미지 클릭 핸들러
@@ -677,7 +664,8 @@ function ColorAnalysis() {
                       style={{ cursor: "pointer" }}
                     >
                       <img
-                        src={image.s3_key}
+                        src={thumbnailUrl(image.s3_key)}
+                        loading="lazy"
                         alt={`${selectedColor} 컬러 이미지`}
                         onError={(e) => {
                           e.target.style.display = "none";
@@ -699,6 +687,11 @@ function ColorAnalysis() {
                   </div>
                 )}
               </div>
+              {nextCursor && (
+                <div ref={loadMoreRef} className="image-load-more">
+                  {loadingMore ? "이미지를 더 불러오는 중..." : "스크롤하여 더 보기"}
+                </div>
+              )}
             </div>
           )}
         </div>
@@ -1,6 +1,7 @@
 import React, { useState, useEffect } from "react";
-import API_ENDPOINTS, { apiCall } from "../config/api";
+import API_ENDPOINTS, { apiCall, thumbnailUrl } from "../config/api";
 import { clothingCategories } from "../data/clothingCategories";
+import useInfiniteImages from "../hooks/useInfiniteImages";
 import ImageModal from "./ImageModal";
 import "./DetailAnalysis.css";
 
@@ -31,15 +32,24 @@ function DetailAnalysis() {
 
   // 이미지 갤러리 관련 상태
   const [selectedDetail, setSelectedDetail] = useState("");
-  const [detailImages, setDetailImages] = useState([]);
-  const [showImageGallery, setShowImageGallery] = useState(false);
-  const [imageLoading, setImageLoading] = useState(false);
 
   // 이미지 모달 상태
   const [isModalOpen, setIsModalOpen] = useState(false);
   const [selectedImageData, setSelectedImageData] = useState(null);
   const [error, setError] = useState("");
 
+  // 이미지 갤러리 (커서 페이지네이션 무한 스크롤)
+  const {
+    images: detailImages,
+    nextCursor,
+    loading: imageLoading,
+    loadingMore,
+    showGallery: showImageGallery,
+    loadMoreRef,
+    load: loadDetailImages,
+    reset: resetDetailImages,
+  } = useInfiniteImages(API_ENDPOINTS.DETAIL_IMAGES, "detail-images", setError);
+
   // 데이터 로딩
   useEffect(() => {
     fetchDetailData();
@@ -130,66 +140,43 @@ function DetailAnalysis() {
     setFilters(resetFilters);
     setAppliedFilters(resetFilters);
     setSelectedDetail("");
-    setDetailImages([]);
-    setShowImageGallery(false);
+    resetDetailImages();
     setError("");
   };
 
-  // 디테일 이미지 조회 함수
-  const fetchDetailImages = async (detail, currentPercent) => {
-    try {
-      setImageLoading(true);
-      setError("");
-
-      const params = new URLSearchParams({
-        detail_1: detail,
-      });
-
-      if (appliedFilters.mainCategory) {
-        params.append("category_l1", appliedFilters.mainCategory);
-      }
-      if (appliedFilters.subCategory) {
-        params.append("category_l3", appliedFilters.subCategory);
-      }
-      if (appliedFilters.year) {
-        params.append("post_year", appliedFilters.year);
-      }
-      if (appliedFilters.month) {
-        params.append("post_month", appliedFilters.month);
-      }
-      if (appliedFilters.followersMin > 0) {
-        params.append("follower_count", appliedFilters.followersMin);
-      }
+  // 디테일 이미지 조회 함수 (다음 페이지는 useInfiniteImages가 같은 조건으로 이어서 조회)
+  const fetchDetailImages = (detail, pageSize) => {
+    const params = new URLSearchParams({
+      detail_1: detail,
+    });
 
-      // 비중에 따라 이미지 수 동적 조정 (최소 10개, 최대 50개)
-      const imageLimit = Math.max(
-        10,
-        Math.min(50, Math.round(currentPercent * 2))
-      );
-      params.append("limit", imageLimit.toString());
+    if (appliedFilters.mainCategory) {
+      params.append("category_l1", appliedFilters.mainCategory);
+    }
+    if (appliedFilters.subCategory) {
+      params.append("category_l3", appliedFilters.subCategory);
+    }
+    if (appliedFilters.year) {
+      params.append("post_year", appliedFilters.year);
+    }
+    if (appliedFilters.month) {
+      params.append("post_month", appliedFilters.month);
+    }
+    if (appliedFilters.followersMin > 0) {
+      params.append("follower_count", appliedFilters.followersMin);
+    }
 
-      const data = await apiCall(`${API_ENDPOINTS.DETAIL_IMAGES}?${params}`);
+    params.append("limit", pageSize.toString());
 
-      if (data.success) {
-        setDetailImages(data.data);
-        setShowImageGallery(true);
-      } else {
-        setError(data.message);
-      }
-    } catch (err) {
-      setError("이미지를 불러오는 중 오류가 발생했습니다.");
-    } finally {
-      setImageLoading(false);
-    }
+    loadDetailImages(params);
   };
 
   // 디테일 클릭 핸들러
   const handleDetailClick = (detail, currentPercent) => {
     setSelectedDetail(detail);
-    setShowImageGallery(false);
-    setDetailImages([]);
-    setError("");
-    fetchDetailImages(detail, currentPercent);
+    // 비중에 따라 페이지당 이미지 수 동적 조정 (최소 10개, 최대 50개)
+    const pageSize = Math.max(10, Math.min(50, Math.round(currentPercent * 2)));
+    fetchDetailImages(detail, pageSize);
   };
 
   // 이미지 클릭 핸들러
@@ -606,7 +593,8 @@ function DetailAnalysis() {
                       style={{ cursor: "pointer" }}
                     >
                       <img
-                        src={image.s3_key}
+                        src={thumbnailUrl(image.s3_key)}
+                        loading="lazy"
                         alt={`${selectedDetail} 디테일 이미지`}
                         onError={(e) => {
                           e.target.style.display = "none";
@@ -628,6 +616,11 @@ function DetailAnalysis() {
                   </div>
                 )}
               </div>
+              {nextCursor && (
+                <div ref={loadMoreRef} className="image-load-more">
+                  {loadingMore ? "이미지를 더 불러오는 중..." : "스크롤하여 더 보기"}
+                </div>
+              )}
             </div>
           )}
         </div>
@@ -1,5 +1,5 @@
 import React, { useState, useEffect } from "react";
-import API_ENDPOINTS, { apiCall } from "../config/api";
+import API_ENDPOINTS, { apiCall, thumbnailUrl } from "../config/api";
 import ImageModal from "./ImageModal";
 import "./Mood1Analysis.css";
 
@@ -833,7 +833,8 @@ function Mood1Analysis() {
                 style={{ cursor: "pointer" }}
               >
                 <img
-                  src={item.thumbnail_s3_url}
+                  src={thumbnailUrl(item.thumbnail_s3_url)}
+                  loading="lazy"
                   alt={`Mood: ${item.mood_category} - ${item.mood_look}`}
                   className="gallery-image"
                   onError={(e) => {
@@ -1,17 +1,42 @@
 import React, { useState, useEffect } from "react";
-import API_ENDPOINTS, { apiCall } from "../config/api";
+import API_ENDPOINTS, { apiCall, thumbnailUrl } from "../config/api";
 import ImageModal from "./ImageModal";
 import "./Mood2Analysis.css";
 
+// 키워드 목록 한 번에 불러오는 개수 (나머지는 "키워드 더 보기"로 keyword_offset 조회)
+const KEYWORD_PAGE_SIZE = 500;
+
+// 서버 normalize_tag와 같은 규칙 (NFKC, 앞의 #, 공백 제거, 소문자)
+const normalizeTag = (tag) =>
+  String(tag).normalize("NFKC").trim().replace(/^#+/, "").trim().toLowerCase();
+
+// 정규화 후 같은 태그는 첫 항목만 남김
+const uniqueTags = (tags) => {
+  const seen = new Set();
+  return tags.filter((tag) => {
+    const key = normalizeTag(tag);
+    if (!key || seen.has(key)) {
+      return false;
+    }
+    seen.add(key);
+    return true;
+  });
+};
+
 function Mood2Analysis() {
   const [keywords, setKeywords] = useState([]);
+  const [totalKeywords, setTotalKeywords] = useState(0);
+  // 현재 표시 중인 목록(전체 또는 무드 필터)의 전체 매칭 수
+  const [displayTotal, setDisplayTotal] = useState(0);
+  const [loadingMoreKeywords, setLoadingMoreKeywords] = useState(false);
   const [selectedKeyword, setSelectedKeyword] = useState(null);
   const [images, setImages] = useState([]);
   const [loading, setLoading] = useState(true);
 
-  // 페이지네이션 상태
+  // 페이지네이션 상태 (서버 페이지 단위)
   const [currentPage, setCurrentPage] = useState(1);
   const [imagesPerPage] = useState(20); // 페이지당 이미지 개수
+  const [totalPages, setTotalPages] = useState(0);
 
   // 이미지 모달 상태
   const [isModalOpen, setIsModalOpen] = useState(false);
@@ -26,134 +51,78 @@ function Mood2Analysis() {
   const [displayKeywords, setDisplayKeywords] = useState([]);
 
   useEffect(() => {
-    // DB 데이터를 가져와서 키워드별로 그룹화
+    // 서버에서 매칭된 키워드 목록과 무드 카테고리 가져오기
     fetchStyleData();
-    // 무드 센싱 데이터 가져오기
-    fetchMoodCategories();
   }, []);
 
-  // 무드 센싱 카테고리 데이터 가져오기
-  const fetchMoodCategories = async () => {
+  // 해시태그-무드 키워드 매칭 API 호출
+  const fetchMatches = async (filters = {}) => {
+    const params = new URLSearchParams();
+    Object.entries(filters).forEach(([key, value]) => {
+      if (value !== undefined && value !== null && value !== "") {
+        params.append(key, value);
+      }
+    });
+    const query = params.toString();
+    return apiCall(
+      query
+        ? `${API_ENDPOINTS.MOOD_STYLE_MATCHES}?${query}`
+        : API_ENDPOINTS.MOOD_STYLE_MATCHES
+    );
+  };
+
+  const fetchStyleData = async () => {
     try {
-      console.log("무드 카테고리 API 호출 시작...");
-      const result = await apiCall(API_ENDPOINTS.MOOD_KEYWORDS);
-      console.log("API 응답 데이터:", result);
+      const result = await fetchMatches({ keyword_limit: KEYWORD_PAGE_SIZE });
 
       if (result.success) {
         setMoodCategories(result.categories);
-        console.log("무드 카테고리 설정 완료:", result.categories);
+        setKeywords(result.keywords);
+        setTotalKeywords(result.total_keywords);
+        setDisplayKeywords(result.keywords); // 초기에는 모든 키워드 표시
+        setDisplayTotal(result.keyword_total);
       } else {
         console.error("API 응답 실패:", result.message);
       }
     } catch (error) {
-      console.error("무드 카테고리 조회 오류:", error);
-      console.error("오류 상세:", error.message);
+      console.error("무드 스타일 데이터 로딩 오류:", error);
+    } finally {
+      setLoading(false);
     }
   };
 
-  const fetchStyleData = async () => {
+  // 선택된 키워드의 이미지 페이지 조회
+  const fetchKeywordImages = async (keywordData, pageNumber) => {
     try {
-      console.log("무드 스타일 API 호출 시작...");
-      const result = await apiCall(API_ENDPOINTS.MOOD_STYLE);
-      console.log("API 응답 데이터:", result);
-
-      if (result.success) {
-        const keywordMap = new Map();
-        let processedCount = 0;
-        let errorCount = 0;
-
-        // DB 데이터에서 키워드 추출
-        result.data.forEach((item) => {
-          const imageUrl = item.s3_thumbnail_key;
-          const descStyle = item.desc_style;
-
-          // desc_style에서 키워드 추출
-          try {
-            let keywords;
-
-            // descStyle이 이미 배열인지 확인
-            if (Array.isArray(descStyle)) {
-              // 이미 배열 형태
-              keywords = descStyle;
-            } else if (typeof descStyle === "string") {
-              // 문자열 형태인 경우
-              if (descStyle.startsWith("[") && descStyle.endsWith("]")) {
-                // JSON 배열 형태
-                keywords = JSON.parse(descStyle);
-              } else {
-                // 쉼표로 구분된 문자열 형태
-                keywords = descStyle.split(",").map((k) => k.trim());
-              }
-            } else {
-              // 예상치 못한 타입
-              console.warn(
-                "예상치 못한 descStyle 타입:",
-                typeof descStyle,
-                descStyle
-              );
-              keywords = [];
-            }
-
-            if (Array.isArray(keywords)) {
-              keywords.forEach((keyword) => {
-                if (typeof keyword === "string" && keyword.trim()) {
-                  if (!keywordMap.has(keyword)) {
-                    keywordMap.set(keyword, []);
-                  }
-                  keywordMap.get(keyword).push(imageUrl);
-                }
-              });
-              processedCount++;
-            }
-          } catch (e) {
-            errorCount++;
-            if (errorCount <= 5) {
-              // 처음 5개 오류만 로그
-              console.error("키워드 파싱 오류:", e, "데이터:", descStyle);
-            }
-          }
-        });
-
-        console.log("처리된 라인 수:", processedCount);
-        console.log("오류 수:", errorCount);
-        console.log("추출된 키워드 수:", keywordMap.size);
-
-        // 키워드를 빈도수 순으로 정렬
-        const sortedKeywords = Array.from(keywordMap.entries())
-          .map(([keyword, images]) => ({
-            keyword,
-            count: images.length,
-            images,
-          }))
-          .sort((a, b) => b.count - a.count);
-
-        console.log("정렬된 키워드 수:", sortedKeywords.length);
-        if (sortedKeywords.length > 0) {
-          console.log("상위 5개 키워드:", sortedKeywords.slice(0, 5));
-        }
-
-        setKeywords(sortedKeywords);
-        setDisplayKeywords(sortedKeywords); // 초기에는 모든 키워드 표시
-        setLoading(false);
+      const result = await fetchMatches({
+        keyword: normalizeTag(keywordData.keyword),
+        page: pageNumber,
+        page_size: imagesPerPage,
+        keyword_limit: 1,
+      });
+
+      if (result.success && result.images) {
+        setImages(result.images.data);
+        setTotalPages(result.images.total_pages);
+        setCurrentPage(result.images.page);
       } else {
         console.error("API 응답 실패:", result.message);
-        setLoading(false);
       }
     } catch (error) {
-      console.error("무드 스타일 데이터 로딩 오류:", error);
-      setLoading(false);
+      console.error("키워드 이미지 조회 오류:", error);
     }
   };
 
   const handleKeywordClick = (keywordData) => {
     setSelectedKeyword(keywordData);
-    setImages(keywordData.images);
-    setCurrentPage(1); // 키워드 선택 시 첫 페이지로 이동
+    setImages([]);
+    fetchKeywordImages(keywordData, 1); // 키워드 선택 시 첫 페이지로 이동
   };
 
   const handleDeselect = () => {
     setSelectedKeyword(null);
     setImages([]);
+    setTotalPages(0);
   };
 
   // 이미지 클릭 핸들러
@@ -193,38 +162,65 @@ function Mood2Analysis() {
     setFilteredKeywords([]);
     // 1차 카테고리 변경 시 모든 키워드 표시
     setDisplayKeywords(keywords);
+    setDisplayTotal(totalKeywords);
   };
 
-  const handleCate2Change = (e) => {
+  const handleCate2Change = async (e) => {
     const value = e.target.value;
     setSelectedCate2(value);
 
     if (value && moodCategories[selectedCate1]?.[value]) {
-      const moodKeywords = moodCategories[selectedCate1][value];
-      setFilteredKeywords(moodKeywords);
-
-      // 기존 키워드 갤러리에서 무드 키워드와 매칭되는 것들만 필터링
-      filterKeywordsByMood(moodKeywords);
+      // 서버에서 무드 키워드와 매칭되는 해시태그만 조회
+      try {
+        const result = await fetchMatches({
+          cate1: selectedCate1,
+          cate2: value,
+          keyword_limit: KEYWORD_PAGE_SIZE,
+        });
+        if (result.success) {
+          setFilteredKeywords(uniqueTags(result.tag_norms));
+          setDisplayKeywords(result.keywords);
+          setDisplayTotal(result.keyword_total);
+        } else {
+          console.error("API 응답 실패:", result.message);
+        }
+      } catch (error) {
+        console.error("무드 키워드 매칭 조회 오류:", error);
+      }
     } else {
       setFilteredKeywords([]);
       // 필터 해제 - 모든 키워드 표시
       setDisplayKeywords(keywords);
+      setDisplayTotal(totalKeywords);
     }
   };
 
-  // 무드 키워드로 기존 키워드 갤러리 필터링
-  const filterKeywordsByMood = (moodKeywords) => {
-    const filtered = keywords.filter((keywordData) => {
-      // 무드 키워드 중 하나라도 포함되면 표시
-      return moodKeywords.some(
-        (moodKeyword) =>
-          keywordData.keyword
-            .toLowerCase()
-            .includes(moodKeyword.toLowerCase()) ||
-          moodKeyword.toLowerCase().includes(keywordData.keyword.toLowerCase())
-      );
-    });
-    setDisplayKeywords(filtered);
+  // 현재 목록의 다음 키워드 페이지 조회 (무드 필터가 없으면 전체 목록에도 반영)
+  const handleLoadMoreKeywords = async () => {
+    const filtered = Boolean(selectedCate1 && selectedCate2);
+    setLoadingMoreKeywords(true);
+    try {
+      const result = await fetchMatches({
+        cate1: filtered ? selectedCate1 : undefined,
+        cate2: filtered ? selectedCate2 : undefined,
+        keyword_limit: KEYWORD_PAGE_SIZE,
+        keyword_offset: displayKeywords.length,
+      });
+      if (result.success) {
+        const merged = [...displayKeywords, ...result.keywords];
+        setDisplayKeywords(merged);
+        setDisplayTotal(result.keyword_total);
+        if (!filtered) {
+          setKeywords(merged);
+        }
+      } else {
+        console.error("API 응답 실패:", result.message);
+      }
+    } catch (error) {
+      console.error("키워드 추가 조회 오류:", error);
+    } finally {
+      setLoadingMoreKeywords(false);
+    }
   };
 
   const toggleMoodFilter = () => {
@@ -236,30 +232,35 @@ function Mood2Analysis() {
     setSelectedCate2("");
     setFilteredKeywords([]);
     setDisplayKeywords(keywords); // 모든 키워드 표시
+    setDisplayTotal(totalKeywords);
   };
 
+  // 무드 필터 결과가 0개여도 전체 목록으로 되돌리지 않음 (빈 상태 표시)
+  const shownKeywords = displayKeywords;
+  const selectedTag = selectedKeyword ? normalizeTag(selectedKeyword.keyword) : null;
+
   // 페이지네이션 계산
-  const totalPages = Math.ceil(images.length / imagesPerPage);
+  const totalImages = selectedKeyword ? selectedKeyword.count : 0;
   const startIndex = (currentPage - 1) * imagesPerPage;
   const endIndex = startIndex + imagesPerPage;
-  const currentImages = images.slice(startIndex, endIndex);
+  const currentImages = images;
 
   // 페이지 변경 핸들러
   const handlePageChange = (pageNumber) => {
-    setCurrentPage(pageNumber);
+    fetchKeywordImages(selectedKeyword, pageNumber);
   };
 
   // 이전 페이지
   const handlePrevPage = () => {
     if (currentPage > 1) {
-      setCurrentPage(currentPage - 1);
+      fetchKeywordImages(selectedKeyword, currentPage - 1);
     }
   };
 
   // 다음 페이지
   const handleNextPage = () => {
     if (currentPage < totalPages) {
-      setCurrentPage(currentPage + 1);
+      fetchKeywordImages(selectedKeyword, currentPage + 1);
     }
   };
 
@@ -286,10 +287,7 @@ function Mood2Analysis() {
               {showMoodFilter ? "필터 숨기기" : "무드 필터"}
             </button>
             <span className="count-text">
-              {displayKeywords.length > 0
-                ? displayKeywords.length
-                : keywords.length}{" "}
-              / {keywords.length}개 표시
+              {shownKeywords.length} / {displayTotal}개 표시
             </span>
           </div>
         </div>
@@ -358,13 +356,21 @@ function Mood2Analysis() {
           </div>
         )}
 
+        {shownKeywords.length === 0 && (
+          <div className="keywords-empty">
+            {selectedCate1 && selectedCate2
+              ? `"${selectedCate2}" 무드와 매칭되는 키워드가 없습니다.`
+              : "표시할 키워드가 없습니다."}
+          </div>
+        )}
+
         <div className="keywords-grid">
-          {(displayKeywords.length > 0 ? displayKeywords : keywords).map(
+          {shownKeywords.map(
             (keywordData, index) => (
               <div
-                key={keywordData.keyword}
+                key={normalizeTag(keywordData.keyword)}
                 className={`keyword-item ${
-                  selectedKeyword?.keyword === keywordData.keyword
+                  selectedTag === normalizeTag(keywordData.keyword)
                     ? "selected"
                     : ""
                 }`}
@@ -376,6 +382,18 @@ function Mood2Analysis() {
             )
           )}
         </div>
+
+        {shownKeywords.length < displayTotal && (
+          <button
+            className="keywords-load-more"
+            onClick={handleLoadMoreKeywords}
+            disabled={loadingMoreKeywords}
+          >
+            {loadingMoreKeywords
+              ? "키워드를 더 불러오는 중..."
+              : `키워드 더 보기 (${displayTotal - shownKeywords.length}개 남음)`}
+          </button>
+        )}
       </div>
 
       {selectedKeyword && (
@@ -399,7 +417,8 @@ function Mood2Analysis() {
                 style={{ cursor: "pointer" }}
               >
                 <img
-                  src={imageUrl}
+                  src={thumbnailUrl(imageUrl)}
+                  loading="lazy"
                   alt={`${selectedKeyword.keyword} 이미지 ${
                     startIndex + index + 1
                   }`}
@@ -423,8 +442,8 @@ function Mood2Analysis() {
             <div className="pagination">
               <div className="pagination-info">
                 <span>
-                  {startIndex + 1}-{Math.min(endIndex, images.length)} /{" "}
-                  {images.length}개 이미지
+                  {startIndex + 1}-{Math.min(endIndex, totalImages)} /{" "}
+                  {totalImages}개 이미지
                 </span>
                 <span className="page-info">
                   페이지 {currentPage} / {totalPages}
@@ -1,6 +1,7 @@
 import React, { useState, useEffect } from "react";
-import API_ENDPOINTS, { apiCall } from "../config/api";
+import API_ENDPOINTS, { apiCall, thumbnailUrl } from "../config/api";
 import { clothingCategories } from "../data/clothingCategories";
+import useInfiniteImages from "../hooks/useInfiniteImages";
 import ImageModal from "./ImageModal";
 import "./PatternAnalysis.css";
 
@@ -31,15 +32,24 @@ function PatternAnalysis() {
 
   // 이미지 갤러리 관련 상태
   const [selectedPattern, setSelectedPattern] = useState("");
-  const [patternImages, setPatternImages] = useState([]);
-  const [showImageGallery, setShowImageGallery] = useState(false);
-  const [imageLoading, setImageLoading] = useState(false);
 
   // 이미지 모달 상태
   const [isModalOpen, setIsModalOpen] = useState(false);
   const [selectedImageData, setSelectedImageData] = useState(null);
   const [error, setError] = useState("");
 
+  // 이미지 갤러리 (커서 페이지네이션 무한 스크롤)
+  const {
+    images: patternImages,
+    nextCursor,
+    loading: imageLoading,
+    loadingMore,
+    showGallery: showImageGallery,
+    loadMoreRef,
+    load: loadPatternImages,
+    reset: resetPatternImages,
+  } = useInfiniteImages(API_ENDPOINTS.PATTERN_IMAGES, "pattern-images", setError);
+
   // 데이터 로딩
   useEffect(() => {
     fetchPatternData();
@@ -130,66 +140,43 @@ function PatternAnalysis() {
     setFilters(resetFilters);
     setAppliedFilters(resetFilters);
     setSelectedPattern("");
-    setPatternImages([]);
-    setShowImageGallery(false);
+    resetPatternImages();
     setError("");
   };
 
-  // 패턴 이미지 조회 함수
-  const fetchPatternImages = async (pattern, currentPercent) => {
-    try {
-      setImageLoading(true);
-      setError("");
-
-      const params = new URLSearchParams({
-        pattern: pattern,
-      });
-
-      if (appliedFilters.mainCategory) {
-        params.append("category_l1", appliedFilters.mainCategory);
-      }
-      if (appliedFilters.subCategory) {
-        params.append("category_l3", appliedFilters.subCategory);
-      }
-      if (appliedFilters.year) {
-        params.append("post_year", appliedFilters.year);
-      }
-      if (appliedFilters.month) {
-        params.append("post_month", appliedFilters.month);
-      }
-      if (appliedFilters.followersMin > 0) {
-        params.append("follower_count", appliedFilters.followersMin);
-      }
+  // 패턴 이미지 조회 함수 (다음 페이지는 useInfiniteImages가 같은 조건으로 이어서 조회)
+  const fetchPatternImages = (pattern, pageSize) => {
+    const params = new URLSearchParams({
+      pattern: pattern,
+    });
 
-      // 비중에 따라 이미지 수 동적 조정 (최소 10개, 최대 50개)
-      const imageLimit = Math.max(
-        10,
-        Math.min(50, Math.round(currentPercent * 2))
-      );
-      params.append("limit", imageLimit.toString());
+    if (appliedFilters.mainCategory) {
+      params.append("category_l1", appliedFilters.mainCategory);
+    }
+    if (appliedFilters.subCategory) {
+      params.append("category_l3", appliedFilters.subCategory);
+    }
+    if (appliedFilters.year) {
+      params.append("post_year", appliedFilters.year);
+    }
+    if (appliedFilters.month) {
+      params.append("post_month", appliedFilters.month);
+    }
+    if (appliedFilters.followersMin > 0) {
+      params.append("follower_count", appliedFilters.followersMin);
+    }
 
-      const data = await apiCall(`${API_ENDPOINTS.PATTERN_IMAGES}?${params}`);
+    params.append("limit", pageSize.toString());
 
-      if (data.success) {
-        setPatternImages(data.data);
-        setShowImageGallery(true);
-      } else {
-        setError(data.message);
-      }
-    } catch (err) {
-      setError("이미지를 불러오는 중 오류가 발생했습니다.");
-    } finally {
-      setImageLoading(false);
-    }
+    loadPatternImages(params);
   };
 
   // 패턴 클릭 핸들러
   const handlePatternClick = (pattern, currentPercent) => {
     setSelectedPattern(pattern);
-    setShowImageGallery(false);
-    setPatternImages([]);
-    setError("");
-    fetchPatternImages(pattern, currentPercent);
+    // 비중에 따라 페이지당 이미지 수 동적 조정 (최소 10개, 최대 50개)
+    const pageSize = Math.max(10, Math.min(50, Math.round(currentPercent * 2)));
+    fetchPatternImages(pattern, pageSize);
   };
 
   // 이미지 클릭 핸들러
@@ -606,7 +593,8 @@ function PatternAnalysis() {
                       style={{ cursor: "pointer" }}
                     >
                       <img
-                        src={image.s3_key}
+                        src={thumbnailUrl(image.s3_key)}
+                        loading="lazy"
                         alt={`${selectedPattern} 패턴 이미지`}
                         onError={(e) => {
                           e.target.style.display = "none";
@@ -628,6 +616,11 @@ function PatternAnalysis() {
                   </div>
                 )}
               </div>
+              {nextCursor && (
+                <div ref={loadMoreRef} className="image-load-more">
+                  {loadingMore ? "이미지를 더 불러오는 중..." : "스크롤하여 더 보기"}
+                </div>
+              )}
             </div>
           )}
         </div>
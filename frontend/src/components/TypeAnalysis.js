@@ -1,5 +1,6 @@
 import React, { useState, useEffect } from "react";
-import API_ENDPOINTS, { apiCall } from "../config/api";
+import API_ENDPOINTS, { apiCall, isAbortError, thumbnailUrl } from "../config/api";
+import useInfiniteImages from "../hooks/useInfiniteImages";
 import ImageModal from "./ImageModal";
 import "./TypeAnalysis.css";
 
@@ -24,6 +25,7 @@ function TypeAnalysis() {
   const [loading, setLoading] = useState(false);
   const [availableYears, setAvailableYears] = useState([]);
   const [availableMonths, setAvailableMonths] = useState([]);
+  const [facets, setFacets] = useState(null);
   const [filteredMonths, setFilteredMonths] = useState([]);
   const [availableCategories, setAvailableCategories] = useState([]);
   const [keywords, setKeywords] = useState([]);
@@ -34,11 +36,20 @@ function TypeAnalysis() {
   const [showCoordi, setShowCoordi] = useState(false);
   const [coordiLoading, setCoordiLoading] = useState(false);
   const [selectedCoordiItem, setSelectedCoordiItem] = useState("");
-  const [coordiImages, setCoordiImages] = useState([]);
-  const [showImageGallery, setShowImageGallery] = useState(false);
-  const [imageLoading, setImageLoading] = useState(false);
   const [error, setError] = useState("");
 
+  // 코디 이미지 갤러리 (커서 페이지네이션 무한 스크롤)
+  const {
+    images: coordiImages,
+    nextCursor,
+    loading: imageLoading,
+    loadingMore,
+    showGallery: showImageGallery,
+    loadMoreRef,
+    load: loadCoordiImages,
+    reset: resetCoordiImages,
+  } = useInfiniteImages(API_ENDPOINTS.COORDI_IMAGES, "coordi-images", setError);
+
   // 전체 선택 경로 추적을 위한 상태
   const [selectedPath, setSelectedPath] = useState({
     mainCategory: "",
@@ -94,6 +105,53 @@ function TypeAnalysis() {
     }
   };
 
+  // 선택 중인 필터 기준 드롭다운 값별 건수 (0건인 값은 비활성화)
+  useEffect(() => {
+    let ignore = false;
+    const controller = new AbortController();
+    const params = new URLSearchParams({ source: "itemtype" });
+    if (filters.mainCategory) {
+      params.append("category_l1", filters.mainCategory);
+    }
+    if (filters.year) {
+      params.append("post_year", filters.year);
+    }
+    if (filters.month) {
+      params.append("post_month", filters.month);
+    }
+    if (filters.followersMin > 0) {
+      params.append("follower_count", filters.followersMin);
+    }
+
+    apiCall(`${API_ENDPOINTS.FACETS}?${params}`, { signal: controller.signal })
+      .then((result) => {
+        if (!ignore) {
+          setFacets(result.success ? result.data.facets : null);
+        }
+      })
+      .catch(() => {
+        if (!ignore) {
+          setFacets(null);
+        }
+      });
+    return () => {
+      ignore = true;
+      // 필터가 바뀌면 이전 건수 요청은 취소
+      controller.abort();
+    };
+  }, [filters.mainCategory, filters.year, filters.month, filters.followersMin]);
+
+  const facetCount = (facet, value) => {
+    if (!facets || !facets[facet]) return null;
+    const entry = facets[facet].find((item) => String(item.value) === String(value));
+    return entry ? entry.count : 0;
+  };
+
+  const facetLabel = (facet, value) => {
+    const count = facetCount(facet, value);
+    return count === null ? "" : ` (${count.toLocaleString()})`;
+  };
+
   const handleFilterChange = (filterType, value) => {
     setFilters((prev) => {
       const newFilters = {
@@ -159,8 +217,7 @@ function TypeAnalysis() {
     setCoordiData({ left: [], right: [] });
     setShowCoordi(false);
     setSelectedCoordiItem("");
-    setCoordiImages([]);
-    setShowImageGallery(false);
+    resetCoordiImages();
     setSelectedPath({
       mainCategory: "",
       keyword: "",
@@ -177,6 +234,7 @@ function TypeAnalysis() {
 
   // 아이템 키워드 조회 (필터 값 직접 전달)
   const fetchKeywordsWithFilters = async (filterValues) => {
+    let superseded = false;
     try {
       setLoading(true);
       setError("");
@@ -198,7 +256,9 @@ function TypeAnalysis() {
         params.append("follower_count", filterValues.followersMin);
       }
 
-      const data = await apiCall(`${API_ENDPOINTS.ITEM_TYPE_KEYWORDS}?${params}`);
+      const data = await apiCall(`${API_ENDPOINTS.ITEM_TYPE_KEYWORDS}?${params}`, {
+        supersede: "item-type-keywords",
+      });
 
       if (data.success) {
         setKeywords(data.data);
@@ -208,9 +268,15 @@ function TypeAnalysis() {
         setError(data.message);
       }
     } catch (err) {
-      setError("아이템 키워드를 불러오는 중 오류가 발생했습니다.");
+      // 필터를 바꿔 취소된 요청은 새 요청이 로딩 상태를 정리
+      superseded = isAbortError(err);
+      if (!superseded) {
+        setError("아이템 키워드를 불러오는 중 오류가 발생했습니다.");
+      }
     } finally {
-      setLoading(false);
+      if (!superseded) {
+        setLoading(false);
+      }
     }
   };
 
@@ -218,6 +284,7 @@ function TypeAnalysis() {
   const fetchItemTypes = async (keyword) => {
     if (!keyword) return;
 
+    let superseded = false;
     try {
       setLoading(true);
       setError("");
@@ -237,7 +304,9 @@ function TypeAnalysis() {
         params.append("follower_count", appliedFilters.followersMin);
       }
 
-      const data = await apiCall(`${API_ENDPOINTS.ITEM_TYPE_ITEMS}?${params}`);
+      const data = await apiCall(`${API_ENDPOINTS.ITEM_TYPE_ITEMS}?${params}`, {
+        supersede: "item-type-items",
+      });
 
       if (data.success) {
         setItemTypes(data.data);
@@ -245,9 +314,14 @@ function TypeAnalysis() {
         setError(data.message);
       }
     } catch (err) {
-      setError("아이템 유형을 불러오는 중 오류가 발생했습니다.");
+      superseded = isAbortError(err);
+      if (!superseded) {
+        setError("아이템 유형을 불러오는 중 오류가 발생했습니다.");
+      }
     } finally {
-      setLoading(false);
+      if (!superseded) {
+        setLoading(false);
+      }
     }
   };
 
@@ -304,8 +378,7 @@ function TypeAnalysis() {
   const handleItemTypeClick = (itemType) => {
     setSelectedItemType(itemType);
     setSelectedCoordiItem("");
-    setShowImageGallery(false);
-    setCoordiImages([]);
+    resetCoordiImages();
     setSelectedPath((prev) => ({
       ...prev,
       itemType: itemType,
@@ -314,48 +387,32 @@ function TypeAnalysis() {
     fetchCoordiCombination(itemType);
   };
 
-  // 이미지 갤러리 조회
-  const fetchCoordiImages = async (itemType, category) => {
-    try {
-      setImageLoading(true);
-      setError("");
-
-      const params = new URLSearchParams({
-        item_type: itemType,
-        main_category: category,
-      });
-
-      // 코디 조합 필터링: 선택된 상의 + 클릭한 코디 아이템
-      if (selectedItemType && appliedFilters.mainCategory) {
-        params.append("coordi_main_category", appliedFilters.mainCategory);
-        params.append("coordi_item_type", selectedItemType);
-      }
+  // 이미지 갤러리 조회 (다음 페이지는 useInfiniteImages가 같은 조건으로 이어서 조회)
+  const fetchCoordiImages = (itemType, category) => {
+    const params = new URLSearchParams({
+      item_type: itemType,
+      main_category: category,
+    });
 
-      if (appliedFilters.year && appliedFilters.year !== "") {
-        params.append("post_year", appliedFilters.year);
-      }
-      if (appliedFilters.month && appliedFilters.month !== "") {
-        params.append("post_month", appliedFilters.month);
-      }
-      if (appliedFilters.followersMin > 0) {
-        params.append("follower_count", appliedFilters.followersMin);
-      }
+    // 코디 조합 필터링: 선택된 상의 + 클릭한 코디 아이템
+    if (selectedItemType && appliedFilters.mainCategory) {
+      params.append("coordi_main_category", appliedFilters.mainCategory);
+      params.append("coordi_item_type", selectedItemType);
+    }
 
-      params.append("limit", "20");
+    if (appliedFilters.year && appliedFilters.year !== "") {
+      params.append("post_year", appliedFilters.year);
+    }
+    if (appliedFilters.month && appliedFilters.month !== "") {
+      params.append("post_month", appliedFilters.month);
+    }
+    if (appliedFilters.followersMin > 0) {
+      params.append("follower_count", appliedFilters.followersMin);
+    }
 
-      const data = await apiCall(`${API_ENDPOINTS.COORDI_IMAGES}?${params}`);
+    params.append("limit", "20");
 
-      if (data.success) {
-        setCoordiImages(data.data);
-        setShowImageGallery(true);
-      } else {
-        setError(data.message);
-      }
-    } catch (err) {
-      setError("이미지를 불러오는 중 오류가 발생했습니다.");
-    } finally {
-      setImageLoading(false);
-    }
+    loadCoordiImages(params);
   };
 
   const handleCoordiItemClick = (itemType, category) => {
@@ -489,8 +546,13 @@ function TypeAnalysis() {
           >
             <option value="">전체</option>
             {availableCategories.map((category, index) => (
-              <option key={index} value={category}>
+              <option
+                key={index}
+                value={category}
+                disabled={facetCount("category_l1", category) === 0}
+              >
                 {category}
+                {facetLabel("category_l1", category)}
               </option>
             ))}
           </select>
@@ -505,8 +567,12 @@ function TypeAnalysis() {
           >
             <option value="">전체</option>
             {availableYears.map((year) => (
-              <option key={year} value={year}>
-                {year}년
+              <option
+                key={year}
+                value={year}
+                disabled={facetCount("post_year", year) === 0}
+              >
+                {year}년{facetLabel("post_year", year)}
               </option>
             ))}
           </select>
@@ -521,8 +587,12 @@ function TypeAnalysis() {
           >
             <option value="">전체</option>
             {filteredMonths.map((month) => (
-              <option key={month} value={month}>
-                {month}월
+              <option
+                key={month}
+                value={month}
+                disabled={facetCount("post_month", month) === 0}
+              >
+                {month}월{facetLabel("post_month", month)}
               </option>
             ))}
           </select>
@@ -897,7 +967,8 @@ function TypeAnalysis() {
                       style={{ cursor: "pointer" }}
                     >
                       <img
-                        src={image.s3_key}
+                        src={thumbnailUrl(image.s3_key)}
+                        loading="lazy"
                         alt={`${image.item_type} 이미지`}
                         onError={(e) => {
                           e.target.style.display = "none";
@@ -916,6 +987,11 @@ function TypeAnalysis() {
                   </div>
                 )}
               </div>
+              {nextCursor && (
+                <div ref={loadMoreRef} className="image-load-more">
+                  {loadingMore ? "이미지를 더 불러오는 중..." : "스크롤하여 더 보기"}
+                </div>
+              )}
             </div>
           )}
         </div>
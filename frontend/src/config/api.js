@@ -46,6 +46,7 @@ export const API_ENDPOINTS = {
   MOOD_KEYWORDS: `${API_BASE_URL}/mood-keywords`,
   MOOD_RATE: `${API_BASE_URL}/mood-rate`,
   MOOD_STYLE: `${API_BASE_URL}/mood-style`,
+  MOOD_STYLE_MATCHES: `${API_BASE_URL}/mood-style/matches`,
   
   // 아이템 센싱
   ITEM_COLOR: `${API_BASE_URL}/item-color`,
@@ -55,19 +56,300 @@ export const API_ENDPOINTS = {
   ITEM_TYPE_META: `${API_BASE_URL}/item-type-meta`,
   ITEM_TYPE_KEYWORDS: `${API_BASE_URL}/item-type-keywords`,
   ITEM_TYPE_ITEMS: `${API_BASE_URL}/item-type-items`,
+  FACETS: `${API_BASE_URL}/facets`,
   
   // 코디 조합
   COORDI_COMBINATION: `${API_BASE_URL}/coordi-combination`,
   COORDI_IMAGES: `${API_BASE_URL}/coordi-images`,
+  COORDI_ITEMSETS: `${API_BASE_URL}/coordi-itemsets`,
+
+  // 월간 추이 / 상승·하락
+  TRENDS_SERIES: `${API_BASE_URL}/trends/series`,
+  MOVERS: `${API_BASE_URL}/movers`,
   
   // 이미지 조회
   COLOR_IMAGES: `${API_BASE_URL}/color-images`,
   PATTERN_IMAGES: `${API_BASE_URL}/pattern-images`,
   DETAIL_IMAGES: `${API_BASE_URL}/detail-images`,
+  THUMBNAIL: `${API_BASE_URL}/images/thumbnail`,
+};
+
+// 갤러리용 썸네일 URL (원본 s3_key → 리사이즈된 썸네일 프록시)
+export const thumbnailUrl = (key, width = 320) =>
+  `${API_ENDPOINTS.THUMBNAIL}?${new URLSearchParams({ key, width: width.toString() })}`;
+
+// ---------------------------------------------------------------------------
+// 응답 캐시
+//  - GET 응답을 "엔드포인트 + 정렬된 쿼리" 키로 메모리(파싱된 객체)와 IndexedDB에 저장한다.
+//  - 저장된 응답은 백엔드 데이터 버전(/api/data-versions)이 같을 때만 사용하고,
+//    버전 변경은 SSE 스트림(/api/data-versions/stream)으로 받는다.
+//  - 응답은 서버가 알려준 버전(X-Data-Version, 데이터를 읽을 때 기준 버전)으로 저장하고,
+//    그 값이 현재 알고 있는 버전과 다르면 저장하지 않는다.
+//  - 같은 요청이 동시에 들어오면 하나의 fetch를 함께 기다린다.
+//  - 캐시/공유된 응답은 호출마다 복사본을 돌려줘, 한 화면이 고친 값이 다른 호출에 보이지 않게 한다.
+//  - supersede 이름이 같은 이전 요청은 새 요청이 시작될 때 취소된다.
+// ---------------------------------------------------------------------------
+const CACHE_DB_NAME = 'trendai-api-cache';
+const CACHE_STORE = 'responses';
+const MEMORY_CACHE_MAX = 64;
+// SSE 연결이 없을 때 데이터 버전 재확인 주기 (ms)
+const VERSION_RECHECK_MS = 60 * 1000;
+const NO_CACHE_ENDPOINTS = new Set([API_ENDPOINTS.HEALTH, API_ENDPOINTS.DB_TEST]);
+const DATA_VERSIONS_URL = `${API_BASE_URL}/data-versions`;
+const DATA_VERSIONS_STREAM_URL = `${API_BASE_URL}/data-versions/stream`;
+
+const memoryCache = new Map();
+const inflight = new Map();
+const supersedable = new Map();
+
+let dataVersion = null;
+let versionCheckedAt = 0;
+let versionRequest = null;
+let versionStream = null;
+let cacheDbRequest = null;
+
+export const isAbortError = (error) => error?.name === 'AbortError';
+
+const abortError = () => new DOMException('요청이 취소되었습니다.', 'AbortError');
+
+const cacheKey = (endpoint) => {
+  const url = new URL(endpoint, isBrowser ? window.location.origin : 'http://localhost');
+  url.searchParams.sort();
+  return `${url.pathname}?${url.searchParams}`;
+};
+
+const isCacheable = (endpoint, config) =>
+  isBrowser &&
+  config.cache !== false &&
+  (config.method || 'GET').toUpperCase() === 'GET' &&
+  !NO_CACHE_ENDPOINTS.has(endpoint.split('?')[0]);
+
+// IndexedDB (사용할 수 없으면 메모리 캐시만 사용)
+const openCacheDb = () => {
+  if (!cacheDbRequest) {
+    cacheDbRequest = new Promise((resolve) => {
+      if (typeof indexedDB === 'undefined') {
+        resolve(null);
+        return;
+      }
+      const request = indexedDB.open(CACHE_DB_NAME, 1);
+      request.onupgradeneeded = () => {
+        request.result.createObjectStore(CACHE_STORE, { keyPath: 'key' });
+      };
+      request.onsuccess = () => resolve(request.result);
+      request.onerror = () => resolve(null);
+      request.onblocked = () => resolve(null);
+    });
+  }
+  return cacheDbRequest;
+};
+
+const storeRequest = async (mode, operate) => {
+  const db = await openCacheDb();
+  if (!db) {
+    return null;
+  }
+  return new Promise((resolve) => {
+    try {
+      const request = operate(db.transaction(CACHE_STORE, mode).objectStore(CACHE_STORE));
+      request.onsuccess = () => resolve(request.result);
+      request.onerror = () => resolve(null);
+    } catch (error) {
+      resolve(null);
+    }
+  });
+};
+
+// 이전 데이터 버전으로 저장된 응답 정리
+const pruneStoredResponses = async (version) => {
+  const db = await openCacheDb();
+  if (!db) {
+    return;
+  }
+  try {
+    const request = db.transaction(CACHE_STORE, 'readwrite').objectStore(CACHE_STORE).openCursor();
+    request.onsuccess = () => {
+      const cursor = request.result;
+      if (cursor) {
+        if (cursor.value.version !== version) {
+          cursor.delete();
+        }
+        cursor.continue();
+      }
+    };
+  } catch (error) {
+    // 정리 실패는 무시 (다음 버전 변경 때 다시 시도)
+  }
+};
+
+// 응답은 JSON에서 파싱한 값이므로 structuredClone이 없으면 JSON 왕복으로 복사
+const copyResponse = (data) =>
+  typeof structuredClone === 'function' ? structuredClone(data) : JSON.parse(JSON.stringify(data));
+
+const rememberResponse = (key, version, data) => {
+  memoryCache.delete(key);
+  memoryCache.set(key, { version, data });
+  if (memoryCache.size > MEMORY_CACHE_MAX) {
+    memoryCache.delete(memoryCache.keys().next().value);
+  }
+};
+
+const readCache = async (key, version) => {
+  const cached = memoryCache.get(key);
+  if (cached?.version === version) {
+    rememberResponse(key, version, cached.data);
+    return cached.data;
+  }
+  const stored = await storeRequest('readonly', (store) => store.get(key));
+  if (stored?.version === version) {
+    rememberResponse(key, version, stored.data);
+    return stored.data;
+  }
+  return undefined;
+};
+
+const writeCache = (key, version, data) => {
+  rememberResponse(key, version, data);
+  storeRequest('readwrite', (store) => store.put({ key, version, data, storedAt: Date.now() }));
+};
+
+const setDataVersion = (version) => {
+  versionCheckedAt = Date.now();
+  if (version && version !== dataVersion) {
+    const previous = dataVersion;
+    dataVersion = version;
+    if (previous) {
+      memoryCache.clear();
+    }
+    pruneStoredResponses(version);
+  }
+};
+
+// 데이터 버전 변경 알림 구독 (연결이 끊기면 EventSource가 retry 간격으로 재연결)
+const watchDataVersion = () => {
+  if (versionStream || typeof EventSource === 'undefined') {
+    return;
+  }
+  versionStream = new EventSource(DATA_VERSIONS_STREAM_URL);
+  versionStream.addEventListener('versions', (event) => {
+    try {
+      setDataVersion(JSON.parse(event.data).version);
+    } catch (error) {
+      console.warn('데이터 버전 알림 처리 오류:', error);
+    }
+  });
+  versionStream.onerror = () => {
+    // 구독 상한(503) 등으로 재연결하지 않는 경우 주기적 재확인으로 전환
+    if (versionStream.readyState === EventSource.CLOSED) {
+      versionStream = null;
+    }
+  };
+};
+
+// 현재 데이터 버전 (확인할 수 없으면 null → 캐시를 사용하지 않음)
+const currentDataVersion = async () => {
+  watchDataVersion();
+  const streaming = Boolean(versionStream) && versionStream.readyState === EventSource.OPEN;
+  if (dataVersion && (streaming || Date.now() - versionCheckedAt < VERSION_RECHECK_MS)) {
+    return dataVersion;
+  }
+  if (!versionRequest) {
+    versionRequest = fetch(DATA_VERSIONS_URL)
+      .then((response) => (response.ok ? response.json() : null))
+      .then((result) => {
+        if (result?.success) {
+          setDataVersion(result.data.version);
+          return dataVersion;
+        }
+        return null;
+      })
+      .catch(() => null)
+      .finally(() => {
+        versionRequest = null;
+      });
+  }
+  return versionRequest;
+};
+
+// 같은 키의 진행 중인 요청 공유 (기다리는 호출이 모두 취소되면 fetch도 취소)
+const shareRequest = (key, load, signal) => {
+  let entry = inflight.get(key);
+  if (!entry) {
+    const controller = new AbortController();
+    entry = { controller, waiters: 0 };
+    entry.promise = load(controller.signal).finally(() => {
+      if (inflight.get(key) === entry) {
+        inflight.delete(key);
+      }
+    });
+    inflight.set(key, entry);
+  }
+  entry.waiters += 1;
+  if (!signal) {
+    return entry.promise;
+  }
+
+  const shared = entry;
+  return new Promise((resolve, reject) => {
+    const onAbort = () => {
+      shared.waiters -= 1;
+      if (shared.waiters === 0 && inflight.get(key) === shared) {
+        inflight.delete(key);
+        shared.controller.abort();
+      }
+      reject(abortError());
+    };
+    if (signal.aborted) {
+      onAbort();
+      return;
+    }
+    signal.addEventListener('abort', onAbort, { once: true });
+    shared.promise.then(resolve, reject).finally(() => signal.removeEventListener('abort', onAbort));
+  });
 };
 
+// options.signal과 options.supersede(같은 이름의 이전 요청 취소)를 하나의 signal로 결합
+const requestSignal = ({ signal, supersede }) => {
+  if (!supersede) {
+    return signal;
+  }
+  supersedable.get(supersede)?.abort();
+  const controller = new AbortController();
+  supersedable.set(supersede, controller);
+  if (signal) {
+    if (signal.aborted) {
+      controller.abort();
+    } else {
+      signal.addEventListener('abort', () => controller.abort(), { once: true });
+    }
+  }
+  return controller.signal;
+};
+
+const releaseSignal = (supersede, signal) => {
+  if (supersede && supersedable.get(supersede)?.signal === signal) {
+    supersedable.delete(supersede);
+  }
+};
+
+const fetchResponse = async (endpoint, config, signal) => {
+  const response = await fetch(endpoint, { ...config, signal });
+
+  if (!response.ok) {
+    throw new Error(`HTTP error! status: ${response.status}`);
+  }
+
+  return response;
+};
+
+const fetchJson = async (endpoint, config, signal) => (await fetchResponse(endpoint, config, signal)).json();
+
 // API 호출 헬퍼 함수
+//  options.cache: false면 응답 캐시/중복 요청 공유를 사용하지 않음 (GET 외 요청은 항상 사용하지 않음)
+//  options.supersede: 같은 이름으로 새 요청이 시작되면 이전 요청을 취소 (AbortError, isAbortError로 확인)
+//  options.signal: 호출하는 쪽에서 취소할 때 사용하는 AbortSignal
 export const apiCall = async (endpoint, options = {}) => {
+  const { cache, supersede, signal: callerSignal, ...fetchOptions } = options;
   const defaultOptions = {
     headers: {
       'Content-Type': 'application/json',
@@ -76,24 +358,53 @@ export const apiCall = async (endpoint, options = {}) => {
   
   const config = {
     ...defaultOptions,
-    ...options,
+    ...fetchOptions,
     headers: {
       ...defaultOptions.headers,
-      ...options.headers,
+      ...fetchOptions.headers,
     },
   };
+  const signal = requestSignal({ signal: callerSignal, supersede });
   
   try {
-    const response = await fetch(endpoint, config);
-    
-    if (!response.ok) {
-      throw new Error(`HTTP error! status: ${response.status}`);
+    if (!isCacheable(endpoint, { ...config, cache })) {
+      return await fetchJson(endpoint, config, signal);
+    }
+
+    const key = cacheKey(endpoint);
+    const version = await currentDataVersion();
+    if (version) {
+      const cached = await readCache(key, version);
+      if (signal?.aborted) {
+        throw abortError();
+      }
+      if (cached !== undefined) {
+        return copyResponse(cached);
+      }
     }
-    
-    return await response.json();
+    const shared = await shareRequest(
+      key,
+      async (fetchSignal) => {
+        const response = await fetchResponse(endpoint, config, fetchSignal);
+        const data = await response.json();
+        // 요청 중에 데이터 버전이 바뀌었을 수 있으므로 서버가 읽은 버전으로 저장하고,
+        // 현재 버전과 다르거나 오류 응답({"success": false, ...})이면 저장하지 않음
+        const servedVersion = response.headers.get('X-Data-Version');
+        if (servedVersion && servedVersion === dataVersion && data?.success !== false) {
+          writeCache(key, servedVersion, data);
+        }
+        return data;
+      },
+      signal
+    );
+    return copyResponse(shared);
   } catch (error) {
-    console.error('API 호출 오류:', error);
+    if (!isAbortError(error)) {
+      console.error('API 호출 오류:', error);
+    }
     throw error;
+  } finally {
+    releaseSignal(supersede, signal);
   }
 };
 
@@ -0,0 +1,113 @@
+import { useCallback, useEffect, useRef, useState } from "react";
+import { apiCall, isAbortError } from "../config/api";
+
+// 커서 페이지네이션 이미지 갤러리 (무한 스크롤)
+//  - load(params): 새 조회의 첫 페이지 (params에 limit 포함, cursor는 훅이 붙임)
+//  - reset(): 갤러리 비우기 (진행 중인 이전 조회 응답은 무시)
+//  - loadMoreRef를 목록 하단 요소에 연결하면 보일 때 같은 조회의 다음 페이지를 이어 붙인다.
+//  - 같은 supersede 이름의 이전 요청은 새 요청이 시작될 때 취소된다.
+//  - onError: 오류 메시지 설정 함수 (컴포넌트의 setError, 조회 시작 시 ""로 초기화)
+function useInfiniteImages(endpoint, supersede, onError) {
+  const [images, setImages] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loading, setLoading] = useState(false);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const [showGallery, setShowGallery] = useState(false);
+  const loadMoreRef = useRef(null);
+  // 현재 조회 조건과 세대 (reset/load마다 증가, 이전 세대 응답은 버림)
+  const queryRef = useRef(null);
+  const generationRef = useRef(0);
+
+  const fetchPage = useCallback(
+    async (params, cursor, generation) => {
+      // 다른 항목을 선택해 취소된 요청은 새 요청이 로딩 상태를 정리
+      let superseded = false;
+      try {
+        if (cursor) {
+          setLoadingMore(true);
+        } else {
+          setLoading(true);
+        }
+        onError("");
+
+        const query = new URLSearchParams(params);
+        if (cursor) {
+          query.append("cursor", cursor);
+        }
+
+        const data = await apiCall(`${endpoint}?${query}`, { supersede });
+        if (generation !== generationRef.current) {
+          return;
+        }
+
+        if (data.success) {
+          setImages((prev) => (cursor ? [...prev, ...data.data] : data.data));
+          setNextCursor(data.next_cursor || null);
+          setShowGallery(true);
+        } else {
+          onError(data.message);
+        }
+      } catch (err) {
+        superseded = isAbortError(err);
+        if (!superseded && generation === generationRef.current) {
+          onError("이미지를 불러오는 중 오류가 발생했습니다.");
+        }
+      } finally {
+        if (!superseded && generation === generationRef.current) {
+          setLoading(false);
+          setLoadingMore(false);
+        }
+      }
+    },
+    [endpoint, supersede, onError]
+  );
+
+  const reset = useCallback(() => {
+    generationRef.current += 1;
+    queryRef.current = null;
+    setImages([]);
+    setNextCursor(null);
+    setShowGallery(false);
+    setLoading(false);
+    setLoadingMore(false);
+  }, []);
+
+  const load = useCallback(
+    (params) => {
+      reset();
+      queryRef.current = params;
+      fetchPage(params, null, generationRef.current);
+    },
+    [reset, fetchPage]
+  );
+
+  // 갤러리 하단에 도달하면 다음 페이지 조회
+  useEffect(() => {
+    const target = loadMoreRef.current;
+    const params = queryRef.current;
+    if (!target || !nextCursor || loadingMore || !params) return undefined;
+
+    const generation = generationRef.current;
+    const observer = new IntersectionObserver((entries) => {
+      if (entries[0].isIntersecting) {
+        observer.disconnect();
+        fetchPage(params, nextCursor, generation);
+      }
+    });
+    observer.observe(target);
+    return () => observer.disconnect();
+  }, [nextCursor, loadingMore, fetchPage]);
+
+  return {
+    images,
+    nextCursor,
+    loading,
+    loadingMore,
+    showGallery,
+    loadMoreRef,
+    load,
+    reset,
+  };
+}
+
+export default useInfiniteImages;